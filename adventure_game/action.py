@@ -1,19 +1,22 @@
 from __future__ import annotations
 import random
-from typing import List, TYPE_CHECKING
+from typing import ContextManager, TYPE_CHECKING
 import time
 
-from . import constants, item, messages
+from . import autosave, constants, item, messages, resolver
 from .chest import Chest
+from .container import ItemContainer
 from .enemy import Enemy
 from .exceptions import InventoryFullException, WeaponBrokenException
+from .world import NO_LOCK
+from .simulation import Result
 from .trap import Trap
-from .utils import print_options, get_user_instr
+from .utils import print_items, get_user_instr
 if TYPE_CHECKING:
     from .player import Player
 
 
-def attack(player: Player, enemy: Enemy):
+def attack(player: Player, enemy: Enemy, lock: ContextManager = NO_LOCK):
     """
     Enter a loop of attack between player and enemy, consisting of
         - 1. if the player is killed, game over
@@ -22,73 +25,156 @@ def attack(player: Player, enemy: Enemy):
         - 4. if enemy isn't killed, attacks back
         - 5. display hp status at the end of each mutual attack
 
+    The player may also choose to fight it out automatically, see auto_attack.
+
     Args:
         player: the player in the game
         enemy: the enemy encountered in a certain room
+        lock: the lock of the enemy's room, held for each round of the fight
 
     """
     option = "a"
     while option != "f":
+        if option == "auto":
+            auto_attack(player, enemy, lock)
+            return
         if option == "a":
-            try:
-                player.attack(enemy)
-            except WeaponBrokenException:
-                print(
-                    "Your weapon is BROKENNNN! Throw it away and RUNNN--"
-                )
-            else:
-                weapon_name = (
-                    player.equipped["weapon"].name
-                    if player.equipped["weapon"] is not None
-                    else 'fists'
-                )
-                print(
-                    f"You attacked the {enemy.short_name} with your "
-                    f"{weapon_name}"
-                )
-
-            if not enemy.is_alive():
-                print(f"You took down the {enemy.short_name}!")
-                break
-
-            enemy.attack(player)
-            print(
-                f"The {enemy.short_name} attacked you with its "
-                f"{enemy.weapon.name}"
-            )
-
-            print(
-                f"hp stats: {player.name} {player.hp}, "
-                f"{enemy.short_name} {enemy.hp}"
-            )
-            if not player.is_alive():
+            with lock:
+                if not enemy.is_alive():
+                    # Another player got there first
+                    print(
+                        f"The {enemy.short_name} has already been taken down!"
+                    )
+                    break
+                _fight_round(player, enemy)
+            if not enemy.is_alive() or not player.is_alive():
                 break
 
-        message = "Press 'a' to continue attacking or 'f' to flee."
+        message = (
+            "Press 'a' to continue attacking, 'auto' to fight it out or 'f' "
+            "to flee."
+        )
         if player.hp < 20:
             message = "Your hp is at a dangerous level. RUN AWAY??"
-        while (inputs := get_user_instr(message, player)) is None:
+        while (
+                inputs := get_user_instr(message, player, ['a', 'auto', 'f'])
+        ) is None:
             continue
         option, _ = inputs
 
+    autosave.request(player.current_room)
     if option == 'f':
         print(f"You fled from the {enemy.short_name}. Better luck next time!")
         retreat(player)
 
 
-def take_loop(player: Player, items: List[item.Item]):
+def _fight_round(player: Player, enemy: Enemy):
+    """Plays out a single round of a fight, see attack."""
+    try:
+        player.attack(enemy)
+    except WeaponBrokenException:
+        print(
+            "Your weapon is BROKENNNN! Throw it away and RUNNN--"
+        )
+    else:
+        weapon_name = (
+            player.equipped["weapon"].name
+            if player.equipped["weapon"] is not None
+            else 'fists'
+        )
+        print(
+            f"You attacked the {enemy.short_name} with your "
+            f"{weapon_name}"
+        )
+        _notify(player, f"attacked the {enemy.short_name}")
+
+    if not enemy.is_alive():
+        print(f"You took down the {enemy.short_name}!")
+        _notify(player, f"took down the {enemy.short_name}")
+        return
+
+    enemy.attack(player)
+    print(
+        f"The {enemy.short_name} attacked you with its "
+        f"{enemy.weapon.name}"
+    )
+
+    print(
+        f"hp stats: {player.name} {player.hp}, "
+        f"{enemy.short_name} {enemy.hp}"
+    )
+
+
+def auto_attack(
+        player: Player, enemy: Enemy, lock: ContextManager = NO_LOCK
+):
     """
-    Enter a loop of collecting items from a list.
+    Resolves the whole fight between the player and the enemy in one step,
+    as if the player kept attacking until the fight was decided.
+
+    If neither side is able to damage the other, the player flees.
+
+    Args:
+        player: the player in the game
+        enemy: the enemy encountered in a certain room
+        lock: the lock of the enemy's room, held for the whole fight
+
+    """
+    with lock:
+        if not enemy.is_alive():
+            print(f"The {enemy.short_name} has already been taken down!")
+            return
+        outcome = resolver.resolve_fight(player, enemy)
+        resolver.apply_outcome(player, enemy, outcome)
+    print(
+        f"You fought the {enemy.short_name} for {outcome.rounds} rounds "
+        f"and lost {outcome.hp_lost} hp."
+    )
+    print(
+        f"hp stats: {player.name} {player.hp}, "
+        f"{enemy.short_name} {enemy.hp}"
+    )
+    _notify(player, f"fought the {enemy.short_name}")
+    autosave.request(player.current_room)
+    if outcome.result is Result.Won:
+        print(f"You took down the {enemy.short_name}!")
+        _notify(player, f"took down the {enemy.short_name}")
+    elif outcome.result is Result.Stalemate:
+        weapon = player.cur_weapon
+        if weapon is not None and weapon.is_broken():
+            print("Your weapon is BROKENNNN! Throw it away and RUNNN--")
+        else:
+            print(
+                f"You can't hurt the {enemy.short_name}, and it can't hurt "
+                "you!"
+            )
+        print(f"You fled from the {enemy.short_name}. Better luck next time!")
+        retreat(player)
+
+
+def take_loop(
+        player: Player, items: ItemContainer,
+        lock: ContextManager = NO_LOCK
+):
+    """
+    Enter a loop of collecting items from a container.
+
+    Since other players may take items from the same container, each item is
+    only picked up if it is still there, while holding the lock of its room.
+    The items are numbered by their ids, which stay the same as others are
+    taken.
 
     Args:
         player: The Player in the game.
         items: The available items.
+        lock: The lock of the room in which the items are found.
 
     """
     while len(items) > 0:
-        print_options(items)
+        print_items(items.numbered())
         options = get_user_instr(
-            f"What would you like to {messages.underline('take')}?", player
+            f"What would you like to {messages.underline('take')}?", player,
+            ['take']
         )
         if options is None:
             continue
@@ -96,15 +182,10 @@ def take_loop(player: Player, items: List[item.Item]):
         option, args = options
         if option == 'take':
             if args[0] == 'all':
-                # don't want to affect loop by removing treasure from items
-                for treasure in list(items):
-                    try:
-                        player.pick_up_item(treasure)
-                        print(f"You picked up {treasure.name}!")
-                    except InventoryFullException as e:
-                        print(e)
-                    else:
-                        items.remove(treasure)
+                with lock:
+                    # don't want to affect loop by removing treasure from items
+                    for treasure in list(items):
+                        _take(player, items, treasure)
 
             elif args[0] == 'none':
                 break
@@ -114,39 +195,57 @@ def take_loop(player: Player, items: List[item.Item]):
                 except ValueError:
                     print("take must be followed by a number")
                     continue
-                if item_num > len(items) or item_num <= 0:
-                    print(f"Invalid item number: {item_num}")
-                    continue
-                treasure = items[item_num - 1]
-                try:
-                    player.pick_up_item(treasure)
-                    print(f"You picked up {treasure.name}!")
-                except InventoryFullException as e:
-                    print(e)
-                else:
-                    items.remove(treasure)
+                with lock:
+                    treasure = items.get(item_num)
+                    if treasure is None:
+                        print(f"Invalid item number: {item_num}")
+                        continue
+                    _take(player, items, treasure)
 
         if len(items) > 0:
             message = (
                 f"Continue to take [{messages.underline('yes')}/"
                 f"{messages.underline('no')}]?"
             )
-            while (inputs := get_user_instr(message, player)) is None:
+            while (
+                    inputs := get_user_instr(message, player, ['yes', 'no'])
+            ) is None:
                 continue
             if inputs[0] == 'no':
                 break
 
 
-def collect(player: Player, chest: Chest):
+def _take(player: Player, items: ItemContainer, treasure: item.Item):
+    """
+    Moves an item from the container into the player's inventory, if it
+    fits.
+
+    """
+    try:
+        player.pick_up_item(treasure)
+        print(f"You picked up {treasure.name}!")
+    except InventoryFullException as e:
+        print(e)
+    else:
+        items.remove(treasure)
+
+
+def collect(player: Player, chest: Chest, lock: ContextManager = NO_LOCK):
     """
     Enter a loop of collecting items found in the chest
 
     Args:
         player: the player in the game
         chest: the chest found in a certain room
+        lock: the lock of the chest's room
 
     """
-    chest.open()
+    with lock:
+        was_open = chest.is_open
+        chest.open()
+    if not was_open:
+        _notify(player, "opened the chest")
+    autosave.request(player.current_room)
 
     if len(chest.contents) == 0:
         print("Bad luck! There is nothing in the chest")
@@ -155,7 +254,13 @@ def collect(player: Player, chest: Chest):
     print("Looks like you've found something...\n"
           "What would you like to take?")
 
-    take_loop(player, chest.contents)
+    take_loop(player, chest.contents, lock)
+
+
+def _notify(player: Player, what: str):
+    """Tells the players nearby of what the player did."""
+    if player.current_room is not None:
+        player.current_room.notify(player, what)
 
 
 def retreat(player: Player):
@@ -171,7 +276,9 @@ def retreat(player: Player):
     player.retreat()
 
 
-def attempt_sneak(player: Player, enemy: Enemy):
+def attempt_sneak(
+        player: Player, enemy: Enemy, lock: ContextManager = NO_LOCK
+):
     """
     The Player attempts to sneak past an enemy.
 
@@ -188,7 +295,7 @@ def attempt_sneak(player: Player, enemy: Enemy):
     else:
         # Failure...
         print(f"Oops... the {enemy.short_name} spotted you and you were forced to fight back.")
-        attack(player, enemy)
+        attack(player, enemy, lock)
 
 
 def trigger_trap(player: Player, trap: Trap) -> bool:
@@ -0,0 +1,293 @@
+"""
+This module contains Atlas, an index of the items lying in the rooms of a
+dungeon, on their floors or in their opened chests, by which a player can
+find the nearest room with food, or the outfit they dropped, without anyone
+walking through, or searching, every room.
+
+Rooms are added to an atlas as they are generated, and the atlas listens to
+the containers of each room it holds (see container.ItemContainer.listener),
+so that it learns of every item added to a room or taken from it, however
+the item came or went, as it happens. It keeps:
+
+* the room each item lies in
+* the rooms holding items of each kind, with how many each holds
+* where each room was generated: beyond which exit of which room
+
+Each room is generated beyond an exit of one other room, and only leads back
+to that room, so the rooms generated from a starting room form a tree, and
+the way between any two of them is found by climbing from both to the room
+they were both generated from, in as many steps as they are deep. A search
+for the items near a room walks out from it, a ring of rooms at a time, but
+only while it has walked through no more than a few rooms for each room
+holding what is searched for; past that, it works out the way to each of
+those rooms from their ancestry instead.
+
+"""
+from __future__ import annotations
+import collections
+import functools
+import threading
+from typing import (
+    Callable, Collection, Deque, Dict, Iterable, Iterator, List, NamedTuple,
+    Optional, Tuple, TYPE_CHECKING
+)
+
+from .compass import get_opposite_dir
+if TYPE_CHECKING:
+    from .compass import Direction
+    from .item import Item
+    from .room import Room
+
+# The number of rooms a search walks through, for each room it is looking
+# for, before working out the way to the rooms left from their ancestry
+_WALK_RATIO = 4
+
+
+class _Place(NamedTuple):
+    """Where a room was generated."""
+    # The room beyond whose exit the room was generated, if any
+    parent: Optional[Room]
+    # The direction of that exit
+    direction: Optional[Direction]
+    # The number of rooms between the room and the room its tree grew from
+    depth: int
+
+
+class Sighting(NamedTuple):
+    """An item found by a search of an atlas."""
+    item: Item
+    room: Room
+    # The exits to go through, in order, to reach the room from where the
+    # search started
+    path: List[Direction]
+
+
+class Atlas:
+    """
+    An index of the items lying in the rooms of a dungeon.
+
+    An atlas may be shared by the rooms of a SharedWorld, so it has a lock
+    of its own, which is only ever held briefly and never while waiting for
+    a room's lock.
+
+    """
+    def __init__(self):
+        self._places: Dict[Room, _Place] = {}
+        # The room each item lies in, by the item's identity
+        self._rooms: Dict[int, Room] = {}
+        # The rooms holding items of each kind, with how many each holds
+        self._holding: Dict[Optional[str], Dict[Room, int]] = (
+            collections.defaultdict(dict)
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._places)
+
+    def __contains__(self, room: object) -> bool:
+        return room in self._places
+
+    def add_room(
+            self,
+            room: Room,
+            parent: Optional[Room] = None,
+            direction: Optional[Direction] = None
+    ):
+        """
+        Adds a room, and the items it holds, to the atlas.
+
+        Args:
+            room: The room, which must not be in the atlas yet.
+            parent: The room beyond whose exit the room was generated, which
+                    must be in the atlas, if any.
+            direction: The direction of that exit.
+
+        """
+        if parent is not None and parent in self._places:
+            place = _Place(parent, direction, self._places[parent].depth + 1)
+        else:
+            place = _Place(None, None, 0)
+        listener = functools.partial(self._moved, room)
+        with self._lock:
+            self._places[room] = place
+            room.atlas = self
+            for container in room.containers():
+                container.listener = listener
+                for item in container:
+                    self._add(room, item)
+
+    def _moved(self, room: Room, item: Item, added: bool):
+        """Called whenever an item is added to a room, or taken from it."""
+        with self._lock:
+            if added:
+                self._add(room, item)
+            else:
+                self._remove(room, item)
+
+    def _add(self, room: Room, item: Item):
+        self._rooms[id(item)] = room
+        holding = self._holding[item.kind]
+        holding[room] = holding.get(room, 0) + 1
+
+    def _remove(self, room: Room, item: Item):
+        if self._rooms.get(id(item)) is room:
+            del self._rooms[id(item)]
+        holding = self._holding[item.kind]
+        left = holding.get(room, 0) - 1
+        if left > 0:
+            holding[room] = left
+        else:
+            holding.pop(room, None)
+
+    def locate(self, item: Item) -> Optional[Room]:
+        """Returns the room an item lies in, or None if it is in none."""
+        return self._rooms.get(id(item))
+
+    def rooms_holding(self, kind: Optional[str]) -> List[Room]:
+        """Returns the rooms holding items of a kind, e.g. 'food'."""
+        with self._lock:
+            return list(self._holding.get(kind, ()))
+
+    def way(self, origin: Room, room: Room) -> Optional[List[Direction]]:
+        """
+        Returns the exits leading from one room of the atlas to another, in
+        order, or None if neither was generated from the other's tree.
+
+        """
+        places = self._places
+        here, there = places.get(origin), places.get(room)
+        if here is None or there is None:
+            return None
+        up: List[Direction] = []
+        down: List[Direction] = []
+        while origin is not room:
+            if here.depth >= there.depth:
+                if here.parent is None:
+                    return None
+                up.append(get_opposite_dir(here.direction))
+                origin = here.parent
+                here = places[origin]
+            else:
+                down.append(there.direction)
+                room = there.parent
+                there = places[room]
+        down.reverse()
+        return up + down
+
+    def search(
+            self,
+            origin: Room,
+            kind: Optional[str],
+            matches: Optional[Callable[[Item], bool]] = None,
+            within: Optional[int] = None
+    ) -> Iterator[Sighting]:
+        """
+        Finds the items of a kind near a room, nearest first.
+
+        The items are found as they are asked for, so that finding the
+        nearest, with next, costs no more than it takes to find it.
+
+        Args:
+            origin: The room to search from.
+            kind: The kind of the items, e.g. 'weapon'.
+            matches: Whether an item is one to find, if not every item of the
+                     kind is.
+            within: The number of steps beyond which to stop looking, if any.
+
+        """
+        # Only looked into while walking out, so not copied unless the rest
+        # are to be worked out from their ancestry
+        rooms = self._holding.get(kind)
+        if not rooms or origin not in self._places:
+            return
+        for path, room in self._by_distance(origin, rooms, within):
+            for container in room.containers():
+                for item in container:
+                    if item.kind == kind and (
+                            matches is None or matches(item)
+                    ):
+                        yield Sighting(item, room, path)
+
+    def nearest(
+            self,
+            origin: Room,
+            kind: Optional[str],
+            matches: Optional[Callable[[Item], bool]] = None,
+            within: Optional[int] = None
+    ) -> Optional[Sighting]:
+        """Finds the nearest item of a kind to a room, see search."""
+        return next(self.search(origin, kind, matches, within), None)
+
+    def _by_distance(
+            self,
+            origin: Room,
+            rooms: Collection[Room],
+            within: Optional[int]
+    ) -> Iterator[Tuple[List[Direction], Room]]:
+        """
+        Yields the way to each of some rooms of the atlas, with the room,
+        nearest first, leaving out those more than within steps away.
+
+        """
+        found = set()
+        ring: List[Tuple[Room, List[Direction]]] = [(origin, [])]
+        seen = {origin}
+        walked = 0
+        steps = 0
+        while ring and (within is None or steps <= within):
+            walked += len(ring)
+            if walked > len(rooms) * _WALK_RATIO:
+                break
+            next_ring = []
+            for room, path in ring:
+                if room in rooms:
+                    found.add(room)
+                    yield path, room
+                    if len(found) == len(rooms):
+                        return
+                for d, adjacent in room.adjacent_rooms().items():
+                    if adjacent not in seen:
+                        seen.add(adjacent)
+                        next_ring.append((adjacent, path + [d]))
+            ring = next_ring
+            steps += 1
+        else:
+            # Every room within reach was walked through
+            return
+
+        # The rooms of the rings walked through were all found, so the
+        # others are at least as far away as the rooms of the ring reached
+        with self._lock:
+            rooms = list(rooms)
+        ways = []
+        for room in rooms:
+            if room in found:
+                continue
+            path = self.way(origin, room)
+            if path is not None and (within is None or len(path) <= within):
+                ways.append((path, room))
+        ways.sort(key=lambda way: len(way[0]))
+        yield from ways
+
+
+def survey(rooms: Iterable[Room]) -> Atlas:
+    """
+    Makes an atlas of rooms restored from a save, which, unlike rooms as
+    they are generated, are added all at once.
+
+    """
+    rooms = list(rooms)
+    members = set(rooms)
+    atlas = Atlas()
+    for start in rooms:
+        if start in atlas:
+            continue
+        atlas.add_room(start)
+        queue: Deque[Room] = collections.deque([start])
+        while queue:
+            room = queue.popleft()
+            for d, adjacent in room.adjacent_rooms().items():
+                if adjacent in members and adjacent not in atlas:
+                    atlas.add_room(adjacent, room, d)
+                    queue.append(adjacent)
+    return atlas
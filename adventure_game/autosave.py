@@ -0,0 +1,437 @@
+"""
+This module saves games in the background while they are being played.
+
+Saving a whole world on the game's thread would make the game stutter, so an
+Autosaver splits each save in two:
+
+* on the game's thread, at a prompt from which the game can be resumed, it
+  copies the player and the rooms which may have changed since the previous
+  save (the rooms the player has been in), which takes as long as copying a
+  handful of small objects however large the world has grown
+* on a writer thread, it merges the copied rooms into its own image of the
+  world, then serializes and compresses the image and atomically replaces
+  the save file with it
+
+A save is taken whenever something worth saving has happened (a fight, a
+chest being opened, a room being entered), as well as periodically. The
+Autosaver of the calling thread is found through bind and current, as for
+console.Console, so that the actions which call for a save need not be
+given one.
+
+A game resumed from its save file goes on being saved to it through resume,
+whose Autosaver starts from the saved rooms, so that its first save copies
+only the rooms changed since, like any other.
+
+"""
+from __future__ import annotations
+import copy
+import os
+import pickle
+import queue
+import threading
+import time
+import zlib
+from typing import (
+    Any, Dict, List, Mapping, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
+)
+
+if TYPE_CHECKING:
+    from .item import Item
+    from .player import Player
+    from .room import Room
+
+# The number of seconds after which a game is saved even if nothing happened
+DEFAULT_INTERVAL = 60.
+
+_local = threading.local()
+
+# Room index -> room type, state and exits (direction -> room index)
+_RoomTable = Dict[int, Tuple[type, Dict[str, Any], Dict[Any, int]]]
+
+
+class _RoomRef(NamedTuple):
+    """Stands in for a room in the copy of the player."""
+    index: int
+
+
+class _ItemRef(NamedTuple):
+    """
+    Stands in for an item the player dropped in a room, in the copy of the
+    player, so that it is restored as the item lying in the restored room.
+
+    """
+    room: int
+    # The index of the item's container among the room's containers
+    container: int
+    item_id: int
+
+
+class _Snapshot(NamedTuple):
+    """The state of a game copied by Autosaver.checkpoint."""
+    taken_at: float
+    player: Player
+    resume_point: Any
+    # The rooms which may have changed since the previous snapshot
+    rooms: _RoomTable
+
+
+class SaveStats:
+    """
+    Measures how long saves pause the game, and how far the writer lags
+    behind it, and records the writes which failed.
+
+    """
+    def __init__(self):
+        self.saves = 0
+        self.writes = 0
+        self.failures = 0
+        self.last_error: Optional[Exception] = None
+        self.total_pause = 0.
+        self.max_pause = 0.
+        self.total_lag = 0.
+        self.max_lag = 0.
+
+    def __str__(self):
+        if not self.saves:
+            return "no saves"
+        status = (
+            f"{self.saves} saves, {self.writes} writes; pause "
+            f"{self.total_pause / self.saves * 1000:.2f} ms mean, "
+            f"{self.max_pause * 1000:.2f} ms max"
+        )
+        if self.writes:
+            status += (
+                f"; writer lag {self.total_lag / self.writes * 1000:.1f} ms "
+                f"mean, {self.max_lag * 1000:.1f} ms max"
+            )
+        if self.failures:
+            status += (
+                f"; {self.failures} failed, last: {self.last_error}"
+            )
+        return status
+
+
+class Autosaver:
+    """
+    Saves a game to a file in the background.
+
+    Args:
+        path: The file to save the game to.
+        interval: The number of seconds after which the game is saved at the
+                  next opportunity, even if nothing worth saving happened.
+        saved_rooms: The rooms restored from the file, by their index in it,
+                     if the game was resumed from it (see resume).
+
+    """
+    def __init__(
+            self,
+            path: str,
+            interval: float = DEFAULT_INTERVAL,
+            saved_rooms: Optional[Mapping[int, Room]] = None
+    ):
+        self.path = path
+        self.interval = interval
+        self.stats = SaveStats()
+        # The index of each room that has been saved, in the order they were
+        # first saved
+        self._indices: Dict[Room, int] = {
+            room: index for index, room in (saved_rooms or {}).items()
+        }
+        self._resumed = saved_rooms is not None
+        self._touched: Set[Room] = set()
+        self._requested = False
+        self._last_save = time.monotonic()
+        self._snapshots: queue.SimpleQueue = queue.SimpleQueue()
+        self._stats_lock = threading.Lock()
+        # The number of failures the player has been told of
+        self._reported = 0
+        self._writer = threading.Thread(
+            target=self._write_loop, name='autosave', daemon=True
+        )
+        self._writer.start()
+
+    def request(self, room: Optional[Room] = None):
+        """
+        Asks for the game to be saved at the next opportunity.
+
+        Args:
+            room: A room which changed, if any.
+
+        """
+        self._requested = True
+        if room is not None:
+            self._touched.add(room)
+
+    def touch(self, room: Room):
+        """Marks a room as changed, to be saved with the next save."""
+        self._touched.add(room)
+
+    def checkpoint(self, player: Player, resume_point: Any):
+        """
+        Saves the game if a save was asked for, or is due; called from the
+        game's thread at a point the game may be resumed from.
+
+        Tells the player of any save which failed since the last checkpoint.
+        Once the writer has stopped, nothing is saved any more.
+
+        Args:
+            player: The player.
+            resume_point: Where to resume the game, see console.resumable.
+
+        """
+        with self._stats_lock:
+            failures, error = self.stats.failures, self.stats.last_error
+        if failures > self._reported:
+            self._reported = failures
+            print(f"The game could not be saved: {error}")
+        if not self._writer.is_alive():
+            return
+        now = time.monotonic()
+        if not self._requested and now - self._last_save < self.interval:
+            return
+        start = time.perf_counter()
+        self._snapshots.put(self._snapshot(player, resume_point, now))
+        pause = time.perf_counter() - start
+        self._requested = False
+        self._last_save = now
+        with self._stats_lock:
+            self.stats.saves += 1
+            self.stats.total_pause += pause
+            self.stats.max_pause = max(self.stats.max_pause, pause)
+
+    def _snapshot(
+            self, player: Player, resume_point: Any, now: float
+    ) -> _Snapshot:
+        """Copies the player and the rooms which may have changed."""
+        # Imported here since rooms depend on this module for their actions
+        from .room import saved_state
+        pending: List[Room] = list(self._touched)
+        pending += [
+            r for r in (player.current_room, player.previous_room)
+            if r is not None
+        ]
+        self._touched.clear()
+        # The rooms indexed from here on are new since the previous save
+        first_new = len(self._indices)
+        rooms = {}
+        while pending:
+            room = pending.pop()
+            index = self._index(room)
+            if index in rooms:
+                continue
+            adjacent_rooms = room.adjacent_rooms()
+            if index >= first_new:
+                # A new room was generated beyond the exits of the rooms it
+                # links to, so they changed too
+                pending += adjacent_rooms.values()
+            exits = {}
+            for d, adjacent in adjacent_rooms.items():
+                if adjacent not in self._indices:
+                    pending.append(adjacent)
+                exits[d] = self._index(adjacent)
+            rooms[index] = (
+                type(room), copy.deepcopy(saved_state(room)), exits
+            )
+
+        # The player refers to their rooms, and to the items they dropped,
+        # by index in the copy
+        memo: Dict[int, Any] = {
+            id(r): _RoomRef(self._indices[r])
+            for r in (player.current_room, player.previous_room)
+            if r is not None
+        }
+        for item in player.dropped.values():
+            ref = self._item_ref(player, item)
+            if ref is not None:
+                memo[id(item)] = ref
+        return _Snapshot(
+            now, copy.deepcopy(player, memo), resume_point, rooms
+        )
+
+    def _item_ref(self, player: Player, item: Item) -> Optional[_ItemRef]:
+        """
+        Returns where an item the player dropped lies, or None if it lies in
+        no saved room.
+
+        """
+        here = player.current_room
+        atlas = None if here is None else here.atlas
+        room = None if atlas is None else atlas.locate(item)
+        if room is None or room not in self._indices:
+            return None
+        for i, container in enumerate(room.containers()):
+            if item in container:
+                return _ItemRef(self._indices[room], i, container.id_of(item))
+        return None
+
+    def _index(self, room: Room) -> int:
+        index = self._indices.get(room)
+        if index is None:
+            index = self._indices[room] = len(self._indices)
+        return index
+
+    def _write_loop(self):
+        """Writes the snapshots to the save file; runs on the writer thread."""
+        # The rooms of a resumed game are read back here, rather than kept
+        # from loading it, so as not to hold up the game while they are
+        rooms: _RoomTable = {}
+        if self._resumed:
+            try:
+                rooms = _read(self.path)[2]
+            except (OSError, pickle.PickleError, zlib.error) as e:
+                # Saving only the rooms copied from here on would lose the
+                # others, so nothing more is saved
+                self._failed(e)
+                return
+        while True:
+            snapshots = [self._snapshots.get()]
+            # Merge every snapshot taken while the previous one was written,
+            # so the writer never falls more than a write behind
+            while not self._snapshots.empty():
+                snapshots.append(self._snapshots.get())
+            stop = snapshots[-1] is None
+            snapshots = [s for s in snapshots if s is not None]
+            if snapshots:
+                for snapshot in snapshots:
+                    rooms.update(snapshot.rooms)
+                latest = snapshots[-1]
+                try:
+                    _write(self.path, zlib.compress(pickle.dumps(
+                        (latest.player, latest.resume_point, rooms),
+                        pickle.HIGHEST_PROTOCOL
+                    )))
+                except (OSError, pickle.PickleError) as e:
+                    # The rooms stay merged, to be written with the next
+                    # snapshot
+                    self._failed(e)
+                else:
+                    self._written(snapshots)
+            if stop:
+                return
+
+    def _written(self, snapshots: List[_Snapshot]):
+        """Records the snapshots just written; called from the writer."""
+        done = time.monotonic()
+        with self._stats_lock:
+            for snapshot in snapshots:
+                lag = done - snapshot.taken_at
+                self.stats.writes += 1
+                self.stats.total_lag += lag
+                self.stats.max_lag = max(self.stats.max_lag, lag)
+
+    def _failed(self, error: Exception):
+        """Records a save which failed; called from the writer thread."""
+        with self._stats_lock:
+            self.stats.failures += 1
+            self.stats.last_error = error
+
+    def close(self):
+        """Waits for the pending saves to be written, and stops the writer."""
+        self._snapshots.put(None)
+        self._writer.join()
+
+
+def _write(path: str, data: bytes):
+    """Atomically replaces a file with the given data."""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def _read(path: str) -> Tuple[Player, Any, _RoomTable]:
+    """Reads a save file as it was written."""
+    with open(path, 'rb') as fh:
+        return pickle.loads(zlib.decompress(fh.read()))
+
+
+def _restore(path: str) -> Tuple[Player, Any, Dict[int, Room]]:
+    """Restores a saved game, with its rooms by their index in the save."""
+    # Imported here since rooms depend on this module for their actions
+    from .room import restore_rooms
+    player, resume_point, states = _read(path)
+    rooms = {index: cls.__new__(cls) for index, (cls, _, _) in states.items()}
+    restore_rooms(
+        (rooms[index], state, {d: rooms[i] for d, i in exits.items()})
+        for index, (_, state, exits) in states.items()
+    )
+    for attr in ('current_room', 'previous_room'):
+        ref = getattr(player, attr)
+        if isinstance(ref, _RoomRef):
+            setattr(player, attr, rooms[ref.index])
+    for kind, ref in list(player.dropped.items()):
+        if isinstance(ref, _ItemRef):
+            item = rooms[ref.room].containers()[ref.container].get(ref.item_id)
+            if item is None:
+                del player.dropped[kind]
+            else:
+                player.dropped[kind] = item
+    return player, resume_point, rooms
+
+
+def load(path: str) -> Tuple[Player, Any]:
+    """
+    Restores a game saved by an Autosaver.
+
+    Args:
+        path: The save file.
+
+    Returns:
+        The player and the point at which to resume their game.
+
+    """
+    player, resume_point, _ = _restore(path)
+    return player, resume_point
+
+
+def resume(
+        path: str, interval: float = DEFAULT_INTERVAL
+) -> Tuple[Player, Any, Autosaver]:
+    """
+    Restores a game saved by an Autosaver, to go on saving it to the same
+    file.
+
+    Args:
+        path: The save file.
+        interval: See Autosaver.
+
+    Returns:
+        The player, the point at which to resume their game, and the
+        Autosaver to save it with.
+
+    """
+    player, resume_point, rooms = _restore(path)
+    return player, resume_point, Autosaver(path, interval, rooms)
+
+
+def bind(saver: Optional[Autosaver]):
+    """Binds an Autosaver to the calling thread, or unbinds it if None."""
+    _local.saver = saver
+
+
+def current() -> Optional[Autosaver]:
+    """Returns the Autosaver bound to the calling thread, if any."""
+    return getattr(_local, 'saver', None)
+
+
+def request(room: Optional[Room] = None):
+    """Asks the calling thread's Autosaver, if any, for a save."""
+    saver = current()
+    if saver is not None:
+        saver.request(room)
+
+
+def touch(room: Room):
+    """Marks a room as changed for the calling thread's Autosaver, if any."""
+    saver = current()
+    if saver is not None:
+        saver.touch(room)
+
+
+def checkpoint(player: Player, resume_point: Any):
+    """Gives the calling thread's Autosaver, if any, a chance to save."""
+    saver = current()
+    if saver is not None:
+        saver.checkpoint(player, resume_point)
@@ -0,0 +1,439 @@
+"""
+This module contains a harness which plays complete games with bots, to catch
+balance regressions in the data bank before they reach players.
+
+Each game is driven by a Policy, which makes the decisions a player would
+otherwise be prompted for. Games are played without a terminal, using the
+rooms, the player and the silent rules in the headless module, and are spread
+across a pool of processes. Each worker plays a batch of games and sends back
+the aggregated statistics of the whole batch, rather than one message per
+game.
+
+"""
+from __future__ import annotations
+import abc
+import argparse
+import collections
+import multiprocessing
+import random
+import time
+from typing import (
+    Callable, Counter, Dict, Iterator, List, NamedTuple, Optional, Type
+)
+
+from . import compass, headless, odds
+from .enemy import Enemy
+from .outfit import Outfit
+from .player import Player
+from .resolver import apply_outcome, resolve_fight
+from .room import Room
+from .simulation import Result
+from .weapon import Weapon
+
+# Cause of death recorded for bots which are still alive at the turn limit
+SURVIVED = 'survived'
+
+
+class Policy(abc.ABC):
+    """
+    An abstract class used as the base class for all bot policies.
+
+    Args:
+        rng: The random number generator to make any random decisions with.
+
+    """
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    @abc.abstractmethod
+    def choose_option(self, player: Player, options: List[str]) -> str:
+        """Chooses one of the special actions available in the room."""
+        pass
+
+    def choose_exit(self, player: Player) -> compass.Direction:
+        """Chooses the direction in which to leave the room."""
+        return self.rng.choice(player.current_room.exits)
+
+    def keep_fighting(self, player: Player, enemy: Enemy) -> bool:
+        """Decides whether to keep fighting after each round of a fight."""
+        return True
+
+    def manage_inventory(self, player: Player):
+        """Equips or eats items from the inventory, between turns."""
+        pass
+
+
+class RandomPolicy(Policy):
+    """Makes every decision uniformly at random."""
+    def choose_option(self, player: Player, options: List[str]) -> str:
+        return self.rng.choice(options)
+
+    def keep_fighting(self, player: Player, enemy: Enemy) -> bool:
+        return self.rng.random() < 0.8
+
+
+class GreedyLootPolicy(Policy):
+    """
+    Opens every chest, picks up everything it finds, fights every monster and
+    always equips its strongest weapon and sturdiest outfit.
+
+    """
+    PREFERENCES = ['open', 'look', 'attack']
+
+    def choose_option(self, player: Player, options: List[str]) -> str:
+        for option in self.PREFERENCES:
+            if option in options:
+                return option
+        return self.rng.choice(options)
+
+    def manage_inventory(self, player: Player):
+        best = _best_weapon(player)
+        current = player.cur_weapon
+        if best is not None:
+            if current is None or current.is_broken() or \
+                    best.attack_strength > current.attack_strength:
+                player.change_item('weapon', best)
+        if player.outfits:
+            _, best = next(player.outfits.sorted_by('defence'))
+            if player.cur_outfit is None or \
+                    best.defence > player.cur_outfit.defence:
+                player.change_item('outfit', best)
+
+
+class CautiousPolicy(Policy):
+    """
+    Only fights monsters it is sure to beat, sneaks past the others when the
+    odds are good and runs away otherwise. It keeps its hp up by eating, and
+    favours luck and defence when choosing what to wear.
+
+    """
+    SNEAK_ODDS_THRESHOLD = 0.5
+
+    def choose_option(self, player: Player, options: List[str]) -> str:
+        if 'attack' in options:
+            monster = player.current_room.monster
+            if resolve_fight(player, monster).result is Result.Won:
+                return 'attack'
+            if odds.SNEAK_ODDS[player.get_luck()] >= self.SNEAK_ODDS_THRESHOLD:
+                return 'sneak'
+            return 'run'
+        for option in ['open', 'look']:
+            if option in options:
+                return option
+        return self.rng.choice(options)
+
+    def keep_fighting(self, player: Player, enemy: Enemy) -> bool:
+        return player.hp >= 20
+
+    def manage_inventory(self, player: Player):
+        if player.foods and player.hp < player.max_hp // 2:
+            best, food = max(
+                player.foods.numbered(),
+                key=lambda entry: entry[1].restore_amount
+            )
+            if food.restore_amount > 0:
+                player.eat(best)
+        if player.outfits:
+            def score(o: Optional[Outfit]) -> int:
+                return -1 if o is None else o.defence + o.luck_stat
+            best = max(player.outfits, key=score)
+            if score(best) > score(player.cur_outfit):
+                player.change_item('outfit', best)
+        best = _best_weapon(player)
+        current = player.cur_weapon
+        if best is not None and (current is None or current.is_broken()):
+            player.change_item('weapon', best)
+
+
+def _best_weapon(player: Player) -> Optional[Weapon]:
+    """Returns the player's strongest unbroken weapon, if they have one."""
+    return next(
+        (w for _, w in player.weapons.sorted_by('attack')
+         if not w.is_broken()),
+        None
+    )
+
+
+POLICIES: Dict[str, Type[Policy]] = {
+    'random': RandomPolicy,
+    'greedy': GreedyLootPolicy,
+    'cautious': CautiousPolicy,
+}
+
+
+class GameResult(NamedTuple):
+    turns: int
+    depth: int
+    rooms_visited: int
+    cause_of_death: str
+    items_collected: int
+
+
+class HarnessStats:
+    """
+    Aggregated results of a number of games.
+
+    """
+    def __init__(self):
+        self.games = 0
+        self.turns = 0
+        self.rooms_visited = 0
+        self.items_collected = 0
+        # Depth reached -> number of games
+        self.depths: Counter[int] = collections.Counter()
+        # Cause of death -> number of games
+        self.causes_of_death: Counter[str] = collections.Counter()
+        # Wall-clock time spent playing the games, in seconds
+        self.elapsed = 0.
+
+    def add(self, result: GameResult):
+        """Records the result of a single game."""
+        self.games += 1
+        self.turns += result.turns
+        self.rooms_visited += result.rooms_visited
+        self.items_collected += result.items_collected
+        self.depths[result.depth] += 1
+        self.causes_of_death[result.cause_of_death] += 1
+
+    def merge(self, other: HarnessStats):
+        """Adds the results aggregated in another HarnessStats to this one."""
+        self.games += other.games
+        self.turns += other.turns
+        self.rooms_visited += other.rooms_visited
+        self.items_collected += other.items_collected
+        self.depths.update(other.depths)
+        self.causes_of_death.update(other.causes_of_death)
+
+    @property
+    def mean_depth(self) -> float:
+        total = sum(depth * n for depth, n in self.depths.items())
+        return total / self.games if self.games else 0.
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.elapsed if self.elapsed else 0.
+
+    def __str__(self):
+        """Returns a human-readable summary of the statistics."""
+        games = max(self.games, 1)
+        causes = ', '.join(
+            f'{cause} {100 * n / games:.1f}%'
+            for cause, n in self.causes_of_death.most_common()
+        )
+        return (
+            f"games: {self.games}\n"
+            f"mean depth: {self.mean_depth:.2f}, "
+            f"max depth: {max(self.depths, default=0)}\n"
+            f"mean rooms visited: {self.rooms_visited / games:.2f}\n"
+            f"mean items collected: {self.items_collected / games:.2f}\n"
+            f"causes of death: {causes}\n"
+            f"turns per second: {self.turns_per_second:.0f}"
+        )
+
+
+def _fight(player: Player, enemy: Enemy, policy: Policy):
+    """
+    Fights until the fight is decided, or until the policy decides to flee
+    or neither side can damage the other any more.
+
+    """
+    while True:
+        headless.fight_round(player, enemy)
+        if not enemy.is_alive() or not player.is_alive():
+            return
+        if not policy.keep_fighting(player, enemy) or \
+                resolve_fight(player, enemy).result is Result.Stalemate:
+            player.retreat()
+            return
+
+
+def _auto_fight(player: Player, enemy: Enemy):
+    """Fights it out in one step, as in action.auto_attack."""
+    outcome = resolve_fight(player, enemy)
+    apply_outcome(player, enemy, outcome)
+    if outcome.result is Result.Stalemate:
+        player.retreat()
+
+
+def play_game(
+        policy_cls: Type[Policy],
+        seed: Optional[int] = None,
+        max_turns: int = 200,
+        hp: int = 100
+) -> GameResult:
+    """
+    Plays a complete game with a bot, following the same flow as run_game.
+
+    A turn consists of entering a room, taking one of its special actions (if
+    any) and leaving through one of its exits.
+
+    Since rooms, items and monsters are generated from the random module's
+    global generator, a seed is set on that generator, for the whole
+    process; run_harness therefore plays its games in worker processes of
+    their own. Without a seed, the global generator is left as it is.
+
+    Args:
+        policy_cls: The type of Policy which makes the bot's decisions.
+        seed: An optional seed, to make the game reproducible. Note that it
+              reseeds the random module, see above.
+        max_turns: The number of turns after which the bot stops playing.
+        hp: The bot's hp at the start of the game.
+
+    Returns:
+        The result of the game.
+
+    """
+    if seed is not None:
+        random.seed(seed)
+    policy = policy_cls(random.Random(seed))
+    player = Player("Bot", hp)
+    player.move_to_new_room()
+
+    # Number of steps from the starting room of the current level to each
+    # room reached in it
+    depths: Dict[Room, int] = {player.current_room: 0}
+    # The rooms reached, and the deepest of them, in the levels before
+    rooms_visited = 0
+    max_depth = 0
+    items_collected = 0
+    cause = SURVIVED
+    turns = 0
+    while turns < max_turns:
+        turns += 1
+        room = player.current_room
+        trap = room.trap
+        if trap is not None and headless.trigger_trap(player, trap):
+            if not player.is_alive():
+                cause = trap.name
+                break
+            # The trap whisks the player away to a brand new level
+            rooms_visited += len(depths)
+            max_depth = max(max_depth, *depths.values())
+            depths = {player.current_room: 0}
+            continue
+
+        options = list(room.get_options())
+        if options:
+            option = policy.choose_option(player, options)
+            if option == 'attack' or (
+                    option == 'sneak' and not headless.sneak_succeeds(player)
+            ):
+                _fight(player, room.monster, policy)
+            elif option == 'auto':
+                _auto_fight(player, room.monster)
+            elif option == 'run':
+                player.retreat()
+            elif option == 'open':
+                room.chest.open()
+                items_collected += headless.take_all(
+                    player, room.chest.contents
+                )
+            elif option == 'look':
+                items_collected += headless.take_all(player, room.items)
+            room.changed()
+            if not player.is_alive():
+                cause = room.monster.short_name
+                break
+        policy.manage_inventory(player)
+
+        depth = depths[player.current_room]
+        player.go(policy.choose_exit(player))
+        depths.setdefault(player.current_room, depth + 1)
+
+    return GameResult(
+        turns,
+        max(max_depth, *depths.values()),
+        rooms_visited + len(depths),
+        cause,
+        items_collected
+    )
+
+
+def _play_batch(args) -> HarnessStats:
+    """Plays a batch of games in a worker process."""
+    policy_name, seeds, max_turns = args
+    stats = HarnessStats()
+    start = time.perf_counter()
+    for seed in seeds:
+        stats.add(play_game(POLICIES[policy_name], seed, max_turns))
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _batches(
+        games: int, batch_size: int, first_seed: int
+) -> Iterator[List[int]]:
+    for start in range(0, games, batch_size):
+        stop = min(start + batch_size, games)
+        yield list(range(first_seed + start, first_seed + stop))
+
+
+def run_harness(
+        policy_name: str,
+        games: int,
+        processes: Optional[int] = None,
+        batch_size: int = 100,
+        max_turns: int = 200,
+        first_seed: int = 0,
+        on_batch: Optional[Callable[[HarnessStats], None]] = None
+) -> HarnessStats:
+    """
+    Plays many games with a bot across a pool of processes.
+
+    Args:
+        policy_name: The name of the policy in POLICIES to play with.
+        games: The number of games to play.
+        processes: The number of worker processes (defaults to the number of
+                   CPUs).
+        batch_size: The number of games played per message sent back from a
+                    worker.
+        max_turns: The number of turns after which each game is stopped.
+        first_seed: The seed of the first game; the others follow on from it.
+        on_batch: An optional callback, invoked with the running totals each
+                  time a batch of results arrives.
+
+    Returns:
+        The aggregated statistics of all the games.
+
+    """
+    if policy_name not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy_name}")
+
+    total = HarnessStats()
+    start = time.perf_counter()
+    tasks = (
+        (policy_name, seeds, max_turns)
+        for seeds in _batches(games, batch_size, first_seed)
+    )
+    with multiprocessing.Pool(processes) as pool:
+        for stats in pool.imap_unordered(_play_batch, tasks):
+            total.merge(stats)
+            total.elapsed = time.perf_counter() - start
+            if on_batch is not None:
+                on_batch(total)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play many games with bots and report the statistics."
+    )
+    parser.add_argument('--policy', choices=list(POLICIES), default='greedy')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--max-turns', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(run_harness(
+        args.policy,
+        args.games,
+        args.processes,
+        args.batch_size,
+        args.max_turns,
+        args.seed
+    ))
+
+
+if __name__ == '__main__':
+    main()
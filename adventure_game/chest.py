@@ -1,6 +1,6 @@
 import random
-from typing import List
 
+from .container import ItemContainer
 from .item import Item
 from .outfit import generate_outfit
 from .weapon import generate_weapon
@@ -8,10 +8,10 @@ from .weapon import generate_weapon
 
 class Chest:
     def __init__(self):
-        self.contents: List[Item] = []
+        self.contents = ItemContainer()
         self.is_open = False
 
-    def open(self) -> List[Item]:
+    def open(self) -> ItemContainer:
         """
         Generates a list of items to be served as treasure to the player.
 
@@ -20,7 +20,7 @@ class Chest:
         to the chest.
 
         Returns:
-            List of Items
+            The contents of the chest
 
         """
         if self.is_open:
@@ -43,8 +43,7 @@ class Chest:
         Returns:
 
         """
-        if item in self.contents:
-            self.contents.remove(item)
+        self.contents.discard(item)
 
     def clear(self):
         """
@@ -0,0 +1,204 @@
+"""
+This module contains a combat engine, which plays out many fights at once,
+one round at a time.
+
+The engine holds its fights as a struct of arrays: a column for each of the
+parameters of a fight, with a row per fight. Each round is played out for all
+of the fights together, a column at a time, rather than through the methods
+of each fight's Player, Enemy and Weapon. The rules are exactly those of
+action.attack:
+    - the player strikes first, with their weapon or, if unarmed, their fists
+      (which always deal 1 damage)
+    - each strike with a weapon uses up 1 durability, and a broken weapon
+      deals no damage
+    - the enemy strikes back if it is still alive, with the damage of its
+      weapon reduced by the defence of the player's outfit
+
+A fight which neither side can win any more, since neither can damage the
+other, ends in a stalemate.
+
+"""
+from __future__ import annotations
+import itertools
+from typing import Dict, List, NamedTuple, Optional, TYPE_CHECKING
+
+from .simulation import FightOutcome, FightSpec, Result, fight_spec
+if TYPE_CHECKING:
+    from .enemy import Enemy
+    from .player import Player
+
+
+class FightEvent(NamedTuple):
+    """
+    What happened in a round of a fight.
+
+    Args:
+        fight: The id of the fight.
+        dealt: The hp the enemy lost to the player's strike.
+        taken: The hp the player lost to the enemy's strike.
+        weapon_broken: Whether the player's weapon was broken when they
+                       struck.
+        outcome: The outcome of the fight, if it is over.
+
+    """
+    fight: int
+    dealt: int
+    taken: int
+    weapon_broken: bool
+    outcome: Optional[FightOutcome]
+
+
+class CombatEngine:
+    """
+    Plays out fights in lockstep, a round at a time.
+
+    """
+    def __init__(self):
+        self._ids = itertools.count()
+        # The columns, with a row per fight in play
+        self.fights: List[int] = []
+        self.player_hp: List[int] = []
+        self.attack: List[int] = []
+        self.armed: List[bool] = []
+        self.durability: List[int] = []
+        self.enemy_hp: List[int] = []
+        # The damage dealt by the enemy, net of the player's defence
+        self.enemy_damage: List[int] = []
+        self.rounds: List[int] = []
+        # The parameters each fight started with, by id
+        self.specs: Dict[int, FightSpec] = {}
+
+    def __len__(self):
+        """Returns the number of fights in play."""
+        return len(self.fights)
+
+    def add(self, spec: FightSpec) -> int:
+        """
+        Starts a fight.
+
+        Args:
+            spec: The parameters of the fight.
+
+        Returns:
+            The id of the fight.
+
+        """
+        fight = next(self._ids)
+        self.specs[fight] = spec
+        self.fights.append(fight)
+        self.player_hp.append(spec.player_hp)
+        self.attack.append(spec.attack)
+        self.armed.append(spec.durability is not None)
+        self.durability.append(spec.durability or 0)
+        self.enemy_hp.append(spec.enemy_hp)
+        self.enemy_damage.append(spec.enemy_damage)
+        self.rounds.append(0)
+        return fight
+
+    def add_fight(self, player: Player, enemy: Enemy) -> int:
+        """Starts a fight between a player and an enemy, see add."""
+        return self.add(fight_spec(player, enemy))
+
+    def remove(self, fight: int) -> FightOutcome:
+        """
+        Ends a fight early, as when the player flees.
+
+        Returns:
+            The outcome of the fight so far, which may be applied to the
+            player and enemy with resolver.apply_outcome.
+
+        """
+        row = self.fights.index(fight)
+        outcome = self._outcome(row, Result.Fled)
+        self._keep([i != row for i in range(len(self.fights))])
+        return outcome
+
+    def _outcome(self, row: int, result: Result) -> FightOutcome:
+        spec = self.specs.pop(self.fights[row])
+        return FightOutcome(
+            result,
+            self.rounds[row],
+            spec.player_hp - self.player_hp[row],
+            spec.durability - self.durability[row] if self.armed[row] else 0
+        )
+
+    def _keep(self, keep: List[bool]):
+        """Drops the rows of the fights which are over."""
+        for name in (
+                'fights', 'player_hp', 'attack', 'armed', 'durability',
+                'enemy_hp', 'enemy_damage', 'rounds'
+        ):
+            column = getattr(self, name)
+            setattr(self, name, list(itertools.compress(column, keep)))
+
+    def step(self) -> List[FightEvent]:
+        """
+        Plays out a round of every fight in play.
+
+        Returns:
+            An event for each fight, in no particular order. The fights which
+            are over are no longer in play.
+
+        """
+        events = []
+
+        # Fights in which neither side can damage the other end before the
+        # round is played
+        stuck = [
+            damage == 0 and (attack == 0 or (armed and durability == 0))
+            for damage, attack, armed, durability in zip(
+                self.enemy_damage, self.attack, self.armed, self.durability
+            )
+        ]
+        if any(stuck):
+            for row in itertools.compress(range(len(stuck)), stuck):
+                broken = self.armed[row] and self.durability[row] == 0
+                events.append(FightEvent(
+                    self.fights[row], 0, 0, broken,
+                    self._outcome(row, Result.Stalemate)
+                ))
+            self._keep([not s for s in stuck])
+
+        broken = [
+            armed and durability == 0
+            for armed, durability in zip(self.armed, self.durability)
+        ]
+        # The damage is capped by the hp left, as in Character.take_damage
+        dealt = [
+            0 if b else attack if attack < hp else hp
+            for b, attack, hp in zip(broken, self.attack, self.enemy_hp)
+        ]
+        self.durability = [
+            durability - 1 if armed and durability > 0 else durability
+            for armed, durability in zip(self.armed, self.durability)
+        ]
+        self.enemy_hp = [
+            hp - damage for hp, damage in zip(self.enemy_hp, dealt)
+        ]
+        taken = [
+            0 if not enemy_hp else damage if damage < hp else hp
+            for enemy_hp, damage, hp in zip(
+                self.enemy_hp, self.enemy_damage, self.player_hp
+            )
+        ]
+        self.player_hp = [
+            hp - damage for hp, damage in zip(self.player_hp, taken)
+        ]
+        self.rounds = [rounds + 1 for rounds in self.rounds]
+
+        over = [
+            not (enemy_hp and player_hp)
+            for enemy_hp, player_hp in zip(self.enemy_hp, self.player_hp)
+        ]
+        outcomes: List[Optional[FightOutcome]] = [None] * len(over)
+        if any(over):
+            for row in itertools.compress(range(len(over)), over):
+                outcomes[row] = self._outcome(
+                    row, Result.Won if not self.enemy_hp[row] else Result.Lost
+                )
+        events.extend(map(
+            FightEvent, self.fights, dealt, taken, broken, outcomes
+        ))
+        if any(over):
+            self._keep([not o for o in over])
+        return events
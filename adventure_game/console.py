@@ -0,0 +1,145 @@
+"""
+This module routes the game's terminal input and output, so that many games
+can be hosted by one process.
+
+By default, the game reads from stdin and prints to stdout. A thread may bind
+its own Console, after which the prompts made by the game on that thread are
+read from the Console, and (once route_stdout has been called) everything the
+game prints on that thread is written to it.
+
+"""
+import abc
+import contextlib
+import sys
+import threading
+from typing import Any, Iterator, Optional, TextIO
+
+_local = threading.local()
+
+
+class Console(abc.ABC):
+    """
+    An abstract class used as the base class for all game consoles.
+
+    While the game prompts for input within a resumable block, resume_point
+    identifies where the game could be resumed from, were it stopped during
+    the prompt.
+
+    """
+    resume_point: Optional[Any] = None
+
+    @abc.abstractmethod
+    def read_line(self, prompt: str) -> str:
+        """
+        Prompts the player for a line of input, blocking until it arrives.
+
+        Args:
+            prompt: The message with which to prompt the player.
+
+        Returns:
+            The player's input, without a trailing newline.
+
+        """
+        pass
+
+    @abc.abstractmethod
+    def write(self, text: str):
+        """Outputs text to the player."""
+        pass
+
+    def show(self, pane: str, text: str) -> bool:
+        """
+        Shows text in a pane of its own, where it stays in view for the next
+        prompt, if the console lays out the game in panes.
+
+        Args:
+            pane: The pane to show the text in, e.g. 'options'.
+            text: The text to show.
+
+        Returns:
+            False if the console has no such pane, in which case the text
+            should be output as usual.
+
+        """
+        return False
+
+
+def bind(console: Optional[Console]):
+    """Binds a Console to the calling thread, or unbinds it if None."""
+    _local.console = console
+
+
+def current() -> Optional[Console]:
+    """Returns the Console bound to the calling thread, if any."""
+    return getattr(_local, 'console', None)
+
+
+@contextlib.contextmanager
+def resumable(point: Any) -> Iterator[None]:
+    """
+    Marks the prompts made within the block as points from which the game
+    may be resumed, if it is stopped while waiting for input.
+
+    Args:
+        point: Identifies where to resume the game.
+
+    """
+    console = current()
+    if console is None:
+        yield
+        return
+    console.resume_point = point
+    try:
+        yield
+    finally:
+        console.resume_point = None
+
+
+def show(pane: str, text: str) -> bool:
+    """
+    Shows text in a pane of the calling thread's Console (see Console.show).
+
+    Returns:
+        False if the text should be printed instead.
+
+    """
+    console = current()
+    return console is not None and console.show(pane, text)
+
+
+def read_line(prompt: str) -> str:
+    """Prompts for a line of input on the calling thread's Console."""
+    console = current()
+    if console is None:
+        return input(prompt)
+    return console.read_line(prompt)
+
+
+class _RoutedStdout:
+    """
+    A stand-in for sys.stdout, which writes to the calling thread's Console
+    if it has one.
+
+    """
+    def __init__(self, fallback: TextIO):
+        self.fallback = fallback
+
+    def write(self, text: str) -> int:
+        console = current()
+        if console is None:
+            return self.fallback.write(text)
+        console.write(text)
+        return len(text)
+
+    def flush(self):
+        if current() is None:
+            self.fallback.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+def route_stdout():
+    """Routes sys.stdout through the Consoles bound to each thread."""
+    if not isinstance(sys.stdout, _RoutedStdout):
+        sys.stdout = _RoutedStdout(sys.stdout)
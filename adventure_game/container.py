@@ -0,0 +1,379 @@
+"""
+This module contains ItemContainer, which holds the items of a player's
+inventory, of the floor of a room and of a chest.
+
+Each item of a container has an id, unique within the container and never
+reused, by which the game numbers the items it lists: 'take 3' or 'equip w3'
+goes on meaning the same item however many others are taken or dropped in
+the meantime, even by other players. The items are kept by id, in the order
+they were added, and their ids by identity, so that any item is found and
+removed in constant time.
+
+A container also keeps:
+
+* a count of its items of each kind (see item.Item.kind)
+* for each of STATS it has been asked to sort by, its items sorted by that
+  stat, best first, which is kept sorted as items come and go rather than
+  sorted again whenever it is asked for
+
+Containers may be searched with queries such as 'rarity:Super attack>5
+by:luck page:2' (see parse_query), and may tell a listener of each item added
+or removed, as the atlas of a dungeon's items is told (see atlas.Atlas).
+
+"""
+from __future__ import annotations
+import bisect
+import collections
+import collections.abc
+import itertools
+import operator
+import re
+from typing import (
+    Any, Callable, Counter, Dict, Iterable, Iterator, List, NamedTuple,
+    Optional, Sequence, Tuple, TYPE_CHECKING
+)
+
+from .grammar import InvalidInstruction
+if TYPE_CHECKING:
+    from .item import Item
+
+# The stats items may be sorted and compared by, and the attribute holding
+# each
+STATS: Dict[str, str] = {
+    'attack': 'attack_strength',
+    'defence': 'defence',
+    'luck': 'luck_stat',
+}
+# The number of items listed on each page of a query's results
+PAGE_SIZE = 10
+
+# A term of a query, e.g. attack>5
+_TERM = re.compile(r'^([a-z]+)(:|>=|<=|>|<|=)(.+)$')
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '=': operator.eq,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+# Every change to the items of any container is numbered from here, so that
+# no two states of a container ever share a version
+_versions = itertools.count(1)
+
+
+class ItemContainer(collections.abc.Sequence):
+    """
+    A collection of items, in the order they were added.
+
+    Indexing a container, as a list, finds its items by position, while get
+    finds them by id.
+
+    Args:
+        items: The items the container starts with.
+
+    """
+    def __init__(self, items: Iterable[Item] = ()):
+        self._items: Dict[int, Item] = {}
+        # The id of each item, by the item's identity
+        self._ids: Dict[int, int] = {}
+        self._next_id = 1
+        self._kinds: Counter[Optional[str]] = collections.Counter()
+        # The (negated value, id) of the items having each stat sorted by so
+        # far, in order
+        self._views: Dict[str, List[Tuple[int, int]]] = {}
+        # The items in order, until the container next changes
+        self._list: Optional[List[Item]] = None
+        # The version of the container's items, which changes whenever an
+        # item is added or removed
+        self.version = next(_versions)
+        # Called with each item added (True) or removed (False) from here
+        # on, if set, e.g. by atlas.Atlas; it is not saved with the items
+        self.listener: Optional[Callable[[Item, bool], None]] = None
+        self.extend(items)
+
+    def add(self, item: Item) -> int:
+        """
+        Adds an item to the end of the container.
+
+        Returns:
+            The id of the item.
+
+        Raises:
+            ValueError: If the item is already in the container.
+
+        """
+        if id(item) in self._ids:
+            raise ValueError(f"{item} is already in the container")
+        item_id = self._next_id
+        self._next_id += 1
+        self._items[item_id] = item
+        self._ids[id(item)] = item_id
+        self._kinds[item.kind] += 1
+        for stat, view in self._views.items():
+            value = getattr(item, STATS[stat], None)
+            if value is not None:
+                bisect.insort(view, (-value, item_id))
+        self._list = None
+        self.version = next(_versions)
+        if self.listener is not None:
+            self.listener(item, True)
+        return item_id
+
+    # As for a list
+    append = add
+
+    def extend(self, items: Iterable[Item]):
+        for item in items:
+            self.add(item)
+
+    def remove(self, item: Item):
+        """
+        Removes an item from the container.
+
+        Raises:
+            ValueError: If the item is not in the container.
+
+        """
+        item_id = self._ids.pop(id(item), None)
+        if item_id is None:
+            raise ValueError(f"{item} is not in the container")
+        del self._items[item_id]
+        self._kinds[item.kind] -= 1
+        for stat, view in self._views.items():
+            value = getattr(item, STATS[stat], None)
+            if value is not None:
+                del view[bisect.bisect_left(view, (-value, item_id))]
+        self._list = None
+        self.version = next(_versions)
+        if self.listener is not None:
+            self.listener(item, False)
+
+    def discard(self, item: Item):
+        """Removes an item from the container, if it is there."""
+        if item in self:
+            self.remove(item)
+
+    def clear(self):
+        if self.listener is not None:
+            for item in self._items.values():
+                self.listener(item, False)
+        self._items.clear()
+        self._ids.clear()
+        self._kinds.clear()
+        self._views.clear()
+        self._list = None
+        self.version = next(_versions)
+
+    def get(self, item_id: int) -> Optional[Item]:
+        """Returns the item with an id, or None if there is no such item."""
+        return self._items.get(item_id)
+
+    def id_of(self, item: Item) -> int:
+        """
+        Returns the id of an item.
+
+        Raises:
+            ValueError: If the item is not in the container.
+
+        """
+        try:
+            return self._ids[id(item)]
+        except KeyError:
+            raise ValueError(f"{item} is not in the container") from None
+
+    def numbered(self) -> Iterator[Tuple[int, Item]]:
+        """Returns the id of each item, with the item, in order."""
+        return iter(list(self._items.items()))
+
+    def count_of(self, kind: Optional[str]) -> int:
+        """Returns the number of items of a kind, e.g. 'weapon'."""
+        return self._kinds[kind]
+
+    def sorted_by(self, stat: str) -> Iterator[Tuple[int, Item]]:
+        """
+        Returns the id of each item having a stat, with the item, from the
+        highest value of the stat to the lowest, and in order of id between
+        items with the same value.
+
+        Args:
+            stat: One of STATS.
+
+        """
+        return ((i, self._items[i]) for _, i in self._view(stat))
+
+    def _view(self, stat: str) -> List[Tuple[int, int]]:
+        view = self._views.get(stat)
+        if view is None:
+            attribute = STATS[stat]
+            view = self._views[stat] = sorted(
+                (-getattr(item, attribute), i)
+                for i, item in self._items.items()
+                if hasattr(item, attribute)
+            )
+        return view
+
+    def select(self, query: Query) -> List[Tuple[int, Item]]:
+        """
+        Finds the items matching a query.
+
+        Returns:
+            The id of each item found, with the item, in the query's order.
+
+        """
+        if query.order is not None:
+            # The bounds on the stat sorted by need not be checked one item
+            # at a time
+            view = self._view(query.order)
+            low, high = 0, len(view)
+            for stat, comparison, value in query.bounds:
+                if stat != query.order:
+                    continue
+                if comparison in ('>', '>='):
+                    key = (-value, 0) if comparison == '>' else (-value + 1, 0)
+                    high = min(high, bisect.bisect_left(view, key))
+                elif comparison in ('<', '<='):
+                    key = (-value + 1, 0) if comparison == '<' else (-value, 0)
+                    low = max(low, bisect.bisect_left(view, key))
+            found = (
+                (i, self._items[i]) for _, i in itertools.islice(
+                    view, low, max(low, high)
+                )
+            )
+        else:
+            found = self.numbered()
+        return [
+            (i, item) for i, item in found
+            if all(matches(item) for matches in query.filters)
+        ]
+
+    def __getstate__(self):
+        # The counts and views are worked out again when loaded
+        return {'items': self._items, 'next_id': self._next_id}
+
+    def __setstate__(self, state):
+        self.__init__()
+        for item_id, item in state['items'].items():
+            self._items[item_id] = item
+            self._ids[id(item)] = item_id
+            self._kinds[item.kind] += 1
+        self._next_id = state['next_id']
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Item]:
+        # Over the items as they were, so that they may be removed meanwhile
+        return iter(self._snapshot())
+
+    def __contains__(self, item: object) -> bool:
+        return id(item) in self._ids
+
+    def __getitem__(self, index):
+        return self._snapshot()[index]
+
+    def _snapshot(self) -> List[Item]:
+        if self._list is None:
+            self._list = list(self._items.values())
+        return self._list
+
+    def __add__(self, other: Iterable[Item]) -> List[Item]:
+        return list(self) + list(other)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ItemContainer, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'ItemContainer({list(self)!r})'
+
+
+class Query(NamedTuple):
+    """A search of a container, see parse_query."""
+    # Whether an item matches each of the query's terms
+    filters: List[Callable[[Item], bool]]
+    # The terms comparing stats with numbers, as (stat, comparison, number)
+    bounds: List[Tuple[str, str, int]]
+    # The stat the items found are sorted by, best first, if any
+    order: Optional[str] = None
+    page: int = 1
+
+
+def parse_query(terms: Sequence[str]) -> Query:
+    """
+    Parses the terms of a query, each of which may be:
+
+    * stat<comparison>number, e.g. attack>5, luck<=2 or defence=3, where
+      stat is one of STATS
+    * rarity:name, e.g. rarity:Super
+    * name:text, matching the items whose names contain the text
+    * by:stat, listing the items by the stat, best first, instead of in
+      order of id
+    * page:number, the page of the results to list, see PAGE_SIZE
+
+    Raises:
+        InvalidInstruction: If a term is not one of the above.
+
+    """
+    filters: List[Callable[[Item], bool]] = []
+    bounds: List[Tuple[str, str, int]] = []
+    order = None
+    page = 1
+    for term in terms:
+        match = _TERM.match(term.lower())
+        if match is None:
+            raise InvalidInstruction(
+                f"{term} is not a search term, such as attack>5, "
+                f"rarity:super, name:sword, by:luck or page:2"
+            )
+        field, comparison, value = match.groups()
+        if field in STATS and comparison != ':' and value.isdigit():
+            bounds.append((field, comparison, int(value)))
+            filters.append(_compare(STATS[field], comparison, int(value)))
+        elif field == 'rarity' and comparison == ':':
+            filters.append(_rarity_is(value))
+        elif field == 'name' and comparison == ':':
+            filters.append(lambda item, text=value: text in item.name.lower())
+        elif field == 'by' and comparison == ':' and value in STATS:
+            order = value
+        elif field == 'page' and comparison == ':' and value.isdigit():
+            page = max(1, int(value))
+        else:
+            raise InvalidInstruction(f"{term} is not a valid search term")
+    return Query(filters, bounds, order, page)
+
+
+def _compare(
+        attribute: str, comparison: str, value: int
+) -> Callable[[Item], bool]:
+    compare = _COMPARISONS[comparison]
+
+    def matches(item: Item) -> bool:
+        stat = getattr(item, attribute, None)
+        return stat is not None and compare(stat, value)
+    return matches
+
+
+def _rarity_is(name: str) -> Callable[[Item], bool]:
+    def matches(item: Item) -> bool:
+        rarity = getattr(item, 'rarity', None)
+        return rarity is not None and rarity.name.lower() == name
+    return matches
+
+
+def page_of(
+        found: Sequence[Tuple[int, Item]], page: int
+) -> Tuple[Sequence[Tuple[int, Item]], int]:
+    """
+    Returns a page of a query's results, and the number of pages.
+
+    Args:
+        found: The results.
+        page: The page, counting from 1.
+
+    """
+    pages = max(1, -(-len(found) // PAGE_SIZE))
+    start = (min(page, pages) - 1) * PAGE_SIZE
+    return found[start:start + PAGE_SIZE], pages
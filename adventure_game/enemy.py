@@ -1,23 +1,46 @@
 from __future__ import annotations
 import json
 import random
-from typing import TYPE_CHECKING
+from typing import Any, Dict, Optional, TYPE_CHECKING
 
-from . import constants, item
+from . import constants, item, messages
 from .character import Character
-from .weapon import Weapon, generate_weapon
+from .weapon import Weapon, WeaponType, generate_weapon
 if TYPE_CHECKING:
     from .player import Player
 
 
 with open(constants.DATA_BANK_FILE) as fh:
     ENEMY_BANK = json.load(fh)['enemies']
+# Work out the article of each enemy's name once, rather than every time the
+# enemy is described
+for _presets in ENEMY_BANK:
+    _presets['article'] = messages.get_a_or_an(_presets['name'])
+    # Likewise the type of the enemy's own weapon, if it has one
+    if 'weapon' in _presets:
+        _presets['weapon_type'] = item.intern_type(WeaponType(
+            _presets['weapon']['name'],
+            0,
+            item.Rarity.Common,
+            _presets['weapon']['damage']
+        ))
 
 
 class Enemy(Character):
-    def __init__(self, name: str, short_name: str, hp: int, weapon: Weapon):
+    def __init__(
+            self,
+            name: str,
+            short_name: str,
+            hp: int,
+            weapon: Weapon,
+            article: Optional[str] = None
+    ):
         self.short_name = short_name
         self.weapon = weapon
+        # The indefinite article of the name, 'a' or 'an'
+        self.article = (
+            article if article is not None else messages.get_a_or_an(name)
+        )
         super().__init__(name, hp)
 
     def attack(self, target: Player):
@@ -29,10 +52,9 @@ class Enemy(Character):
 
         """
         if target.is_alive():
-            damage = self.weapon.attack_strength
-            if target.cur_outfit is not None:
-                damage = max(0, damage - target.cur_outfit.defence)
-            target.take_damage(damage)
+            target.take_damage(
+                max(0, self.weapon.attack_strength - target.get_defence())
+            )
 
 
 def generate_enemy() -> Enemy:
@@ -43,21 +65,23 @@ def generate_enemy() -> Enemy:
         Enemy
 
     """
-    presets = random.choice(ENEMY_BANK)
-    if 'weapon' in presets:
-        weapon_presets = presets['weapon']
-        weapon = Weapon(
-            weapon_presets['name'],
-            0,
-            item.Rarity.Common,
-            weapon_presets['damage'],
-            100
-        )
+    return from_presets(random.choice(ENEMY_BANK))
+
+
+def from_presets(presets: Dict[str, Any]) -> Enemy:
+    """
+    Produces an enemy from its presets in the data bank, with a random weapon
+    if the presets do not give it one.
+
+    """
+    if 'weapon_type' in presets:
+        weapon = Weapon.of(presets['weapon_type'], 100)
     else:
         weapon = generate_weapon()
     return Enemy(
         presets['name'],
         presets.get('short_name', presets['name']),
         presets['hp'],
-        weapon
+        weapon,
+        presets['article']
     )
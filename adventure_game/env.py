@@ -0,0 +1,342 @@
+"""
+This module exposes the game as a batched, Gym-style environment for training
+agents: N independent games are stepped in lockstep with reset(seeds) and
+step(actions).
+
+Observations are written into a single flat array of integers, OBS_SIZE per
+game (see OBS_FIELDS), so that they can be handed to a learner without any
+per-game objects, e.g. with numpy.frombuffer.
+
+Actions are indices into ACTIONS, which covers the special room options and
+movement. As in run_game, a game alternates between choosing one of the
+room's options (if it has any) and choosing an exit, with a fight taking one
+round per step until it is decided or the player flees. Actions which are not
+available in the current phase are ignored and penalised; action_masks gives
+the available actions of each game.
+
+The worlds are generated with the global random module: a seed makes the
+starting room of a game reproducible, but the rooms generated afterwards
+depend on the other games in the batch.
+
+"""
+from __future__ import annotations
+import array
+import collections
+import random
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import compass, headless
+from .player import Player
+from .resolver import apply_outcome, resolve_fight
+from .room import EmptyRoom, MonsterRoom, Room, TreasureRoom
+from .simulation import Result
+
+ACTIONS: Tuple[str, ...] = (
+    'attack', 'auto', 'sneak', 'run', 'open', 'leave', 'look', 'ignore',
+    'north', 'south', 'east', 'west',
+)
+ACTION_IDS: Dict[str, int] = {a: i for i, a in enumerate(ACTIONS)}
+MOVES: Dict[int, compass.Direction] = {
+    ACTION_IDS[d.name.lower()]: d for d in compass.DIRECTIONS
+}
+
+OBS_FIELDS: Tuple[str, ...] = (
+    'hp', 'luck', 'attack', 'defence', 'room_type', 'exits', 'monster_hp',
+    'chest', 'phase',
+)
+OBS_SIZE = len(OBS_FIELDS)
+
+# Values of the 'room_type' observation
+ROOM_TYPES = {EmptyRoom: 0, MonsterRoom: 1, TreasureRoom: 2}
+# Values of the 'chest' observation
+NO_CHEST, CHEST_CLOSED, CHEST_OPEN = range(3)
+# Values of the 'phase' observation
+PHASE_OPTIONS, PHASE_FIGHT, PHASE_MOVE = range(3)
+# Bits of the 'exits' observation
+EXIT_BITS = {d: 1 << i for i, d in enumerate(compass.DIRECTIONS)}
+
+FIGHT_MASK = sum(1 << ACTION_IDS[a] for a in ('attack', 'auto', 'run'))
+
+REWARD_NEW_ROOM = 1.
+REWARD_ITEM = 1.
+REWARD_KILL = 5.
+REWARD_DEATH = -10.
+INVALID_ACTION_PENALTY = -0.1
+
+
+class StartRoomPool:
+    """
+    A pool of pre-generated starting rooms, so that resetting a game does not
+    have to wait for a room to be generated.
+
+    Args:
+        size: The number of unseeded rooms to generate at a time.
+
+    """
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self._rooms: Deque[Room] = collections.deque()
+        self._seeded: Dict[int, List[Room]] = collections.defaultdict(list)
+        self.refill()
+
+    def refill(self):
+        """Tops the pool of unseeded rooms back up to its full size."""
+        for _ in range(self.size - len(self._rooms)):
+            self._rooms.append(EmptyRoom.generate(compass.DIRECTIONS))
+
+    def prefill(self, seeds: Sequence[int]):
+        """Generates the starting rooms for the given seeds ahead of time."""
+        for seed in seeds:
+            self._seeded[seed].append(self._generate_seeded(seed))
+
+    @staticmethod
+    def _generate_seeded(seed: int) -> Room:
+        # Rooms are generated with the global generator, whose state is put
+        # back afterwards so that the caller's own use of it is unaffected
+        state = random.getstate()
+        random.seed(seed)
+        try:
+            return EmptyRoom.generate(compass.DIRECTIONS)
+        finally:
+            random.setstate(state)
+
+    def take(self, seed: Optional[int] = None) -> Room:
+        """
+        Takes a starting room from the pool.
+
+        A seeded room which was not generated ahead of time, with prefill,
+        is generated there and then.
+
+        Args:
+            seed: If given, the room is the one generated with this seed.
+
+        """
+        if seed is not None:
+            rooms = self._seeded.get(seed)
+            if rooms:
+                return rooms.pop()
+            return self._generate_seeded(seed)
+        if not self._rooms:
+            self.refill()
+        return self._rooms.popleft()
+
+
+class VecEnv:
+    """
+    N independent games of the adventure game, stepped in lockstep.
+
+    Args:
+        n: The number of games.
+        hp: The player's hp at the start of each game.
+        max_turns: The number of steps after which a game is ended.
+        pool: The pool to draw starting rooms from.
+
+    """
+    def __init__(
+            self,
+            n: int,
+            hp: int = 100,
+            max_turns: int = 1000,
+            pool: Optional[StartRoomPool] = None
+    ):
+        self.n = n
+        self.hp = hp
+        self.max_turns = max_turns
+        self.pool = pool if pool is not None else StartRoomPool()
+        self.players: List[Optional[Player]] = [None] * n
+        self.phases = [PHASE_MOVE] * n
+        self.masks = [0] * n
+        self.turns = [0] * n
+        self.visited: List[Set[int]] = [set() for _ in range(n)]
+        self.observations = array.array('i', [0]) * (n * OBS_SIZE)
+
+    def reset(self, seeds: Optional[Sequence[Optional[int]]] = None):
+        """
+        Starts a new game in every slot.
+
+        Args:
+            seeds: An optional seed for each game's starting room.
+
+        Returns:
+            The observations of all the games.
+
+        """
+        seeds = seeds if seeds is not None else [None] * self.n
+        for i, seed in enumerate(seeds):
+            self._reset_one(i, seed)
+        return self.observations
+
+    def _reset_one(self, i: int, seed: Optional[int] = None):
+        player = Player("Agent", self.hp)
+        player.move_to(self.pool.take(seed))
+        self.players[i] = player
+        self.turns[i] = 0
+        self.visited[i] = {id(player.current_room)}
+        self._enter_phase(i, PHASE_OPTIONS)
+        self._observe(i)
+
+    def action_masks(self) -> List[int]:
+        """
+        Returns, for each game, a bitmask of the actions currently available,
+        where bit k stands for ACTIONS[k].
+
+        """
+        return list(self.masks)
+
+    def step(
+            self, actions: Sequence[int]
+    ) -> Tuple[array.array, List[float], List[bool], List[dict]]:
+        """
+        Advances every game by one action.
+
+        Games which end are immediately reset, so the observation returned for
+        them is that of the new game; the final turn count of the game which
+        ended is reported in its info.
+
+        Args:
+            actions: The index into ACTIONS of each game's action.
+
+        Returns:
+            The observations, rewards, whether each game ended and an info
+            dictionary for each game.
+
+        """
+        rewards = [0.] * self.n
+        dones = [False] * self.n
+        infos: List[dict] = [{} for _ in range(self.n)]
+        for i, a in enumerate(actions):
+            if not self.masks[i] >> a & 1:
+                rewards[i] = INVALID_ACTION_PENALTY
+            else:
+                rewards[i] = self._act(i, a)
+            self.turns[i] += 1
+
+            player = self.players[i]
+            if not player.is_alive():
+                rewards[i] += REWARD_DEATH
+                dones[i] = True
+            elif self.turns[i] >= self.max_turns:
+                dones[i] = True
+            if dones[i]:
+                infos[i]['turns'] = self.turns[i]
+                self._reset_one(i)
+            else:
+                self._observe(i)
+        return self.observations, rewards, dones, infos
+
+    def _act(self, i: int, a: int) -> float:
+        """Applies a valid action to game i, returning the reward."""
+        player = self.players[i]
+        room = player.current_room
+        if a in MOVES:
+            player.go(MOVES[a])
+            return self._enter_room(i)
+
+        action = ACTIONS[a]
+        reward = 0.
+        if action == 'attack' or (
+                action == 'sneak' and not headless.sneak_succeeds(player)
+        ):
+            headless.fight_round(player, room.monster)
+            room.changed()
+            if room.monster.is_alive():
+                self._enter_phase(i, PHASE_FIGHT)
+                return reward
+            reward += REWARD_KILL
+        elif action == 'auto':
+            outcome = resolve_fight(player, room.monster)
+            apply_outcome(player, room.monster, outcome)
+            if outcome.result is Result.Won:
+                reward += REWARD_KILL
+            elif outcome.result is Result.Stalemate:
+                player.retreat()
+        elif action == 'run':
+            player.retreat()
+        elif action == 'open':
+            room.chest.open()
+            reward += REWARD_ITEM * headless.take_all(
+                player, room.chest.contents
+            )
+        elif action == 'look':
+            reward += REWARD_ITEM * headless.take_all(player, room.items)
+        room.changed()
+        self._enter_phase(i, PHASE_MOVE)
+        return reward
+
+    def _enter_room(self, i: int) -> float:
+        """Handles game i's player entering a room, returning the reward."""
+        player = self.players[i]
+        reward = 0.
+        room = player.current_room
+        if id(room) not in self.visited[i]:
+            self.visited[i].add(id(room))
+            reward += REWARD_NEW_ROOM
+        if room.trap is not None and headless.trigger_trap(player, room.trap):
+            self.visited[i] = {id(player.current_room)}
+        self._enter_phase(i, PHASE_OPTIONS)
+        return reward
+
+    def _enter_phase(self, i: int, phase: int):
+        """Moves game i into a phase, updating its available actions."""
+        room = self.players[i].current_room
+        mask = 0
+        if phase == PHASE_OPTIONS:
+            for option in room.get_options():
+                mask |= 1 << ACTION_IDS[option]
+            if not mask:
+                phase = PHASE_MOVE
+        elif phase == PHASE_FIGHT:
+            mask = FIGHT_MASK
+        if phase == PHASE_MOVE:
+            mask = _move_mask(room.exits)
+        self.phases[i] = phase
+        self.masks[i] = mask
+
+    def _observe(self, i: int):
+        """Writes the observation of game i into the observations array."""
+        player = self.players[i]
+        room = player.current_room
+        weapon = player.cur_weapon
+        obs = self.observations
+        base = i * OBS_SIZE
+
+        obs[base] = player.hp
+        obs[base + 1] = player.get_luck()
+        obs[base + 2] = (
+            0 if weapon is None or weapon.is_broken()
+            else player.get_attack()
+        )
+        obs[base + 3] = player.get_defence()
+        room_type = ROOM_TYPES[type(room)]
+        obs[base + 4] = room_type
+        obs[base + 5] = _exit_bits(room.exits)
+        obs[base + 6] = room.monster.hp if room_type == 1 else 0
+        if room_type == 2:
+            obs[base + 7] = CHEST_OPEN if room.chest.is_open else CHEST_CLOSED
+        else:
+            obs[base + 7] = NO_CHEST
+        obs[base + 8] = self.phases[i]
+
+
+# Room exits only come in a handful of combinations, so their encodings are
+# memoized by the combination's tuple of directions
+_EXIT_BITS_CACHE: Dict[Tuple[compass.Direction, ...], int] = {}
+_MOVE_MASK_CACHE: Dict[Tuple[compass.Direction, ...], int] = {}
+
+
+def _exit_bits(exits: List[compass.Direction]) -> int:
+    key = tuple(exits)
+    bits = _EXIT_BITS_CACHE.get(key)
+    if bits is None:
+        bits = _EXIT_BITS_CACHE[key] = sum(EXIT_BITS[d] for d in set(exits))
+    return bits
+
+
+def _move_mask(exits: List[compass.Direction]) -> int:
+    key = tuple(exits)
+    mask = _MOVE_MASK_CACHE.get(key)
+    if mask is None:
+        mask = _MOVE_MASK_CACHE[key] = sum(
+            1 << ACTION_IDS[d.name.lower()] for d in set(exits)
+        )
+    return mask
@@ -13,3 +13,53 @@ class NoSuchExitException(Exception):
 
 class WeaponBrokenException(Exception):
     pass
+
+
+class SessionClosedException(Exception):
+    """
+    Raised from a prompt when the session waiting for input has been closed,
+    to unwind the game being played in it.
+
+    """
+    pass
+
+
+class SessionHibernatedException(Exception):
+    """
+    Raised from a prompt when the session waiting for input has been
+    hibernated, to unwind the game being played in it.
+
+    """
+    pass
+
+
+class PlayerHandoffException(Exception):
+    """
+    Raised when a player moves into a room owned by another shard of a
+    sharded world, to unwind the game being played in this one.
+
+    Args:
+        room_id: The id of the room the player moved into.
+
+    """
+    def __init__(self, room_id: int):
+        super().__init__(room_id)
+        self.room_id = room_id
+
+
+class RoomUnavailableException(Exception):
+    """
+    Raised when the room beyond an exit cannot be reached for now, e.g. when
+    the shard owning it does not reply in time.
+
+    """
+    pass
+
+
+class PlayerKilledException(Exception):
+    """
+    Raised when the player is killed while the game is waiting for their
+    input, to unwind the game.
+
+    """
+    pass
@@ -0,0 +1,328 @@
+"""
+This module contains the grammar of the instructions players type in.
+
+Each prompt of the game accepts a few commands of its own (the options of a
+room, 'go' at the exits, 'take' when looking at items...) along with the
+global commands, which are accepted anywhere. The arguments each command
+expects are declared in COMMANDS, and the words a prompt accepts are
+compiled, the first time the prompt is shown, into:
+
+* a prefix trie, through which any unambiguous abbreviation of a word stands
+  for the word itself, so 'att' is read as 'attack', and 'n' as 'north'
+* an index of the words made by deleting a few letters from each, through
+  which the words closest to a misspelt word are found without comparing
+  it with every word, so that 'nrth' suggests 'north'
+
+"""
+from __future__ import annotations
+import collections
+import enum
+import functools
+from typing import (
+    Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+)
+
+from . import compass
+
+# The furthest a misspelt word may be from a word it is corrected to, in
+# edits
+MAX_TYPOS = 2
+
+
+class InvalidInstruction(Exception):
+    pass
+
+
+class Arg(enum.Enum):
+    """The kinds of argument a command may expect."""
+    # A compass direction, e.g. north
+    Direction = enum.auto()
+    # An item of the player's inventory, e.g. w1
+    Item = enum.auto()
+    # A number, e.g. 1
+    Number = enum.auto()
+    # A number, or a word standing for a choice, e.g. all
+    Choice = enum.auto()
+
+
+class Syntax(NamedTuple):
+    """The arguments a command expects, with an example of its use."""
+    args: Tuple[Arg, ...]
+    example: str
+    # The words accepted by an Arg.Choice argument
+    choices: Tuple[str, ...] = ()
+
+
+# The commands which expect arguments; any other command expects none
+COMMANDS: Dict[str, Syntax] = {
+    'go': Syntax((Arg.Direction,), "go north"),
+    'take': Syntax((Arg.Choice,), "take 1", ('all', 'none')),
+    'eat': Syntax((Arg.Number,), "eat 1"),
+    'equip': Syntax((Arg.Item,), "equip w1"),
+    'drop': Syntax((Arg.Item,), "drop w1"),
+}
+DIRECTION_WORDS = tuple(d.name.lower() for d in compass.DIRECTIONS)
+# The initials of the directions, which stand for them even where they are
+# also the initials of other words (such as east and eat)
+DIRECTION_ALIASES = {d[0]: d for d in DIRECTION_WORDS}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Returns the Levenshtein distance between two words."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        previous = current
+    return previous[-1]
+
+
+class _TrieNode:
+    __slots__ = ('children', 'word', 'count')
+
+    def __init__(self):
+        self.children: Dict[str, _TrieNode] = {}
+        # The word ending at the node, if any
+        self.word: Optional[str] = None
+        # The number of words passing through the node
+        self.count = 0
+
+
+class Trie:
+    """A prefix trie of words."""
+    def __init__(self, words: Iterable[str] = ()):
+        self._root = _TrieNode()
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        node = self._root
+        node.count += 1
+        for c in word:
+            node = node.children.setdefault(c, _TrieNode())
+            node.count += 1
+        node.word = word
+
+    def complete(self, prefix: str) -> List[str]:
+        """Returns the words beginning with a prefix, in sorted order."""
+        node = self._root
+        for c in prefix:
+            node = node.children.get(c)
+            if node is None:
+                return []
+        words = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.word is not None:
+                words.append(node.word)
+            stack.extend(node.children.values())
+        return sorted(words)
+
+    def expand(self, prefix: str) -> Optional[str]:
+        """
+        Returns the word a prefix stands for: the word itself, or the only
+        word beginning with the prefix. Returns None if there is no such word.
+
+        """
+        node = self._root
+        for c in prefix:
+            node = node.children.get(c)
+            if node is None:
+                return None
+        if node.word is not None:
+            return node.word
+        while node.count == 1 and node.word is None:
+            node = next(iter(node.children.values()))
+        return node.word if node.count == 1 else None
+
+
+def _deletions(word: str, depth: int) -> Set[str]:
+    """Returns the words made by deleting up to a number of letters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {
+            w[:i] + w[i + 1:] for w in frontier for i in range(len(w))
+        }
+        found |= frontier
+    return found
+
+
+class TypoIndex:
+    """
+    An index of words, which finds the words within a small edit distance
+    of a word.
+
+    Two words within an edit distance of each other can both be turned into
+    the same word by deleting at most that many letters from each (a
+    substitution is a deletion from both). Each word is indexed under every
+    word made by deleting up to MAX_TYPOS of its letters, so the candidates
+    for a word are found by looking up its own deletions, and only they are
+    compared with the word, rather than every word of the index.
+
+    """
+    def __init__(self, words: Iterable[str] = ()):
+        self._index: Dict[str, List[str]] = collections.defaultdict(list)
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        for deletion in _deletions(word, MAX_TYPOS):
+            self._index[deletion].append(word)
+
+    def search(self, word: str, radius: int) -> List[Tuple[int, str]]:
+        """
+        Finds the words within a distance of a word.
+
+        Args:
+            word: The word.
+            radius: The distance, which may be no greater than MAX_TYPOS.
+
+        Returns:
+            The distance to each word found, and the word, closest first.
+
+        """
+        candidates = {
+            candidate
+            for deletion in _deletions(word, radius)
+            for candidate in self._index.get(deletion, ())
+        }
+        found = [(edit_distance(word, c), c) for c in candidates]
+        return sorted((d, c) for d, c in found if d <= radius)
+
+
+class Vocabulary:
+    """
+    The words accepted in some context, compiled for abbreviations and
+    corrections.
+
+    Args:
+        words: The words.
+        kind: What the words are, for error messages, e.g. 'instruction'.
+
+    """
+    def __init__(self, words: Iterable[str], kind: str):
+        self.words = frozenset(words)
+        self.kind = kind
+        self._trie = Trie(self.words)
+        self._index = TypoIndex(self.words)
+
+    def resolve(self, word: str) -> str:
+        """
+        Resolves a word, which may be abbreviated, to a word of the
+        vocabulary.
+
+        Raises:
+            InvalidInstruction: If the word is ambiguous or unknown, with
+                                suggestions of what may have been meant.
+
+        """
+        word = word.lower()
+        expanded = self._trie.expand(word)
+        if expanded is not None:
+            return expanded
+        candidates = self._trie.complete(word)
+        if candidates:
+            raise InvalidInstruction(
+                f"{word} could mean any of: {', '.join(candidates)}"
+            )
+        suggestions = self.suggest(word)
+        message = f"{word} is not a valid {self.kind}"
+        if suggestions:
+            message += f". Did you mean {' or '.join(suggestions)}?"
+        raise InvalidInstruction(message)
+
+    def suggest(self, word: str) -> List[str]:
+        """Returns the closest words to a misspelt word, if any are close."""
+        # Any short word is close to a single letter, so they are never
+        # suggested
+        found = [
+            (d, w) for d, w in
+            self._index.search(word, min(MAX_TYPOS, len(word) - 1))
+            if len(w) > 1
+        ]
+        return [w for d, w in found if d == found[0][0]]
+
+
+@functools.lru_cache(maxsize=None)
+def compile_vocabulary(words: FrozenSet[str], kind: str) -> Vocabulary:
+    """Returns the compiled Vocabulary of a set of words."""
+    return Vocabulary(words, kind)
+
+
+DIRECTIONS = compile_vocabulary(
+    frozenset(DIRECTION_WORDS).union(DIRECTION_ALIASES), 'direction'
+)
+
+
+def parse(line: str, commands: Iterable[str]) -> Tuple[str, List[str]]:
+    """
+    Parses an instruction.
+
+    Args:
+        line: The instruction, as typed by the player.
+        commands: The commands accepted.
+
+    Returns:
+        The command, in full, and its arguments. Directions are returned in
+        full, and a bare direction is read as 'go' in that direction, if
+        'go' is accepted.
+
+    Raises:
+        InvalidInstruction: If the instruction is not a valid use of one of
+                            the commands.
+
+    """
+    words = line.split()
+    if not words:
+        raise InvalidInstruction("Please enter an instruction")
+    commands = frozenset(commands)
+    accepted = commands | DIRECTIONS.words if 'go' in commands else commands
+    command = compile_vocabulary(accepted, 'instruction').resolve(words[0])
+    args = words[1:]
+    if command in DIRECTIONS.words:
+        command, args = 'go', [DIRECTION_ALIASES.get(command, command)]
+
+    syntax = COMMANDS.get(command)
+    if syntax is None:
+        return command, args
+    if len(args) < len(syntax.args):
+        raise InvalidInstruction(
+            f"Expected an instruction in the form: {syntax.example}"
+        )
+    for i, (kind, arg) in enumerate(zip(syntax.args, args)):
+        args[i] = _parse_arg(kind, arg, syntax)
+    return command, args
+
+
+def _parse_arg(kind: Arg, arg: str, syntax: Syntax) -> str:
+    """Checks an argument, returning it with any abbreviation expanded."""
+    if kind is Arg.Direction:
+        arg = DIRECTIONS.resolve(arg)
+        return DIRECTION_ALIASES.get(arg, arg)
+    if kind is Arg.Number or (kind is Arg.Choice and arg.isdigit()):
+        if not arg.isdigit():
+            raise InvalidInstruction(
+                f"Expected a number, as in: {syntax.example}"
+            )
+        return arg
+    if kind is Arg.Choice:
+        return compile_vocabulary(
+            frozenset(syntax.choices), 'choice'
+        ).resolve(arg)
+    if kind is Arg.Item:
+        if arg[:1].lower() not in 'wof' or not arg[1:].isdigit():
+            raise InvalidInstruction(
+                f"Expected an item such as w1, o1 or f1, as in: "
+                f"{syntax.example}"
+            )
+        return arg.lower()
+    return arg
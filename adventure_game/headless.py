@@ -0,0 +1,87 @@
+"""
+This module contains silent counterparts of the interactive actions, for
+driving the game without a terminal (e.g. from bots or simulations).
+
+Each function applies exactly the same rules as its counterpart in the action
+module, but neither prints nor prompts: any decision is left to the caller.
+
+"""
+from __future__ import annotations
+import random
+from typing import TYPE_CHECKING
+
+from . import constants, item
+from .exceptions import InventoryFullException, WeaponBrokenException
+if TYPE_CHECKING:
+    from .container import ItemContainer
+    from .enemy import Enemy
+    from .player import Player
+    from .trap import Trap
+
+
+def fight_round(player: Player, enemy: Enemy):
+    """
+    Plays out a single round of a fight, as in action.attack: the player
+    strikes, and the enemy strikes back if it survived.
+
+    """
+    try:
+        player.attack(enemy)
+    except WeaponBrokenException:
+        pass
+    if enemy.is_alive():
+        enemy.attack(player)
+
+
+def sneak_succeeds(player: Player) -> bool:
+    """Rolls the check made by action.attempt_sneak."""
+    return player.get_luck() > random.randint(0, constants.MAX_LUCK + 5)
+
+
+def trigger_trap(player: Player, trap: Trap) -> bool:
+    """
+    Rolls the check made by action.trigger_trap, and applies its effects if
+    the trap was triggered.
+
+    Returns:
+        True if the trap was triggered, False otherwise.
+
+    """
+    if trap.triggered:
+        return False
+    if player.get_luck() >= random.randint(0, constants.MAX_LUCK):
+        return False
+    player.take_damage(trap.damage)
+    player.move_to_new_room()
+    trap.triggered = True
+    return True
+
+
+def take(
+        player: Player, items: ItemContainer, treasure: item.Item
+) -> bool:
+    """
+    Moves an item from a container into the player's inventory, if there is
+    room for it.
+
+    Returns:
+        True if the item was taken, False otherwise.
+
+    """
+    try:
+        player.pick_up_item(treasure)
+    except InventoryFullException:
+        return False
+    items.remove(treasure)
+    return True
+
+
+def take_all(player: Player, items: ItemContainer) -> int:
+    """
+    Takes as many items as possible from a container, as in 'take all'.
+
+    Returns:
+        The number of items taken.
+
+    """
+    return sum(take(player, items, treasure) for treasure in list(items))
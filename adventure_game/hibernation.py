@@ -0,0 +1,181 @@
+"""
+This module serializes idle games, so that a server can evict them from
+memory and restore them when their player comes back.
+
+A player's world is a graph of rooms linked through their exits, which can be
+far too deep for pickle to recurse through. The rooms are therefore written
+as a flat table, with their exits stored as links between indices into the
+table. Rooms which belong to a SharedWorld are not written at all: they stay
+in the world, and are referred to by their ids. Nor is the atlas of the
+items in the player's own rooms, which is made again once they are read.
+
+"""
+from __future__ import annotations
+import collections
+import io
+import os
+import pickle
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from .player import Player
+from .room import Room, restore_rooms, saved_state
+from .world import SharedWorld
+
+
+class _Pickler(pickle.Pickler):
+    """Writes rooms by reference, as an index into the table or a room id."""
+    def __init__(self, file: io.BytesIO, index: Dict[int, int]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.index = index
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[str, int]]:
+        if not isinstance(obj, Room):
+            return None
+        if obj.world is not None:
+            return 'world', obj.id
+        return 'room', self.index[id(obj)]
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(
+            self,
+            file: io.BytesIO,
+            rooms: List[Room],
+            world: Optional[SharedWorld]
+    ):
+        super().__init__(file)
+        self.rooms = rooms
+        self.world = world
+
+    def persistent_load(self, pid: Tuple[str, int]) -> Room:
+        kind, key = pid
+        if kind == 'world':
+            if self.world is None:
+                raise pickle.UnpicklingError(
+                    "The game was played in a shared world"
+                )
+            return self.world.get_room(key)
+        return self.rooms[key]
+
+
+def _own_rooms(player: Player) -> List[Room]:
+    """
+    Finds the rooms reachable from the player which are their own, i.e. which
+    do not belong to a shared world.
+
+    """
+    rooms: List[Room] = []
+    seen: Set[int] = set()
+    queue: Deque[Room] = collections.deque(
+        r for r in (player.current_room, player.previous_room)
+        if r is not None
+    )
+    while queue:
+        room = queue.popleft()
+        if id(room) in seen or room.world is not None:
+            continue
+        seen.add(id(room))
+        rooms.append(room)
+        queue.extend(r for r in room._exits.values() if r is not None)
+    return rooms
+
+
+def dumps(player: Player, resume_point: Any = None) -> bytes:
+    """
+    Serializes a player along with their world.
+
+    Args:
+        player: The player.
+        resume_point: Where to resume the player's game, see
+                      console.resumable.
+
+    Returns:
+        The serialized game.
+
+    """
+    rooms = _own_rooms(player)
+    index = {id(room): i for i, room in enumerate(rooms)}
+    states = [saved_state(room) for room in rooms]
+    exits = [
+        {d: r for d, r in room._exits.items() if r is not None}
+        for room in rooms
+    ]
+
+    f = io.BytesIO()
+    # The types are written first, so the rooms can be created before any
+    # reference to them is read
+    pickle.dump([type(room) for room in rooms], f, pickle.HIGHEST_PROTOCOL)
+    _Pickler(f, index).dump((player, resume_point, states, exits))
+    return f.getvalue()
+
+
+def loads(
+        data: bytes, world: Optional[SharedWorld] = None
+) -> Tuple[Player, Any]:
+    """
+    Restores a player serialized with dumps.
+
+    Args:
+        data: The serialized game.
+        world: The shared world in which the game was played, if any.
+
+    Returns:
+        The player and the point at which to resume their game.
+
+    """
+    f = io.BytesIO(data)
+    rooms = [cls.__new__(cls) for cls in pickle.load(f)]
+    player, resume_point, states, exits = _Unpickler(f, rooms, world).load()
+    restore_rooms(zip(rooms, states, exits))
+    return player, resume_point
+
+
+class HibernationStore:
+    """
+    A local directory holding the serialized games of hibernated sessions,
+    one file per session.
+
+    Args:
+        directory: The directory, which is created if necessary.
+
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.keys: Set[str] = set()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.game')
+
+    def save(self, key: str, data: bytes):
+        """Writes a serialized game, replacing any previous one."""
+        path = self._path(key)
+        with open(path + '.tmp', 'wb') as fh:
+            fh.write(data)
+        os.replace(path + '.tmp', path)
+        self.keys.add(key)
+
+    def load(self, key: str) -> bytes:
+        """
+        Reads a serialized game, removing it from the store.
+
+        Raises:
+            KeyError: if there is no game stored under the key.
+
+        """
+        if key not in self.keys:
+            raise KeyError(key)
+        path = self._path(key)
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        self.discard(key)
+        return data
+
+    def discard(self, key: str):
+        """Removes a serialized game from the store, if it is there."""
+        if key in self.keys:
+            self.keys.discard(key)
+            os.remove(self._path(key))
@@ -1,9 +1,17 @@
 import enum
 import json
+import operator
 import random
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
 
 from . import constants
 
+T = TypeVar('T', bound=tuple)
+
+# The one object standing for each item type, by its class and fields (see
+# intern_type)
+_TYPES: Dict[Tuple[type, tuple], tuple] = {}
+
 
 class Item:
     """
@@ -14,6 +22,13 @@ class Item:
         name: The name of the item.
 
     """
+    # The kind of item, which is also the key of the player's inventory in
+    # which it is kept, if any
+    kind: Optional[str] = None
+    # The attributes of the items of subclasses which declare their own are
+    # kept in slots, rather than a dict per item
+    __slots__ = ()
+
     def __init__(self, name: str):
         self.name = name
 
@@ -23,15 +38,28 @@ class EquipmentItem(Item):
     An abstract class intended to be inherited by all 'equippable' items in
     the game, meaning the Player's (or Enemy's) equipment.
 
+    Weapons and outfits keep their stats in a type shared with other items
+    (see type_stat) instead, and so do not call this class's __init__.
+
     Args:
         name: The name of the item.
         luck_stat: The luck value associated with the item.
 
     """
+    __slots__ = ()
+
     def __init__(self, name: str, luck_stat: int):
         super().__init__(name)
         self.luck_stat = luck_stat
 
+    def modifiers(self) -> Dict[str, int]:
+        """
+        Returns what the item adds to the stats of whoever equips it, by
+        stat (see stats.StatSheet).
+
+        """
+        return {'luck': self.luck_stat}
+
 
 class FoodItem(Item):
     """
@@ -45,6 +73,8 @@ class FoodItem(Item):
         msg: A message to be output when the item is eaten by the player.
 
     """
+    kind = 'food'
+
     def __init__(self, name: str, restore_amount: int, msg: str):
         super().__init__(name)
         self.restore_amount = restore_amount
@@ -71,3 +101,37 @@ class Rarity(enum.Enum):
 
 
 RARITIES = [r for r in Rarity]
+# Relative weights with which each rarity is generated, in RARITIES order
+RARITY_WEIGHTS = [10, 5, 1]
+
+
+def intern_type(item_type: T) -> T:
+    """
+    Returns the one object standing for an item type, such as a
+    weapon.WeaponType, equal to the one given.
+
+    Item types are immutable, and a world holds many items of each, so all
+    of the items of a type refer to the same object, whatever made them.
+
+    """
+    return _TYPES.setdefault((type(item_type), item_type), item_type)
+
+
+def load_type(cls: Type[T], fields: tuple) -> T:
+    """Loads a pickled item type, see intern_type."""
+    return intern_type(cls._make(fields))
+
+
+def type_stat(field: str) -> property:
+    """
+    Returns a property of an item reading one of the fields of its type
+    (held by its 'type' attribute).
+
+    Setting the property gives the item the type with the field changed,
+    leaving the other items of its former type as they were.
+
+    """
+    def set_stat(self, value: Any):
+        self.type = intern_type(self.type._replace(**{field: value}))
+
+    return property(operator.attrgetter(f'type.{field}'), set_stat)
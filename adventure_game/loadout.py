@@ -0,0 +1,221 @@
+"""
+This module finds the best weapon and outfit for a player to use, from those
+they carry or have equipped: either the pair which fares best in a fight with
+a given enemy, or the luckiest pair, for sneaking past enemies and avoiding
+traps.
+
+A fight is judged by its outcome as resolver.resolve works it out, so the
+durability of each weapon counts as much as its attack strength. Rather than
+every pair of items, only those which could be best are tried:
+
+* a weapon is only worth trying if no weapon of at least the same attack
+  strength lasts longer, and fists (which deal 1 damage and never break) are
+  always tried
+* in a fight, an outfit only matters by its defence, so the outfit with the
+  most defence is tried, with the outfit already worn
+* for luck, the luckiest item of each kind is tried, with the item already
+  equipped
+
+The items are found from the inventory's sorted views (see
+container.ItemContainer.sorted_by). The loadout found is kept until the
+player's inventory, equipment or hp, or the enemy, change, so that asking
+again costs nothing.
+
+"""
+from __future__ import annotations
+from typing import (
+    Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+)
+
+from . import constants, resolver
+from .simulation import FightOutcome, FightSpec, Result
+from .stats import FISTS
+if TYPE_CHECKING:
+    from .enemy import Enemy
+    from .outfit import Outfit
+    from .player import Player
+    from .weapon import Weapon
+
+# The equipment slots a loadout fills, see Player.equipped
+SLOTS = ('weapon', 'outfit')
+# How good each result of a fight is for the player: fleeing a fight neither
+# side can win is better than losing it
+_RESULT_RANKS = {Result.Lost: 0, Result.Stalemate: 1, Result.Won: 2}
+
+
+class Loadout(NamedTuple):
+    """
+    A weapon and outfit for the player to use, None standing for fists or no
+    outfit.
+
+    Args:
+        weapon: The weapon.
+        outfit: The outfit.
+        luck: The player's luck with the loadout equipped.
+        outcome: The outcome of the fight the loadout was chosen for, if it
+                 was chosen for a fight.
+
+    """
+    weapon: Optional[Weapon]
+    outfit: Optional[Outfit]
+    luck: int
+    outcome: Optional[FightOutcome] = None
+
+
+def best_loadout(player: Player, enemy: Optional[Enemy] = None) -> Loadout:
+    """
+    Finds the best loadout for the player, from the items they carry or have
+    equipped.
+
+    Args:
+        player: The player.
+        enemy: The enemy the player is to fight, or None to find the loadout
+               with the most luck.
+
+    Returns:
+        The best loadout. Between loadouts which are as good, the one which
+        keeps more of the player's equipment is chosen.
+
+    """
+    weapon = player.cur_weapon
+    key: Tuple[Any, ...] = (
+        player.weapons.version, player.outfits.version, player.stats.version,
+        None if weapon is None else weapon.durability
+    )
+    if enemy is not None:
+        key += (player.hp, enemy.hp, enemy.weapon.attack_strength)
+    goal = 'luck' if enemy is None else 'fight'
+    cached = player._loadouts.get(goal)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    if enemy is None:
+        loadout = _luckiest(player)
+    else:
+        loadout = _best_for_fight(player, enemy)
+    player._loadouts[goal] = (key, loadout)
+    return loadout
+
+
+def _best_for_fight(player: Player, enemy: Enemy) -> Loadout:
+    weapons = _weapon_frontier(player)
+    outfits = _candidates(
+        player.cur_outfit, player.outfits.sorted_by('defence')
+    )
+    # What the effects on the player add to the stats of the loadout
+    attack = player.stats.excluding('attack', SLOTS)
+    defence = player.stats.excluding('defence', SLOTS)
+    best = None
+    for weapon in weapons:
+        for outfit in outfits:
+            outcome = resolver.resolve(FightSpec(
+                player.hp,
+                max(0, attack + (
+                    FISTS['attack'] if weapon is None
+                    else weapon.attack_strength
+                )),
+                None if weapon is None else weapon.durability,
+                enemy.hp,
+                max(0, enemy.weapon.attack_strength - max(0, defence + (
+                    0 if outfit is None else outfit.defence
+                )))
+            ))
+            score = (
+                _RESULT_RANKS.get(outcome.result, 0),
+                -outcome.hp_lost,
+                -outcome.durability_used,
+                _kept(player, weapon, outfit)
+            )
+            if best is None or score > best[0]:
+                best = (score, weapon, outfit, outcome)
+    _, weapon, outfit, outcome = best
+    return Loadout(weapon, outfit, _luck_of(player, weapon, outfit), outcome)
+
+
+def _weapon_frontier(player: Player) -> List[Optional[Weapon]]:
+    """
+    Returns the weapons the player might best fight with: fists (as None),
+    the weapon they hold, and the weapons they carry which are not outdone by
+    one at least as strong which lasts longer.
+
+    The weapons carried only change with the inventory, so they are kept
+    until it does.
+
+    """
+    version = player.weapons.version
+    cached = player._loadouts.get('weapons')
+    if cached is None or cached[0] != version:
+        frontier = []
+        longest = None
+        for _, weapon in player.weapons.sorted_by('attack'):
+            if weapon.attack_strength <= 1:
+                # Outdone by fists
+                break
+            if longest is None or weapon.durability > longest:
+                frontier.append(weapon)
+                longest = weapon.durability
+        cached = player._loadouts['weapons'] = (version, frontier)
+    weapons: List[Optional[Weapon]] = [None, *cached[1]]
+    if player.cur_weapon is not None:
+        weapons.append(player.cur_weapon)
+    return weapons
+
+
+def _luckiest(player: Player) -> Loadout:
+    weapons = _candidates(player.cur_weapon, player.weapons.sorted_by('luck'))
+    outfits = _candidates(player.cur_outfit, player.outfits.sorted_by('luck'))
+    best = None
+    for weapon in weapons:
+        for outfit in outfits:
+            score = (
+                _luck_of(player, weapon, outfit),
+                # A weapon which still works, should sneaking fail
+                weapon is not None and not weapon.is_broken(),
+                _kept(player, weapon, outfit)
+            )
+            if best is None or score > best[0]:
+                best = (score, weapon, outfit)
+    _, weapon, outfit = best
+    return Loadout(weapon, outfit, _luck_of(player, weapon, outfit))
+
+
+def _candidates(current: Optional[Any], ranked: Iterable) -> List[Any]:
+    """
+    Returns the item equipped, or None, and the first of the items ranked
+    best first by a container's sorted view.
+
+    """
+    candidates = [current]
+    best = next(iter(ranked), None)
+    if best is not None:
+        candidates.append(best[1])
+    return candidates
+
+
+def _kept(
+        player: Player, weapon: Optional[Weapon], outfit: Optional[Outfit]
+) -> int:
+    """Returns the number of the player's equipped items a loadout keeps."""
+    return (weapon is player.cur_weapon) + (outfit is player.cur_outfit)
+
+
+def _luck_of(
+        player: Player, weapon: Optional[Weapon], outfit: Optional[Outfit]
+) -> int:
+    """Returns a player's luck with a loadout, as Player.get_luck would."""
+    luck = player.stats.excluding('luck', SLOTS) + sum(
+        item.luck_stat for item in (weapon, outfit) if item is not None
+    )
+    return max(0, min(constants.MAX_LUCK, luck))
+
+
+def changes(player: Player, loadout: Loadout) -> Dict[str, Optional[Any]]:
+    """
+    Returns the items the player must equip to use a loadout, by key (see
+    Player.equipped), None meaning the item equipped must be taken off.
+
+    """
+    wanted = dict(zip(SLOTS, (loadout.weapon, loadout.outfit)))
+    return {
+        key: item for key, item in wanted.items()
+        if item is not player.equipped[key]
+    }
@@ -1,13 +1,29 @@
-from typing import Any, Dict, List
+from __future__ import annotations
+import functools
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
+from . import console
 from .action_handler import ActionHandler
-from .room import Room
+if TYPE_CHECKING:
+    from .compass import Direction
+    from .room import Room
+
+
+# The beginnings of the words which start with a vowel sound
+VOWEL_SOUNDS = ('a', 'e', 'i', 'o', 'u', 'honor')
+
+# The templates of the messages printed most often
+_ENTER = "You enter {}.".format
+_WANDERER = "{} {} is wandering around.".format
 
 
 def get_a_or_an(s: str) -> str:
     """
     Determines whether the singular counter for a string should be 'a' or 'an'.
 
+    Note that the articles of the names in the data bank are worked out once,
+    when it is loaded (see enemy.Enemy.article).
+
     Args:
         s: The string to analyze.
 
@@ -15,9 +31,7 @@ def get_a_or_an(s: str) -> str:
         'an' if s starts with a vowel sound, 'a' otherwise.
 
     """
-    if any(s.startswith(c) for c in ['a', 'e', 'i', 'o', 'u', 'honor']):
-        return 'an'
-    return 'a'
+    return 'an' if s.startswith(VOWEL_SOUNDS) else 'a'
 
 
 def list_to_comma_string(options: List[Any]) -> str:
@@ -40,8 +54,21 @@ def list_to_comma_string(options: List[Any]) -> str:
 
 
 def print_enter(room: Room):
-    """Prints a message indicating the entered room."""
-    print(f"You enter {room}.")
+    """
+    Prints a message indicating the entered room, unless the console shows
+    the room in a pane of its own.
+
+    """
+    text = _ENTER(room)
+    if not console.show('room', text):
+        print(text)
+
+
+def print_wanderers(room: Room):
+    """Prints the living monsters wandering through a room."""
+    for wanderer in room.wanderers:
+        if wanderer.is_alive():
+            print(_WANDERER(wanderer.article.capitalize(), wanderer.name))
 
 
 def underline(s: str) -> str:
@@ -49,13 +76,55 @@ def underline(s: str) -> str:
     return f'\033[4m{s}\033[0m'
 
 
-def print_options(options: Dict[str, ActionHandler]):
+def print_options(
+        options: Dict[str, ActionHandler],
+        notes: Optional[Dict[str, str]] = None
+):
     """
     Prints the option descriptions, with the instruction keyword underlined
-    if present.
+    if present, or shows them in the console's options pane if it has one.
+
+    Args:
+        options: The options to print.
+        notes: An optional map of option keys to extra information to print
+               beside the option's description.
 
     """
+    notes = notes if notes is not None else {}
+    lines = []
     for option, (desc, _) in options.items():
-        if option in desc or (option := option.capitalize()) in desc:
-            desc = desc.replace(option, underline(option))
-        print(desc)
+        note = notes.get(option)
+        desc = render_option(option, desc)
+        if note is not None:
+            desc += f' {note}'
+        lines.append(desc)
+    text = '\n'.join(lines)
+    if not console.show('options', text) and lines:
+        print(text)
+
+
+def print_exits(exits: List[Direction]):
+    """
+    Prints the exits of a room, or shows them in the console's exits pane if
+    it has one.
+
+    """
+    text = f"There are portals to the {list_to_comma_string(exits)}."
+    if not console.show('exits', text):
+        print(text)
+
+
+@functools.lru_cache(maxsize=1024)
+def render_option(option: str, desc: str) -> str:
+    """
+    Returns an option's description with its instruction keyword underlined,
+    if present.
+
+    The options of a room are only built again when the room changes, and
+    most rooms offer the same few options, so the same descriptions are
+    rendered over and over.
+
+    """
+    if option in desc or (option := option.capitalize()) in desc:
+        desc = desc.replace(option, underline(option))
+    return desc
@@ -0,0 +1,110 @@
+"""
+This module contains the exact odds of the luck-based checks in the game, for
+every luck value a player can have, along with samplers which resolve many
+checks at once for use in simulations.
+
+The tables mirror the checks made by action.attempt_sneak and
+action.trigger_trap, which compare the player's luck against a threshold drawn
+uniformly at random.
+
+"""
+from __future__ import annotations
+import random
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from . import constants
+if TYPE_CHECKING:
+    from .action_handler import ActionHandler
+    from .player import Player
+
+# The number of equally likely thresholds drawn by each check, i.e. the size
+# of the ranges randint(0, MAX_LUCK + 5) and randint(0, MAX_LUCK)
+SNEAK_THRESHOLDS = constants.MAX_LUCK + 6
+TRAP_THRESHOLDS = constants.MAX_LUCK + 1
+
+# For each luck value, the number of thresholds for which the check succeeds:
+# a sneak succeeds if luck > threshold, a trap is avoided if luck >= threshold
+SNEAK_SUCCESSES: Tuple[int, ...] = tuple(
+    sum(1 for t in range(SNEAK_THRESHOLDS) if luck > t)
+    for luck in range(constants.MAX_LUCK + 1)
+)
+TRAP_ESCAPES: Tuple[int, ...] = tuple(
+    sum(1 for t in range(TRAP_THRESHOLDS) if luck >= t)
+    for luck in range(constants.MAX_LUCK + 1)
+)
+
+# For each luck value, the probability that the check succeeds
+SNEAK_ODDS: Tuple[float, ...] = tuple(
+    n / SNEAK_THRESHOLDS for n in SNEAK_SUCCESSES
+)
+TRAP_ESCAPE_ODDS: Tuple[float, ...] = tuple(
+    n / TRAP_THRESHOLDS for n in TRAP_ESCAPES
+)
+
+
+def _sample(
+        successes: int,
+        total: int,
+        n: int,
+        rng: Optional[random.Random]
+) -> List[bool]:
+    """Draws n checks, each of which succeeds for 'successes' in 'total'."""
+    rng = rng if rng is not None else random
+    return rng.choices((True, False), cum_weights=(successes, total), k=n)
+
+
+def sample_sneaks(
+        luck: int, n: int, rng: Optional[random.Random] = None
+) -> List[bool]:
+    """
+    Resolves n attempts to sneak past an enemy at once.
+
+    Args:
+        luck: The player's luck, as given by Player.get_luck.
+        n: The number of attempts.
+        rng: An optional random number generator to draw from.
+
+    Returns:
+        Whether each attempt succeeded.
+
+    """
+    return _sample(SNEAK_SUCCESSES[luck], SNEAK_THRESHOLDS, n, rng)
+
+
+def sample_trap_escapes(
+        luck: int, n: int, rng: Optional[random.Random] = None
+) -> List[bool]:
+    """
+    Resolves n encounters with a trap at once.
+
+    Args:
+        luck: The player's luck, as given by Player.get_luck.
+        n: The number of encounters.
+        rng: An optional random number generator to draw from.
+
+    Returns:
+        Whether the trap was avoided in each encounter.
+
+    """
+    return _sample(TRAP_ESCAPES[luck], TRAP_THRESHOLDS, n, rng)
+
+
+def option_notes(
+        options: Dict[str, ActionHandler], player: Player
+) -> Dict[str, str]:
+    """
+    Produces readouts of the odds for any luck-based room options.
+
+    Args:
+        options: The available room options.
+        player: The player choosing between the options.
+
+    Returns:
+        A map of option keys to a note to be displayed beside the option.
+
+    """
+    notes = {}
+    if 'sneak' in options:
+        odds = SNEAK_ODDS[player.get_luck()]
+        notes['sneak'] = f'({odds:.0%} chance of success)'
+    return notes
@@ -1,10 +1,46 @@
+"""
+This module contains the outfits of the game.
+
+An outfit never changes, so all of its stats (its name, luck, rarity and
+defence) are kept by an OutfitType shared with every other outfit of its
+base type and rarity (see item.intern_type), along with its description.
+
+"""
+from __future__ import annotations
 import json
 import random
+from typing import Dict, NamedTuple
 
 from . import constants, item
 
+_DESCRIPTION = '{} [defence: {}, luck: {}]'.format
+
+
+class OutfitType(NamedTuple):
+    """The stats shared by the outfits of a base type and rarity."""
+    name: str
+    luck_stat: int
+    rarity: item.Rarity
+    defence: int
+
+    def __reduce__(self):
+        # Loaded as the interned type, rather than a copy of it
+        return item.load_type, (type(self), tuple(self))
+
+
+# The description of each type, written the first time it is needed
+_descriptions: Dict[OutfitType, str] = {}
+
 
 class Outfit(item.EquipmentItem):
+    kind = 'outfit'
+    __slots__ = ('type',)
+
+    name = item.type_stat('name')
+    luck_stat = item.type_stat('luck_stat')
+    rarity = item.type_stat('rarity')
+    defence = item.type_stat('defence')
+
     def __init__(
             self,
             name: str,
@@ -12,27 +48,47 @@ class Outfit(item.EquipmentItem):
             rarity: item.Rarity,
             defence: int
     ):
-        super().__init__(name, luck_stat)
-        self.rarity = rarity
-        self.defence = defence
+        self.type = item.intern_type(
+            OutfitType(name, luck_stat, rarity, defence)
+        )
+
+    @classmethod
+    def of(cls, outfit_type: OutfitType) -> Outfit:
+        """Makes an outfit of an interned type."""
+        outfit = cls.__new__(cls)
+        outfit.type = outfit_type
+        return outfit
 
     def __str__(self):
         """Returns the string representation of the Outfit."""
-        return (f'{self.name} [defence: {self.defence}, '
-                f'luck: {self.luck_stat}]')
+        description = _descriptions.get(self.type)
+        if description is None:
+            description = _descriptions[self.type] = _DESCRIPTION(
+                self.name, self.defence, self.luck_stat
+            )
+        return description
+
+    def modifiers(self) -> Dict[str, int]:
+        return {**super().modifiers(), 'defence': self.defence}
 
 
 with open(constants.DATA_BANK_FILE) as fh:
     OUTFIT_TYPE_BANK = json.load(fh)['outfit_types']
+# Work out the type of each base type and rarity once, rather than for every
+# outfit generated
+for _base in OUTFIT_TYPE_BANK:
+    _base['types'] = {
+        rarity: item.intern_type(OutfitType(
+            f"{rarity.name} {_base['name']}",
+            _base["luck"][rarity.name],
+            rarity,
+            _base["defence"][rarity.name]
+        ))
+        for rarity in item.RARITIES
+    }
 
 
 def generate_outfit() -> Outfit:
     base = random.choice(OUTFIT_TYPE_BANK)
-    rarity = random.choices(item.RARITIES, weights=[10, 5, 1])[0]
-    rarity_str = rarity.name
-    return Outfit(
-        f"{rarity_str} {base['name']}",
-        base["luck"][rarity_str],
-        rarity,
-        base["defence"][rarity_str]
-    )
+    rarity = random.choices(item.RARITIES, weights=item.RARITY_WEIGHTS)[0]
+    return Outfit.of(base['types'][rarity])
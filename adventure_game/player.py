@@ -1,14 +1,24 @@
-from typing import cast, Dict, List, Optional
+from typing import Any, cast, Dict, List, Optional, Tuple
 
 from . import constants
 from .character import Character
 from .compass import Direction
+from .container import ItemContainer
 from .exceptions import InventoryFullException, WeaponBrokenException
-from .item import EquipmentItem, FoodItem, Item
+from .item import EquipmentItem, Item
 from .outfit import Outfit
 from .room import Room, generate_first_room
+from .stats import FISTS, StatSheet
 from .weapon import Weapon
 
+_DESCRIPTION = "{}: hp {}, holding {}, wearing {}".format
+# The number of items of each kind a player can carry
+CAPACITIES = {
+    "weapon": constants.MAX_WEAPON,
+    "outfit": constants.MAX_OUTFIT,
+    "food": constants.MAX_FOOD,
+}
+
 
 class Player(Character):
     def __init__(
@@ -19,17 +29,28 @@ class Player(Character):
             outfit: Optional[Outfit] = None
     ):
         super().__init__(name, hp)
-        self.equipped: Dict[str, Optional[EquipmentItem]] = {
-            "weapon": weapon,
-            "outfit": outfit
-        }
-        self.inventory: Dict[str, List[Item]] = {
-            "weapon": [],
-            "outfit": [],
-            "food": [],
+        # The totals of the player's stats, kept up to date as equipment
+        # and effects come and go
+        self.stats = StatSheet()
+        self.equipped: Dict[str, Optional[EquipmentItem]] = {}
+        self._fill_slot("weapon", weapon)
+        self._fill_slot("outfit", outfit)
+        self.inventory: Dict[str, ItemContainer] = {
+            kind: ItemContainer() for kind in CAPACITIES
         }
         self.previous_room: Optional[Room] = None
         self.current_room: Optional[Room] = None
+        # The commands of each macro the player has defined, by name (see
+        # utils.define_macro)
+        self.macros: Dict[str, List[str]] = {}
+        # The description last written, see __str__
+        self._description: Optional[Tuple[tuple, str]] = None
+        # The loadouts last found, with what they were found for (see
+        # loadout.best_loadout)
+        self._loadouts: Dict[str, Tuple[tuple, Any]] = {}
+        # The item of each kind the player last dropped or threw away, so
+        # that they may find it again (see utils.find)
+        self.dropped: Dict[str, Item] = {}
 
     @property
     def cur_weapon(self) -> Weapon:
@@ -37,7 +58,7 @@ class Player(Character):
 
     @cur_weapon.setter
     def cur_weapon(self, weapon: Weapon):
-        self.equipped["weapon"] = weapon
+        self._fill_slot("weapon", weapon)
 
     @property
     def cur_outfit(self) -> Outfit:
@@ -45,29 +66,55 @@ class Player(Character):
 
     @cur_outfit.setter
     def cur_outfit(self, outfit: Outfit):
-        self.equipped["outfit"] = outfit
+        self._fill_slot("outfit", outfit)
+
+    def _fill_slot(self, key: str, item: Optional[EquipmentItem]):
+        """Equips an item, or nothing, applying what it adds to the stats."""
+        self.equipped[key] = item
+        if item is not None:
+            self.stats.apply(key, item.modifiers())
+        elif key == "weapon":
+            self.stats.apply(key, FISTS)
+        else:
+            self.stats.remove(key)
 
     @property
-    def weapons(self) -> List[Weapon]:
-        return cast(List[Weapon], self.inventory["weapon"])
+    def weapons(self) -> ItemContainer:
+        return self.inventory["weapon"]
 
     @property
-    def outfits(self) -> List[Outfit]:
-        return cast(List[Outfit], self.inventory["outfit"])
+    def outfits(self) -> ItemContainer:
+        return self.inventory["outfit"]
 
     @property
-    def foods(self) -> List[FoodItem]:
-        return cast(List[FoodItem], self.inventory["food"])
+    def foods(self) -> ItemContainer:
+        return self.inventory["food"]
 
     def __str__(self):
         weapon = self.cur_weapon
         outfit = self.cur_outfit
-        return f"{self.name}: hp {self.hp}, " \
-               f"holding {'Nothing' if weapon is None else weapon}, " \
-               f"wearing {'Nothing' if outfit is None else outfit}"
+        # The description is kept until the player's hp or equipment, or the
+        # stats of their equipment, change
+        key = (
+            self.hp, weapon, outfit,
+            None if weapon is None else (weapon.type, weapon.durability),
+            None if outfit is None else outfit.type
+        )
+        cached = self._description
+        if cached is None or cached[0] != key:
+            cached = self._description = (key, _DESCRIPTION(
+                self.name, self.hp,
+                'Nothing' if weapon is None else weapon,
+                'Nothing' if outfit is None else outfit
+            ))
+        return cached[1]
 
     def move_to_new_room(self):
-        new_room = generate_first_room()
+        world = None if self.current_room is None else self.current_room.world
+        if world is None:
+            new_room = generate_first_room()
+        else:
+            new_room = world.new_room()
         self.move_to(new_room)
 
     def move_to(self, room: Room):
@@ -79,12 +126,17 @@ class Player(Character):
         placement of the Player. Internally, this condition is checked in
         Player.go, so this method may be used safely therein.
 
+        If the Room belongs to a world, the world is told of the Player's
+        arrival.
+
         Args:
             room: The Room to which the Player should be moved.
 
         """
         self.previous_room = self.current_room
         self.current_room = room
+        if room is not None and room.world is not None:
+            room.world.on_enter(self, room)
 
     def retreat(self):
         """
@@ -106,6 +158,8 @@ class Player(Character):
         Raises:
             NoSuchExitException: if the player attempts to move in a
                                  direction that does not have a room.
+            RoomUnavailableException: if the room in that direction cannot
+                                      be reached for now.
 
         """
         if self.current_room is not None:
@@ -125,22 +179,17 @@ class Player(Character):
         Args:
             item: The item that got picked up
 
+        Raises:
+            InventoryFullException: if the player already carries as many
+                                    items of its kind as they can.
+
         """
-        if isinstance(item, Weapon):
-            if len(self.weapons) < constants.MAX_WEAPON:
-                self.weapons.append(item)
-            else:
-                raise InventoryFullException("Your weapon pocket is full.")
-        elif isinstance(item, Outfit):
-            if len(self.outfits) < constants.MAX_OUTFIT:
-                self.outfits.append(item)
-            else:
-                raise InventoryFullException("Your outfit pocket is full.")
-        elif isinstance(item, FoodItem):
-            if len(self.foods) < constants.MAX_FOOD:
-                self.foods.append(item)
-            else:
-                raise InventoryFullException("Your food pocket is full.")
+        pocket = self.inventory.get(item.kind)
+        if pocket is None:
+            return
+        if len(pocket) >= CAPACITIES[item.kind]:
+            raise InventoryFullException(f"Your {item.kind} pocket is full.")
+        pocket.add(item)
 
     def equip(self, key: str, option: int):
         """
@@ -148,10 +197,11 @@ class Player(Character):
 
         Args:
             key: The key referring to the type of item
-            option: The option_th item in the inventory list
+            option: The number of the item in the inventory (its id in the
+                    inventory's ItemContainer)
 
         """
-        item = self.inventory[key][option - 1]
+        item = self.inventory[key].get(option)
         self.change_item(key, cast(EquipmentItem, item))
 
     def change_item(self, key: str, item: EquipmentItem):
@@ -165,15 +215,38 @@ class Player(Character):
         """
         self.inventory[key].remove(item)
         if self.equipped[key] is not None:
-            self.inventory[key].append(self.equipped[key])
-        self.equipped[key] = item
+            self.inventory[key].add(self.equipped[key])
+        self._fill_slot(key, item)
+
+    def unequip(self, key: str):
+        """
+        Puts the equipped item back in the inventory.
+
+        Args:
+            key: The key referring to the type of item
+
+        Raises:
+            InventoryFullException: if the player already carries as many
+                                    items of its kind as they can.
+
+        """
+        item = self.equipped[key]
+        if item is None:
+            return
+        if len(self.inventory[key]) >= CAPACITIES[key]:
+            raise InventoryFullException(f"Your {key} pocket is full.")
+        self.inventory[key].add(item)
+        self._fill_slot(key, None)
 
     def throw(self):
         """
         Throw away the weapon currently equipped
         """
-        self.current_room.add_item(self.equipped["weapon"])
+        weapon = self.cur_weapon
+        self.current_room.add_item(weapon)
         self.cur_weapon = None
+        self.dropped[weapon.kind] = weapon
+        self.current_room.notify(self, f"threw away the {weapon.name}")
 
     def drop(self, key: str, option: int):
         """
@@ -181,22 +254,26 @@ class Player(Character):
 
         Args:
             key: The key referring to the type of item
-            option: The option_th item in the inventory list
+            option: The number of the item in the inventory (its id in the
+                    inventory's ItemContainer)
 
         """
-        drop_item = self.inventory[key][option - 1]
+        drop_item = self.inventory[key].get(option)
         self.inventory[key].remove(drop_item)
         self.current_room.add_item(drop_item)
+        self.dropped[key] = drop_item
+        self.current_room.notify(self, f"dropped the {drop_item.name}")
 
     def eat(self, option: int):
         """
         Eats a piece of food from the inventory.
 
         Args:
-            option: The option_th item in the food inventory list.
+            option: The number of the food in the inventory (its id in the
+                    inventory's ItemContainer).
 
         """
-        food = self.foods[option]
+        food = self.foods.get(option)
         self.heal(food.restore_amount)
         self.foods.remove(food)
 
@@ -211,16 +288,13 @@ class Player(Character):
             WeaponBrokenException
 
         """
-        if self.cur_weapon is None:
-            damage = 1
-        else:
+        if self.cur_weapon is not None:
             if self.cur_weapon.is_broken():
                 raise WeaponBrokenException()
-            damage = self.cur_weapon.attack_strength
             self.cur_weapon.decrement_durability()
 
         if target.is_alive():
-            target.take_damage(damage)
+            target.take_damage(self.get_attack())
 
     def get_luck(self) -> int:
         """
@@ -228,10 +302,45 @@ class Player(Character):
 
         Returns:
             Total number of luck points added from equipped weapon & outfit
+            and the effects on the player, up to MAX_LUCK
 
         """
-        return min(
-            constants.MAX_LUCK,
-            sum([item.luck_stat for item in list(self.equipped.values())
-                 if item is not None])
-        )
+        luck = self.stats.luck
+        if 0 <= luck <= constants.MAX_LUCK:
+            return luck
+        return max(0, min(constants.MAX_LUCK, luck))
+
+    def get_attack(self) -> int:
+        """
+        Returns the damage dealt by each of the player's strikes: that of
+        their weapon, or of their fists, with the effects on them.
+
+        """
+        attack = self.stats.attack
+        return attack if attack > 0 else 0
+
+    def get_defence(self) -> int:
+        """
+        Returns the damage taken off each strike against the player by their
+        outfit and the effects on them.
+
+        """
+        defence = self.stats.defence
+        return defence if defence > 0 else 0
+
+    def add_effect(self, name: str, modifiers: Dict[str, int]):
+        """
+        Puts an effect, such as a buff or debuff, on the player, in place of
+        any effect of the same name.
+
+        Args:
+            name: The name of the effect.
+            modifiers: What the effect adds to each stat (see
+                       stats.StatSheet), e.g. {'luck': -5}.
+
+        """
+        self.stats.apply(('effect', name), modifiers)
+
+    def remove_effect(self, name: str):
+        """Removes an effect from the player, as when it wears off."""
+        self.stats.remove(('effect', name))
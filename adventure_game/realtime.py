@@ -0,0 +1,174 @@
+"""
+This module contains the game's real-time mechanics, played out on a
+TimerWheel while the player thinks:
+
+* a living monster in the player's room, whether it lives there or is
+  wandering through, attacks them whenever its attack cools down, until
+  they leave or kill it (or it wanders off)
+* a trap which has been triggered re-arms itself after a while
+* food spoils if it is carried around for too long
+* the player slowly regenerates their health
+
+The timers fire on whichever thread turns the wheel, but the game itself
+is only ever changed on the game's own thread: each mechanic posts its
+effect to the game, which applies it the next time it waits for input. An
+effect posted before the mechanics were stopped, but applied after, does
+nothing.
+
+"""
+from __future__ import annotations
+import functools
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+
+from .exceptions import PlayerKilledException
+if TYPE_CHECKING:
+    from .enemy import Enemy
+    from .item import FoodItem
+    from .player import Player
+    from .timers import Timer, TimerWheel
+    from .trap import Trap
+
+# The delays of the mechanics, in seconds
+MONSTER_COOLDOWN = 5.
+TRAP_REARM_DELAY = 60.
+FOOD_SHELF_LIFE = 300.
+REGENERATION_INTERVAL = 10.
+# The hp regenerated every interval
+REGENERATION_POINTS = 1
+
+
+class RealTimeGame:
+    """
+    Plays out the real-time mechanics of a single player's game.
+
+    Args:
+        wheel: The wheel on which to schedule the mechanics.
+        player: The player.
+        post: Called from any thread with a function which must be called
+              on the game's thread, the next time it waits for input.
+
+    """
+    def __init__(
+            self,
+            wheel: TimerWheel,
+            player: Player,
+            post: Callable[[Callable[[], None]], None]
+    ):
+        self.wheel = wheel
+        self.player = player
+        self.post = post
+        self._regeneration: Optional[Timer] = None
+        self._monster: Optional[Enemy] = None
+        self._monster_attack: Optional[Timer] = None
+        self._rearming: Dict[Trap, Timer] = {}
+        self._spoiling: Dict[FoodItem, Timer] = {}
+        # Whether the mechanics have been stopped, for good
+        self._stopped = False
+
+    def start(self):
+        """Starts the mechanics which do not depend on where the player is."""
+        self._regeneration = self._schedule(
+            REGENERATION_INTERVAL, self._regenerate
+        )
+
+    def stop(self):
+        """
+        Cancels every pending mechanic, including the effects already posted
+        to the game but not applied yet.
+
+        """
+        self._stopped = True
+        timers = [self._regeneration, self._monster_attack]
+        timers += self._rearming.values()
+        timers += self._spoiling.values()
+        for timer in timers:
+            if timer is not None:
+                timer.cancel()
+        self._regeneration = self._monster_attack = self._monster = None
+        self._rearming.clear()
+        self._spoiling.clear()
+
+    def _schedule(self, delay: float, effect: Callable[[], None]) -> Timer:
+        """Schedules an effect to be posted to the game after a delay."""
+        return self.wheel.schedule(
+            delay, self.post, functools.partial(self._apply, effect)
+        )
+
+    def _apply(self, effect: Callable[[], None]):
+        # The game may have been stopped since the effect was posted, e.g.
+        # hibernated while the effect waited in its queue
+        if not self._stopped:
+            effect()
+
+    def on_prompt(self):
+        """
+        Catches up with the game, before it waits for input; called from the
+        game's thread.
+
+        """
+        room = self.player.current_room
+        monster = room.living_monster()
+        if monster is not self._monster:
+            if self._monster_attack is not None:
+                self._monster_attack.cancel()
+            self._monster = monster
+            self._monster_attack = None
+            if monster is not None:
+                self._schedule_monster_attack()
+
+        # Traps move the player away when they are triggered, so the trap
+        # may be in the room they have just left
+        for visited in (room, self.player.previous_room):
+            trap = None if visited is None else visited.trap
+            if (
+                    trap is not None and trap.triggered
+                    and trap not in self._rearming
+            ):
+                self._rearming[trap] = self._schedule(
+                    TRAP_REARM_DELAY, functools.partial(self._rearm, trap)
+                )
+
+        for food in self.player.foods:
+            if food not in self._spoiling:
+                self._spoiling[food] = self._schedule(
+                    FOOD_SHELF_LIFE, functools.partial(self._spoil, food)
+                )
+
+    def _schedule_monster_attack(self):
+        self._monster_attack = self._schedule(
+            MONSTER_COOLDOWN, self._monster_attacks
+        )
+
+    def _monster_attacks(self):
+        monster = self._monster
+        room = self.player.current_room
+        if monster is None or room.living_monster() is not monster:
+            return
+        with room.lock:
+            if not monster.is_alive():
+                return
+            monster.attack(self.player)
+        print(
+            f"\nThe {monster.short_name} attacks you! "
+            f"You have {self.player.hp} hp left."
+        )
+        if not self.player.is_alive():
+            raise PlayerKilledException()
+        self._schedule_monster_attack()
+
+    def _rearm(self, trap: Trap):
+        trap.triggered = False
+        self._rearming.pop(trap, None)
+
+    def _spoil(self, food: FoodItem):
+        self._spoiling.pop(food, None)
+        if food in self.player.foods:
+            self.player.foods.remove(food)
+            print(f"\nYour {food.name} has spoiled.")
+
+    def _regenerate(self):
+        if self.player.is_alive() and self.player.hp < self.player.max_hp:
+            self.player.heal(REGENERATION_POINTS)
+        self._regeneration = self._schedule(
+            REGENERATION_INTERVAL, self._regenerate
+        )
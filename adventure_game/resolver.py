@@ -0,0 +1,96 @@
+"""
+This module resolves fights in closed form.
+
+Once the loadouts are fixed, combat involves no randomness: the number of
+rounds, the hp lost and the durability used follow directly from the weapon's
+attack strength and durability, the outfit's defence and the enemy's hp and
+weapon. The outcome of a fight is therefore computed in constant time, rather
+than round by round, and memoized since the same handful of loadouts and enemy
+templates come up again and again.
+
+"""
+from __future__ import annotations
+import functools
+from typing import Optional, TYPE_CHECKING
+
+from .simulation import FightOutcome, FightSpec, Result, fight_spec
+if TYPE_CHECKING:
+    from .enemy import Enemy
+    from .player import Player
+
+
+def _ceil_div(a: int, b: int) -> Optional[int]:
+    """Divides a by b, rounding up, or returns None if b is zero."""
+    return -(-a // b) if b > 0 else None
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve(spec: FightSpec) -> FightOutcome:
+    """
+    Determines the outcome of a fight in which the player keeps attacking
+    until the fight is decided, exactly as resolve_batch would.
+
+    Args:
+        spec: The parameters of the fight.
+
+    Returns:
+        The outcome of the fight.
+
+    """
+    # The number of strikes the player needs to kill the enemy, and the
+    # number of the enemy's strikes that the player can take
+    strikes_needed = _ceil_div(spec.enemy_hp, spec.attack)
+    rounds_survived = _ceil_div(spec.player_hp, spec.enemy_damage)
+
+    def durability_used(rounds: int) -> int:
+        if spec.durability is None:
+            return 0
+        return min(rounds, spec.durability)
+
+    if strikes_needed is not None and (
+            spec.durability is None or strikes_needed <= spec.durability
+    ) and (rounds_survived is None or strikes_needed <= rounds_survived):
+        # The enemy strikes back after every round but the last
+        return FightOutcome(
+            Result.Won,
+            strikes_needed,
+            (strikes_needed - 1) * spec.enemy_damage,
+            durability_used(strikes_needed)
+        )
+
+    if rounds_survived is not None:
+        return FightOutcome(
+            Result.Lost,
+            rounds_survived,
+            spec.player_hp,
+            durability_used(rounds_survived)
+        )
+
+    # The player keeps striking until the weapon breaks, to no avail
+    rounds = spec.durability if spec.attack > 0 else 0
+    return FightOutcome(Result.Stalemate, rounds, 0, rounds)
+
+
+def resolve_fight(player: Player, enemy: Enemy) -> FightOutcome:
+    """Determines the outcome of a fight between a player and an enemy."""
+    return resolve(fight_spec(player, enemy))
+
+
+def apply_outcome(player: Player, enemy: Enemy, outcome: FightOutcome):
+    """
+    Updates the player, their weapon and the enemy to the state they would be
+    in after fighting it out.
+
+    Args:
+        player: The player in the fight.
+        enemy: The enemy in the fight.
+        outcome: The outcome of the fight, as given by resolve_fight.
+
+    """
+    weapon = player.cur_weapon
+    if weapon is None:
+        enemy.take_damage(outcome.rounds * player.get_attack())
+    else:
+        enemy.take_damage(outcome.durability_used * player.get_attack())
+        weapon.durability -= outcome.durability_used
+    player.take_damage(outcome.hp_lost)
@@ -5,31 +5,71 @@ adventure game.
 """
 from __future__ import annotations
 import abc
+import functools
+import itertools
 import json
 import random
-from typing import Dict, List, Optional
+from typing import (
+    Any, Callable, ContextManager, Dict, Iterable, List, Mapping, Optional,
+    Tuple, TYPE_CHECKING
+)
 
-from . import action, compass, constants, item, enemy, messages
+from . import action, compass, constants, item, enemy
 from .action_handler import ActionHandler
+from .atlas import Atlas, survey
+from .character import Character
 from .chest import Chest
+from .container import ItemContainer
 from .exceptions import NoSuchExitException
 from .trap import Trap, generate_trap
 from .weapon import generate_weapon
+from .world import NO_LOCK
+if TYPE_CHECKING:
+    from .player import Player
+    from .world import SharedWorld
 
 # Populate a set of descriptions from the predefined JSON
 # These descriptions are used when dynamically generating new rooms
 with open(constants.DATA_BANK_FILE) as fh:
     DESCRIPTION_BANK = json.load(fh)['room_descriptions']
 
+# The templates of the rooms' descriptions
+_TRAP_WARNING = (
+    "\nWatch out, there seems to be a {}...try to sneak past"
+).format
+_MONSTER = "{}, with {} {}".format
+_MONSTER_CORPSE = "{}, with the corpse of {} {}".format
+_OPEN_CHEST = "{}. An open, empty chest sits in the centre".format
+_CLOSED_CHEST = "{}. An enticing chest sits in the centre".format
+
+# Every change to the state of any room is numbered from here, so that no two
+# states of a room ever share a version
+_versions = itertools.count(1)
+# The attributes of a room which are not saved with its state, by
+# hibernation or autosave, but set afresh when it is restored (see
+# restore_rooms)
+TRANSIENT = ('_description', '_exits', '_options', 'atlas', 'lock', 'world')
+
 
 class Room(abc.ABC):
     """
     An abstract class used as the base class for all concrete implements of the
     Room type.
 
-    Note: An abstract static method, generate, exists on all subclasses to
-    randomly populate the room's description, and other fields as appropriate
-    for the room type.
+    Note: The rooms generated as players explore, EmptyRoom, MonsterRoom and
+    TreasureRoom, each have a static method, generate, which randomly
+    populates the room's description, and other fields as appropriate for
+    the room type. Rooms which are never generated need not have one.
+
+    A room which belongs to a SharedWorld has an id, and a lock which must be
+    held while changing the room, its items or its contents, since other
+    players may be in the room at the same time. Rooms generated beyond its
+    exits join the same world, in which wandering monsters may roam between
+    the rooms (see wandering.WanderingMonsters).
+
+    A room generated beyond another's exit also joins the other's atlas, if
+    it has one, which keeps track of the items in each room (see
+    atlas.Atlas).
 
     Args:
         description: A player-facing description of the room.
@@ -46,8 +86,22 @@ class Room(abc.ABC):
             trap: Optional[Trap] = None
     ):
         self.description = description
-        self.items: List[item.Item] = items if items is not None else []
+        self.items = ItemContainer(items if items is not None else ())
         self.trap = trap
+        # The wandering monsters currently in the room
+        self.wanderers: List[enemy.Enemy] = []
+        self.id: Optional[int] = None
+        self.world: Optional[SharedWorld] = None
+        self.lock: ContextManager = NO_LOCK
+        self.atlas: Optional[Atlas] = None
+        # The version of the room's state, see changed
+        self.version = next(_versions)
+        # The options last built, with the version of the state they were
+        # built from
+        self._options: Optional[Tuple[int, Dict[str, ActionHandler]]] = None
+        # The description last written, with the version of the state it
+        # describes
+        self._description: Optional[Tuple[int, str]] = None
 
         self.exits = exits
         self._exits: Dict[compass.Direction, Optional[Room]] = {
@@ -57,49 +111,132 @@ class Room(abc.ABC):
             compass.Direction.West: None,
         }
 
-    @abc.abstractmethod
     def __str__(self):
         """
-        Returns the player-facing description of the room.
-
-        Note that this is abstract since concrete subclasses are expected to
-        customize the format according to their room state.
+        Returns the player-facing description of the room, which is only
+        written again once the state of the room has changed (see changed).
 
         """
-        pass
+        version = self.version
+        cached = self._description
+        if cached is None or cached[0] != version:
+            cached = self._description = (version, self._describe())
+        return cached[1]
 
-    @staticmethod
     @abc.abstractmethod
-    def generate(exits: List[compass.Direction]) -> Room:
+    def _describe(self) -> str:
         """
-        Dynamically generates an instance of the Room subclass.
+        Writes the player-facing description of the room, see __str__.
 
-        This method is expected to randomly initialize relevant fields of the
-        subclass for use in map generation.
+        Note that this is abstract since concrete subclasses are expected to
+        customize the format according to their room state.
 
         """
         pass
 
     def add_item(self, new_item: item.Item):
         """Adds a new item to the floor of the room."""
-        self.items.append(new_item)
+        with self.lock:
+            self.items.append(new_item)
+        self.changed()
+
+    def containers(self) -> List[ItemContainer]:
+        """Returns the containers of the items which lie in the room."""
+        return [self.items]
+
+    def changed(self):
+        """
+        Marks the state of the room as changed, so that its options are
+        built afresh.
+
+        The room's own methods and options do so themselves. Anything else
+        which changes what may be done in the room, such as taking its items
+        or killing its monster directly, must call this afterwards.
+
+        """
+        self.version = next(_versions)
+
+    def notify(self, actor: Character, what: str):
+        """
+        Tells the players nearby, if the room belongs to a SharedWorld, of
+        something that happened in the room.
+
+        Args:
+            actor: The character who did something.
+            what: What they did, e.g. 'opened the chest'.
+
+        """
+        if self.world is not None:
+            self.world.broadcast(self, actor, what)
+
+    def adjacent_rooms(self) -> Dict[compass.Direction, Room]:
+        """
+        Returns the rooms beyond the room's exits which have been generated,
+        without generating any others.
+
+        """
+        return {d: r for d, r in self._exits.items() if r is not None}
+
+    def living_monster(self) -> Optional[enemy.Enemy]:
+        """Returns a living monster in the room, if there is one."""
+        for wanderer in self.wanderers:
+            if wanderer.is_alive():
+                return wanderer
+        return None
+
+    def living_monsters(self) -> List[enemy.Enemy]:
+        """Returns all of the living monsters in the room."""
+        return [w for w in self.wanderers if w.is_alive()]
 
     def get_options(self) -> Dict[str, ActionHandler]:
         """
         Returns a map of the available special actions for the room, along
         with a callback handler to implement the action.
 
+        The options are only built again once the state of the room has
+        changed (see changed), which running any of them counts as.
+
+        """
+        version = self.version
+        cached = self._options
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        options = {
+            key: ActionHandler(
+                description, functools.partial(self._run_option, handler)
+            )
+            for key, (description, handler) in self._build_options().items()
+        }
+        self._options = (version, options)
+        return options
+
+    def _run_option(self, handler: Callable[[Player], Any], player: Player):
+        """Runs the handler of an option, which may change the room."""
+        try:
+            return handler(player)
+        finally:
+            self.changed()
+
+    def _build_options(self) -> Dict[str, ActionHandler]:
+        """
+        Builds the map of the available special actions for the room, see
+        get_options.
+
         Note that it is intended, but not required, that subclasses override
         this method to provide their own state-dependent actions. They should
         each call this base class method to facilitate pick-up of dropped
-        items or food.
+        items or food, and fights with wandering monsters.
 
         """
+        wanderer = self.living_monster()
+        if wanderer is not None:
+            return self._fight_options(wanderer)
+
         options = {}
         if self.items:
             options['look'] = ActionHandler(
                 'Look at items on the floor',
-                lambda player: action.take_loop(player, self.items)
+                lambda player: action.take_loop(player, self.items, self.lock)
             )
             options['ignore'] = ActionHandler(
                 'Ignore floor-based garbage',
@@ -108,6 +245,58 @@ class Room(abc.ABC):
 
         return options
 
+    def _fight_options(
+            self, monster: enemy.Enemy
+    ) -> Dict[str, ActionHandler]:
+        """
+        Returns the actions available to a player facing a living monster:
+        1. Attack
+        2. Fight it out automatically
+        3. Sneak past the monster
+        4. Flee to the previous room
+
+        """
+        return {
+            'attack': ActionHandler(
+                f'Attack {monster.name}',
+                lambda player: self._fight(action.attack, player, monster)
+            ),
+            'auto': ActionHandler(
+                f'Auto-battle the {monster.short_name}',
+                lambda player: self._fight(
+                    action.auto_attack, player, monster
+                )
+            ),
+            'sneak': ActionHandler(
+                f'Attempt to sneak past the {monster.short_name}',
+                lambda player: self._fight(
+                    action.attempt_sneak, player, monster
+                )
+            ),
+            'run': ActionHandler(
+                'Run back',
+                action.retreat
+            ),
+        }
+
+    def _fight(
+            self,
+            fight: Callable[[Player, enemy.Enemy, ContextManager], Any],
+            player: Player,
+            monster: enemy.Enemy
+    ):
+        """
+        Runs one of the actions of a player facing a monster, after which a
+        wandering monster killed in it is cleared away by its world.
+
+        """
+        try:
+            return fight(player, monster, self.lock)
+        finally:
+            wanderers = None if self.world is None else self.world.wanderers
+            if wanderers is not None and not monster.is_alive():
+                wanderers.killed(monster)
+
     def _get_exit_room(self, d: compass.Direction):
         """
         Provides lazy initialization of the connecting Rooms for which the
@@ -128,11 +317,16 @@ class Room(abc.ABC):
             room = self._exits[d]
             if room is not None:
                 return room
-            opp = compass.get_opposite_dir(d)
-            room = _generate_room(enter_from=opp)
-            # Set the "backwards" room to the current room
-            setattr(room, opp.name.lower(), self)
-            self._exits[d] = room
+            with self.lock:
+                # Another player may have generated the room while waiting
+                room = self._exits[d]
+                if room is not None:
+                    return room
+                if self.world is not None:
+                    room = self.world.generate_exit_room(self, d)
+                else:
+                    room = generate_exit_room(self, d)
+                self._exits[d] = room
             return room
         # This should only ever be reached due to programmer error
         raise NoSuchExitException()
@@ -188,12 +382,12 @@ class EmptyRoom(Room):
     a weapon lying on the floor, which the player may take.
 
     """
-    def __str__(self):
+    def _describe(self) -> str:
         desc = self.description
         if self.items:
-            desc += f". There is something lying on the floor"
+            desc += ". There is something lying on the floor"
         if self.trap:
-            desc += f"\nWatch out, there seems to be a {self.trap.name}...try to sneak past"
+            desc += _TRAP_WARNING(self.trap.name)
         return desc
 
     @staticmethod
@@ -242,12 +436,13 @@ class MonsterRoom(Room):
         self.monster = monster
         super().__init__(description, exits, trap=trap)
 
-    def __str__(self):
-        desc = f'{self.description}, with '
-        if not self.monster.is_alive():
-            desc += 'the corpse of '
-        desc += f'{messages.get_a_or_an(self.monster.name)} {self.monster.name}'
-        return desc
+    def _describe(self) -> str:
+        template = (
+            _MONSTER if self.monster.is_alive() else _MONSTER_CORPSE
+        )
+        return template(
+            self.description, self.monster.article, self.monster.name
+        )
 
     @staticmethod
     def generate(exits: List[compass.Direction]) -> MonsterRoom:
@@ -267,7 +462,7 @@ class MonsterRoom(Room):
             enemy.generate_enemy()
         )
 
-    def get_options(self) -> Dict[str, ActionHandler]:
+    def _build_options(self) -> Dict[str, ActionHandler]:
         """
         Determines the special actions available, given the MonsterRoom's
         current state.
@@ -275,30 +470,30 @@ class MonsterRoom(Room):
         In practice, this means that the options, if the monster is alive,
         are:
         1. Attack
-        2. Flee to the previous room
-        If the monster is dead, there are no special actions to be taken.
+        2. Fight it out automatically
+        3. Sneak past the monster
+        4. Flee to the previous room
+        If the monster is dead, the options are those of any other room.
 
         Returns:
             Dictionary mapping action descriptions to callback handlers.
 
         """
         if self.monster.is_alive():
-            action_handlers = {
-                'attack': ActionHandler(
-                    f'Attack {self.monster.name}',
-                    lambda player: action.attack(player, self.monster)
-                ),
-                'sneak': ActionHandler(
-                    f'Attempt to sneak past the {self.monster.short_name}',
-                    lambda player: action.attempt_sneak(player, self.monster)
-                ),
-                'run': ActionHandler(
-                    'Run back',
-                    action.retreat
-                ),
-            }
-            return action_handlers
-        return super().get_options()
+            return self._fight_options(self.monster)
+        return super()._build_options()
+
+    def living_monster(self) -> Optional[enemy.Enemy]:
+        """Returns the room's monster if it is alive, or a wanderer's."""
+        if self.monster.is_alive():
+            return self.monster
+        return super().living_monster()
+
+    def living_monsters(self) -> List[enemy.Enemy]:
+        monsters = super().living_monsters()
+        if self.monster.is_alive():
+            monsters.insert(0, self.monster)
+        return monsters
 
 
 class TreasureRoom(Room):
@@ -311,14 +506,13 @@ class TreasureRoom(Room):
         self.chest = Chest()
         super().__init__(description, exits, trap=trap)
 
-    def __str__(self):
-        desc = f'{self.description}. '
-        if self.chest.is_open:
-            desc += 'An open, empty'
-        else:
-            desc += 'An enticing'
-        desc += ' chest sits in the centre'
-        return desc
+    def _describe(self) -> str:
+        template = _OPEN_CHEST if self.chest.is_open else _CLOSED_CHEST
+        return template(self.description)
+
+    def containers(self) -> List[ItemContainer]:
+        # The chest is empty until it is opened
+        return [self.items, self.chest.contents]
 
     @staticmethod
     def generate(exits: List[compass.Direction]) -> TreasureRoom:
@@ -337,7 +531,7 @@ class TreasureRoom(Room):
             exits
         )
 
-    def get_options(self) -> Dict[str, ActionHandler]:
+    def _build_options(self) -> Dict[str, ActionHandler]:
         """
         Determines the special actions available, given the TreasureRoom's
         current state.
@@ -354,12 +548,12 @@ class TreasureRoom(Room):
 
         """
         if self.chest.is_open:
-            return super().get_options()
+            return super()._build_options()
 
         action_handlers = {
             'open': ActionHandler(
                 'Open the chest',
-                lambda player: action.collect(player, self.chest)
+                lambda player: action.collect(player, self.chest, self.lock)
             ),
             'leave': ActionHandler(
                 'Leave it alone',
@@ -396,12 +590,77 @@ def _generate_room(enter_from: Optional[compass.Direction] = None) -> Room:
     return TreasureRoom.generate(exits)
 
 
-def generate_first_room() -> Room:
+def generate_exit_room(room: Room, d: compass.Direction) -> Room:
+    """
+    Generates the room beyond one of a room's exits, whose exit in the
+    opposite direction leads back to the room.
+
+    Note that the room's own exit is left for the caller to set. The new
+    room is added to the room's atlas, if it has one.
+
+    Args:
+        room: The room whose exit to generate a room beyond.
+        d: The direction of the exit.
+
+    Returns:
+        Room
+
+    """
+    opp = compass.get_opposite_dir(d)
+    new_room = _generate_room(enter_from=opp)
+    # Set the "backwards" room to the current room
+    setattr(new_room, opp.name.lower(), room)
+    if room.atlas is not None:
+        room.atlas.add_room(new_room, room, d)
+    return new_room
+
+
+def generate_first_room(atlas: Optional[Atlas] = None) -> Room:
     """
     Generates the first room of the level.
 
+    Args:
+        atlas: The atlas to add the room to, which is made afresh if not
+               given.
+
     Returns:
         Room
 
     """
-    return EmptyRoom.generate(compass.DIRECTIONS)
+    room = EmptyRoom.generate(compass.DIRECTIONS)
+    (atlas if atlas is not None else Atlas()).add_room(room)
+    return room
+
+
+def saved_state(room: Room) -> Dict[str, Any]:
+    """Returns the state of a room to be saved, see restore_rooms."""
+    return {k: v for k, v in vars(room).items() if k not in TRANSIENT}
+
+
+def restore_rooms(
+        saved: Iterable[
+            Tuple[Room, Dict[str, Any], Mapping[compass.Direction, Room]]
+        ]
+) -> Atlas:
+    """
+    Restores the rooms of a single player's game from their saved states,
+    once every room has been made, and makes an atlas of their items.
+
+    Args:
+        saved: Each room, made with its class's __new__, with its state (see
+               saved_state) and the rooms beyond its generated exits.
+
+    Returns:
+        The atlas of the rooms.
+
+    """
+    rooms = []
+    for room, state, exits in saved:
+        vars(room).update(state)
+        room.world = None
+        room.lock = NO_LOCK
+        room._options = room._description = None
+        room.changed()
+        room._exits = {d: exits.get(d) for d in compass.DIRECTIONS}
+        rooms.append(room)
+    return survey(rooms)
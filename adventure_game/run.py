@@ -1,65 +1,164 @@
+import contextlib
+import enum
+import os
 import sys
+from typing import Iterator, Optional
 
-from . import action, messages, utils
-from .exceptions import NoSuchExitException
+from . import action, autosave, console, messages, odds, screen, utils
+from .exceptions import NoSuchExitException, RoomUnavailableException
 from .player import Player
 
 
-def game_over():
+class Phase(enum.Enum):
+    """The phases of a turn, each of which a game may be resumed from."""
+    # Entering the player's current room
+    Enter = enum.auto()
+    # Choosing one of the room's special options
+    Options = enum.auto()
+    # Choosing an exit
+    Exits = enum.auto()
+
+
+def print_game_over():
     print("You were relentlessly killed. RIP.")
+
+
+def game_over():
+    print_game_over()
     sys.exit(0)
 
 
-def run_game():
-    name = input("Please enter your name: ")
-    player = Player(name, 100)
+def run_game(save_path: Optional[str] = None, full_screen: bool = False):
+    """
+    Runs a game in the terminal.
+
+    Args:
+        save_path: The file to save the game to as it is played, from which
+                   it is resumed if it exists. The game is not saved if
+                   None.
+        full_screen: Whether to lay the game out in panes across the whole
+                     terminal (see screen.ScreenConsole), if the terminal
+                     allows it, rather than printing it line by line.
+
+    """
+    with _front_end(full_screen) as screen_console:
+        saver = None
+        if save_path is not None and os.path.exists(save_path):
+            player, phase, saver = autosave.resume(save_path)
+            print(
+                f"Welcome back, {player.name}! "
+                f"You are in {player.current_room}."
+            )
+        else:
+            name = console.read_line("Please enter your name: ")
+            player = Player(name, 100)
+            # Move the player to the starting room
+            player.move_to_new_room()
+            phase = Phase.Enter
+        if screen_console is not None:
+            screen_console.player = player
+
+        if saver is None and save_path is not None:
+            saver = autosave.Autosaver(save_path)
+        autosave.bind(saver)
+        try:
+            play(player, phase)
+        finally:
+            autosave.bind(None)
+            if saver is not None:
+                saver.close()
+    if saver is not None and os.path.exists(save_path):
+        # The dead are not brought back
+        os.remove(save_path)
+    game_over()
+
+
+@contextlib.contextmanager
+def _front_end(
+        full_screen: bool
+) -> Iterator[Optional[screen.ScreenConsole]]:
+    """
+    Binds a ScreenConsole to the game for the duration of the block, if a
+    full screen was asked for and the terminal allows it.
+
+    """
+    if not full_screen:
+        yield None
+        return
+    with screen.open_screen() as screen_console:
+        if screen_console is None:
+            print("The terminal cannot show the full screen, so the game "
+                  "will be played line by line.")
+            yield None
+            return
+        console.route_stdout()
+        console.bind(screen_console)
+        try:
+            yield screen_console
+        finally:
+            console.bind(None)
 
-    # Move the player to the starting room
-    player.move_to_new_room()
 
+def play(player: Player, phase: Phase = Phase.Enter):
+    """
+    Plays the game with the player until they are killed.
+
+    Args:
+        player: The player, who must have been placed in a room.
+        phase: The phase of the turn to start from, when resuming a game.
+
+    """
     while player.is_alive():
-        messages.print_enter(player.current_room)
-        if player.current_room.trap is not None:
-            # If the trap is triggered, start the loop again (check alive. printing, etc)
-            if action.trigger_trap(player, player.current_room.trap):
-                continue
+        if phase is Phase.Enter:
+            autosave.request(player.current_room)
+            messages.print_enter(player.current_room)
+            messages.print_wanderers(player.current_room)
+            if player.current_room.living_monster() is not None:
+                # The rest of the player's line was typed before they knew
+                # they would have to fight
+                utils.interrupt()
+            if player.current_room.trap is not None:
+                # If the trap is triggered, start the loop again (check alive. printing, etc)
+                if action.trigger_trap(player, player.current_room.trap):
+                    utils.interrupt()
+                    continue
+            phase = Phase.Options
 
-        options = player.current_room.get_options()
-        if options:
-            while True:
-                messages.print_options(options)
-                inputs = utils.get_user_instr(
-                    "What would you like to do?",
-                    player
+        if phase is Phase.Options:
+            options = player.current_room.get_options()
+            while options:
+                autosave.checkpoint(player, Phase.Options)
+                messages.print_options(
+                    options, odds.option_notes(options, player)
                 )
+                with console.resumable(Phase.Options):
+                    inputs = utils.get_user_instr(
+                        "What would you like to do?",
+                        player,
+                        options
+                    )
                 if inputs is None:
-                    # Global option handled in get_user_instr
+                    # Global option or invalid input handled in
+                    # get_user_instr
                     continue
                 action_id = inputs[0]
                 # Invoke the action handler for the selected option
-                try:
-                    options[action_id].handler(player)
-                except KeyError:
-                    print(f"Invalid instruction: {action_id}")
-                else:
-                    break
+                options[action_id].handler(player)
+                break
 
         exits = player.current_room.exits
         while player.is_alive():
-            print(
-                "There are portals to the "
-                f"{messages.list_to_comma_string(exits)}."
-            )
-            instr = utils.get_user_instr(
-                "What would you like to do?",
-                player
-            )
+            autosave.checkpoint(player, Phase.Exits)
+            messages.print_exits(exits)
+            with console.resumable(Phase.Exits):
+                instr = utils.get_user_instr(
+                    "What would you like to do?",
+                    player,
+                    ['go']
+                )
             if instr is None:
                 continue
             instr, args = instr
-            if not args:
-                print("Expected an instruction in the form: go north")
-                continue
 
             try:
                 dest = utils.parse_movement_instr(instr, args[0])
@@ -71,7 +170,9 @@ def run_game():
                 player.go(dest)
             except NoSuchExitException:
                 print(f"There is no portal to the {dest}.")
+            except RoomUnavailableException:
+                print(f"The way {dest} is blocked. Try again later.")
             else:
                 break
-
-    game_over()
+        phase = Phase.Enter
+    utils.interrupt()
@@ -0,0 +1,301 @@
+"""
+This module contains a full-screen front end for the terminal, drawn with
+curses.
+
+The screen is laid out in panes:
+
+* the player's current room, at the top right, with the options and exits
+  of the current prompt beneath it, and the player's inventory beside it
+* a status bar, with the player's hp and equipment
+* a log of everything the game prints, scrolling beneath them
+* the prompt, on the bottom line
+
+Whenever the game prompts for input, the screen is composed afresh as a
+frame of plain text, and compared with the frame already on the terminal:
+only the characters which differ are drawn, and the lines printed to the log
+since the last prompt are brought in by scrolling the log's lines up rather
+than by drawing them all again. The room, its options and its exits, which
+line mode prints again at every prompt, stay in place in the room's pane
+instead of being logged (see Console.show).
+Over a slow link, a turn therefore costs little more than what happened in
+it, instead of the whole screen.
+
+If curses is unavailable, or the game is not being played in a terminal
+large enough for the panes, the game is played in line mode, as it is by
+default.
+
+"""
+from __future__ import annotations
+import collections
+import contextlib
+import io
+import re
+import sys
+import textwrap
+from typing import (
+    Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple,
+    TYPE_CHECKING
+)
+
+try:
+    import curses
+except ImportError:
+    # Not built on some platforms, e.g. Windows
+    curses = None
+
+from . import console, utils
+if TYPE_CHECKING:
+    from .player import Player
+
+# The smallest terminal the panes fit in, in rows and columns
+MIN_ROWS = 16
+MIN_COLUMNS = 60
+# The number of wrapped lines of the log kept
+LOG_LINES = 1000
+# Changes closer together than this are drawn as one run of characters, as
+# moving the cursor between them costs more than drawing a few characters
+MERGE_GAP = 4
+# Separates the room from the inventory
+PANE_SEPARATOR = ' | '
+# The panes shown beneath the room, in order (see Console.show)
+PANES = ('options', 'exits')
+
+# The escape sequences of the line mode (see messages.underline)
+_ESCAPES = re.compile(r'\033\[[0-9;]*m')
+
+
+def strip_escapes(text: str) -> str:
+    """Removes the terminal escape sequences from text."""
+    return _ESCAPES.sub('', text)
+
+
+def wrap(text: str, width: int) -> List[str]:
+    """Wraps each line of text to a width, keeping blank lines."""
+    return [
+        row
+        for line in text.split('\n')
+        for row in (textwrap.wrap(line, width) or [''])
+    ]
+
+
+def diff(
+        old: Sequence[str], new: Sequence[str]
+) -> Iterator[Tuple[int, int, str]]:
+    """
+    Finds the characters which differ between two frames of the same size.
+
+    Args:
+        old: The rows of the frame on the terminal.
+        new: The rows of the frame to draw.
+
+    Returns:
+        The row, column and characters of each run of the new frame which
+        differs from the old, where runs less than MERGE_GAP apart are
+        merged.
+
+    """
+    for row, (before, after) in enumerate(zip(old, new)):
+        if before == after:
+            continue
+        run = None
+        for col, (a, b) in enumerate(zip(before, after)):
+            if a == b:
+                continue
+            if run is not None and col - run[1] >= MERGE_GAP:
+                yield row, run[0], after[run[0]:run[1]]
+                run = None
+            run = (col if run is None else run[0], col + 1)
+        if run is not None:
+            yield row, run[0], after[run[0]:run[1]]
+
+
+class ScreenConsole(console.Console):
+    """
+    A Console which lays out the game in panes on a curses window.
+
+    Args:
+        window: The curses window covering the terminal.
+        player: The player whose room, status and inventory are shown, once
+                known.
+
+    """
+    def __init__(self, window: Any, player: Optional[Player] = None):
+        self.window = window
+        self.player = player
+        self._log: Deque[str] = collections.deque(maxlen=LOG_LINES)
+        # The end of the log's last line, if it was printed without one
+        self._partial = ''
+        # The number of lines logged since the screen was last drawn
+        self._scrolled = 0
+        self._frame: List[str] = []
+        # The text shown in each of PANES for the next prompt
+        self._panes: Dict[str, str] = {}
+        # The prompt on the bottom line
+        self.prompt: Optional[str] = None
+        # The rows the window scrolls, once they have been set
+        self._region: Optional[Tuple[int, int]] = None
+
+    def write(self, text: str):
+        text = self._partial + strip_escapes(text)
+        lines = text.split('\n')
+        self._partial = lines.pop()
+        width = self.window.getmaxyx()[1]
+        for line in lines:
+            rows = wrap(line, width)
+            self._log.extend(rows)
+            self._scrolled += len(rows)
+
+    def show(self, pane: str, text: str) -> bool:
+        if pane == 'room':
+            # The room's pane always describes the player's current room
+            return self.player is not None
+        if pane not in PANES:
+            return False
+        self._panes[pane] = strip_escapes(text)
+        return True
+
+    def read_line(self, prompt: str) -> str:
+        rows, cols = self.window.getmaxyx()
+        prompt = strip_escapes(self._partial + prompt)[:cols // 2]
+        self._partial = ''
+        self.draw()
+        if prompt == self.prompt:
+            # Only the previous answer needs clearing
+            self.window.move(rows - 1, len(prompt))
+            self.window.clrtoeol()
+        else:
+            self.window.move(rows - 1, 0)
+            self.window.clrtoeol()
+            self.window.addstr(rows - 1, 0, prompt)
+            self.prompt = prompt
+        self.window.refresh()
+        line = self.window.getstr(
+            rows - 1, len(prompt), cols - len(prompt) - 1
+        )
+        line = line.decode('utf-8', 'replace')
+        # The panes were for this prompt only
+        self._panes.clear()
+        return line
+
+    def tail(self) -> List[str]:
+        """Returns the lines of the log which fit in its pane."""
+        rows = self.window.getmaxyx()[0]
+        return list(self._log)[-self._layout(rows)[1]:]
+
+    @staticmethod
+    def _layout(rows: int) -> Tuple[int, int]:
+        """Returns the heights of the top panes and of the log."""
+        top = max(3, (rows - 2) // 3)
+        return top, rows - top - 2
+
+    def compose(self) -> List[str]:
+        """Composes the frame to draw, above the prompt."""
+        rows, cols = self.window.getmaxyx()
+        top, log_rows = self._layout(rows)
+        inventory_cols = cols // 3
+        room_cols = cols - inventory_cols - len(PANE_SEPARATOR)
+
+        room: List[str] = []
+        status = ''
+        inventory: List[str] = []
+        if self.player is not None:
+            room = wrap(str(self.player.current_room or ''), room_cols)
+            status = strip_escapes(str(self.player))
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                utils.show_inventory(self.player)
+            inventory = wrap(output.getvalue().rstrip(), inventory_cols)
+        if len(inventory) > top:
+            inventory[top - 1:] = ["(type items to see them all)"]
+        # The panes are kept at the foot of the room's, so that they stay in
+        # place however long the room's description is
+        panes = [
+            row for pane in PANES if self._panes.get(pane)
+            for row in wrap(self._panes[pane], room_cols)
+        ][-top:]
+        room = room[:top - len(panes)]
+        room += [''] * (top - len(room) - len(panes)) + panes
+
+        # The room is on the right, where the ends of its rows can be
+        # cleared without drawing them
+        frame = [
+            (inventory[i] if i < len(inventory) else '').ljust(inventory_cols)
+            + PANE_SEPARATOR
+            + room[i]
+            for i in range(top)
+        ]
+        frame.append(f'== {status} '.ljust(cols, '='))
+        log = list(self._log)[-log_rows:]
+        frame.extend([''] * (log_rows - len(log)) + log)
+        return [row[:cols].ljust(cols) for row in frame]
+
+    def draw(self):
+        """Draws the characters of the screen which have changed."""
+        rows, cols = self.window.getmaxyx()
+        top, log_rows = self._layout(rows)
+        frame = self.compose()
+        old = self._frame
+        if len(old) != len(frame) or len(old[0]) != cols:
+            # The first frame, or the terminal was resized
+            self.window.erase()
+            old = [' ' * cols] * len(frame)
+            self.prompt = self._region = None
+        elif 0 < self._scrolled < log_rows:
+            # Move the lines still shown up the log, as the terminal would
+            first = top + 1
+            if self._region != (first, first + log_rows - 1):
+                self._region = (first, first + log_rows - 1)
+                self.window.setscrreg(*self._region)
+            self.window.scrollok(True)
+            self.window.scroll(self._scrolled)
+            self.window.scrollok(False)
+            old = (
+                old[:first] + old[first + self._scrolled:]
+                + [' ' * cols] * self._scrolled
+            )
+        for row, col, text in diff(old, frame):
+            if frame[row][col + len(text):].strip():
+                self.window.addstr(row, col, text)
+            else:
+                # Clear the rest of the row instead of drawing blanks
+                text = text.rstrip()
+                if text:
+                    self.window.addstr(row, col, text)
+                self.window.move(row, col + len(text))
+                self.window.clrtoeol()
+        self._frame = frame
+        self._scrolled = 0
+
+
+@contextlib.contextmanager
+def open_screen() -> Iterator[Optional[ScreenConsole]]:
+    """
+    Takes over the terminal for a ScreenConsole, and on leaving restores it
+    and prints the lines the log last showed.
+
+    Returns:
+        The ScreenConsole, or None if the terminal cannot be taken over, in
+        which case the game should be played in line mode.
+
+    """
+    if curses is None or not (sys.stdin.isatty() and sys.stdout.isatty()):
+        yield None
+        return
+    try:
+        window = curses.initscr()
+    except curses.error:
+        yield None
+        return
+    rows, cols = window.getmaxyx()
+    if rows < MIN_ROWS or cols < MIN_COLUMNS:
+        curses.endwin()
+        yield None
+        return
+    curses.echo()
+    window.idlok(True)
+    screen = ScreenConsole(window)
+    try:
+        yield screen
+    finally:
+        curses.endwin()
+        print('\n'.join(screen.tail()).rstrip())
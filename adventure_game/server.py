@@ -0,0 +1,681 @@
+"""
+This module contains a game server, which hosts many concurrent players in one
+process over a line-based TCP protocol that works with plain telnet or netcat.
+
+Each connection gets its own Session, with its own Player. Unless the server
+hosts a SharedWorld, each player explores a world of their own. The
+networking is handled by asyncio. The game itself prompts for input
+synchronously, so each session plays on a lightweight thread of its own, bound
+to the session's Console. A prompt parks that thread until the session's next
+line arrives, without blocking the event loop or the other sessions. Output is
+buffered per connection and flushed from the event loop.
+
+A server may also hibernate idle sessions: once a player has been idle for a
+while at one of the main prompts of a turn, their game is serialized to a
+HibernationStore and its thread ends, leaving only the connection in memory.
+The game is restored as soon as the player's next line arrives, and resumed
+at the same prompt.
+
+Anyone may watch a game instead of playing, by answering the name prompt with
+'watch <name>'. Each chunk of a game's output is encoded once and shared by
+all of its spectators, each of which has a bounded queue of its own: a
+spectator who falls behind skips ahead, rather than slowing down the game.
+
+A server may also play its games in real time, with monsters attacking,
+traps re-arming, food spoiling and players regenerating while they think.
+The timers of every session share a single TimerWheel, turned by the event
+loop, and post their effects to the sessions' game threads, which apply them
+while they wait for the player's input. In a real-time shared world, monsters
+also wander between the rooms.
+
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import collections
+import itertools
+import queue
+import signal
+import tempfile
+import threading
+import time
+from typing import Any, Deque, List, Optional, Set
+
+from . import console, hibernation, run, timers
+from .exceptions import (
+    PlayerKilledException, SessionClosedException, SessionHibernatedException
+)
+from .hibernation import HibernationStore
+from .realtime import RealTimeGame
+from .run import Phase
+from .player import Player
+from .wandering import WanderingMonsters
+from .world import SharedWorld
+
+DEFAULT_PORT = 4000
+DEFAULT_IDLE_TIMEOUT = 600.
+# The stack size of each session's game thread, kept small so that thousands
+# of sessions fit in one process
+SESSION_STACK_SIZE = 512 * 1024
+ENCODING = 'utf-8'
+# The number of pending connections to queue, so that bursts of players
+# connecting at once are not turned away
+LISTEN_BACKLOG = 1024
+
+# The number of restores of hibernated games whose latency is reported
+RESTORE_TIMES_KEPT = 1000
+
+# The number of chunks of output queued for a spectator, beyond which the
+# oldest ones are dropped
+SPECTATOR_QUEUE_SIZE = 256
+
+# The number of seconds between the moves of wandering monsters
+WANDER_INTERVAL = 1.
+
+# Placed in a session's input queue to wake up its game thread when the
+# session is closed or hibernated
+_CLOSED = object()
+_HIBERNATE = object()
+
+
+class Spectator:
+    """
+    A connection watching another player's game.
+
+    Args:
+        writer: The stream to which the game's output is written.
+        queue_size: The number of chunks of output which may be waiting to
+                    be written, beyond which the oldest ones are dropped.
+
+    """
+    def __init__(
+            self,
+            writer: asyncio.StreamWriter,
+            queue_size: int = SPECTATOR_QUEUE_SIZE
+    ):
+        self.writer = writer
+        self.dropped = 0
+        self._pending: Deque[bytes] = collections.deque(maxlen=queue_size)
+        self._wakeup = asyncio.Event()
+        self._closed = False
+
+    def feed(self, data: bytes):
+        """Queues a chunk of output, without ever waiting for the spectator."""
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(data)
+        self._wakeup.set()
+
+    def close(self):
+        """Stops watching, once the output queued so far has been written."""
+        self._closed = True
+        self._wakeup.set()
+
+    async def run(self):
+        """Writes the queued output to the spectator until closed."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.dropped:
+                self.writer.write(
+                    f"\r\n[... skipped {self.dropped} messages ...]\r\n"
+                    .encode(ENCODING)
+                )
+                self.dropped = 0
+            while self._pending:
+                self.writer.write(self._pending.popleft())
+            if self._closed:
+                return
+            await self.writer.drain()
+
+
+class Session(console.Console):
+    """
+    A single player's connection to the server.
+
+    Args:
+        server: The server hosting the session.
+        reader: The stream from which the player's input is read.
+        writer: The stream to which the game's output is written.
+
+    """
+    def __init__(
+            self,
+            server: GameServer,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+    ):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self.key = str(next(server.session_ids))
+        self.name: Optional[str] = None
+        self.player: Optional[Player] = None
+        self.hibernated = False
+        # The resume point of the prompt at which the game thread is waiting
+        # for input, if it is waiting at one
+        self.parked_at: Optional[Any] = None
+        self.spectators: Set[Spectator] = set()
+        self.realtime: Optional[RealTimeGame] = None
+
+        self._inputs: queue.SimpleQueue = queue.SimpleQueue()
+        self._output: List[str] = []
+        self._output_lock = threading.Lock()
+        # Held while the game thread applies the effect of a real-time
+        # mechanic, during which the player must not be serialized
+        self._effects_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._thread: Optional[threading.Thread] = None
+        self._thread_stopped = asyncio.Event()
+        self._game_finished = asyncio.Event()
+        self._closing: Optional[asyncio.Future] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closing is not None
+
+    def read_line(self, prompt: str) -> str:
+        """
+        Prompts the player for input; called from the game thread.
+
+        While waiting, the effects of the game's real-time mechanics are
+        applied as they arrive.
+
+        Raises:
+            SessionClosedException: if the session is closed while waiting.
+            SessionHibernatedException: if the session is hibernated while
+                                        waiting.
+            PlayerKilledException: if the player is killed while waiting.
+
+        """
+        self.write(prompt)
+        if self.realtime is not None:
+            self.realtime.on_prompt()
+        self.parked_at = self.resume_point
+        line = self._inputs.get()
+        while callable(line):
+            with self._effects_lock:
+                line()
+            line = self._inputs.get()
+        self.parked_at = None
+        if line is _CLOSED:
+            raise SessionClosedException()
+        if line is _HIBERNATE:
+            raise SessionHibernatedException()
+        return line
+
+    def write(self, text: str):
+        """
+        Buffers output for the player, to be flushed from the event loop.
+
+        This may be called from any thread.
+
+        """
+        with self._output_lock:
+            self._output.append(text)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self):
+        """Writes all the buffered output to the connection."""
+        with self._output_lock:
+            text = ''.join(self._output)
+            self._output.clear()
+            self._flush_scheduled = False
+        if not text:
+            return
+        data = text.replace('\n', '\r\n').encode(ENCODING)
+        if not self.writer.is_closing():
+            self.writer.write(data)
+        for spectator in self.spectators:
+            spectator.feed(data)
+
+    async def _readline(self, timeout: Optional[float]) -> Optional[str]:
+        """
+        Reads a line from the player, waiting at most the given timeout (or
+        indefinitely if None).
+
+        Returns:
+            The line, or None if the connection was closed.
+
+        Raises:
+            asyncio.TimeoutError: if no line arrived in time.
+
+        """
+        try:
+            data = await asyncio.wait_for(self.reader.readline(), timeout)
+        except (ConnectionError, ValueError):
+            # ValueError is raised for lines exceeding the stream's limit
+            return None
+        if not data:
+            return None
+        return data.decode(ENCODING, errors='replace').rstrip('\r\n')
+
+    async def _next_line(self) -> Optional[str]:
+        """
+        Waits for the player's next line, hibernating the session if the
+        player is idle for long enough, and disconnecting them if they are
+        idle for longer than the server's idle timeout.
+
+        Returns:
+            The line, or None if the player is gone.
+
+        """
+        timeout = self.server.idle_timeout
+        hibernate_after = self.server.hibernate_after
+        if (
+                self.server.store is not None and not self.hibernated
+                and hibernate_after is not None and hibernate_after < timeout
+        ):
+            try:
+                return await self._readline(hibernate_after)
+            except asyncio.TimeoutError:
+                timeout -= hibernate_after
+                await self._hibernate()
+        try:
+            return await self._readline(timeout)
+        except asyncio.TimeoutError:
+            self.write("\nYou have been idle for too long. Goodbye!\n")
+            return None
+
+    async def run(self):
+        """Serves the session until the game ends or the player leaves."""
+        try:
+            name = ''
+            while not name:
+                self.write("Please enter your name: ")
+                name = await self._next_line()
+                if name is None:
+                    return
+                name = name.strip()
+            if name.startswith('watch '):
+                await self._watch(name[len('watch '):].strip())
+                return
+
+            self.name = name
+            self.player = Player(name, 100)
+            if self.server.world is not None:
+                self.player.move_to(self.server.world.start_room)
+            else:
+                self.player.move_to_new_room()
+            self._start_game()
+
+            while not self._game_finished.is_set():
+                line = await self._next_line()
+                if line is None:
+                    break
+                if self.hibernated and not await self._restore():
+                    break
+                self._inputs.put(line)
+                if self.spectators:
+                    # Show the spectators what the player typed
+                    data = f"{line}\r\n".encode(ENCODING)
+                    for spectator in self.spectators:
+                        spectator.feed(data)
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            await self.close()
+
+    async def _watch(self, name: str):
+        """Watches another player's game, until either side leaves."""
+        target = self.server.find_session(name)
+        if target is None:
+            self.write(f"There is nobody called {name} playing.\n")
+            return
+        self.write(f"You are now watching {name}.\n")
+        self._flush()
+
+        spectator = Spectator(self.writer)
+        target.spectators.add(spectator)
+        watching = asyncio.ensure_future(spectator.run())
+        # Spectators can't play, so their input is only read to notice them
+        # leaving
+        leaving = asyncio.ensure_future(self._discard_input())
+        try:
+            await asyncio.wait(
+                {watching, leaving}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            target.spectators.discard(spectator)
+            watching.cancel()
+            leaving.cancel()
+
+    async def _discard_input(self):
+        """Reads and ignores the input, until the connection is closed."""
+        while await self._readline(None):
+            pass
+
+    def _start_game(self, phase: Phase = Phase.Enter):
+        if self.server.world is not None:
+            self.server.world.join(self.player, self._notify)
+        if self.server.wheel is not None:
+            self.realtime = RealTimeGame(
+                self.server.wheel, self.player, self._inputs.put
+            )
+            self.realtime.start()
+        self._thread_stopped.clear()
+        self._thread = threading.Thread(
+            target=self._play,
+            args=(phase,),
+            name=f'session-{self.player.name}',
+            daemon=True
+        )
+        self._thread.start()
+
+    def _play(self, phase: Phase):
+        """Plays the game; runs on the session's game thread."""
+        console.bind(self)
+        finished = True
+        try:
+            run.play(self.player, phase)
+            run.print_game_over()
+        except PlayerKilledException:
+            run.print_game_over()
+        except SessionHibernatedException:
+            finished = False
+        except SessionClosedException:
+            pass
+        finally:
+            console.bind(None)
+            if self.realtime is not None:
+                self.realtime.stop()
+                self.realtime = None
+            if self.server.world is not None:
+                self.server.world.leave(self.player)
+            try:
+                self.loop.call_soon_threadsafe(
+                    self._on_thread_stopped, finished
+                )
+            except RuntimeError:
+                # The event loop has already been shut down
+                pass
+
+    def _notify(self, message: str):
+        """Tells the player of something happening nearby."""
+        self.write(f"\n{message}\n")
+
+    def _on_thread_stopped(self, finished: bool):
+        self._thread = None
+        self._thread_stopped.set()
+        if finished:
+            self._on_game_finished()
+
+    async def _hibernate(self):
+        """
+        Serializes the game to the server's store and stops its thread, if
+        the game is waiting for input at a point it can be resumed from.
+
+        """
+        phase = self.parked_at
+        if self._thread is None or phase is None:
+            return
+        # The game thread is blocked until it gets more input, so the player
+        # can be serialized safely from here
+        with self._effects_lock:
+            data = hibernation.dumps(self.player, phase)
+        try:
+            await self.loop.run_in_executor(
+                None, self.server.store.save, self.key, data
+            )
+        except OSError:
+            return
+        self._inputs.put(_HIBERNATE)
+        await self._thread_stopped.wait()
+        self.player = None
+        self.hibernated = True
+
+    async def _restore(self) -> bool:
+        """
+        Restores and resumes a hibernated game.
+
+        Returns:
+            Whether the game could be restored.
+
+        """
+        start = time.perf_counter()
+        try:
+            data = await self.loop.run_in_executor(
+                None, self.server.store.load, self.key
+            )
+        except (KeyError, OSError):
+            self.write("\nSorry, your game could not be restored.\n")
+            return False
+        self.player, phase = hibernation.loads(data, self.server.world)
+        self.hibernated = False
+        self._start_game(phase)
+        self.server.restore_times.append(time.perf_counter() - start)
+        return True
+
+    def _on_game_finished(self):
+        self._game_finished.set()
+        self._flush()
+        # Closing the connection also ends the wait for the player's input
+        self.writer.close()
+
+    async def close(self):
+        """Ends the game, if it is still going, and closes the connection."""
+        if self._closing is None:
+            self._closing = asyncio.ensure_future(self._close())
+        await asyncio.shield(self._closing)
+
+    async def _close(self):
+        if self._thread is not None:
+            self._inputs.put(_CLOSED)
+            await self._thread_stopped.wait()
+        if self.hibernated:
+            self.server.store.discard(self.key)
+        self._flush()
+        for spectator in self.spectators:
+            spectator.feed(
+                f"\r\nThe game of {self.name} has ended.\r\n".encode(ENCODING)
+            )
+            spectator.close()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.server.sessions.discard(self)
+
+
+class GameServer:
+    """
+    A server hosting many concurrent game sessions.
+
+    Args:
+        host: The interface to listen on.
+        port: The port to listen on, or 0 to pick any free port.
+        idle_timeout: The number of seconds after which a player who has not
+                      sent any input is disconnected.
+        world: The world shared by all the players, if any.
+        hibernate_after: The number of seconds after which the game of an
+                         idle player is hibernated, if any.
+        store: The store of hibernated games, which is required to hibernate
+               sessions.
+        realtime: Whether to play the games in real time.
+
+    """
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = DEFAULT_PORT,
+            idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+            world: Optional[SharedWorld] = None,
+            hibernate_after: Optional[float] = None,
+            store: Optional[HibernationStore] = None,
+            realtime: bool = False
+    ):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.world = world
+        self.hibernate_after = hibernate_after
+        self.store = store
+        self.sessions: Set[Session] = set()
+        self.session_ids = itertools.count()
+        # The latencies of the most recent restores of hibernated games
+        self.restore_times: Deque[float] = collections.deque(
+            maxlen=RESTORE_TIMES_KEPT
+        )
+        self.wheel = timers.TimerWheel() if realtime else None
+        self.wanderers: Optional[WanderingMonsters] = None
+        if realtime and world is not None:
+            self.wanderers = WanderingMonsters(world)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._driver: Optional[asyncio.Future] = None
+
+    def find_session(self, name: str) -> Optional[Session]:
+        """Finds the session of the player with the given name, if any."""
+        for session in self.sessions:
+            if session.name == name and not session.closed:
+                return session
+        return None
+
+    def status(self) -> str:
+        """Summarizes the sessions hosted by the server."""
+        resident = sum(s.player is not None for s in self.sessions)
+        hibernated = sum(s.hibernated for s in self.sessions)
+        spectators = sum(len(s.spectators) for s in self.sessions)
+        status = (
+            f"{len(self.sessions)} sessions: {resident} resident, "
+            f"{hibernated} hibernated, {spectators} spectators"
+        )
+        if self.wheel is not None:
+            status += f"; {len(self.wheel)} timers pending"
+        if self.wanderers is not None:
+            status += f", {len(self.wanderers)} wandering monsters"
+        if self.restore_times:
+            mean = sum(self.restore_times) / len(self.restore_times)
+            status += (
+                f"; restore latency {mean * 1000:.1f} ms mean, "
+                f"{max(self.restore_times) * 1000:.1f} ms max"
+            )
+        return status
+
+    async def start(self):
+        """Starts accepting connections."""
+        console.route_stdout()
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, backlog=LISTEN_BACKLOG
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.wheel is not None:
+            self._driver = asyncio.ensure_future(timers.drive(self.wheel))
+        if self.wanderers is not None:
+            self.wheel.schedule(WANDER_INTERVAL, self._wander)
+
+    def _wander(self):
+        """Moves the wandering monsters on; called from the wheel."""
+        self.wanderers.step()
+        self.wheel.schedule(WANDER_INTERVAL, self._wander)
+
+    async def _handle(
+            self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        session = Session(self, reader, writer)
+        self.sessions.add(session)
+        await session.run()
+
+    async def shutdown(
+            self, message: str = "The server is shutting down. Goodbye!"
+    ):
+        """
+        Stops accepting connections, then says goodbye to every player and
+        closes their sessions.
+
+        """
+        if self._server is not None:
+            self._server.close()
+        sessions = list(self.sessions)
+        for session in sessions:
+            session.write(f"\n{message}\n")
+        await asyncio.gather(*(session.close() for session in sessions))
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._driver is not None:
+            self._driver.cancel()
+
+
+async def serve(
+        host: str,
+        port: int,
+        idle_timeout: float,
+        shared: bool,
+        hibernate_after: Optional[float],
+        hibernate_dir: Optional[str],
+        status_interval: Optional[float],
+        realtime: bool
+):
+    """Runs a GameServer until the process is interrupted."""
+    store = None
+    if hibernate_after is not None:
+        store = HibernationStore(
+            hibernate_dir or tempfile.mkdtemp(prefix='adventure-game-')
+        )
+    server = GameServer(
+        host, port, idle_timeout, SharedWorld() if shared else None,
+        hibernate_after, store, realtime
+    )
+    await server.start()
+    print(f"Serving on {host}:{server.port}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), status_interval)
+        except asyncio.TimeoutError:
+            print(server.status())
+    await server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Host the adventure game over TCP."
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        '--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT
+    )
+    parser.add_argument(
+        '--shared', action='store_true',
+        help="let every player explore the same world"
+    )
+    parser.add_argument(
+        '--hibernate-after', type=float,
+        help="hibernate the games of players idle for this many seconds"
+    )
+    parser.add_argument(
+        '--hibernate-dir',
+        help="where to store hibernated games (default: a temporary "
+             "directory)"
+    )
+    parser.add_argument(
+        '--status-interval', type=float,
+        help="print the number of resident and hibernated sessions every "
+             "this many seconds"
+    )
+    parser.add_argument(
+        '--realtime', action='store_true',
+        help="play in real time: monsters attack, traps re-arm, food spoils "
+             "and players regenerate while they think"
+    )
+    args = parser.parse_args()
+    threading.stack_size(SESSION_STACK_SIZE)
+    asyncio.run(serve(
+        args.host, args.port, args.idle_timeout, args.shared,
+        args.hibernate_after, args.hibernate_dir, args.status_interval,
+        args.realtime
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,621 @@
+"""
+This module splits one large shared world across several worker processes,
+so that room generation and combat run on every core instead of in a single
+interpreter.
+
+Rooms are laid out on a grid, each exit leading one step in its direction,
+and the grid is divided into square regions. Each region is owned by one
+shard, picked by hashing the region's coordinates, and the rooms in it are
+generated and played in that shard's process only. Each shard has its own
+starting room, in one of its regions.
+
+A coordinator process holds the players' connections and routes messages
+between them and the shards: the players' input and the games' output,
+requests to generate rooms in another shard's region, and handoffs. When a
+player moves into a room owned by another shard, their game stops, and is
+serialized (as when hibernating) and resumed in the other shard.
+
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import threading
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Tuple
+
+from . import compass, console, hibernation, run
+from .exceptions import (
+    PlayerHandoffException, RoomUnavailableException, SessionClosedException
+)
+from .player import Player
+from .room import Room, generate_exit_room
+from .run import Phase
+from .server import (
+    DEFAULT_PORT, ENCODING, LISTEN_BACKLOG, SESSION_STACK_SIZE
+)
+from .world import SharedWorld
+
+# The width and height of a region, in rooms
+DEFAULT_REGION_SIZE = 8
+
+# The steps taken on the grid through each exit
+OFFSETS: Dict[compass.Direction, Tuple[int, int]] = {
+    compass.Direction.North: (0, 1),
+    compass.Direction.South: (0, -1),
+    compass.Direction.East: (1, 0),
+    compass.Direction.West: (-1, 0),
+}
+
+# The number of seconds to wait for another shard to generate a room before
+# giving up on it
+ROOM_REQUEST_TIMEOUT = 10.
+# The spread of the coordinates at which new starting rooms are placed
+_START_SPREAD = 1 << 20
+
+Coords = Tuple[int, int]
+
+# Placed in a session's input queue to wake up its game thread when the
+# session is closed
+_CLOSED = object()
+
+
+class RemoteRoom(Room):
+    """
+    Stands in for a room owned by another shard, so that the rooms of this
+    shard can lead to it. It is only ever made by ShardedWorld.get_room,
+    never generated.
+
+    Args:
+        room_id: The id of the room.
+        world: The shard's part of the world.
+
+    """
+    def __init__(self, room_id: int, world: ShardedWorld):
+        super().__init__("a distant part of the dungeon", [])
+        self.id = room_id
+        self.world = world
+
+    def _describe(self) -> str:
+        return self.description
+
+
+class ShardedWorld(SharedWorld):
+    """
+    One shard's part of a world shared between several processes.
+
+    The ids of the rooms are unique across the shards, and each shard can
+    tell the owner of a room from its id.
+
+    Args:
+        shard: The index of this shard.
+        shards: The number of shards.
+        link: Generates rooms in the regions of the other shards, see
+              ShardWorker.request_room.
+        region_size: The width and height of a region, in rooms.
+
+    """
+    def __init__(
+            self,
+            shard: int,
+            shards: int,
+            link: ShardWorker,
+            region_size: int = DEFAULT_REGION_SIZE
+    ):
+        self.shard = shard
+        self.shards = shards
+        self.link = link
+        self.region_size = region_size
+        self.coords: Dict[int, Coords] = {}
+        self._remote_rooms: Dict[int, RemoteRoom] = {}
+        super().__init__(ids=itertools.count(shard, shards))
+
+    def owner(self, coords: Coords) -> int:
+        """Returns the shard owning the region containing the coordinates."""
+        x, y = coords
+        region = (x // self.region_size, y // self.region_size)
+        # Tuples of ints hash the same in every process
+        return hash(region) % self.shards
+
+    def adopt(self, room: Room, coords: Optional[Coords] = None) -> Room:
+        """
+        Adds a room to the world, see SharedWorld.adopt.
+
+        Args:
+            room: The room, which must not belong to a world yet.
+            coords: The room's coordinates, which must be in a region owned
+                    by this shard. The room is placed in a random region
+                    owned by this shard if not given.
+
+        """
+        super().adopt(room)
+        if coords is None:
+            coords = self._random_coords()
+        self.coords[room.id] = coords
+        return room
+
+    def _random_coords(self) -> Coords:
+        while True:
+            coords = (
+                random.randrange(-_START_SPREAD, _START_SPREAD),
+                random.randrange(-_START_SPREAD, _START_SPREAD),
+            )
+            if self.owner(coords) == self.shard:
+                return coords
+
+    def get_room(self, room_id: int) -> Room:
+        """Gets a room by its id, or a stand-in if another shard owns it."""
+        if room_id % self.shards == self.shard:
+            return self.rooms[room_id]
+        room = self._remote_rooms.get(room_id)
+        if room is None:
+            room = self._remote_rooms.setdefault(
+                room_id, RemoteRoom(room_id, self)
+            )
+        return room
+
+    def generate_exit_room(self, room: Room, d: compass.Direction) -> Room:
+        """
+        Generates the room beyond one of a room's exits, asking the shard
+        owning the region it is in to generate it if necessary.
+
+        """
+        x, y = self.coords[room.id]
+        dx, dy = OFFSETS[d]
+        coords = (x + dx, y + dy)
+        owner = self.owner(coords)
+        if owner == self.shard:
+            return self.adopt(generate_exit_room(room, d), coords)
+        return self.get_room(
+            self.link.request_room(owner, coords, d, room.id)
+        )
+
+    def generate_remote_exit_room(
+            self, coords: Coords, d: compass.Direction, from_id: int
+    ) -> int:
+        """
+        Generates a room on behalf of another shard.
+
+        Args:
+            coords: The coordinates of the room to generate.
+            d: The direction of the exit through which the room is reached.
+            from_id: The id of the room whose exit leads to the room.
+
+        Returns:
+            The id of the generated room.
+
+        """
+        return self.adopt(
+            generate_exit_room(self.get_room(from_id), d), coords
+        ).id
+
+    def on_enter(self, player: Player, room: Room):
+        """
+        Hands the player off to the shard owning the room they entered.
+
+        Raises:
+            PlayerHandoffException: if the room is owned by another shard.
+
+        """
+        if isinstance(room, RemoteRoom):
+            raise PlayerHandoffException(room.id)
+        super().on_enter(player, room)
+
+
+class ShardSession(console.Console):
+    """
+    A player's game, played in a shard.
+
+    Args:
+        worker: The shard's worker.
+        key: The key of the player's connection to the coordinator.
+
+    """
+    def __init__(self, worker: ShardWorker, key: str):
+        self.worker = worker
+        self.key = key
+        self.inputs: queue.SimpleQueue = queue.SimpleQueue()
+
+    def read_line(self, prompt: str) -> str:
+        """
+        Prompts the player for input.
+
+        Raises:
+            SessionClosedException: if the player has left.
+
+        """
+        self.write(prompt)
+        line = self.inputs.get()
+        if line is _CLOSED:
+            raise SessionClosedException()
+        return line
+
+    def write(self, text: str):
+        self.worker.send('output', self.key, text)
+
+    def play(self, player: Player, phase: Phase):
+        """Plays the game; runs on a thread of its own."""
+        console.bind(self)
+        message: Optional[tuple] = None
+        try:
+            run.play(player, phase)
+            run.print_game_over()
+            message = ('finished', self.key)
+        except PlayerHandoffException as e:
+            message = (
+                'handoff',
+                self.key,
+                e.room_id % self.worker.world.shards,
+                hibernation.dumps(player, Phase.Enter)
+            )
+        except SessionClosedException:
+            pass
+        finally:
+            console.bind(None)
+            # Left before the message goes out, since the player may come
+            # straight back to a new session under the same key
+            if self.worker.sessions.get(self.key) is self:
+                del self.worker.sessions[self.key]
+        if message is not None:
+            self.worker.send(*message)
+
+
+class _Request:
+    """A request for a room made to another shard, awaiting its reply."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.room_id: Optional[int] = None
+
+
+class ShardWorker:
+    """
+    Runs one shard of a sharded world, in a worker process.
+
+    Messages from the coordinator are read on the main thread, which never
+    sends any itself, so that the coordinator can always get its messages
+    through. Each game is played on a thread of its own, and the requests of
+    the other shards are served on another.
+
+    Args:
+        shard: The index of the shard.
+        shards: The number of shards.
+        conn: The connection to the coordinator.
+        region_size: The width and height of a region, in rooms.
+
+    """
+    def __init__(
+            self,
+            shard: int,
+            shards: int,
+            conn: Connection,
+            region_size: int = DEFAULT_REGION_SIZE
+    ):
+        self.conn = conn
+        self.world = ShardedWorld(shard, shards, self, region_size)
+        self.sessions: Dict[str, ShardSession] = {}
+        self._send_lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._requests: Dict[int, _Request] = {}
+        self._remote_requests: queue.SimpleQueue = queue.SimpleQueue()
+
+    def send(self, *message):
+        """Sends a message to the coordinator, from any thread."""
+        with self._send_lock:
+            self.conn.send(message)
+
+    def request_room(
+            self, owner: int, coords: Coords, d: compass.Direction,
+            from_id: int
+    ) -> int:
+        """
+        Asks another shard to generate the room beyond an exit, and waits
+        for its reply.
+
+        Returns:
+            The id of the generated room.
+
+        Raises:
+            RoomUnavailableException: if the shard does not reply within
+                                      ROOM_REQUEST_TIMEOUT seconds.
+
+        """
+        request_id = next(self._request_ids)
+        request = self._requests[request_id] = _Request()
+        self.send('generate', owner, request_id, coords, d, from_id)
+        if not request.done.wait(ROOM_REQUEST_TIMEOUT):
+            # A reply arriving later is dropped, and the exit is generated
+            # afresh when it is next taken
+            self._requests.pop(request_id, None)
+            raise RoomUnavailableException(
+                f"Shard {owner} did not generate the room at {coords}"
+            )
+        return request.room_id
+
+    def serve(self):
+        """Serves the coordinator's messages until told to stop."""
+        console.route_stdout()
+        threading.Thread(target=self._serve_requests, daemon=True).start()
+        handlers = {
+            'start': self._start,
+            'resume': self._resume,
+            'input': self._input,
+            'close': self._close,
+            'reply': self._reply,
+        }
+        while True:
+            try:
+                kind, *args = self.conn.recv()
+            except EOFError:
+                break
+            if kind == 'stop':
+                break
+            if kind == 'generate':
+                self._remote_requests.put(args)
+            else:
+                handlers[kind](*args)
+
+    def _serve_requests(self):
+        while True:
+            from_shard, request_id, coords, d, from_id = (
+                self._remote_requests.get()
+            )
+            room_id = self.world.generate_remote_exit_room(coords, d, from_id)
+            self.send('reply', from_shard, request_id, room_id)
+
+    def _play(self, key: str, player: Player, phase: Phase):
+        session = self.sessions[key] = ShardSession(self, key)
+        threading.Thread(
+            target=session.play,
+            args=(player, phase),
+            name=f'session-{player.name}',
+            daemon=True
+        ).start()
+
+    def _start(self, key: str, name: str):
+        player = Player(name, 100)
+        player.move_to(self.world.start_room)
+        self._play(key, player, Phase.Enter)
+
+    def _resume(self, key: str, data: bytes):
+        player, phase = hibernation.loads(data, self.world)
+        self._play(key, player, phase)
+
+    def _input(self, key: str, line: str):
+        session = self.sessions.get(key)
+        if session is not None:
+            session.inputs.put(line)
+
+    def _close(self, key: str):
+        self._input(key, _CLOSED)
+
+    def _reply(self, request_id: int, room_id: int):
+        request = self._requests.pop(request_id, None)
+        if request is None:
+            # The request timed out
+            return
+        request.room_id = room_id
+        request.done.set()
+
+
+def run_worker(
+        shard: int, shards: int, conn: Connection, region_size: int
+):
+    """The entry point of a worker process."""
+    # Forked workers would otherwise all generate the same rooms
+    random.seed()
+    threading.stack_size(SESSION_STACK_SIZE)
+    ShardWorker(shard, shards, conn, region_size).serve()
+
+
+class _Connection:
+    """A player's connection to the coordinator."""
+    def __init__(self, writer: asyncio.StreamWriter, shard: int):
+        self.writer = writer
+        self.shard = shard
+        self.finished = False
+
+
+class ShardedServer:
+    """
+    The coordinator of a world sharded across worker processes, which
+    serves the players' connections.
+
+    Args:
+        shards: The number of worker processes.
+        host: The interface to listen on.
+        port: The port to listen on, or 0 to pick any free port.
+        region_size: The width and height of a region, in rooms.
+
+    """
+    def __init__(
+            self,
+            shards: int,
+            host: str = '127.0.0.1',
+            port: int = DEFAULT_PORT,
+            region_size: int = DEFAULT_REGION_SIZE
+    ):
+        self.shards = shards
+        self.host = host
+        self.port = port
+        self.region_size = region_size
+        self.connections: Dict[str, _Connection] = {}
+        self.handoffs = 0
+        self._keys = itertools.count()
+        self._conns: List[Connection] = []
+        self._processes: List[multiprocessing.Process] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Starts the shards, then starts accepting connections."""
+        loop = asyncio.get_running_loop()
+        for shard in range(self.shards):
+            conn, worker_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(shard, self.shards, worker_conn, self.region_size),
+                name=f'shard-{shard}',
+                daemon=True
+            )
+            process.start()
+            worker_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+            loop.add_reader(conn.fileno(), self._receive, shard)
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, backlog=LISTEN_BACKLOG
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def status(self) -> str:
+        """Summarizes the players and the shards."""
+        return (
+            f"{len(self.connections)} players over {self.shards} shards, "
+            f"{self.handoffs} handoffs"
+        )
+
+    def _send(self, shard: int, *message):
+        self._conns[shard].send(message)
+
+    def _receive(self, shard: int):
+        """Handles the messages waiting from a shard."""
+        conn = self._conns[shard]
+        try:
+            while conn.poll():
+                kind, *args = conn.recv()
+                if kind == 'output':
+                    self._output(*args)
+                elif kind == 'finished':
+                    self._finished(*args)
+                elif kind == 'handoff':
+                    self._handoff(*args)
+                elif kind == 'generate':
+                    owner, *request = args
+                    self._send(owner, 'generate', shard, *request)
+                elif kind == 'reply':
+                    to_shard, *reply = args
+                    self._send(to_shard, 'reply', *reply)
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+
+    def _output(self, key: str, text: str):
+        connection = self.connections.get(key)
+        if connection is not None and not connection.writer.is_closing():
+            connection.writer.write(
+                text.replace('\n', '\r\n').encode(ENCODING)
+            )
+
+    def _finished(self, key: str):
+        connection = self.connections.get(key)
+        if connection is not None:
+            connection.finished = True
+            # Closing the connection also ends the wait for the player's input
+            connection.writer.close()
+
+    def _handoff(self, key: str, shard: int, data: bytes):
+        connection = self.connections.get(key)
+        if connection is None:
+            # The player left during the handoff
+            return
+        connection.shard = shard
+        self.handoffs += 1
+        self._send(shard, 'resume', key, data)
+
+    async def _handle(
+            self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        key = str(next(self._keys))
+        connection = None
+        try:
+            name = ''
+            while not name:
+                writer.write(b"Please enter your name: ")
+                data = await reader.readline()
+                if not data:
+                    return
+                name = data.decode(ENCODING, errors='replace').strip()
+
+            # Spread the new players over the shards' starting rooms
+            connection = _Connection(writer, int(key) % self.shards)
+            self.connections[key] = connection
+            self._send(connection.shard, 'start', key, name)
+            while not connection.finished:
+                data = await reader.readline()
+                if not data:
+                    break
+                line = data.decode(ENCODING, errors='replace').rstrip('\r\n')
+                self._send(connection.shard, 'input', key, line)
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            if connection is not None:
+                if not connection.finished:
+                    try:
+                        self._send(connection.shard, 'close', key)
+                    except OSError:
+                        # The shard has already been stopped
+                        pass
+                del self.connections[key]
+            writer.close()
+
+    async def shutdown(self):
+        """Stops accepting connections, and stops the shards."""
+        if self._server is not None:
+            self._server.close()
+        for connection in list(self.connections.values()):
+            connection.writer.write(
+                b"\r\nThe server is shutting down. Goodbye!\r\n"
+            )
+            connection.writer.close()
+        loop = asyncio.get_running_loop()
+        for shard, conn in enumerate(self._conns):
+            loop.remove_reader(conn.fileno())
+            try:
+                self._send(shard, 'stop')
+            except OSError:
+                pass
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, 5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+
+
+async def serve(host: str, port: int, shards: int, region_size: int):
+    """Runs a ShardedServer until the process is interrupted."""
+    server = ShardedServer(shards, host, port, region_size)
+    await server.start()
+    print(f"Serving {shards} shards on {host}:{server.port}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Host one large world, sharded across processes."
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--shards', type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        '--region-size', type=int, default=DEFAULT_REGION_SIZE
+    )
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.shards, args.region_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+This module contains a Monte Carlo simulator for combat in the adventure game,
+used to evaluate the balance of the data bank without playing through fights
+by hand.
+
+Fights are resolved with exactly the rules implemented by action.attack,
+Player.attack and Enemy.attack, assuming that the player keeps attacking until
+the fight is decided:
+    - the player strikes first, with their weapon or, if unarmed, their fists
+      (which always deal 1 damage)
+    - each strike with a weapon uses up 1 durability, and a broken weapon
+      deals no damage
+    - the enemy strikes back if it is still alive, with the damage of its
+      weapon reduced by the defence of the player's outfit
+
+Since the outcome of a fight is fully determined by its parameters, sampled
+fights are grouped by their parameters and each distinct fight is resolved
+only once, in batches which are stepped round by round in lockstep by a
+combat.CombatEngine.
+
+"""
+from __future__ import annotations
+import argparse
+import collections
+import enum
+import random
+from typing import Counter, Dict, List, NamedTuple, Optional, TYPE_CHECKING
+
+from . import item
+from .enemy import ENEMY_BANK
+from .outfit import OUTFIT_TYPE_BANK
+from .weapon import WEAPON_TYPE_BANK
+if TYPE_CHECKING:
+    from .enemy import Enemy
+    from .player import Player
+
+# The rarities which a simulated loadout item can take, where None stands for
+# the item slot being empty (i.e. fighting with fists, or without an outfit)
+LOADOUT_RARITIES: List[Optional[item.Rarity]] = [None] + item.RARITIES
+
+
+class Result(enum.Enum):
+    Won = enum.auto()
+    Lost = enum.auto()
+    # Neither side is able to damage the other, so the player must flee
+    Stalemate = enum.auto()
+    # The player fled before the fight was decided
+    Fled = enum.auto()
+
+
+class FightSpec(NamedTuple):
+    """
+    The parameters which fully determine the course of a fight.
+
+    Args:
+        player_hp: The player's hp at the start of the fight.
+        attack: The damage dealt by each of the player's strikes.
+        durability: The durability of the player's weapon, or None if the
+                    player is fighting with their fists.
+        enemy_hp: The enemy's hp at the start of the fight.
+        enemy_damage: The damage dealt by each of the enemy's strikes, after
+                      the defence of the player's outfit has been applied.
+
+    """
+    player_hp: int
+    attack: int
+    durability: Optional[int]
+    enemy_hp: int
+    enemy_damage: int
+
+
+class FightOutcome(NamedTuple):
+    result: Result
+    rounds: int
+    hp_lost: int
+    durability_used: int
+
+
+class Cell(NamedTuple):
+    """A single combination of enemy and loadout rarities to simulate."""
+    enemy: str
+    weapon_rarity: Optional[item.Rarity]
+    outfit_rarity: Optional[item.Rarity]
+
+
+class CombatStats:
+    """
+    Aggregated outcomes of a number of simulated fights.
+
+    """
+    def __init__(self):
+        self.fights = 0
+        self.results: Counter[Result] = collections.Counter()
+        self.total_hp_lost = 0
+        # Number of rounds -> number of decided (won or lost) fights
+        self.rounds: Counter[int] = collections.Counter()
+
+    def add(self, outcome: FightOutcome, count: int = 1):
+        """
+        Records the outcome of 'count' identical fights.
+
+        Args:
+            outcome: The outcome of the fight.
+            count: The number of times the fight took place.
+
+        """
+        self.fights += count
+        self.results[outcome.result] += count
+        self.total_hp_lost += outcome.hp_lost * count
+        if outcome.result is not Result.Stalemate:
+            self.rounds[outcome.rounds] += count
+
+    @property
+    def win_rate(self) -> float:
+        return self.results[Result.Won] / self.fights if self.fights else 0.
+
+    @property
+    def expected_hp_lost(self) -> float:
+        return self.total_hp_lost / self.fights if self.fights else 0.
+
+    def rounds_percentile(self, q: float) -> int:
+        """
+        Determines the number of rounds within which the fraction 'q' of the
+        decided fights were over.
+
+        Args:
+            q: The fraction of fights, between 0 and 1.
+
+        Returns:
+            The number of rounds, or 0 if no fight was decided.
+
+        """
+        total = sum(self.rounds.values())
+        seen = 0
+        for rounds in sorted(self.rounds):
+            seen += self.rounds[rounds]
+            if seen >= q * total:
+                return rounds
+        return 0
+
+
+def fight_spec(player: Player, enemy: Enemy) -> FightSpec:
+    """
+    Captures the parameters of a fight between a player and an enemy in their
+    current state.
+
+    """
+    weapon = player.cur_weapon
+    return FightSpec(
+        player.hp,
+        player.get_attack(),
+        None if weapon is None else weapon.durability,
+        enemy.hp,
+        max(0, enemy.weapon.attack_strength - player.get_defence())
+    )
+
+
+def resolve_batch(specs: List[FightSpec]) -> List[FightOutcome]:
+    """
+    Resolves a batch of fights, advancing all of the undecided fights by one
+    round at a time.
+
+    Args:
+        specs: The parameters of each fight.
+
+    Returns:
+        The outcome of each fight, in the same order as 'specs'.
+
+    """
+    # Imported here since the engine depends on this module for its types
+    from .combat import CombatEngine
+    engine = CombatEngine()
+    fights = [engine.add(spec) for spec in specs]
+    outcomes: Dict[int, FightOutcome] = {}
+    while engine:
+        for event in engine.step():
+            if event.outcome is not None:
+                outcomes[event.fight] = event.outcome
+    return [outcomes[fight] for fight in fights]
+
+
+def _sample_specs(
+        rng: random.Random,
+        template: dict,
+        cell: Cell,
+        n: int,
+        player_hp: int
+) -> List[FightSpec]:
+    """
+    Randomly samples the parameters of 'n' fights for a Cell, following the
+    same distributions as generate_weapon, generate_outfit and generate_enemy.
+
+    """
+    if cell.weapon_rarity is None:
+        attacks = [1] * n
+        durabilities = [None] * n
+    else:
+        rarity_str = cell.weapon_rarity.name
+        bases = rng.choices(WEAPON_TYPE_BANK, k=n)
+        attacks = [b['damage'][rarity_str] for b in bases]
+        durabilities = [b['durability'][rarity_str] for b in bases]
+
+    if cell.outfit_rarity is None:
+        defences = [0] * n
+    else:
+        rarity_str = cell.outfit_rarity.name
+        defences = [
+            b['defence'][rarity_str]
+            for b in rng.choices(OUTFIT_TYPE_BANK, k=n)
+        ]
+
+    if 'weapon' in template:
+        enemy_damages = [template['weapon']['damage']] * n
+    else:
+        bases = rng.choices(WEAPON_TYPE_BANK, k=n)
+        rarities = rng.choices(
+            item.RARITIES, weights=item.RARITY_WEIGHTS, k=n
+        )
+        enemy_damages = [
+            b['damage'][r.name] for b, r in zip(bases, rarities)
+        ]
+
+    return [
+        FightSpec(player_hp, a, d, template['hp'], max(0, ed - df))
+        for a, d, ed, df in zip(attacks, durabilities, enemy_damages, defences)
+    ]
+
+
+def simulate(
+        fights_per_cell: int = 5000,
+        player_hp: int = 100,
+        seed: Optional[int] = None
+) -> Dict[Cell, CombatStats]:
+    """
+    Simulates fights against every enemy in the bank, for every combination
+    of weapon and outfit rarity (including fighting unarmed or unclothed).
+
+    Args:
+        fights_per_cell: The number of fights to simulate per combination.
+        player_hp: The player's hp at the start of each fight.
+        seed: An optional seed, to make the simulation reproducible.
+
+    Returns:
+        A map of each combination to the statistics of its fights.
+
+    """
+    rng = random.Random(seed)
+    results = {}
+    for template in ENEMY_BANK:
+        for weapon_rarity in LOADOUT_RARITIES:
+            for outfit_rarity in LOADOUT_RARITIES:
+                cell = Cell(template['name'], weapon_rarity, outfit_rarity)
+                counts = collections.Counter(_sample_specs(
+                    rng, template, cell, fights_per_cell, player_hp
+                ))
+                specs = list(counts)
+                stats = CombatStats()
+                for spec, outcome in zip(specs, resolve_batch(specs)):
+                    stats.add(outcome, counts[spec])
+                results[cell] = stats
+    return results
+
+
+def format_report(results: Dict[Cell, CombatStats]) -> str:
+    """Formats simulation results as a table, one line per combination."""
+    def rarity_name(rarity: Optional[item.Rarity]) -> str:
+        return 'None' if rarity is None else rarity.name
+
+    lines = [
+        f"{'enemy':<46} {'weapon':<7} {'outfit':<7} {'win %':>6} "
+        f"{'E[hp lost]':>10} {'rounds p50':>10} {'rounds p90':>10}"
+    ]
+    for cell, stats in results.items():
+        lines.append(
+            f"{cell.enemy:<46} {rarity_name(cell.weapon_rarity):<7} "
+            f"{rarity_name(cell.outfit_rarity):<7} "
+            f"{100 * stats.win_rate:>6.1f} {stats.expected_hp_lost:>10.1f} "
+            f"{stats.rounds_percentile(0.5):>10} "
+            f"{stats.rounds_percentile(0.9):>10}"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulate fights against every enemy in the data bank."
+    )
+    parser.add_argument('--fights-per-cell', type=int, default=5000)
+    parser.add_argument('--hp', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    print(format_report(simulate(args.fights_per_cell, args.hp, args.seed)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+This module contains StatSheet, which keeps the totals of a character's
+stats (luck, attack and defence) as the modifiers making them up come and
+go.
+
+Each modifier comes from a source: an equipment slot, for the stats of the
+item in it, or an effect, such as a buff or debuff, under a name of its
+own. Applying or removing a source's modifiers updates the totals there and
+then, so reading a total, as the sneak, trap and combat formulas do many
+times a turn, is a single lookup however many modifiers make it up.
+
+"""
+from __future__ import annotations
+import itertools
+from typing import Dict, Hashable, Iterable, Mapping
+
+# The stats a StatSheet totals
+STATS = ('luck', 'attack', 'defence')
+# What a player's fists add to their stats, when they hold no weapon
+FISTS = {'attack': 1}
+
+# Every change to any stat sheet is numbered from here, so that no two
+# states of a sheet ever share a version
+_versions = itertools.count(1)
+
+
+class StatSheet:
+    """
+    The totals of a character's stats, and the modifiers making them up.
+
+    The total of each of STATS is an attribute of the sheet, e.g.
+    sheet.luck, which is read as any other.
+
+    """
+    def __init__(self):
+        # The modifiers applied by each source, by stat
+        self._modifiers: Dict[Hashable, Dict[str, int]] = {}
+        self.luck = self.attack = self.defence = 0
+        # The version of the totals, which changes whenever a source's
+        # modifiers are applied or removed
+        self.version = next(_versions)
+
+    def apply(self, source: Hashable, modifiers: Mapping[str, int]):
+        """
+        Applies the modifiers of a source, in place of any it applied before.
+
+        Args:
+            source: The source of the modifiers, e.g. 'weapon'.
+            modifiers: The amount added to each stat, by name (see STATS).
+
+        """
+        self.remove(source)
+        modifiers = {stat: n for stat, n in modifiers.items() if n}
+        for stat, n in modifiers.items():
+            setattr(self, stat, getattr(self, stat) + n)
+        self._modifiers[source] = modifiers
+        self.version = next(_versions)
+
+    def remove(self, source: Hashable):
+        """Removes the modifiers of a source, if it applied any."""
+        modifiers = self._modifiers.pop(source, None)
+        if modifiers is None:
+            return
+        for stat, n in modifiers.items():
+            setattr(self, stat, getattr(self, stat) - n)
+        self.version = next(_versions)
+
+    def __contains__(self, source: Hashable) -> bool:
+        return source in self._modifiers
+
+    def excluding(self, stat: str, sources: Iterable[Hashable]) -> int:
+        """
+        Returns the total of a stat, leaving out the modifiers of some
+        sources, e.g. to weigh up other equipment in their place.
+
+        """
+        return getattr(self, stat) - sum(
+            self._modifiers.get(source, {}).get(stat, 0)
+            for source in sources
+        )
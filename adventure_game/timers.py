@@ -0,0 +1,238 @@
+"""
+This module contains a hierarchical timer wheel, which schedules the
+callbacks of the game's real-time mechanics.
+
+Time is counted in ticks of a fixed length. The wheel has several levels of
+slots: the first level has a slot for each of the next few ticks, and each
+further level has slots covering as many ticks as the whole level below it.
+Scheduling a timer puts it in the slot covering its deadline, and cancelling
+it removes it from that slot, both in constant time however many timers are
+pending. As the wheel turns, the timers in the slot of a higher level are
+spread over the level below it, once its span comes into reach, until they
+reach the first level and fire.
+
+"""
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# The number of slots in each level of a wheel, lowest first
+LEVEL_SLOTS = (256, 64, 64, 64)
+DEFAULT_TICK = 0.1
+
+
+class Timer:
+    """
+    A callback scheduled on a TimerWheel; see TimerWheel.schedule.
+
+    """
+    __slots__ = ('deadline', 'callback', 'args', '_wheel', '_slot', '_level')
+
+    def __init__(
+            self,
+            wheel: 'TimerWheel',
+            deadline: int,
+            callback: Callable[..., Any],
+            args: Tuple[Any, ...]
+    ):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self._wheel = wheel
+        # The slot holding the timer, or None once it has fired or been
+        # cancelled
+        self._slot: Optional[Dict['Timer', None]] = None
+        self._level = 0
+
+    @property
+    def pending(self) -> bool:
+        """Whether the timer has neither fired nor been cancelled yet."""
+        return self._slot is not None
+
+    def cancel(self):
+        """Cancels the timer, if it is still pending."""
+        self._wheel._cancel(self)
+
+
+class TimerWheel:
+    """
+    Schedules callbacks to be called after a delay, with a resolution of one
+    tick.
+
+    Timers may be scheduled and cancelled from any thread. The callbacks are
+    called by whichever thread turns the wheel, through advance or drive.
+
+    Args:
+        tick: The length of a tick, in seconds.
+        clock: The clock measuring the time, in seconds.
+
+    """
+    def __init__(
+            self,
+            tick: float = DEFAULT_TICK,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.tick = tick
+        self.clock = clock
+        self.start = clock()
+        # The number of ticks the wheel has turned through
+        self.now = 0
+        self._levels: List[List[Dict[Timer, None]]] = [
+            [{} for _ in range(slots)] for slots in LEVEL_SLOTS
+        ]
+        # The first tick beyond the reach of each level
+        self._spans: List[int] = []
+        span = 1
+        for slots in LEVEL_SLOTS:
+            span *= slots
+            self._spans.append(span)
+        # The number of timers in each level
+        self._sizes = [0] * len(LEVEL_SLOTS)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Returns the number of pending timers."""
+        return sum(self._sizes)
+
+    def schedule(
+            self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> Timer:
+        """
+        Schedules a callback.
+
+        Args:
+            delay: The number of seconds after which to call the callback,
+                   rounded up to a whole number of ticks, of which there is
+                   at least one.
+            callback: The callback.
+            args: The arguments with which to call the callback.
+
+        Returns:
+            The timer, which may be used to cancel the callback.
+
+        """
+        ticks = max(1, math.ceil(delay / self.tick))
+        with self._lock:
+            timer = Timer(self, self.now + ticks, callback, args)
+            self._insert(timer)
+        return timer
+
+    def _cancel(self, timer: Timer):
+        with self._lock:
+            if timer._slot is not None:
+                del timer._slot[timer]
+                timer._slot = None
+                self._sizes[timer._level] -= 1
+
+    def _insert(self, timer: Timer):
+        """Puts a timer in the slot covering its deadline."""
+        # Timers beyond the reach of the wheel wait in the furthest slot,
+        # and are put back as the wheel turns
+        ticks = min(timer.deadline - self.now, self._spans[-1] - 1)
+        deadline = self.now + ticks
+        shift = 0
+        for i, span in enumerate(self._spans):
+            if ticks < span or i == len(self._spans) - 1:
+                break
+            shift = span.bit_length() - 1
+        level = self._levels[i]
+        slot = level[(deadline >> shift) % len(level)]
+        slot[timer] = None
+        timer._slot = slot
+        timer._level = i
+        self._sizes[i] += 1
+
+    def _cascade(self):
+        """
+        Spreads the timers of the higher levels over the levels below them,
+        as their slots come into reach.
+
+        """
+        for i in range(1, len(self._levels)):
+            below = self._spans[i - 1]
+            if self.now % below:
+                break
+            level = self._levels[i]
+            slot = level[(self.now // below) % len(level)]
+            timers = list(slot)
+            slot.clear()
+            self._sizes[i] -= len(timers)
+            for timer in timers:
+                self._insert(timer)
+
+    def _turn(self, target: int) -> List[Timer]:
+        """
+        Turns the wheel by a tick, or further towards a target tick while no
+        timer could fall due, returning the timers due to fire.
+
+        """
+        with self._lock:
+            # While the lowest levels are empty, nothing happens until the
+            # next slot of the level above them is spread over them
+            for i, size in enumerate(self._sizes):
+                if size:
+                    if i:
+                        span = self._spans[i - 1]
+                        self.now = min(target, self.now // span * span + span)
+                        self.now -= 1
+                    break
+            else:
+                self.now = target - 1
+            self.now += 1
+            self._cascade()
+            slot = self._levels[0][self.now % len(self._levels[0])]
+            due = [timer for timer in slot if timer.deadline <= self.now]
+            for timer in due:
+                del slot[timer]
+                timer._slot = None
+            self._sizes[0] -= len(due)
+            return due
+
+    def advance(self, ticks: int) -> int:
+        """
+        Turns the wheel, firing the timers which fall due.
+
+        Args:
+            ticks: The number of ticks by which to turn the wheel.
+
+        Returns:
+            The number of timers fired.
+
+        """
+        fired = 0
+        target = self.now + ticks
+        while self.now < target:
+            for timer in self._turn(target):
+                timer.callback(*timer.args)
+                fired += 1
+        return fired
+
+    def advance_to(self, now: Optional[float] = None) -> int:
+        """
+        Turns the wheel up to a time, firing the timers which fall due.
+
+        Args:
+            now: The time, according to the wheel's clock, which defaults to
+                 the current time.
+
+        Returns:
+            The number of timers fired.
+
+        """
+        if now is None:
+            now = self.clock()
+        target = int((now - self.start) / self.tick)
+        return self.advance(max(0, target - self.now))
+
+
+async def drive(wheel: TimerWheel):
+    """
+    Turns a wheel in step with its clock, until cancelled. The callbacks of
+    its timers are called from the event loop.
+
+    """
+    while True:
+        wheel.advance_to()
+        await asyncio.sleep(wheel.tick)
@@ -1,15 +1,38 @@
 from __future__ import annotations
+import collections
+import threading
 from typing import (
-    Any, Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+    Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple,
+    TYPE_CHECKING
 )
 
-from . import compass
+from . import compass, console, container, enemy, grammar, loadout
+from .exceptions import InventoryFullException
+from .grammar import InvalidInstruction
+from .simulation import Result
 if TYPE_CHECKING:
     from .player import Player
 
+# Separates the commands of a line holding several
+COMMAND_SEPARATOR = ';'
+# Separates the name of a macro from its commands, e.g. loot = open; take all
+MACRO_SEPARATOR = '='
+
+# The kinds of item, by the letter which stands for them in instructions,
+# e.g. equip w1
+SPEC_KINDS = {"w": "weapon", "o": "outfit", "f": "food"}
+
+# What a fight with the best loadout would come to, given the short name of
+# the enemy and the hp the player would lose
+_OUTCOMES = {
+    Result.Won: "You would defeat the {} and lose {} hp",
+    Result.Lost: "The {} would still defeat you",
+    Result.Stalemate: "Neither you nor the {} could win; you would have to "
+                      "flee",
+}
 
-class InvalidInstruction(Exception):
-    pass
+# The commands still to be run from the last line read on each thread
+_local = threading.local()
 
 
 def print_options(options: Iterable[Any]):
@@ -21,40 +44,80 @@ def print_options(options: Iterable[Any]):
         print(f"{i + 1}. {option}")
 
 
+def print_items(items: Iterable[Tuple[int, Any]]):
+    """
+    Prints items with the ids by which the player refers to them.
+
+    Args:
+        items: The id of each item, with the item, e.g. from
+               ItemContainer.numbered.
+
+    """
+    for item_id, item in items:
+        print(f"{item_id}. {item}")
+
+
 def show_inventory(player: Player, *args):
     """
-    Display all the items the player has
+    Display the items the player has, a page of each kind at a time.
 
     Args:
         player: the player in the game
-
-    Returns:
+        args: Optionally, the kind of items to show (w, o or f), followed by
+              the terms of a search of them (see container.parse_query),
+              e.g. items w attack>5 by:luck page:2
 
     """
-    for item_key, item_list in player.inventory.items():
+    kinds = list(player.inventory)
+    if args:
+        kind = SPEC_KINDS.get(args[0][0].lower())
+        if kind is None:
+            print(
+                "items may be followed by the kind of item to show, one of "
+                f"{'/'.join(SPEC_KINDS.keys())}"
+            )
+            return
+        kinds = [kind]
+    try:
+        query = container.parse_query(args[1:])
+    except InvalidInstruction as e:
+        print(e)
+        return
+    for item_key in kinds:
+        items = player.inventory[item_key]
         print(f"Your {item_key}s: ")
-        if not len(item_list):
+        if not len(items):
             print(f"You have NO {item_key}s")
-        else:
-            print_options(item_list)
+            continue
+        found = items.select(query)
+        if not found:
+            print(f"None of your {item_key}s match")
+            continue
+        page, pages = container.page_of(found, query.page)
+        print_items(page)
+        shown = min(query.page, pages)
+        if shown < pages:
+            print(f"Page {shown} of {pages}, add page:{shown + 1} for more")
+        elif pages > 1:
+            print(f"Page {shown} of {pages}")
 
 
 def eat(player: Player, *args):
     try:
         option = int(args[0])
-    except ValueError:
+    except (IndexError, ValueError):
         print("eat must be followed by a number")
         return
-    if option <= len(player.foods):
-        food = player.foods[option - 1]
+    food = player.foods.get(option)
+    if food is not None:
         print(f"You ate the {food.name}. {food.consume_msg}.")
         if food.restore_amount > 0:
             print(f"You gained {food.restore_amount} hp!")
         else:
             print(f"You lost {abs(food.restore_amount)} hp!")
-        player.eat(option - 1)
+        player.eat(option)
     else:
-        print("You don't have that much food!")
+        print("You don't have that food!")
 
 
 def throw(player: Player, *args):
@@ -66,20 +129,19 @@ def throw(player: Player, *args):
 
 
 def parse_item_spec(*args) -> Tuple:
-    spec_dict = {"w": "weapon", "o": "outfit", "f": "food"}
     try:
-        key = spec_dict[args[0][0]]
+        key = SPEC_KINDS[args[0][0]]
     except IndexError:
         print("command must be followed by item specification")
         return ()
     except KeyError:
         print(
             "item specification must start with one of "
-            f"{'/'.join(spec_dict.keys())}"
+            f"{'/'.join(SPEC_KINDS.keys())}"
         )
         return ()
     try:
-        value = int(args[0][1])
+        value = int(args[0][1:])
     except ValueError:
         print(f"{key} must be followed by an integer, e.g. w1")
         return ()
@@ -94,11 +156,12 @@ def equip(player: Player, *args):
     if ikey == "food":
         print("Can't equip food! Maybe you wanted to eat it?")
         return
-    if ival <= len(player.inventory[ikey]):
-        print(f"You equipped the {player.inventory[ikey][ival - 1].name}")
+    item = player.inventory[ikey].get(ival)
+    if item is not None:
+        print(f"You equipped the {item.name}")
         player.equip(ikey, ival)
     else:
-        print(f"You don't have {ikey} #{ival} yet")
+        print(f"You don't have {ikey} #{ival}")
 
 
 def drop(player: Player, *args):
@@ -106,11 +169,190 @@ def drop(player: Player, *args):
     if not item:
         return
     ikey, ival = item
-    if ival <= len(player.inventory[ikey]):
-        print(f"You dropped the {player.inventory[ikey][ival - 1].name}")
+    item = player.inventory[ikey].get(ival)
+    if item is not None:
+        print(f"You dropped the {item.name}")
         player.drop(ikey, ival)
     else:
-        print(f"You don't have {ikey} #{ival} yet")
+        print(f"You don't have {ikey} #{ival}")
+
+
+def optimize(player: Player, *args):
+    """
+    Equips the weapon and outfit which fare best against an enemy, or which
+    give the most luck, of those the player has (see loadout.best_loadout).
+
+    Args:
+        player: the player in the game
+        args: Optionally, luck, or the name of the enemy to prepare for: one
+              in the player's room or, failing that, one of the data bank's.
+              By default, the player prepares for the monster in their room,
+              if there is one, or else for luck.
+
+    """
+    name = ' '.join(args).lower()
+    if name == 'luck':
+        foe = None
+    elif name:
+        foe = _enemy_named(player, name)
+        if foe is None:
+            print(f"There is no {name} to prepare for")
+            return
+    else:
+        room = player.current_room
+        foe = None if room is None else room.living_monster()
+
+    best = loadout.best_loadout(player, foe)
+    changes = loadout.changes(player, best)
+    for key, equipment in changes.items():
+        current = player.equipped[key]
+        try:
+            if equipment is None:
+                player.unequip(key)
+                print(f"You took off the {current.name}")
+            else:
+                player.change_item(key, equipment)
+                print(f"You equipped the {equipment.name}")
+        except InventoryFullException as e:
+            print(e)
+            return
+    if not changes:
+        print("Your equipment is already the best you have")
+    if foe is None:
+        print(f"Your luck is {best.luck}")
+    else:
+        print(_OUTCOMES[best.outcome.result].format(
+            foe.short_name, best.outcome.hp_lost
+        ))
+
+
+def _enemy_named(player: Player, name: str) -> Optional[enemy.Enemy]:
+    """
+    Finds the enemy with a name, in the player's room or else in the data
+    bank, preferring an exact match of its short name.
+
+    """
+    room = player.current_room
+    present = [] if room is None else room.living_monsters()
+    # The enemies of the data bank with a weapon of their own, as the others
+    # are given a random one
+    known = (
+        enemy.from_presets(p) for p in enemy.ENEMY_BANK if 'weapon' in p
+    )
+    for candidates in (present, known):
+        candidates = list(candidates)
+        for foe in candidates:
+            if foe.short_name.lower() == name:
+                return foe
+        for foe in candidates:
+            if name in foe.name.lower():
+                return foe
+    return None
+
+
+def find(player: Player, *args):
+    """
+    Tells the player the way to items lying in the dungeon's rooms, on the
+    floor or in opened chests (see atlas.Atlas).
+
+    Args:
+        player: the player in the game
+        args: The kind of item to find (w, o or f), followed by the terms of
+              a search (see container.parse_query) and, optionally,
+              within:n, e.g. find w rarity:super within:5. Without within,
+              the nearest item found is shown; with it, every item found
+              within n steps, nearest first unless sorted with by:stat, a
+              page at a time. Alternatively, my followed
+              by a kind, e.g. find my o, for the item of the kind the player
+              last dropped.
+
+    """
+    room = player.current_room
+    atlas = None if room is None else room.atlas
+    if atlas is None:
+        print("You have no idea where anything is around here")
+        return
+    mine = bool(args) and args[0].lower() == 'my'
+    if mine:
+        args = args[1:]
+    kind = SPEC_KINDS.get(args[0][0].lower()) if args else None
+    if kind is None:
+        print(
+            "find must be followed by the kind of item to find, one of "
+            f"{'/'.join(SPEC_KINDS.keys())}"
+        )
+        return
+
+    if mine:
+        dropped = player.dropped.get(kind)
+        where = None if dropped is None else atlas.locate(dropped)
+        path = None if where is None else atlas.way(room, where)
+        if path is None:
+            print(f"You don't know where any {kind} of yours is")
+        else:
+            print(f"Your {dropped.name} is {_way_to(path)}")
+        return
+
+    within = None
+    terms = []
+    for term in args[1:]:
+        field, _, value = term.lower().partition(':')
+        if field == 'within' and value.isdigit():
+            within = int(value)
+        else:
+            terms.append(term)
+    try:
+        query = container.parse_query(terms)
+    except InvalidInstruction as e:
+        print(e)
+        return
+
+    def matches(item) -> bool:
+        return all(f(item) for f in query.filters)
+
+    if within is None:
+        nearest = atlas.nearest(room, kind, matches)
+        if nearest is None:
+            print(f"You know of no such {kind} anywhere")
+        else:
+            print(f"The nearest is the {nearest.item.name}, "
+                  f"{_way_to(nearest.path)}")
+        return
+    found = list(atlas.search(room, kind, matches, within))
+    if not found:
+        print(f"You know of no such {kind} within {within} steps")
+        return
+    if query.order is not None:
+        # Best first, and nearest first between equals
+        attribute = container.STATS[query.order]
+        found.sort(key=lambda s: -getattr(s.item, attribute, 0))
+    page, pages = container.page_of(found, query.page)
+    for sighting in page:
+        print(f"{sighting.item}: {_way_to(sighting.path)}")
+    shown = min(query.page, pages)
+    if shown < pages:
+        print(f"Page {shown} of {pages}, add page:{shown + 1} for more")
+    elif pages > 1:
+        print(f"Page {shown} of {pages}")
+
+
+def _way_to(path: List[compass.Direction]) -> str:
+    """Describes the way through a list of exits, e.g. 'north, east'."""
+    if not path:
+        return "here"
+    steps = f"{len(path)} step{'s' if len(path) > 1 else ''} away"
+    return f"{steps}: {', '.join(d.name.lower() for d in path)}"
+
+
+def show_macros(player: Player, *args):
+    """Displays the macros the player has defined."""
+    if not player.macros:
+        print(
+            "You have no macros. Define one with e.g. "
+            "loot = open; take all"
+        )
+    for name, commands in player.macros.items():
+        print(f"{name} = {'; '.join(commands)}")
 
 
 GLOBAL_OPTIONS: Dict[str, Callable[[Player, ...], Any]] = {
@@ -120,21 +362,142 @@ GLOBAL_OPTIONS: Dict[str, Callable[[Player, ...], Any]] = {
     'throw': throw,
     'me': print,
     'eat': eat,
+    'optimize': optimize,
+    'find': find,
+    'macros': show_macros,
 }
 
 
-def prompt_player(prompt: str, player: Player) -> Optional[str]:
+def _pending() -> Deque[str]:
+    """Returns the commands the calling thread has yet to run."""
+    pending = getattr(_local, 'pending', None)
+    if pending is None:
+        pending = _local.pending = collections.deque()
+    return pending
+
+
+def interrupt():
+    """
+    Drops the commands yet to be run from a line holding several, as when
+    the player must decide what to do next.
+
+    """
+    pending = _pending()
+    if pending:
+        print(f"Skipped: {f'{COMMAND_SEPARATOR} '.join(pending)}")
+        pending.clear()
+
+
+def define_macro(player: Player, name: str, line: str):
+    """
+    Defines a macro, which stands for a line of commands, or removes it if
+    the line is empty.
+
+    Args:
+        player: The player whose macro it is.
+        name: The name of the macro, which must be a single word.
+        line: The commands, separated by COMMAND_SEPARATOR.
+
+    """
+    name = name.strip().lower()
+    reserved = (
+        GLOBAL_OPTIONS.keys() | grammar.COMMANDS.keys()
+        | grammar.DIRECTIONS.words
+    )
+    if not name.isalnum():
+        print("The name of a macro must be a single word, e.g. loot")
+    elif name in reserved:
+        print(f"{name} is already an instruction")
+    elif not _split(line):
+        if player.macros.pop(name, None) is not None:
+            print(f"Removed the macro {name}")
+    else:
+        player.macros[name] = _split(line)
+        print(f"{name} now stands for: {'; '.join(player.macros[name])}")
+
+
+def _split(line: str) -> List[str]:
+    """Splits a line into its commands."""
+    commands = (c.strip() for c in line.split(COMMAND_SEPARATOR))
+    return [c for c in commands if c]
+
+
+def _next_command(prompt: str, player: Player) -> Optional[str]:
+    """
+    Returns the next command to run: the next one pending from the last line
+    read, or else the first of a new line, the rest of which is left
+    pending. Returns None if the line defined a macro, which it does if it
+    begins with a single word followed by MACRO_SEPARATOR.
+
+    """
+    pending = _pending()
+    if pending:
+        command = pending.popleft()
+        # Show the command as though the player had typed it in
+        print(f"{prompt}{command}")
+        return command
+
+    line = console.read_line(prompt)
+    name, separator, definition = line.partition(MACRO_SEPARATOR)
+    # Anything else with an = in it, such as the search term attack>=5, is
+    # a command
+    if separator and name.strip().isalnum():
+        define_macro(player, name, definition)
+        return None
+    commands = []
+    for command in _split(line):
+        macro = player.macros.get(command.lower())
+        commands.extend(macro if macro is not None else [command])
+    if not commands:
+        return line
+    pending.extend(commands[1:])
+    return commands[0]
+
+
+def prompt_player(
+        prompt: str, player: Player, commands: Optional[Iterable[str]] = None
+) -> Optional[str]:
+    """
+    Prompts the user for input, and handles global options.
+
+    A line may hold several commands, separated by COMMAND_SEPARATOR, or
+    name a macro; the commands after the first are taken as the input to
+    the following prompts, until one of them is invalid or the game
+    interrupts them.
+
+    Args:
+        prompt: The message with which to prompt the user for input.
+        player: The Player instance associated with the current user.
+        commands: The commands accepted besides the global options. If None,
+                  any input which is not a global option is accepted as is.
+
+    Returns:
+        None, if the input was a handled global option, a macro definition
+        or was invalid, otherwise the input, with its command and arguments
+        in full.
+
+    """
     if not prompt.endswith(" "):
         prompt += " "
-    instr = input(prompt)
-    strings = instr.split(' ')
-    option, args = strings[0], strings[1:]
+    instr = _next_command(prompt, player)
+    if instr is None:
+        return None
+    if commands is None and instr.split(' ')[0] not in GLOBAL_OPTIONS:
+        return instr
+    try:
+        option, args = grammar.parse(
+            instr, GLOBAL_OPTIONS.keys() | set(commands or ())
+        )
+    except InvalidInstruction as e:
+        print(e)
+        interrupt()
+        return None
 
     if option in GLOBAL_OPTIONS:
         GLOBAL_OPTIONS[option](player, *args)
         return None
 
-    return instr
+    return ' '.join([option, *args])
 
 
 def get_user_int(prompt: str, player: Player) -> Optional[int]:
@@ -146,7 +509,7 @@ def get_user_int(prompt: str, player: Player) -> Optional[int]:
 
 
 def get_user_instr(
-        prompt: str, player: Player
+        prompt: str, player: Player, commands: Optional[Iterable[str]] = None
 ) -> Optional[Tuple[str, List[str]]]:
     """
     Prompts the user for input, and handles generic actions.
@@ -154,13 +517,17 @@ def get_user_instr(
     Args:
         prompt: The message with which to prompt the user for input.
         player: The Player instance associated with the current user.
+        commands: The commands accepted besides the global options, which
+                  may be abbreviated (see grammar.parse). If None, any input
+                  is accepted.
 
     Returns:
-        None, if the input is a handled global option, otherwise a tuple
-        containing the instruction command and a list of extra options.
+        None, if the input is a handled global option or was invalid,
+        otherwise a tuple containing the instruction command and a list of
+        extra options.
 
     """
-    inputs = prompt_player(prompt, player)
+    inputs = prompt_player(prompt, player, commands)
     if inputs is None:
         return None
 
@@ -184,9 +551,8 @@ def parse_movement_instr(
 
     """
     if instr == 'go':
-        try:
-            return compass.Direction[dest.capitalize()]
-        except KeyError:
-            # Continue to report invalid instruction
-            raise InvalidInstruction(f"{dest} is not a valid direction")
+        # Raises InvalidInstruction, suggesting the closest directions
+        dest = grammar.DIRECTIONS.resolve(dest)
+        dest = grammar.DIRECTION_ALIASES.get(dest, dest)
+        return compass.Direction[dest.capitalize()]
     raise InvalidInstruction("Expected an instruction in the form: go north")
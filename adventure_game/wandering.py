@@ -0,0 +1,284 @@
+"""
+This module lets monsters wander between the rooms of a SharedWorld.
+
+Each wandering monster roams the rooms within a few exits of the room it
+was spawned in, its home range, moving to one of the neighbouring rooms of
+its range with a fixed chance every tick. The world may hold far more
+monsters than anyone could watch, so they are simulated at two levels of
+detail:
+
+* the monsters whose range comes within a few exits of a player are moved
+  every tick, as the players nearby could see them come and go
+* every other monster is left where it was last seen, along with the tick
+  it was last moved on
+
+A monster left behind is caught up as soon as a player comes near its
+range, wherever in the range it was left.
+Rather than replaying every tick it missed, the number of moves it made is
+sampled directly. After a few moves, a walk which picks among its
+neighbours at random has forgotten where it started, and is found in any
+room of its range in proportion to the number of exits the room has within
+the range. Such a monster is simply placed in a room drawn from those
+odds. The monsters are kept by their home, so that those whose range comes
+near a player are found from the rooms near the players, and the cost of a
+tick grows with those rooms however many monsters there are in the rest of
+the world. A monster is only ever killed by a player, so near one, and is
+cleared away on the next tick (see WanderingMonsters.killed).
+
+"""
+from __future__ import annotations
+import collections
+import math
+import random
+from typing import Deque, Dict, Iterable, List, Set, TYPE_CHECKING
+
+from .enemy import Enemy, generate_enemy
+if TYPE_CHECKING:
+    from .room import Room
+    from .world import SharedWorld
+
+# The chance that a room is spawned with a wandering monster in it
+SPAWN_CHANCE = 0.1
+# The chance that a monster moves to another room on each tick
+MOVE_CHANCE = 0.2
+# How many exits away from its home a monster may roam
+HOME_RANGE = 3
+# How many exits away from a player monsters are moved every tick
+DETAIL_RADIUS = 2
+# The number of moves after which a monster's walk no longer depends on
+# where it started
+MIXING_MOVES = 16
+
+
+class Wanderer:
+    """
+    The simulation state of a wandering monster.
+
+    Args:
+        monster: The monster.
+        home: The room in which it was spawned.
+        now: The current tick.
+
+    """
+    def __init__(self, monster: Enemy, home: Room, now: int):
+        self.monster = monster
+        self.home = home
+        self.room = home
+        # The tick the monster was last moved on
+        self.updated = now
+        # The rooms the monster may roam, found when it is next caught up
+        self.range: Set[Room] = set()
+
+
+def rooms_within(start: Room, radius: int) -> Set[Room]:
+    """
+    Finds the rooms at most a number of exits away from a room, through the
+    exits which have been generated.
+
+    """
+    found = {start}
+    frontier = [start]
+    for _ in range(radius):
+        frontier = [
+            adjacent for room in frontier
+            for adjacent in room.adjacent_rooms().values()
+            if adjacent not in found
+        ]
+        found.update(frontier)
+    return found
+
+
+def _rooms_around(rooms: Iterable[Room], radius: int) -> Set[Room]:
+    """Finds the rooms at most a number of exits away from any of some."""
+    around: Set[Room] = set()
+    for room in rooms:
+        around |= rooms_within(room, radius)
+    return around
+
+
+def _moves_made(ticks: int, limit: int) -> int:
+    """
+    Samples the number of moves made by a monster in a number of ticks,
+    counting no further than a limit.
+
+    """
+    if ticks <= 0:
+        return 0
+    # The gaps between moves are geometrically distributed, so the moves can
+    # be counted without visiting every tick
+    log_stay = math.log(1 - MOVE_CHANCE)
+    moves = 0
+    tick = 0
+    while moves < limit:
+        tick += 1 + int(math.log(1 - random.random()) / log_stay)
+        if tick > ticks:
+            break
+        moves += 1
+    return moves
+
+
+class WanderingMonsters:
+    """
+    The wandering monsters of a world, spawned as its rooms are generated.
+
+    Args:
+        world: The world, whose wandering monsters these become.
+        spawn_chance: The chance that a room is spawned with a monster.
+
+    """
+    def __init__(
+            self, world: SharedWorld, spawn_chance: float = SPAWN_CHANCE
+    ):
+        self.world = world
+        self.spawn_chance = spawn_chance
+        self.now = 0
+        self.wanderers: Dict[Enemy, Wanderer] = {}
+        # The monsters spawned in each room
+        self._homes: Dict[Room, List[Wanderer]] = {}
+        # The monsters killed since the previous tick
+        self._killed: Deque[Enemy] = collections.deque()
+        world.wanderers = self
+
+    def __len__(self):
+        return len(self.wanderers)
+
+    def on_generated(self, room: Room):
+        """Called whenever a room of the world is generated."""
+        if random.random() < self.spawn_chance:
+            self.spawn(generate_enemy(), room)
+
+    def spawn(self, monster: Enemy, room: Room) -> Wanderer:
+        """
+        Lets a monster loose in a room of the world, which becomes its home.
+
+        """
+        wanderer = Wanderer(monster, room, self.now)
+        with room.lock:
+            room.wanderers.append(monster)
+        room.changed()
+        self.wanderers[monster] = wanderer
+        self._homes.setdefault(room, []).append(wanderer)
+        return wanderer
+
+    def killed(self, monster: Enemy):
+        """
+        Called whenever a monster is killed, from the thread of the game in
+        which it was, to clear it away on the next tick if it is wandering.
+
+        """
+        self._killed.append(monster)
+
+    def near_rooms(self) -> Set[Room]:
+        """Returns the rooms close enough to a player to be seen."""
+        return _rooms_around(self.world.occupied_rooms(), DETAIL_RADIUS)
+
+    def roaming_near(self) -> List[Wanderer]:
+        """
+        Returns the monsters whose range comes close enough to a player to
+        be seen, i.e. whose home is within HOME_RANGE of a room near one.
+
+        """
+        return [
+            wanderer
+            for room in _rooms_around(
+                self.world.occupied_rooms(), DETAIL_RADIUS + HOME_RANGE
+            )
+            for wanderer in self._homes.get(room, ())
+        ]
+
+    def step(self) -> int:
+        """
+        Advances the world by a tick, moving the monsters whose range comes
+        near the players and catching up any which were left behind.
+
+        Returns:
+            The number of monsters simulated.
+
+        """
+        self.now += 1
+        while self._killed:
+            wanderer = self.wanderers.get(self._killed.popleft())
+            if wanderer is not None:
+                self._remove(wanderer)
+        # A monster found twice is only moved once, since it is marked with
+        # the tick it was moved on
+        queue: Deque[Wanderer] = collections.deque(self.roaming_near())
+        simulated = 0
+        while queue:
+            wanderer = queue.popleft()
+            if wanderer.updated == self.now:
+                continue
+            if not wanderer.monster.is_alive():
+                self._remove(wanderer)
+                continue
+            if wanderer.updated < self.now - 1:
+                self._catch_up(wanderer)
+            if random.random() < MOVE_CHANCE:
+                self._walk(wanderer)
+            wanderer.updated = self.now
+            simulated += 1
+        return simulated
+
+    def _catch_up(self, wanderer: Wanderer):
+        """
+        Moves a monster to where it would be after the ticks it missed, up
+        to the previous tick.
+
+        """
+        # The range only grows as the world is generated, so the monster is
+        # still within it
+        wanderer.range = rooms_within(wanderer.home, HOME_RANGE)
+        moves = _moves_made(self.now - 1 - wanderer.updated, MIXING_MOVES)
+        if moves < MIXING_MOVES:
+            for _ in range(moves):
+                self._walk(wanderer, announce=False)
+            return
+        rooms = list(wanderer.range)
+        weights = [len(self._exits_in_range(wanderer, r)) for r in rooms]
+        if any(weights):
+            self._move(
+                wanderer, random.choices(rooms, weights)[0], announce=False
+            )
+
+    def _exits_in_range(self, wanderer: Wanderer, room: Room) -> List[Room]:
+        return [
+            r for r in room.adjacent_rooms().values() if r in wanderer.range
+        ]
+
+    def _walk(self, wanderer: Wanderer, announce: bool = True):
+        """Moves a monster to a random neighbour within its range."""
+        if not wanderer.range:
+            wanderer.range = rooms_within(wanderer.home, HOME_RANGE)
+        exits = self._exits_in_range(wanderer, wanderer.room)
+        # Monsters do not wander away from the players they have met
+        if exits and not self.world.players_in(wanderer.room):
+            self._move(wanderer, random.choice(exits), announce)
+
+    def _move(self, wanderer: Wanderer, room: Room, announce: bool):
+        previous = wanderer.room
+        if room is previous:
+            return
+        first, second = sorted((previous, room), key=lambda r: r.id)
+        with first.lock, second.lock:
+            if wanderer.monster in previous.wanderers:
+                previous.wanderers.remove(wanderer.monster)
+            room.wanderers.append(wanderer.monster)
+        previous.changed()
+        room.changed()
+        wanderer.room = room
+        if announce:
+            name = wanderer.monster.short_name
+            self.world.announce(previous, f"The {name} wandered off.")
+            self.world.announce(room, f"The {name} wandered in.")
+
+    def _remove(self, wanderer: Wanderer):
+        """Clears away a monster which has been killed."""
+        with wanderer.room.lock:
+            if wanderer.monster in wanderer.room.wanderers:
+                wanderer.room.wanderers.remove(wanderer.monster)
+        wanderer.room.changed()
+        del self.wanderers[wanderer.monster]
+        homed = self._homes[wanderer.home]
+        homed.remove(wanderer)
+        if not homed:
+            del self._homes[wanderer.home]
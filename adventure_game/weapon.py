@@ -1,10 +1,43 @@
+"""
+This module contains the weapons of the game.
+
+The stats a weapon shares with every other weapon of its base type and rarity
+(its name, luck, rarity and attack strength) are kept by a WeaponType, of
+which there is only one object for each (see item.intern_type), while each
+weapon keeps only its type and its own durability.
+
+"""
+from __future__ import annotations
 import json
 import random
+from typing import Dict, NamedTuple
 
 from . import constants, item
 
+_DESCRIPTION = '{} [attack: {}, durability: {}, luck: {}]'.format
+
+
+class WeaponType(NamedTuple):
+    """The stats shared by the weapons of a base type and rarity."""
+    name: str
+    luck_stat: int
+    rarity: item.Rarity
+    attack_strength: int
+
+    def __reduce__(self):
+        # Loaded as the interned type, rather than a copy of it
+        return item.load_type, (type(self), tuple(self))
+
 
 class Weapon(item.EquipmentItem):
+    kind = 'weapon'
+    __slots__ = ('type', 'durability', '_description')
+
+    name = item.type_stat('name')
+    luck_stat = item.type_stat('luck_stat')
+    rarity = item.type_stat('rarity')
+    attack_strength = item.type_stat('attack_strength')
+
     def __init__(
             self,
             name: str,
@@ -13,15 +46,38 @@ class Weapon(item.EquipmentItem):
             attack_strength: int,
             durability: int
     ):
-        super().__init__(name, luck_stat)
-        self.rarity = rarity
-        self.attack_strength = attack_strength
+        self.type = item.intern_type(
+            WeaponType(name, luck_stat, rarity, attack_strength)
+        )
         self.durability = durability
+        # The description last written, with the type and durability it
+        # describes
+        self._description = None
+
+    @classmethod
+    def of(cls, weapon_type: WeaponType, durability: int) -> Weapon:
+        """Makes a weapon of an interned type."""
+        weapon = cls.__new__(cls)
+        weapon.type = weapon_type
+        weapon.durability = durability
+        weapon._description = None
+        return weapon
 
     def __str__(self):
         """Returns the string representation of the Weapon."""
-        return (f'{self.name} [attack: {self.attack_strength}, '
-                f'durability: {self.durability}, luck: {self.luck_stat}]')
+        # The description is kept until the durability changes, or a stat
+        # is set, which gives the weapon another type
+        key = (self.type, self.durability)
+        cached = self._description
+        if cached is None or cached[0] != key:
+            cached = self._description = (key, _DESCRIPTION(
+                self.name, self.attack_strength, self.durability,
+                self.luck_stat
+            ))
+        return cached[1]
+
+    def modifiers(self) -> Dict[str, int]:
+        return {**super().modifiers(), 'attack': self.attack_strength}
 
     def decrement_durability(self):
         """
@@ -44,16 +100,21 @@ class Weapon(item.EquipmentItem):
 
 with open(constants.DATA_BANK_FILE) as fh:
     WEAPON_TYPE_BANK = json.load(fh)['weapon_types']
+# Work out the type of each base type and rarity once, rather than for every
+# weapon generated
+for _base in WEAPON_TYPE_BANK:
+    _base['types'] = {
+        rarity: item.intern_type(WeaponType(
+            f"{rarity.name} {_base['name']}",
+            _base["luck"][rarity.name],
+            rarity,
+            _base["damage"][rarity.name]
+        ))
+        for rarity in item.RARITIES
+    }
 
 
 def generate_weapon() -> Weapon:
     base = random.choice(WEAPON_TYPE_BANK)
-    rarity = random.choices(item.RARITIES, weights=[10, 5, 1])[0]
-    rarity_str = rarity.name
-    return Weapon(
-        f"{rarity_str} {base['name']}",
-        base["luck"][rarity_str],
-        rarity,
-        base["damage"][rarity_str],
-        base["durability"][rarity_str]
-    )
+    rarity = random.choices(item.RARITIES, weights=item.RARITY_WEIGHTS)[0]
+    return Weapon.of(base['types'][rarity], base["durability"][rarity.name])
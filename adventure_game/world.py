@@ -0,0 +1,211 @@
+"""
+This module contains the shared world, a single dungeon explored by many
+players at once.
+
+Everything that happens in a shared world is visible to every player in it:
+the rooms generated beyond each exit, the items dropped on the floor, the
+chests opened and the monsters killed. Each room in the world has its own
+lock, so that players only wait for each other while they are changing the
+same room, and players in different rooms never wait for each other at all.
+
+Players who join the world with a listener are told of what other players do
+in their room and in the rooms next to it. The world keeps an index of the
+players in each room, updated as they move, so that telling the players
+nearby costs as much as there are players nearby, however many are online.
+The world's rooms also share an atlas of the items lying in them (see
+atlas.Atlas).
+
+"""
+from __future__ import annotations
+import contextlib
+import itertools
+import threading
+from typing import (
+    Callable, ContextManager, Dict, Iterator, List, Optional, Set, Tuple,
+    TYPE_CHECKING
+)
+
+from .atlas import Atlas
+from .compass import get_opposite_dir
+if TYPE_CHECKING:
+    from .character import Character
+    from .compass import Direction
+    from .player import Player
+    from .room import Room
+    from .wandering import WanderingMonsters
+
+# The lock of a room which is only ever visited by a single player
+NO_LOCK: ContextManager = contextlib.nullcontext()
+
+
+class SharedWorld:
+    """
+    A dungeon shared between many players.
+
+    Args:
+        start_room: The room in which every player starts, which is generated
+                    if not given.
+        ids: The ids to give the rooms of the world, in order.
+
+    """
+    def __init__(
+            self,
+            start_room: Optional[Room] = None,
+            ids: Optional[Iterator[int]] = None
+    ):
+        self.rooms: Dict[int, Room] = {}
+        self._ids = ids if ids is not None else itertools.count()
+        self._rooms_lock = threading.Lock()
+        # The index of the players listening for what happens nearby
+        self._listeners: Dict[Player, Callable[[str], None]] = {}
+        self._occupants: Dict[int, Set[Player]] = {}
+        self._locations: Dict[Player, int] = {}
+        self._interest_lock = threading.Lock()
+        # The monsters roaming the world, if any
+        self.wanderers: Optional[WanderingMonsters] = None
+        # The items lying in the world's rooms
+        self.atlas = Atlas()
+        self.start_room = (
+            self.adopt(start_room) if start_room is not None
+            else self.new_room()
+        )
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def adopt(self, room: Room) -> Room:
+        """
+        Adds a room to the world, giving it an id and a lock of its own, and
+        adding it to the world's atlas unless it was generated into it.
+
+        Args:
+            room: The room, which must not belong to a world yet.
+
+        Returns:
+            The room.
+
+        """
+        room.world = self
+        room.lock = threading.RLock()
+        with self._rooms_lock:
+            room.id = next(self._ids)
+            self.rooms[room.id] = room
+        if room.atlas is not self.atlas:
+            self.atlas.add_room(room)
+        return room
+
+    def get_room(self, room_id: int) -> Room:
+        """Gets a room of the world by its id."""
+        return self.rooms[room_id]
+
+    def generate_exit_room(self, room: Room, d: Direction) -> Room:
+        """
+        Generates the room beyond one of the exits of a room in the world,
+        see Room._get_exit_room.
+
+        """
+        # Imported here since rooms depend on this module for their locks
+        from .room import generate_exit_room
+        new_room = self.adopt(generate_exit_room(room, d))
+        if self.wanderers is not None:
+            self.wanderers.on_generated(new_room)
+        return new_room
+
+    def on_enter(self, player: Player, room: Room):
+        """Called whenever a player moves into one of the world's rooms."""
+        if player in self._listeners:
+            with self._interest_lock:
+                self._place(player, room)
+
+    def join(self, player: Player, listener: Callable[[str], None]):
+        """
+        Starts telling a player, who must be in one of the world's rooms, of
+        what happens nearby.
+
+        Args:
+            player: The player.
+            listener: Called with a message for the player whenever
+                      something happens nearby, from any thread.
+
+        """
+        with self._interest_lock:
+            self._listeners[player] = listener
+            self._place(player, player.current_room)
+
+    def leave(self, player: Player):
+        """Stops telling a player of what happens nearby."""
+        with self._interest_lock:
+            self._listeners.pop(player, None)
+            room_id = self._locations.pop(player, None)
+            if room_id is not None:
+                self._remove_occupant(room_id, player)
+
+    def players_in(self, room: Room) -> Set[Player]:
+        """Returns the listening players in a room."""
+        with self._interest_lock:
+            return set(self._occupants.get(room.id, ()))
+
+    def occupied_rooms(self) -> List[Room]:
+        """Returns the rooms with listening players in them."""
+        with self._interest_lock:
+            return [self.rooms[room_id] for room_id in self._occupants]
+
+    def _place(self, player: Player, room: Room):
+        previous = self._locations.get(player)
+        if previous is not None:
+            self._remove_occupant(previous, player)
+        self._locations[player] = room.id
+        self._occupants.setdefault(room.id, set()).add(player)
+
+    def _remove_occupant(self, room_id: int, player: Player):
+        occupants = self._occupants[room_id]
+        occupants.discard(player)
+        if not occupants:
+            del self._occupants[room_id]
+
+    def broadcast(self, room: Room, actor: Character, what: str):
+        """
+        Tells the players in a room and in the rooms next to it, other than
+        the actor, of something that happened in the room.
+
+        Args:
+            room: The room in which it happened.
+            actor: The character who did it.
+            what: What they did, e.g. 'opened the chest'.
+
+        """
+        self.announce(room, f"{actor.name} {what}.", actor)
+
+    def announce(
+            self, room: Room, message: str, actor: Optional[Character] = None
+    ):
+        """
+        Tells the players in a room and in the rooms next to it of something
+        that happened in the room.
+
+        Args:
+            room: The room in which it happened.
+            message: The message telling of it.
+            actor: A character who is not to be told, if any.
+
+        """
+        deliveries: List[Tuple[Callable[[str], None], str]] = []
+        with self._interest_lock:
+            for player in self._occupants.get(room.id, ()):
+                if player is not actor:
+                    deliveries.append((self._listeners[player], message))
+            for d, adjacent in room.adjacent_rooms().items():
+                occupants = self._occupants.get(adjacent.id)
+                if not occupants:
+                    continue
+                heard = f"From the {get_opposite_dir(d)}: {message}"
+                for player in occupants:
+                    deliveries.append((self._listeners[player], heard))
+        for listener, text in deliveries:
+            listener(text)
+
+    def new_room(self) -> Room:
+        """Generates a new starting room, disconnected from the others."""
+        # Imported here since rooms depend on this module for their locks
+        from .room import generate_first_room
+        return self.adopt(generate_first_room(self.atlas))
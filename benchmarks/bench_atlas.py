@@ -0,0 +1,96 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of finding items in a large dungeon: the nearest food,
+the Super weapons within 5 steps, and a dropped outfit, by walking out
+through the rooms and searching each, against searching the dungeon's atlas.
+
+Usage: python benchmarks/bench_atlas.py [rooms]
+
+"""
+import collections
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import item  # noqa: E402
+from adventure_game.outfit import generate_outfit  # noqa: E402
+from adventure_game.room import generate_first_room  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def walk(origin, found, within=None):
+    """
+    Walks out from a room, searching every room passed through, until found
+    is true of an item or the rooms within reach have all been searched.
+
+    """
+    seen = {origin}
+    queue = collections.deque([(origin, 0)])
+    hits = []
+    while queue:
+        room, steps = queue.popleft()
+        for container in room.containers():
+            hits += [i for i in container if found(i)]
+        if hits and within is None:
+            return hits
+        if within is not None and steps == within:
+            continue
+        for adjacent in room.adjacent_rooms().values():
+            if adjacent not in seen:
+                seen.add(adjacent)
+                queue.append((adjacent, steps + 1))
+    return hits
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    random.seed(0)
+    start = generate_first_room()
+    rooms = [start]
+    while len(rooms) < count:
+        room = random.choice(rooms)
+        d = random.choice(room.exits)
+        if room.adjacent_rooms().get(d) is None:
+            rooms.append(getattr(room, d.name.lower()))
+    for room in rooms:
+        if hasattr(room, 'chest'):
+            room.chest.open()
+    atlas = start.atlas
+    origin = rooms[-1]
+    vest = generate_outfit()
+    rooms[count // 2].add_item(vest)
+
+    def super_weapon(i):
+        return i.kind == 'weapon' and i.rarity is item.Rarity.Super
+
+    for name, walked, searched in (
+            ('nearest food',
+             lambda: walk(origin, lambda i: i.kind == 'food'),
+             lambda: atlas.nearest(origin, 'food')),
+            ('Super weapons within 5',
+             lambda: walk(origin, super_weapon, 5),
+             lambda: list(atlas.search(
+                 origin, 'weapon', super_weapon, within=5
+             ))),
+            ('dropped outfit',
+             lambda: walk(origin, lambda i: i is vest),
+             lambda: atlas.way(origin, atlas.locate(vest))),
+    ):
+        before = timed(lambda: [walked() for _ in range(10)]) / 10
+        after = timed(lambda: [searched() for _ in range(10)]) / 10
+        print(
+            f"{name:>22}: walking {before * 1e3:.2f} ms, "
+            f"atlas {after * 1e3:.3f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#! /usr/bin/env python3
+"""
+Measures how long saving a game pauses it, as the world the player has
+explored grows: saving the whole game on the game's thread, against taking
+an autosave snapshot and leaving the rest to the writer thread.
+
+Usage: python benchmarks/bench_autosave.py [moves]
+
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import hibernation  # noqa: E402
+from adventure_game.autosave import Autosaver  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.room import generate_first_room  # noqa: E402
+
+
+def explore(player: Player, rooms: int):
+    """Walks the player around until they have generated enough rooms."""
+    seen = {player.current_room}
+    while len(seen) < rooms:
+        player.go(random.choice(player.current_room.exits))
+        seen.add(player.current_room)
+
+
+def save(player: Player, path: str):
+    """Saves the whole game, as a game without an autosaver would."""
+    data = zlib.compress(hibernation.dumps(player))
+    with open(path + '.tmp', 'wb') as fh:
+        fh.write(data)
+    os.replace(path + '.tmp', path)
+
+
+def main():
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'game.sav')
+        for rooms in (100, 1000, 10000):
+            player = Player("Bench", 100)
+            player.move_to(generate_first_room())
+            explore(player, rooms)
+
+            pauses = []
+            for _ in range(moves):
+                player.go(random.choice(player.current_room.exits))
+                start = time.perf_counter()
+                save(player, path)
+                pauses.append(time.perf_counter() - start)
+            sync = sum(pauses) / moves
+
+            saver = Autosaver(path)
+            for _ in range(moves):
+                player.go(random.choice(player.current_room.exits))
+                saver.request()
+                saver.checkpoint(player, None)
+            saver.close()
+            print(
+                f"{rooms:>6} rooms: saving {sync * 1000:.2f} ms per move, "
+                f"autosave {saver.stats}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of telling the players nearby of an event in a shared
+world, as the number of players online grows while the number of players
+near the event stays the same.
+
+Usage: python benchmarks/bench_broadcast.py [events]
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game.compass import Direction  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.room import EmptyRoom  # noqa: E402
+from adventure_game.world import SharedWorld  # noqa: E402
+
+PLAYERS_PER_ROOM = 4
+
+
+def corridor_world(rooms: int) -> SharedWorld:
+    """Builds a shared world which is a corridor of rooms leading north."""
+    exits = [Direction.North, Direction.South]
+    world = SharedWorld(EmptyRoom("room 0", exits))
+    room = world.start_room
+    for i in range(1, rooms):
+        north = world.adopt(EmptyRoom(f"room {i}", exits))
+        room._exits[Direction.North] = north
+        north._exits[Direction.South] = room
+        room = north
+    return world
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for online in (100, 1000, 10000):
+        world = corridor_world(online // PLAYERS_PER_ROOM)
+        delivered = 0
+
+        def listener(message):
+            nonlocal delivered
+            delivered += 1
+
+        for i in range(online):
+            player = Player(f"player {i}", 100)
+            player.move_to(world.rooms[i // PLAYERS_PER_ROOM])
+            world.join(player, listener)
+
+        actor = Player("actor", 100)
+        room = world.rooms[len(world) // 2]
+        start = time.perf_counter()
+        for _ in range(events):
+            world.broadcast(room, actor, "dropped the sword")
+        elapsed = time.perf_counter() - start
+        print(
+            f"{online:>6} players online: {elapsed / events * 1e6:.2f} us "
+            f"per event, {delivered // events} players told"
+        )
+
+
+if __name__ == '__main__':
+    main()
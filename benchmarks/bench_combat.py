@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+"""
+Compares playing out many simultaneous fights round by round through the
+Player and Enemy methods against playing them out with the combat engine.
+
+Usage: python benchmarks/bench_combat.py [fights]
+
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import headless  # noqa: E402
+from adventure_game.combat import CombatEngine  # noqa: E402
+from adventure_game.enemy import Enemy, generate_enemy  # noqa: E402
+from adventure_game.outfit import generate_outfit  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.simulation import fight_spec  # noqa: E402
+from adventure_game.weapon import generate_weapon  # noqa: E402
+
+
+def can_go_on(player: Player, enemy: Enemy, enemy_damage: int) -> bool:
+    """Whether a fight is undecided, and either side can still do damage."""
+    if not (player.is_alive() and enemy.is_alive()):
+        return False
+    weapon = player.cur_weapon
+    return enemy_damage > 0 or weapon is None or (
+        weapon.attack_strength > 0 and not weapon.is_broken()
+    )
+
+
+def make_fights(n: int, seed: int):
+    random.seed(seed)
+    return [
+        (Player("Bench", 100, generate_weapon(), generate_outfit()),
+         generate_enemy())
+        for _ in range(n)
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rounds = 0
+
+    def one_by_one():
+        nonlocal rounds
+        active = [
+            (player, enemy, fight_spec(player, enemy).enemy_damage)
+            for player, enemy in make_fights(n, 0)
+        ]
+        start = time.perf_counter()
+        active = [fight for fight in active if can_go_on(*fight)]
+        while active:
+            rounds += 1
+            for player, enemy, _ in active:
+                headless.fight_round(player, enemy)
+            active = [fight for fight in active if can_go_on(*fight)]
+        return time.perf_counter() - start
+
+    def engine():
+        combat = CombatEngine()
+        for player, enemy in make_fights(n, 0):
+            combat.add_fight(player, enemy)
+        start = time.perf_counter()
+        while combat:
+            combat.step()
+        return time.perf_counter() - start
+
+    methods = one_by_one()
+    batched = engine()
+    print(f"{n} simultaneous fights, {rounds} rounds")
+    print(
+        f"methods: {methods:.3f}s  engine: {batched:.3f}s  "
+        f"speedup: {methods / batched:.1f}x"
+    )
+
+
+if __name__ == '__main__':
+    main()
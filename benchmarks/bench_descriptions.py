@@ -0,0 +1,65 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of describing rooms and the player when nothing has changed
+since they were last described, against describing them afresh every time.
+
+Usage: python benchmarks/bench_descriptions.py [descriptions]
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.room import (  # noqa: E402
+    EmptyRoom, MonsterRoom, TreasureRoom
+)
+from adventure_game.weapon import generate_weapon  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rooms = [
+        EmptyRoom.generate([]), MonsterRoom.generate([]),
+        TreasureRoom.generate([])
+    ]
+    for room in rooms:
+        def describe(change: bool):
+            for _ in range(count):
+                if change:
+                    room.changed()
+                str(room)
+
+        fresh = timed(lambda: describe(True)) / count
+        cached = timed(lambda: describe(False)) / count
+        print(
+            f"{type(room).__name__:>12}: fresh {fresh * 1e6:.2f} us, "
+            f"cached {cached * 1e6:.2f} us per description"
+        )
+
+    player = Player("Tester", 100, generate_weapon(), None)
+
+    def describe_player(change: bool):
+        for _ in range(count):
+            if change:
+                player._description = None
+            str(player)
+
+    fresh = timed(lambda: describe_player(True)) / count
+    cached = timed(lambda: describe_player(False)) / count
+    print(
+        f"{'Player':>12}: fresh {fresh * 1e6:.2f} us, "
+        f"cached {cached * 1e6:.2f} us per description"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#! /usr/bin/env python3
+"""
+Measures the throughput of the batched environment, stepping every game with
+a uniformly random choice among its available actions.
+
+Usage: python benchmarks/bench_env.py [n_envs] [steps]
+
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game.env import ACTIONS, VecEnv  # noqa: E402
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    env = VecEnv(n)
+    env.reset(list(range(n)))
+
+    # Pre-compute the actions available for each mask value
+    available = {}
+    rng = random.Random(0)
+    elapsed = 0.
+    for _ in range(steps):
+        actions = []
+        for mask in env.action_masks():
+            if mask not in available:
+                available[mask] = [
+                    a for a in range(len(ACTIONS)) if mask >> a & 1
+                ]
+            actions.append(rng.choice(available[mask]))
+        start = time.perf_counter()
+        env.step(actions)
+        elapsed += time.perf_counter() - start
+
+    print(
+        f"{n} games x {steps} steps: {n * steps / elapsed:.0f} steps/s "
+        f"(excluding action selection)"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+"""
+Measures how long it takes to suggest corrections for a misspelt word, with
+the grammar's typo index against comparing the word with every word of the
+vocabulary, as the vocabulary grows.
+
+Usage: python benchmarks/bench_grammar.py [queries]
+
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game.grammar import (  # noqa: E402
+    MAX_TYPOS, Vocabulary, edit_distance
+)
+
+
+def random_word() -> str:
+    return ''.join(
+        random.choices(string.ascii_lowercase, k=random.randint(4, 10))
+    )
+
+
+def typo(word: str) -> str:
+    """Changes a random letter of a word."""
+    i = random.randrange(len(word))
+    return word[:i] + random.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    random.seed(0)
+    for size in (100, 1000, 10000):
+        words = {random_word() for _ in range(size)}
+        vocabulary = Vocabulary(words, 'instruction')
+        misspelt = [typo(w) for w in random.choices(sorted(words), k=queries)]
+
+        def scan():
+            for word in misspelt:
+                [w for w in words if edit_distance(word, w) <= MAX_TYPOS]
+
+        def index():
+            for word in misspelt:
+                vocabulary.suggest(word)
+
+        linear = timed(scan) / queries
+        indexed = timed(index) / queries
+        print(
+            f"{size:>6} words: scan {linear * 1000:.3f} ms, "
+            f"index {indexed * 1000:.3f} ms per suggestion"
+        )
+
+
+if __name__ == '__main__':
+    main()
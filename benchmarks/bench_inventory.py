@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of the item operations of a crowded world, on lists of
+items against ItemContainers:
+
+* taking every item from a floor one at a time, in random order, as players
+  sharing a room do
+* finding the strongest weapon after each item is taken, as the bots do
+
+Usage: python benchmarks/bench_inventory.py [items]
+
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game.container import ItemContainer  # noqa: E402
+from adventure_game.weapon import generate_weapon  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def take_each(items, order):
+    for item in order:
+        items.remove(item)
+
+
+def strongest_list(items, order):
+    for item in order:
+        items.remove(item)
+        if items:
+            max(items, key=lambda w: w.attack_strength)
+
+
+def strongest_container(items, order):
+    for item in order:
+        items.remove(item)
+        next(items.sorted_by('attack'), None)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(0)
+    weapons = [generate_weapon() for _ in range(count)]
+    order = random.sample(weapons, len(weapons))
+
+    as_list = timed(lambda: take_each(list(weapons), order))
+    as_container = timed(lambda: take_each(ItemContainer(weapons), order))
+    print(
+        f"take each of {count}: list {as_list * 1e3:.1f} ms, "
+        f"container {as_container * 1e3:.1f} ms"
+    )
+
+    # Finding the strongest is quadratic on lists, so fewer are taken
+    count = min(count, 5000)
+    weapons = weapons[:count]
+    order = random.sample(weapons, count)
+    as_list = timed(lambda: strongest_list(list(weapons), order))
+    as_container = timed(
+        lambda: strongest_container(ItemContainer(weapons), order)
+    )
+    print(
+        f"strongest of {count}: list {as_list * 1e3:.1f} ms, "
+        f"container {as_container * 1e3:.1f} ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#! /usr/bin/env python3
+"""
+Measures the memory taken, and the time spent, generating weapons and
+outfits which share their interned types, against items keeping a copy of
+their stats and a name of their own each, as they were before.
+
+Usage: python benchmarks/bench_items.py [items]
+
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import item  # noqa: E402
+from adventure_game.outfit import OUTFIT_TYPE_BANK  # noqa: E402
+from adventure_game.outfit import generate_outfit  # noqa: E402
+from adventure_game.weapon import WEAPON_TYPE_BANK  # noqa: E402
+from adventure_game.weapon import generate_weapon  # noqa: E402
+
+
+class CopiedWeapon:
+    """A weapon as it was, holding its own copy of every stat."""
+    def __init__(self, name, luck_stat, rarity, attack_strength, durability):
+        self.name = name
+        self.luck_stat = luck_stat
+        self.rarity = rarity
+        self.attack_strength = attack_strength
+        self.durability = durability
+        self._description = None
+
+
+class CopiedOutfit:
+    """An outfit as it was, holding its own copy of every stat."""
+    def __init__(self, name, luck_stat, rarity, defence):
+        self.name = name
+        self.luck_stat = luck_stat
+        self.rarity = rarity
+        self.defence = defence
+        self._description = None
+
+
+def generate_copied_weapon():
+    base = random.choice(WEAPON_TYPE_BANK)
+    rarity = random.choices(item.RARITIES, weights=item.RARITY_WEIGHTS)[0]
+    rarity_str = rarity.name
+    return CopiedWeapon(
+        f"{rarity_str} {base['name']}",
+        base["luck"][rarity_str],
+        rarity,
+        base["damage"][rarity_str],
+        base["durability"][rarity_str]
+    )
+
+
+def generate_copied_outfit():
+    base = random.choice(OUTFIT_TYPE_BANK)
+    rarity = random.choices(item.RARITIES, weights=item.RARITY_WEIGHTS)[0]
+    rarity_str = rarity.name
+    return CopiedOutfit(
+        f"{rarity_str} {base['name']}",
+        base["luck"][rarity_str],
+        rarity,
+        base["defence"][rarity_str]
+    )
+
+
+def measure(generate, count):
+    """Returns the bytes held by count generated items, and the time taken."""
+    random.seed(0)
+    start = time.perf_counter()
+    items = [generate() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    del items
+    # Memory is traced apart, as tracing slows down every allocation
+    random.seed(0)
+    tracemalloc.start()
+    items = [generate() for _ in range(count)]
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The items were only kept until their memory was measured
+    del items
+    return held, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for name, copied, shared in (
+            ('weapons', generate_copied_weapon, generate_weapon),
+            ('outfits', generate_copied_outfit, generate_outfit),
+    ):
+        before, before_time = measure(copied, count)
+        after, after_time = measure(shared, count)
+        print(
+            f"{count} {name}: copied {before / count:.0f} bytes, "
+            f"{before_time * 1e3:.0f} ms; shared types "
+            f"{after / count:.0f} bytes, {after_time * 1e3:.0f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
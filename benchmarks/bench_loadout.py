@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of finding the best loadout against an enemy for a player
+carrying many items: trying every pair of weapon and outfit, against
+best_loadout, when the player's inventory or hp have just changed and when
+nothing has.
+
+Usage: python benchmarks/bench_loadout.py [items]
+
+"""
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game.enemy import ENEMY_BANK, from_presets  # noqa: E402
+from adventure_game.loadout import best_loadout  # noqa: E402
+from adventure_game.outfit import generate_outfit  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.resolver import resolve_fight  # noqa: E402
+from adventure_game.weapon import generate_weapon  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def every_pair(player, enemy):
+    """Tries out every loadout, as a player swapping items would."""
+    held = player.cur_weapon, player.cur_outfit
+    best = None
+    for weapon, outfit in itertools.product(
+            [None, *player.weapons], [None, *player.outfits]
+    ):
+        player.cur_weapon, player.cur_outfit = weapon, outfit
+        outcome = resolve_fight(player, enemy)
+        if best is None or outcome.hp_lost < best.hp_lost:
+            best = outcome
+    player.cur_weapon, player.cur_outfit = held
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    random.seed(0)
+    player = Player("Bench", 100)
+    # The inventory is filled directly, as a player may only carry a few
+    # items of each kind
+    player.weapons.extend(generate_weapon() for _ in range(count))
+    player.outfits.extend(generate_outfit() for _ in range(count))
+    enemy = from_presets(
+        next(e for e in ENEMY_BANK if e.get('short_name') == 'ogre')
+    )
+
+    brute = timed(lambda: every_pair(player, enemy))
+    print(f"every pair of {count}: {brute * 1e3:.1f} ms")
+
+    def after_hit():
+        for _ in range(100):
+            player.hp -= 1
+            best_loadout(player, enemy)
+
+    def after_pick_up():
+        for _ in range(100):
+            weapon = player.weapons[0]
+            player.weapons.remove(weapon)
+            player.weapons.add(weapon)
+            best_loadout(player, enemy)
+
+    hit = timed(after_hit) / 100
+    picked_up = timed(after_pick_up) / 100
+    unchanged = timed(
+        lambda: [best_loadout(player, enemy) for _ in range(100)]
+    ) / 100
+    print(
+        f"best_loadout: {picked_up * 1e6:.1f} us after the inventory "
+        f"changes, {hit * 1e6:.1f} us after the player is hit, "
+        f"{unchanged * 1e6:.2f} us unchanged"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#! /usr/bin/env python3
+"""
+Compares resolving sneak and trap checks one at a time through the action
+functions against resolving them in one call with the odds samplers.
+
+Usage: python benchmarks/bench_odds.py [n]
+
+"""
+import contextlib
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import action, item, odds  # noqa: E402
+from adventure_game.enemy import generate_enemy  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.trap import generate_trap  # noqa: E402
+from adventure_game.weapon import Weapon  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    player = Player(
+        "Bench", 100, Weapon("sword", 10, item.Rarity.Common, 5, 10)
+    )
+    luck = player.get_luck()
+    enemy = generate_enemy()
+    trap = generate_trap()
+
+    def sneak_one_by_one():
+        for _ in range(n):
+            action.attempt_sneak(player, enemy)
+
+    def trap_one_by_one():
+        for _ in range(n):
+            trap.triggered = False
+            action.trigger_trap(player, trap)
+
+    # Silence the action functions, and skip the fight, suspense delay and
+    # room change which follow a failed check
+    with open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull), \
+            patch('adventure_game.action.attack', lambda *args: None), \
+            patch('adventure_game.action.time.sleep', lambda s: None), \
+            patch.object(Player, 'move_to_new_room', lambda self: None), \
+            patch.object(Player, 'take_damage', lambda self, points: None):
+        results = [
+            ('sneak', timed(sneak_one_by_one),
+             timed(lambda: odds.sample_sneaks(luck, n))),
+            ('trap', timed(trap_one_by_one),
+             timed(lambda: odds.sample_trap_escapes(luck, n))),
+        ]
+
+    print(f"{n} checks at luck {luck}")
+    for name, one_by_one, batched in results:
+        print(
+            f"{name:<6} action: {one_by_one:.3f}s  sampler: {batched:.3f}s  "
+            f"speedup: {one_by_one / batched:.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of showing a room's options at a prompt, when the room is
+unchanged since they were last shown, against building and rendering them
+afresh every time.
+
+Usage: python benchmarks/bench_options.py [prompts]
+
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import messages  # noqa: E402
+from adventure_game.room import MonsterRoom, TreasureRoom  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    prompts = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for room in (MonsterRoom.generate([]), TreasureRoom.generate([])):
+        def show(change: bool):
+            with redirect_stdout(io.StringIO()):
+                for _ in range(prompts):
+                    if change:
+                        room.changed()
+                        messages.render_option.cache_clear()
+                    messages.print_options(room.get_options())
+
+        fresh = timed(lambda: show(True)) / prompts
+        cached = timed(lambda: show(False)) / prompts
+        print(
+            f"{type(room).__name__:>12}: rebuilt {fresh * 1e6:.2f} us, "
+            f"cached {cached * 1e6:.2f} us per prompt"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#! /usr/bin/env python3
+"""
+Measures how much a game sends to the terminal per prompt, printed line by
+line against laid out by a ScreenConsole on an 80x24 terminal, over the same
+games played by a scripted player: one who always answers straight away, and
+one who checks on themselves (with 'me') before each choice of a turn.
+
+Both count the echo of the player's answers. Line mode is counted as what is
+printed, with each newline sent as CR LF, as terminals do; the full screen as
+the characters drawn, plus the escape sequences moving the cursor to each run
+of them and clearing or scrolling parts of the screen.
+
+Usage: python benchmarks/bench_screen.py [games]
+
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import console, run  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.screen import ScreenConsole  # noqa: E402
+
+# The bytes sent to move the cursor anywhere, e.g. ESC [ 12 ; 40 H, to the
+# start of the next line (CR LF), and along a line, e.g. ESC [ 5 C, as curses
+# picks the cheapest of them
+CURSOR_MOVE = 8
+NEXT_LINE = 2
+ALONG_LINE = 4
+# The prompts the scripted player will answer before giving up on a game
+MAX_PROMPTS = 500
+
+
+class GaveUp(Exception):
+    pass
+
+
+class Script:
+    """Answers the game's prompts, as a player fighting and looting would."""
+    def __init__(self, player: Player, checks: bool):
+        self.player = player
+        self.checks = checks
+        self.prompts = 0
+        self._checked = False
+
+    def answer(self, point, prompt: str) -> str:
+        self.prompts += 1
+        if self.prompts > MAX_PROMPTS:
+            raise GaveUp()
+        if point is not None and self.checks and not self._checked:
+            self._checked = True
+            return 'me'
+        self._checked = False
+        if point is run.Phase.Options:
+            return next(iter(self.player.current_room.get_options()))
+        if point is run.Phase.Exits:
+            exit_ = random.choice(self.player.current_room.exits)
+            return f"go {exit_.name.lower()}"
+        # Within an action
+        if 'take' in prompt:
+            return 'take all'
+        return 'no' if 'yes' in prompt else 'auto'
+
+
+class LineConsole(console.Console):
+    """Counts what line mode prints."""
+    def __init__(self, script: Script):
+        self.script = script
+        self.sent = 0
+
+    def read_line(self, prompt: str) -> str:
+        self.write(prompt)
+        line = self.script.answer(self.resume_point, prompt)
+        self.write(f"{line}\n")
+        return line
+
+    def write(self, text: str):
+        self.sent += len(text.encode()) + text.count('\n')
+
+
+class Terminal:
+    """An 80x24 curses window, counting what would be sent to draw it."""
+    def __init__(self, script: Script, owner: console.Console):
+        self.script = script
+        self.owner = owner
+        self.sent = 0
+        self.cursor = (0, 0)
+
+    def getmaxyx(self):
+        return 24, 80
+
+    def move(self, row, col):
+        if (row, col) == self.cursor:
+            return
+        if (row, col) == (self.cursor[0] + 1, 0):
+            self.sent += NEXT_LINE
+        elif row == self.cursor[0]:
+            self.sent += ALONG_LINE
+        else:
+            self.sent += CURSOR_MOVE
+        self.cursor = (row, col)
+
+    def addstr(self, row, col, text):
+        self.move(row, col)
+        self.sent += len(text.encode())
+        self.cursor = (row, col + len(text))
+
+    def scroll(self, n):
+        # ESC [ n S
+        self.sent += 4
+
+    def getstr(self, row, col, n):
+        self.move(row, col)
+        line = self.script.answer(self.owner.resume_point, self.owner.prompt)
+        self.sent += len(line)
+        self.cursor = (row, col + len(line))
+        return line.encode()
+
+    def clrtoeol(self):
+        self.sent += 3
+
+    def erase(self):
+        pass
+
+    def setscrreg(self, top, bottom):
+        self.sent += CURSOR_MOVE
+
+    def scrollok(self, flag):
+        pass
+
+    def refresh(self):
+        pass
+
+
+def play(seed: int, full_screen: bool, checks: bool):
+    """Plays a game, returning the bytes sent and the prompts answered."""
+    random.seed(seed)
+    player = Player("Bench", 100)
+    player.move_to_new_room()
+    script = Script(player, checks)
+    if full_screen:
+        game_console = ScreenConsole(None, player)
+        game_console.window = terminal = Terminal(script, game_console)
+    else:
+        game_console = terminal = LineConsole(script)
+    console.bind(game_console)
+    try:
+        run.play(player)
+    except GaveUp:
+        pass
+    finally:
+        console.bind(None)
+    return terminal.sent, script.prompts
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    console.route_stdout()
+    # The traps pause for effect, which only the player needs
+    time.sleep = lambda seconds: None
+    for checks in (False, True):
+        player = "checking" if checks else "straight"
+        for full_screen in (False, True):
+            sent = prompts = 0
+            for seed in range(games):
+                game_sent, game_prompts = play(seed, full_screen, checks)
+                sent += game_sent
+                prompts += game_prompts
+            mode = "full screen" if full_screen else "line mode"
+            print(
+                f"{player:>8} player, {mode:>11}: "
+                f"{sent / prompts:.0f} bytes per prompt"
+            )
+
+
+if __name__ == '__main__':
+    main()
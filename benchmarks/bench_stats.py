@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of reading a player's luck, and of capturing the
+parameters of a fight, from the player's stat sheet against summing their
+equipment's stats on every read, as was done before.
+
+Usage: python benchmarks/bench_stats.py [reads]
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import constants  # noqa: E402
+from adventure_game.enemy import generate_enemy  # noqa: E402
+from adventure_game.outfit import generate_outfit  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.simulation import FightSpec, fight_spec  # noqa: E402
+from adventure_game.weapon import generate_weapon  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def summed_luck(player: Player) -> int:
+    return min(
+        constants.MAX_LUCK,
+        sum([item.luck_stat for item in list(player.equipped.values())
+             if item is not None])
+    )
+
+
+def summed_fight_spec(player: Player, enemy) -> FightSpec:
+    weapon = player.cur_weapon
+    enemy_damage = enemy.weapon.attack_strength
+    if player.cur_outfit is not None:
+        enemy_damage = max(0, enemy_damage - player.cur_outfit.defence)
+    return FightSpec(
+        player.hp,
+        1 if weapon is None else weapon.attack_strength,
+        None if weapon is None else weapon.durability,
+        enemy.hp,
+        enemy_damage
+    )
+
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    player = Player("Bench", 100, generate_weapon(), generate_outfit())
+    enemy = generate_enemy()
+
+    for name, summed, kept in (
+            ('luck', lambda: summed_luck(player), player.get_luck),
+            ('fight spec', lambda: summed_fight_spec(player, enemy),
+             lambda: fight_spec(player, enemy)),
+    ):
+        before = timed(lambda: [summed() for _ in range(reads)]) / reads
+        after = timed(lambda: [kept() for _ in range(reads)]) / reads
+        print(
+            f"{name:>10}: summed {before * 1e9:.0f} ns, "
+            f"stat sheet {after * 1e9:.0f} ns per read"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#! /usr/bin/env python3
+"""
+Measures how a timer wheel copes with the timers of many real-time games:
+millions of mechanics are scheduled, half of them are cancelled (as players
+leave rooms and eat their food) and the wheel is turned until the rest have
+fired. A binary heap with lazy cancellation is timed on the same work.
+
+Usage: python benchmarks/bench_timers.py [timers]
+
+"""
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game import realtime  # noqa: E402
+from adventure_game.timers import DEFAULT_TICK, TimerWheel  # noqa: E402
+
+# The delays of the mechanics each game keeps scheduling
+DELAYS = [
+    realtime.MONSTER_COOLDOWN,
+    realtime.TRAP_REARM_DELAY,
+    realtime.FOOD_SHELF_LIFE,
+    realtime.REGENERATION_INTERVAL,
+]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    delays = [random.choice(DELAYS) for _ in range(n)]
+    cancelled = random.sample(range(n), n // 2)
+    ticks = int(max(DELAYS) / DEFAULT_TICK) + 1
+    fired = 0
+
+    def fire():
+        nonlocal fired
+        fired += 1
+
+    wheel = TimerWheel(clock=lambda: 0.)
+    timers = []
+
+    def wheel_schedule():
+        for delay in delays:
+            timers.append(wheel.schedule(delay, fire))
+
+    def wheel_cancel():
+        for i in cancelled:
+            timers[i].cancel()
+
+    def wheel_run():
+        wheel.advance(ticks)
+
+    heap = []
+    entries = []
+    heap_now = 0
+
+    def heap_schedule():
+        for i, delay in enumerate(delays):
+            entry = [
+                heap_now + max(1, int(-(-delay // DEFAULT_TICK))), i, fire
+            ]
+            entries.append(entry)
+            heapq.heappush(heap, entry)
+
+    def heap_cancel():
+        for i in cancelled:
+            entries[i][2] = None
+
+    def heap_run():
+        nonlocal heap_now
+        for _ in range(ticks):
+            heap_now += 1
+            while heap and heap[0][0] <= heap_now:
+                callback = heapq.heappop(heap)[2]
+                if callback is not None:
+                    callback()
+
+    results = []
+    for name, schedule, cancel, run in (
+            ('wheel', wheel_schedule, wheel_cancel, wheel_run),
+            ('heap', heap_schedule, heap_cancel, heap_run)
+    ):
+        fired = 0
+        results.append((
+            name, timed(schedule), timed(cancel), timed(run), fired
+        ))
+
+    print(
+        f"{n} timers, {n // 2} cancelled, {ticks} ticks of "
+        f"{DEFAULT_TICK * 1000:.0f} ms"
+    )
+    for name, schedule, cancel, run, fired in results:
+        print(
+            f"{name:<6} schedule: {schedule / n * 1e9:.0f} ns/timer  "
+            f"cancel: {cancel / (n // 2) * 1e9:.0f} ns/timer  "
+            f"run: {run / ticks * 1000:.3f} ms/tick  "
+            f"({run / (ticks * DEFAULT_TICK):.1%} of real time, "
+            f"{fired} fired)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+"""
+Compares moving every wandering monster on each tick against moving only
+those near the players, as the world grows around a fixed number of
+players.
+
+Usage: python benchmarks/bench_wandering.py [ticks]
+
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from adventure_game.compass import Direction  # noqa: E402
+from adventure_game.enemy import generate_enemy  # noqa: E402
+from adventure_game.player import Player  # noqa: E402
+from adventure_game.room import EmptyRoom  # noqa: E402
+from adventure_game.wandering import MOVE_CHANCE  # noqa: E402
+from adventure_game.wandering import WanderingMonsters  # noqa: E402
+from adventure_game.world import SharedWorld  # noqa: E402
+
+PLAYERS = 20
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def corridor_world(rooms: int) -> WanderingMonsters:
+    """
+    Builds a shared world which is a corridor of rooms leading north, with a
+    wandering monster in every room.
+
+    """
+    exits = [Direction.North, Direction.South]
+    world = SharedWorld(EmptyRoom("room 0", exits))
+    monsters = WanderingMonsters(world, 0)
+    room = world.start_room
+    for i in range(1, rooms):
+        north = world.adopt(EmptyRoom(f"room {i}", exits))
+        room.north = north
+        north.south = room
+        room = north
+    for room in world.rooms.values():
+        monsters.spawn(generate_enemy(), room)
+    return monsters
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    for rooms in (1000, 10000, 100000):
+        monsters = corridor_world(rooms)
+        for i in range(PLAYERS):
+            player = Player(f"player {i}", 100)
+            player.move_to(monsters.world.rooms[i * rooms // PLAYERS])
+            monsters.world.join(player, lambda message: None)
+
+        def every_monster():
+            for _ in range(ticks):
+                for wanderer in list(monsters.wanderers.values()):
+                    if random.random() < MOVE_CHANCE:
+                        monsters._walk(wanderer, announce=False)
+
+        def near_players():
+            for _ in range(ticks):
+                monsters.step()
+
+        full = timed(every_monster)
+        detailed = timed(near_players)
+        print(
+            f"{rooms:>6} monsters  every monster: "
+            f"{full / ticks * 1000:.2f} ms/tick  near players: "
+            f"{detailed / ticks * 1000:.2f} ms/tick  "
+            f"speedup: {full / detailed:.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,19 @@
 #! /usr/bin/env python3
+import argparse
+
 from adventure_game.run import run_game
 
 if __name__ == '__main__':
-    run_game()
+    parser = argparse.ArgumentParser(description="Play the adventure game.")
+    parser.add_argument(
+        '--save',
+        help="save the game to this file as it is played, and resume it "
+             "from there"
+    )
+    parser.add_argument(
+        '--screen', action='store_true',
+        help="lay the game out across the whole terminal, falling back to "
+             "printing it line by line where the terminal cannot"
+    )
+    args = parser.parse_args()
+    run_game(args.save, args.screen)
@@ -187,6 +187,24 @@ class ChestCollectTests(unittest.TestCase):
             2
         )
 
+    def test_take_without_argument(self):
+        player = Player("Tester", 100, None, None)
+        chest = Chest()
+
+        inputs = (i for i in ['take', 'ta a'])
+
+        def mock_input(*args):
+            return next(inputs)
+
+        f = io.StringIO()
+        with patch('builtins.input', mock_input), \
+                contextlib.redirect_stdout(f):
+            with patch('adventure_game.chest.random.randint', lambda a, b: 3):
+                action.collect(player, chest)
+
+        self.assertIn("Expected an instruction in the form", f.getvalue())
+        self.assertEqual(chest.contents, [])
+
 
 class SneakTests(unittest.TestCase):
     def test_failed_attempt_starts_fight(self):
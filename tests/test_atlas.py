@@ -0,0 +1,177 @@
+import contextlib
+import io
+import unittest
+from unittest.mock import patch
+
+from adventure_game import atlas, hibernation, item, utils
+from adventure_game.atlas import Atlas
+from adventure_game.compass import DIRECTIONS, Direction
+from adventure_game.outfit import Outfit
+from adventure_game.player import Player
+from adventure_game.room import EmptyRoom, TreasureRoom
+from adventure_game.weapon import Weapon
+from adventure_game.world import SharedWorld
+
+N, S, E, W = (
+    Direction.North, Direction.South, Direction.East, Direction.West
+)
+
+
+def bare_rooms():
+    """Generates rooms with every exit and nothing in them."""
+    return patch(
+        'adventure_game.room._generate_room',
+        lambda enter_from=None: EmptyRoom("room", list(DIRECTIONS))
+    )
+
+
+def super_weapon(w: Weapon) -> bool:
+    return w.rarity is item.Rarity.Super
+
+
+class AtlasTests(unittest.TestCase):
+    def setUp(self):
+        self.atlas = Atlas()
+        self.start = EmptyRoom("start", list(DIRECTIONS))
+        self.atlas.add_room(self.start)
+        patcher = bare_rooms()
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def corridor(self, length):
+        """Generates a corridor of rooms north of the start."""
+        rooms = [self.start]
+        for _ in range(length):
+            rooms.append(rooms[-1].north)
+        return rooms
+
+    def test_generated_rooms_join(self):
+        east = self.start.north.east
+        self.assertIs(east.atlas, self.atlas)
+        self.assertEqual(len(self.atlas), 3)
+        self.assertEqual(self.atlas.way(self.start, east), [N, E])
+        self.assertEqual(self.atlas.way(east, self.start), [W, S])
+        self.assertEqual(
+            self.atlas.way(east, self.start.south.west), [W, S, S, W]
+        )
+        self.assertEqual(self.atlas.way(east, east), [])
+        self.assertIsNone(self.atlas.way(east, EmptyRoom("elsewhere", [])))
+
+    def test_floor_items(self):
+        room = self.start.north
+        food = item.generate_food()
+        room.add_item(food)
+        self.assertIs(self.atlas.locate(food), room)
+        self.assertEqual(self.atlas.rooms_holding('food'), [room])
+
+        # However the item is taken
+        with contextlib.redirect_stdout(io.StringIO()):
+            with patch('builtins.input', side_effect=["take all", "no"]):
+                room.get_options()['look'].handler(Player("Tester", 100))
+        self.assertIsNone(self.atlas.locate(food))
+        self.assertEqual(self.atlas.rooms_holding('food'), [])
+
+    def test_opened_chests(self):
+        room = TreasureRoom("vault", [S])
+        self.atlas.add_room(room)
+        with patch('random.randint', side_effect=[3, 0, 1, 0]):
+            contents = list(room.chest.open())
+        for treasure in contents:
+            self.assertIs(self.atlas.locate(treasure), room)
+        self.assertEqual(self.atlas.rooms_holding('outfit'), [room])
+        room.chest.remove(contents[1])
+        self.assertEqual(self.atlas.rooms_holding('outfit'), [])
+        room.chest.clear()
+        self.assertEqual(self.atlas.rooms_holding('weapon'), [])
+        self.assertIsNone(self.atlas.locate(contents[0]))
+
+    def test_search(self):
+        rooms = self.corridor(12)
+        near = Weapon("near", 0, item.Rarity.Super, 5, 5)
+        common = Weapon("common", 0, item.Rarity.Common, 5, 5)
+        far = Weapon("far", 0, item.Rarity.Super, 5, 5)
+        rooms[3].add_item(near)
+        rooms[2].add_item(common)
+        rooms[9].add_item(far)
+        rooms[12].add_item(item.generate_food())
+
+        # Walking out, and from the rooms' ancestry, find the same items
+        for ratio in (1000, 0):
+            with patch.object(atlas, '_WALK_RATIO', ratio):
+                found = self.atlas.search(
+                    self.start, 'weapon', super_weapon, within=5
+                )
+                self.assertEqual(
+                    [(s.item, s.room, s.path) for s in found],
+                    [(near, rooms[3], [N] * 3)]
+                )
+                found = self.atlas.search(rooms[5], 'weapon')
+                self.assertEqual(
+                    [s.item for s in found], [near, common, far]
+                )
+                food = self.atlas.nearest(rooms[1], 'food')
+                self.assertEqual(food.path, [N] * 11)
+                self.assertIsNone(self.atlas.nearest(
+                    rooms[1], 'food', within=10
+                ))
+        self.assertIsNone(self.atlas.nearest(self.start, 'outfit'))
+
+    def test_survey(self):
+        rooms = self.corridor(2)
+        food = item.generate_food()
+        rooms[2].add_item(food)
+        player = Player("Tester", 100)
+        player.move_to(rooms[0])
+
+        player, _ = hibernation.loads(hibernation.dumps(player))
+        restored = player.current_room.atlas
+        sighting = restored.nearest(player.current_room, 'food')
+        self.assertEqual(sighting.path, [N, N])
+        sighting.room.items.remove(sighting.item)
+        self.assertEqual(restored.rooms_holding('food'), [])
+
+
+class WorldAtlasTests(unittest.TestCase):
+    def test_shared(self):
+        world = SharedWorld(EmptyRoom("hall", list(DIRECTIONS)))
+        with bare_rooms():
+            north = world.start_room.north
+            other = world.new_room()
+        for room in (world.start_room, north, other):
+            self.assertIs(room.atlas, world.atlas)
+        self.assertEqual(world.atlas.way(north, world.start_room), [S])
+        self.assertIsNone(world.atlas.way(other, world.start_room))
+
+
+class FindTests(unittest.TestCase):
+    def setUp(self):
+        self.player = Player("Tester", 100)
+        with bare_rooms():
+            start = EmptyRoom("start", list(DIRECTIONS))
+            Atlas().add_room(start)
+            self.player.move_to(start)
+            self.east = start.east
+
+    def find(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            utils.find(self.player, *args)
+        return out.getvalue()
+
+    def test_find(self):
+        self.assertIn("no such food", self.find("f"))
+        self.east.add_item(item.generate_food())
+        self.assertIn("1 step away: east", self.find("food"))
+        self.assertIn("within 0 steps", self.find("f", "within:0"))
+        self.assertIn("is not a", self.find("f", "bogus"))
+        self.assertIn("must be followed", self.find())
+
+    def test_find_mine(self):
+        vest = Outfit("vest", 0, item.Rarity.Common, 2)
+        self.player.pick_up_item(vest)
+        self.player.drop('outfit', self.player.outfits.id_of(vest))
+        self.player.move_to(self.east)
+        self.assertEqual(
+            self.find("my", "o"), "Your vest is 1 step away: west\n"
+        )
+        self.assertIn("You don't know", self.find("my", "w"))
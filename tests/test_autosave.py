@@ -0,0 +1,276 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from adventure_game import autosave, item, utils
+from adventure_game.atlas import survey
+from adventure_game.autosave import Autosaver
+from adventure_game.compass import Direction
+from adventure_game.outfit import Outfit
+from adventure_game.player import Player
+from adventure_game.room import EmptyRoom
+from adventure_game.weapon import Weapon
+from adventure_game.world import NO_LOCK
+
+
+def corridor(length):
+    """Builds a corridor of rooms leading north."""
+    rooms = [EmptyRoom(f"room {i}", [Direction.North, Direction.South])
+             for i in range(length)]
+    for south, north in zip(rooms, rooms[1:]):
+        south.north = north
+        north.south = south
+    return rooms
+
+
+class AutosaverTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'game.sav')
+
+    def saver(self, path=None, **kwargs):
+        saver = Autosaver(path or self.path, **kwargs)
+        self.addCleanup(saver.close)
+        return saver
+
+    def test_round_trip(self):
+        rooms = corridor(3)
+        player = Player("Tester", 80, Weapon("sword", 0, item.Rarity.Crappy,
+                                             10, 5))
+        rooms[1].add_item(item.generate_food())
+        player.move_to(rooms[1])
+        player.move_to(rooms[2])
+
+        saver = self.saver()
+        saver.request()
+        saver.checkpoint(player, 'exits')
+        saver.close()
+
+        restored, point = autosave.load(self.path)
+        self.assertEqual(point, 'exits')
+        self.assertEqual(str(restored), str(player))
+        self.assertEqual(restored.current_room.description, "room 2")
+        self.assertIs(restored.previous_room, restored.current_room.south)
+        self.assertEqual(len(restored.previous_room.items), 1)
+        self.assertIs(restored.current_room.lock, NO_LOCK)
+        # The whole corridor is saved, through the rooms' exits
+        self.assertEqual(restored.previous_room.south.description, "room 0")
+
+    def test_snapshots_are_isolated(self):
+        rooms = corridor(2)
+        player = Player("Tester", 80)
+        player.move_to(rooms[0])
+
+        saver = self.saver()
+        saver.request()
+        saver.checkpoint(player, None)
+        # Changes made after the checkpoint are not in the save
+        player.take_damage(30)
+        rooms[0].add_item(item.generate_food())
+        saver.close()
+
+        restored, _ = autosave.load(self.path)
+        self.assertEqual(restored.hp, 80)
+        self.assertEqual(restored.current_room.items, [])
+
+    def test_only_changed_rooms_are_copied(self):
+        rooms = corridor(10)
+        player = Player("Tester", 100)
+        player.move_to(rooms[0])
+
+        saver = self.saver()
+        saver.request()
+        snapshot = saver._snapshot(player, None, 0.)
+        self.assertEqual(len(snapshot.rooms), 10)
+
+        player.move_to(rooms[1])
+        rooms[5].add_item(item.generate_food())
+        saver.touch(rooms[5])
+        snapshot = saver._snapshot(player, None, 0.)
+        self.assertEqual(
+            sorted(state['description'] for _, state, _ in
+                   snapshot.rooms.values()),
+            ["room 0", "room 1", "room 5"]
+        )
+
+    def test_resumed_game_copies_only_changed_rooms(self):
+        rooms = corridor(10)
+        player = Player("Tester", 100)
+        player.move_to(rooms[0])
+        saver = self.saver()
+        saver.request()
+        saver.checkpoint(player, None)
+        saver.close()
+
+        player, _, saver = autosave.resume(self.path)
+        self.addCleanup(saver.close)
+        player.move_to(player.current_room.north)
+        snapshot = saver._snapshot(player, None, 0.)
+        self.assertEqual(
+            sorted(state['description'] for _, state, _ in
+                   snapshot.rooms.values()),
+            ["room 0", "room 1"]
+        )
+        saver._snapshots.put(snapshot)
+        saver.close()
+
+        # The rooms left uncopied are still saved
+        restored, _ = autosave.load(self.path)
+        self.assertEqual(restored.current_room.description, "room 1")
+        room = restored.current_room
+        for _ in range(8):
+            room = room.north
+        self.assertEqual(room.description, "room 9")
+
+    def test_dropped_items_are_found_when_resumed(self):
+        rooms = corridor(3)
+        survey(rooms)
+        player = Player("Tester", 100)
+        player.move_to(rooms[0])
+        vest = Outfit("vest", 0, item.Rarity.Common, 2)
+        player.pick_up_item(vest)
+        rooms[0].add_item(item.generate_food())
+        player.drop('outfit', player.outfits.id_of(vest))
+        player.move_to(rooms[1])
+        player.move_to(rooms[2])
+
+        # The vest's room is not copied with the player
+        saver = self.saver()
+        saver.request()
+        saver.checkpoint(player, None)
+        saver.request()
+        saver.checkpoint(player, None)
+        saver.close()
+
+        restored, _ = autosave.load(self.path)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            utils.find(restored, "my", "o")
+        self.assertEqual(
+            out.getvalue(), "Your vest is 2 steps away: south, south\n"
+        )
+        self.assertIs(
+            restored.dropped['outfit'],
+            restored.previous_room.south.items[1]
+        )
+
+    def test_generated_rooms_are_saved(self):
+        rooms = corridor(2)
+        player = Player("Tester", 100)
+        player.move_to(rooms[1])
+
+        saver = self.saver()
+        saver.request()
+        saver.checkpoint(player, None)
+        # The room beyond the end of the corridor is generated
+        player.go(Direction.North)
+        saver.request()
+        saver.checkpoint(player, None)
+        saver.close()
+
+        restored, _ = autosave.load(self.path)
+        self.assertEqual(
+            restored.current_room.description,
+            player.current_room.description
+        )
+        self.assertIs(restored.current_room.south, restored.previous_room)
+        self.assertIs(restored.previous_room.north, restored.current_room)
+        self.assertEqual(restored.previous_room.south.description, "room 0")
+
+    def test_saves_only_when_requested_or_due(self):
+        player = Player("Tester", 100)
+        player.move_to(corridor(1)[0])
+
+        saver = self.saver(interval=3600)
+        saver.checkpoint(player, None)
+        self.assertEqual(saver.stats.saves, 0)
+        saver.request()
+        saver.checkpoint(player, None)
+        saver.checkpoint(player, None)
+        self.assertEqual(saver.stats.saves, 1)
+
+        saver = self.saver(self.path + '.2', interval=0)
+        saver.checkpoint(player, None)
+        self.assertEqual(saver.stats.saves, 1)
+
+    def test_metrics(self):
+        player = Player("Tester", 100)
+        player.move_to(corridor(1)[0])
+
+        saver = self.saver(interval=0)
+        for _ in range(3):
+            saver.checkpoint(player, None)
+        saver.close()
+        self.assertEqual(saver.stats.saves, 3)
+        # Snapshots taken while another is written are written together
+        self.assertGreaterEqual(saver.stats.writes, 1)
+        self.assertLessEqual(saver.stats.writes, 3)
+        self.assertGreater(saver.stats.max_pause, 0)
+        self.assertGreaterEqual(saver.stats.max_lag, 0)
+        self.assertIn("3 saves", str(saver.stats))
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_failed_writes(self):
+        player = Player("Tester", 100)
+        player.move_to(corridor(1)[0])
+        directory = os.path.join(os.path.dirname(self.path), 'missing')
+        path = os.path.join(directory, 'game.sav')
+
+        saver = self.saver(path)
+        saver.request()
+        saver.checkpoint(player, None)
+        deadline = time.monotonic() + 5
+        while not saver.stats.failures and time.monotonic() < deadline:
+            time.sleep(.01)
+        self.assertEqual(saver.stats.failures, 1)
+        self.assertIn("1 failed", str(saver.stats))
+
+        # The writer carries on, and the failure is reported
+        os.mkdir(directory)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            saver.request()
+            saver.checkpoint(player, None)
+        self.assertIn("could not be saved", output.getvalue())
+        saver.close()
+        self.assertEqual(saver.stats.writes, 1)
+        restored, _ = autosave.load(path)
+        self.assertEqual(restored.name, "Tester")
+
+    def test_failed_resume(self):
+        player = Player("Tester", 100)
+        player.move_to(corridor(1)[0])
+        with open(self.path, 'wb') as fh:
+            fh.write(b"not a save")
+
+        saver = self.saver(saved_rooms={})
+        saver._writer.join(5)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            saver.request()
+            saver.checkpoint(player, None)
+            saver.checkpoint(player, None)
+        # Once the writer has stopped, nothing more is queued
+        self.assertEqual(
+            output.getvalue().count("could not be saved"), 1
+        )
+        self.assertEqual(saver.stats.saves, 0)
+        self.assertTrue(saver._snapshots.empty())
+
+    def test_module_functions_use_bound_saver(self):
+        player = Player("Tester", 100)
+        player.move_to(corridor(1)[0])
+        # Without a bound saver, nothing is saved
+        autosave.request(player.current_room)
+        autosave.checkpoint(player, None)
+
+        saver = self.saver()
+        autosave.bind(saver)
+        self.addCleanup(autosave.bind, None)
+        autosave.request(player.current_room)
+        autosave.checkpoint(player, None)
+        self.assertEqual(saver.stats.saves, 1)
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch
+
+from adventure_game.bots import (
+    POLICIES, SURVIVED, GameResult, HarnessStats, play_game, run_harness
+)
+from adventure_game.compass import DIRECTIONS
+from adventure_game.room import EmptyRoom
+from adventure_game.trap import Trap
+
+
+class PlayGameTests(unittest.TestCase):
+    def test_every_policy_plays(self):
+        for name, policy_cls in POLICIES.items():
+            with self.subTest(policy=name):
+                result = play_game(policy_cls, seed=1, max_turns=50)
+                self.assertLessEqual(result.turns, 50)
+                self.assertGreaterEqual(result.rooms_visited, 1)
+                self.assertLessEqual(result.depth, result.rooms_visited)
+                if result.cause_of_death == SURVIVED:
+                    self.assertEqual(result.turns, 50)
+
+    def test_seed_is_reproducible(self):
+        for policy_cls in POLICIES.values():
+            with self.subTest(policy=policy_cls.__name__):
+                self.assertEqual(
+                    play_game(policy_cls, seed=5, max_turns=50),
+                    play_game(policy_cls, seed=5, max_turns=50)
+                )
+
+    def test_rooms_of_every_level_count(self):
+        def trapped_room():
+            return EmptyRoom("pit", list(DIRECTIONS), trap=Trap("pit", "", 0))
+
+        def fall(player, trap):
+            player.move_to_new_room()
+            return True
+
+        with patch(
+                'adventure_game.player.generate_first_room', trapped_room
+        ), patch('adventure_game.bots.headless.trigger_trap', fall):
+            result = play_game(POLICIES['random'], seed=1, max_turns=5)
+        # One room on each of the five levels fallen through, and the sixth
+        self.assertEqual((result.rooms_visited, result.depth), (6, 0))
+
+    def test_unseeded_game_leaves_the_generator(self):
+        with patch('adventure_game.bots.random.seed') as seed:
+            play_game(POLICIES['random'], max_turns=1)
+        seed.assert_not_called()
+
+
+class HarnessStatsTests(unittest.TestCase):
+    def test_merge(self):
+        first = HarnessStats()
+        first.add(GameResult(10, 3, 5, 'ogre', 2))
+        second = HarnessStats()
+        second.add(GameResult(20, 5, 9, 'ogre', 4))
+        second.add(GameResult(30, 1, 2, SURVIVED, 0))
+        first.merge(second)
+
+        self.assertEqual(first.games, 3)
+        self.assertEqual(first.turns, 60)
+        self.assertEqual(first.items_collected, 6)
+        self.assertEqual(first.causes_of_death['ogre'], 2)
+        self.assertEqual(first.mean_depth, 3)
+
+
+class RunHarnessTests(unittest.TestCase):
+    def test_batches_stream_back(self):
+        batches = []
+        stats = run_harness(
+            'cautious', games=12, processes=2, batch_size=5, max_turns=20,
+            on_batch=lambda total: batches.append(total.games)
+        )
+        self.assertEqual(stats.games, 12)
+        self.assertEqual(sorted(batches)[-1], 12)
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(sum(stats.causes_of_death.values()), 12)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            run_harness('reckless', games=1)
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import random
+import unittest
+
+from adventure_game import action, item, resolver
+from adventure_game.combat import CombatEngine
+from adventure_game.enemy import Enemy
+from adventure_game.outfit import Outfit
+from adventure_game.player import Player
+from adventure_game.simulation import FightSpec, Result
+from adventure_game.weapon import Weapon
+
+
+def random_fight(rng):
+    weapon = None
+    if rng.random() < 0.8:
+        weapon = Weapon(
+            "sword", 0, item.Rarity.Common, rng.randint(0, 10),
+            rng.randint(0, 8)
+        )
+    outfit = None
+    if rng.random() < 0.5:
+        outfit = Outfit("vest", 0, item.Rarity.Common, rng.randint(0, 6))
+    player = Player("Tester", rng.randint(1, 100), weapon, outfit)
+    enemy = Enemy(
+        "beast", "beast", rng.randint(1, 60),
+        Weapon("claws", 0, item.Rarity.Common, rng.randint(0, 20), 100)
+    )
+    return player, enemy
+
+
+class CombatEngineTests(unittest.TestCase):
+    def test_rounds_match_fight_round(self):
+        rng = random.Random(0)
+        fights = [random_fight(rng) for _ in range(500)]
+        engine = CombatEngine()
+        ids = {engine.add_fight(p, e): (p, e) for p, e in fights}
+
+        while engine:
+            for event in engine.step():
+                player, enemy = ids[event.fight]
+                if event.outcome is not None and \
+                        event.outcome.result is Result.Stalemate:
+                    continue
+                player_hp, enemy_hp = player.hp, enemy.hp
+                with contextlib.redirect_stdout(io.StringIO()) as f:
+                    action._fight_round(player, enemy)
+                self.assertEqual(event.dealt, enemy_hp - enemy.hp)
+                self.assertEqual(event.taken, player_hp - player.hp)
+                self.assertEqual(event.weapon_broken, "BROKEN" in f.getvalue())
+                if event.outcome is None:
+                    self.assertTrue(player.is_alive() and enemy.is_alive())
+                elif event.outcome.result is Result.Won:
+                    self.assertFalse(enemy.is_alive())
+                else:
+                    self.assertFalse(player.is_alive())
+
+    def test_outcomes_match_resolver(self):
+        rng = random.Random(1)
+        specs = [
+            FightSpec(
+                rng.randint(1, 100), rng.randint(0, 10),
+                rng.choice([None, rng.randint(0, 10)]),
+                rng.randint(1, 60), rng.randint(0, 20)
+            )
+            for _ in range(1000)
+        ]
+        engine = CombatEngine()
+        ids = [engine.add(spec) for spec in specs]
+        outcomes = {}
+        while engine:
+            for event in engine.step():
+                if event.outcome is not None:
+                    outcomes[event.fight] = event.outcome
+        for fight, spec in zip(ids, specs):
+            with self.subTest(spec=spec):
+                self.assertEqual(outcomes[fight], resolver.resolve(spec))
+
+    def test_flee(self):
+        player, enemy = random_fight(random.Random(2))
+        player.cur_weapon = Weapon("sword", 0, item.Rarity.Common, 2, 10)
+        player.cur_outfit = None
+        player.hp, enemy.hp, enemy.weapon.attack_strength = 100, 50, 3
+        engine = CombatEngine()
+        fight = engine.add_fight(player, enemy)
+        engine.step()
+        engine.step()
+
+        outcome = engine.remove(fight)
+        self.assertFalse(engine)
+        self.assertEqual(outcome.result, Result.Fled)
+        resolver.apply_outcome(player, enemy, outcome)
+        self.assertEqual(
+            (player.hp, enemy.hp, player.cur_weapon.durability), (94, 46, 8)
+        )
@@ -0,0 +1,139 @@
+import pickle
+import random
+import unittest
+
+from adventure_game.container import (
+    PAGE_SIZE, ItemContainer, page_of, parse_query
+)
+from adventure_game.grammar import InvalidInstruction
+from adventure_game.item import FoodItem, Rarity
+from adventure_game.outfit import Outfit
+from adventure_game.weapon import Weapon
+
+
+def weapons(n):
+    return [
+        Weapon(f"sword {i}", i % 7, Rarity.Common, i % 5, 3)
+        for i in range(n)
+    ]
+
+
+class ItemContainerTests(unittest.TestCase):
+    def test_ids_stay_the_same(self):
+        first, second, third = weapons(3)
+        items = ItemContainer([first, second])
+        self.assertEqual(items.add(third), 3)
+        items.remove(second)
+        self.assertEqual(items.get(1), first)
+        self.assertIsNone(items.get(2))
+        self.assertEqual(items.get(3), third)
+        self.assertEqual(items.id_of(third), 3)
+        # Ids are never reused
+        self.assertEqual(items.add(second), 4)
+        self.assertEqual(list(items.numbered()), [
+            (1, first), (3, third), (4, second)
+        ])
+
+    def test_behaves_as_list(self):
+        first, second = weapons(2)
+        items = ItemContainer([first, second])
+        self.assertEqual(items, [first, second])
+        self.assertEqual(items[-1], second)
+        self.assertIn(first, items)
+        self.assertRaises(ValueError, items.add, first)
+        items.remove(first)
+        self.assertNotIn(first, items)
+        self.assertRaises(ValueError, items.remove, first)
+        items.discard(first)
+        self.assertEqual(len(items), 1)
+
+    def test_removing_while_iterating(self):
+        items = ItemContainer(weapons(5))
+        for item in items:
+            items.remove(item)
+        self.assertEqual(items, [])
+
+    def test_counts_kinds(self):
+        items = ItemContainer(weapons(2))
+        food = FoodItem("apple", 5, "Crunchy")
+        items.add(food)
+        self.assertEqual(items.count_of('weapon'), 2)
+        self.assertEqual(items.count_of('food'), 1)
+        items.remove(food)
+        self.assertEqual(items.count_of('food'), 0)
+
+    def test_sorted_views_kept_up_to_date(self):
+        random.seed(3)
+        pool = weapons(40) + [Outfit("cloak", 2, Rarity.Super, 4)]
+        items = ItemContainer(pool[:20])
+        self.assertEqual(len(list(items.sorted_by('attack'))), 20)
+        for _ in range(200):
+            item = random.choice(pool)
+            if item in items:
+                items.remove(item)
+            else:
+                items.add(item)
+            for stat, attribute in [('attack', 'attack_strength'),
+                                    ('luck', 'luck_stat')]:
+                expected = sorted(
+                    (i for i in items.numbered() if hasattr(i[1], attribute)),
+                    key=lambda e: (-getattr(e[1], attribute), e[0])
+                )
+                self.assertEqual(list(items.sorted_by(stat)), expected)
+
+    def test_pickles(self):
+        items = ItemContainer(weapons(3))
+        items.remove(items[0])
+        list(items.sorted_by('attack'))
+        loaded = pickle.loads(pickle.dumps(items))
+        self.assertEqual(
+            [(i, item.name) for i, item in loaded.numbered()],
+            [(2, "sword 1"), (3, "sword 2")]
+        )
+        self.assertEqual(loaded.add(weapons(1)[0]), 4)
+        self.assertEqual(
+            [i for i, _ in loaded.sorted_by('attack')], [3, 2, 4]
+        )
+
+
+class QueryTests(unittest.TestCase):
+    def setUp(self):
+        self.items = ItemContainer(weapons(30))
+        self.items.add(Weapon("axe", 6, Rarity.Super, 1, 3))
+
+    def names(self, terms):
+        return [
+            item.name for _, item in self.items.select(parse_query(terms))
+        ]
+
+    def test_filters(self):
+        self.assertEqual(self.names(['rarity:super']), ["axe"])
+        self.assertEqual(self.names(['name:axe']), ["axe"])
+        self.assertEqual(
+            self.names(['luck>5', 'attack=1']), ["sword 6", "axe"]
+        )
+
+    def test_bounds_on_order(self):
+        for terms in (['attack>2'], ['attack>=2'], ['attack<4'],
+                      ['attack<=4', 'attack>1'], ['attack=3']):
+            query = parse_query(terms + ['by:attack'])
+            found = self.items.select(query)
+            unsorted = self.items.select(parse_query(terms))
+            self.assertEqual(
+                found,
+                sorted(unsorted, key=lambda e: (-e[1].attack_strength, e[0]))
+            )
+
+    def test_pages(self):
+        found = self.items.select(parse_query([]))
+        page, pages = page_of(found, 4)
+        self.assertEqual(pages, 4)
+        self.assertEqual(len(page), len(found) - 3 * PAGE_SIZE)
+        # Past the last page is the last page
+        self.assertEqual(page_of(found, 9), (page, pages))
+        self.assertEqual(parse_query(['page:2']).page, 2)
+
+    def test_invalid_terms(self):
+        for term in ('attack', 'attack>x', 'by:colour', 'shape:round'):
+            with self.assertRaises(InvalidInstruction):
+                parse_query([term])
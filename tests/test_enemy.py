@@ -13,6 +13,15 @@ class EnemyGeneratorTests(unittest.TestCase):
         self.assertIsInstance(enemy, Enemy)
 
 
+class EnemyArticleTests(unittest.TestCase):
+    def test_article(self):
+        weapon = Weapon("club", 0, item.Rarity.Crappy, 1, 1)
+        self.assertEqual(Enemy("ogre", "ogre", 1, weapon).article, 'an')
+        self.assertEqual(Enemy("troll", "troll", 1, weapon).article, 'a')
+        enemy = generate_enemy()
+        self.assertIn(enemy.article, ('a', 'an'))
+
+
 class EnemyAttackTests(unittest.TestCase):
     def test_attack_player(self):
         e_weapon = Weapon("sword", 0, item.Rarity.Crappy, 3, 5)
@@ -0,0 +1,103 @@
+import random
+import unittest
+
+from adventure_game.env import (
+    ACTION_IDS, ACTIONS, INVALID_ACTION_PENALTY, OBS_FIELDS, OBS_SIZE,
+    PHASE_FIGHT, PHASE_MOVE, PHASE_OPTIONS, StartRoomPool, VecEnv
+)
+from adventure_game.enemy import Enemy
+from adventure_game import item
+from adventure_game.room import MonsterRoom
+from adventure_game.weapon import Weapon
+
+
+def available(mask):
+    return [a for a in range(len(ACTIONS)) if mask >> a & 1]
+
+
+class StartRoomPoolTests(unittest.TestCase):
+    def test_seeded_rooms_are_reproducible(self):
+        pool = StartRoomPool(size=4)
+        pool.prefill([3])
+        prefilled = pool.take(3)
+        generated = pool.take(3)
+        self.assertIsNot(prefilled, generated)
+        self.assertEqual(prefilled.description, generated.description)
+        self.assertEqual(len(prefilled.items), len(generated.items))
+
+    def test_seeding_leaves_the_global_generator(self):
+        pool = StartRoomPool(size=0)
+        random.seed(7)
+        expected = [random.random() for _ in range(3)]
+        random.seed(7)
+        drawn = [random.random()]
+        pool.prefill([1])
+        pool.take(2)
+        drawn += [random.random() for _ in range(2)]
+        self.assertEqual(drawn, expected)
+
+    def test_refills_when_empty(self):
+        pool = StartRoomPool(size=2)
+        rooms = [pool.take() for _ in range(5)]
+        self.assertEqual(len({id(r) for r in rooms}), 5)
+
+
+class VecEnvTests(unittest.TestCase):
+    def test_reset(self):
+        env = VecEnv(4, pool=StartRoomPool(size=8))
+        obs = env.reset([1, 2, 3, 4])
+        self.assertEqual(len(obs), 4 * OBS_SIZE)
+        hp = OBS_FIELDS.index('hp')
+        for i in range(4):
+            self.assertEqual(obs[i * OBS_SIZE + hp], 100)
+            self.assertTrue(env.action_masks()[i])
+
+    def test_invalid_action_is_penalised(self):
+        env = VecEnv(1, pool=StartRoomPool(size=1))
+        env.reset([0])
+        invalid = next(
+            a for a in range(len(ACTIONS))
+            if a not in available(env.action_masks()[0])
+        )
+        before = list(env.observations)
+        _, rewards, dones, _ = env.step([invalid])
+        self.assertEqual(rewards, [INVALID_ACTION_PENALTY])
+        self.assertEqual(dones, [False])
+        self.assertEqual(list(env.observations), before)
+
+    def test_fight_takes_one_round_per_step(self):
+        env = VecEnv(1, pool=StartRoomPool(size=1))
+        env.reset([0])
+        player = env.players[0]
+        monster = Enemy(
+            "boss", "boss", 30, Weapon("gun", 0, item.Rarity.Crappy, 1, 5)
+        )
+        player.move_to(MonsterRoom("lair", [], monster))
+        env._enter_phase(0, PHASE_OPTIONS)
+
+        env.step([ACTION_IDS['attack']])
+        self.assertEqual(env.phases[0], PHASE_FIGHT)
+        self.assertEqual(monster.hp, 29)
+        self.assertEqual(player.hp, 99)
+
+        env.step([ACTION_IDS['auto']])
+        self.assertFalse(monster.is_alive())
+        self.assertEqual(env.phases[0], PHASE_MOVE)
+
+    def test_random_play(self):
+        env = VecEnv(8, max_turns=50, pool=StartRoomPool(size=8))
+        env.reset()
+        finished = 0
+        for step in range(200):
+            actions = [
+                available(mask)[step % len(available(mask))]
+                for mask in env.action_masks()
+            ]
+            obs, rewards, dones, infos = env.step(actions)
+            self.assertEqual(len(obs), 8 * OBS_SIZE)
+            for done, info in zip(dones, infos):
+                if done:
+                    finished += 1
+                    self.assertLessEqual(info['turns'], 50)
+        # Every game ends within the turn limit
+        self.assertGreaterEqual(finished, 8 * 200 // 50)
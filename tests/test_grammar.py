@@ -0,0 +1,102 @@
+import random
+import string
+import unittest
+
+from adventure_game import grammar
+from adventure_game.grammar import (
+    InvalidInstruction, Trie, TypoIndex, Vocabulary, edit_distance, parse
+)
+
+
+class EditDistanceTests(unittest.TestCase):
+    def test_distances(self):
+        self.assertEqual(edit_distance("north", "north"), 0)
+        self.assertEqual(edit_distance("nrth", "north"), 1)
+        self.assertEqual(edit_distance("north", "south"), 2)
+        self.assertEqual(edit_distance("", "eat"), 3)
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+
+
+class TrieTests(unittest.TestCase):
+    def test_expand(self):
+        trie = Trie(["attack", "auto", "a", "sneak"])
+        self.assertEqual(trie.expand("a"), "a")
+        self.assertEqual(trie.expand("att"), "attack")
+        self.assertEqual(trie.expand("s"), "sneak")
+        self.assertEqual(trie.expand("attack"), "attack")
+        self.assertIsNone(trie.expand("attacks"))
+        self.assertIsNone(trie.expand("x"))
+        self.assertIsNone(Trie(["attack", "auto"]).expand("a"))
+
+    def test_complete(self):
+        trie = Trie(["eat", "equip", "east"])
+        self.assertEqual(trie.complete("e"), ["east", "eat", "equip"])
+        self.assertEqual(trie.complete("ea"), ["east", "eat"])
+        self.assertEqual(trie.complete("x"), [])
+
+
+class TypoIndexTests(unittest.TestCase):
+    def test_matches_linear_scan(self):
+        random.seed(0)
+        words = {
+            ''.join(random.choices(string.ascii_lowercase[:6], k=5))
+            for _ in range(500)
+        }
+        index = TypoIndex(words)
+        for query in ["abcde", "fffff", "abc", "aabbccdd"]:
+            for radius in range(3):
+                with self.subTest(query=query, radius=radius):
+                    expected = sorted(
+                        (edit_distance(query, w), w) for w in words
+                        if edit_distance(query, w) <= radius
+                    )
+                    self.assertEqual(index.search(query, radius), expected)
+
+
+class VocabularyTests(unittest.TestCase):
+    def test_suggestions(self):
+        vocabulary = Vocabulary(["north", "south", "go", "eat"], 'direction')
+        self.assertEqual(vocabulary.suggest("nrth"), ["north"])
+        self.assertEqual(vocabulary.suggest("zzzzzz"), [])
+        with self.assertRaisesRegex(InvalidInstruction, "Did you mean north"):
+            vocabulary.resolve("nrth")
+
+    def test_ambiguous(self):
+        vocabulary = Vocabulary(["eat", "equip"], 'instruction')
+        with self.assertRaisesRegex(InvalidInstruction, "eat, equip"):
+            vocabulary.resolve("e")
+        self.assertEqual(vocabulary.resolve("EQ"), "equip")
+
+
+class ParseTests(unittest.TestCase):
+    def test_abbreviations(self):
+        self.assertEqual(parse("att", ["attack", "auto"]), ("attack", []))
+        self.assertEqual(parse("eq w1", ["equip", "eat"]), ("equip", ["w1"]))
+        self.assertEqual(parse("take a", ["take"]), ("take", ["all"]))
+        self.assertEqual(parse("take 2", ["take"]), ("take", ["2"]))
+
+    def test_directions(self):
+        self.assertEqual(parse("go n", ["go"]), ("go", ["north"]))
+        self.assertEqual(parse("n", ["go"]), ("go", ["north"]))
+        self.assertEqual(parse("we", ["go"]), ("go", ["west"]))
+        # The initials of the directions win over other abbreviations
+        self.assertEqual(parse("e", ["go", "eat"]), ("go", ["east"]))
+        # Directions are only commands where 'go' is accepted
+        with self.assertRaises(InvalidInstruction):
+            parse("north", ["attack"])
+
+    def test_missing_arguments(self):
+        for line in ["take", "go", "eat", "equip"]:
+            with self.subTest(line=line):
+                with self.assertRaisesRegex(InvalidInstruction, "Expected"):
+                    parse(line, grammar.COMMANDS)
+
+    def test_invalid_arguments(self):
+        for line in ["eat x", "equip t1", "drop w", "go nrth", "take al1"]:
+            with self.subTest(line=line):
+                with self.assertRaises(InvalidInstruction):
+                    parse(line, grammar.COMMANDS)
+
+    def test_empty(self):
+        with self.assertRaises(InvalidInstruction):
+            parse("   ", ["go"])
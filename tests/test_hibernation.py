@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+
+from adventure_game import hibernation, item
+from adventure_game.compass import Direction
+from adventure_game.hibernation import HibernationStore
+from adventure_game.player import Player
+from adventure_game.room import EmptyRoom, TreasureRoom
+from adventure_game.weapon import Weapon
+from adventure_game.world import NO_LOCK, SharedWorld
+
+
+def corridor(length):
+    """Builds a corridor of rooms leading north."""
+    rooms = [EmptyRoom(f"room {i}", [Direction.North, Direction.South])
+             for i in range(length)]
+    for south, north in zip(rooms, rooms[1:]):
+        south.north = north
+        north.south = south
+    return rooms
+
+
+class SerializationTests(unittest.TestCase):
+    def test_round_trip(self):
+        rooms = corridor(3)
+        sword = Weapon("sword", 0, item.Rarity.Crappy, 10, 5)
+        player = Player("Tester", 80, sword)
+        player.weapons.append(Weapon("axe", 0, item.Rarity.Common, 8, 3))
+        rooms[1].add_item(item.generate_food())
+        player.move_to(rooms[1])
+        player.move_to(rooms[2])
+
+        restored, point = hibernation.loads(
+            hibernation.dumps(player, 'exits')
+        )
+        self.assertEqual(point, 'exits')
+        self.assertEqual(str(restored), str(player))
+        self.assertEqual([w.name for w in restored.weapons], ["axe"])
+        self.assertEqual(restored.current_room.description, "room 2")
+        self.assertIs(restored.previous_room, restored.current_room.south)
+        self.assertEqual(len(restored.previous_room.items), 1)
+        self.assertIs(restored.previous_room.north, restored.current_room)
+        self.assertIs(restored.current_room.lock, NO_LOCK)
+
+    def test_deep_world(self):
+        rooms = corridor(5000)
+        player = Player("Tester", 100)
+        player.move_to(rooms[-1])
+
+        restored, _ = hibernation.loads(hibernation.dumps(player))
+        room, steps = restored.current_room, 0
+        while room._exits[Direction.South] is not None:
+            room, steps = room.south, steps + 1
+        self.assertEqual(steps, 4999)
+        self.assertEqual(room.description, "room 0")
+
+    def test_shared_rooms_are_kept_by_reference(self):
+        world = SharedWorld()
+        vault = world.adopt(TreasureRoom("vault", [Direction.South]))
+        player = Player("Tester", 100)
+        player.move_to(world.start_room)
+        player.move_to(vault)
+
+        restored, _ = hibernation.loads(hibernation.dumps(player), world)
+        self.assertIs(restored.current_room, vault)
+        self.assertIs(restored.previous_room, world.start_room)
+
+
+class HibernationStoreTests(unittest.TestCase):
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = HibernationStore(directory)
+            store.save('1', b'game')
+            store.save('2', b'other game')
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.load('1'), b'game')
+            self.assertEqual(len(store), 1)
+            with self.assertRaises(KeyError):
+                store.load('1')
+            store.discard('2')
+            self.assertEqual(len(store), 0)
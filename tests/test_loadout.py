@@ -0,0 +1,141 @@
+import contextlib
+import io
+import itertools
+import random
+import unittest
+
+from adventure_game import utils
+from adventure_game.enemy import Enemy
+from adventure_game.item import Rarity
+from adventure_game.loadout import best_loadout
+from adventure_game.outfit import Outfit
+from adventure_game.player import Player
+from adventure_game.resolver import resolve_fight
+from adventure_game.room import EmptyRoom
+from adventure_game.simulation import Result
+from adventure_game.weapon import Weapon
+
+# How good each result is, as the optimizer ranks them
+RANKS = {Result.Lost: 0, Result.Stalemate: 1, Result.Won: 2}
+
+
+def ogre(hp=25, damage=8):
+    return Enemy(
+        "towering ogre", "ogre", hp,
+        Weapon("club", 0, Rarity.Common, damage, 100)
+    )
+
+
+def fight_score(player, enemy, weapon, outfit):
+    """Scores a loadout by trying it out."""
+    player.cur_weapon, player.cur_outfit = weapon, outfit
+    outcome = resolve_fight(player, enemy)
+    return RANKS[outcome.result], -outcome.hp_lost, -outcome.durability_used
+
+
+class BestLoadoutTests(unittest.TestCase):
+    def setUp(self):
+        self.player = Player("Tester", 40)
+        self.player.move_to(EmptyRoom("A dusty hall", []))
+
+    def test_durability_counts(self):
+        fragile = Weapon("glass sword", 0, Rarity.Super, 20, 1)
+        sturdy = Weapon("mace", 0, Rarity.Common, 5, 10)
+        vest = Outfit("vest", 0, Rarity.Common, 3)
+        for equipment in (fragile, sturdy, vest):
+            self.player.pick_up_item(equipment)
+        loadout = best_loadout(self.player, ogre())
+        self.assertIs(loadout.weapon, sturdy)
+        self.assertIs(loadout.outfit, vest)
+        self.assertIs(loadout.outcome.result, Result.Won)
+        self.assertEqual(loadout.outcome.hp_lost, 4 * 5)
+
+        # A glass sword which lasts is better still
+        fragile.durability = 2
+        self.player.weapons.remove(fragile)
+        self.player.pick_up_item(fragile)
+        self.assertIs(best_loadout(self.player, ogre()).weapon, fragile)
+
+    def test_matches_every_pair(self):
+        random.seed(7)
+        for _ in range(30):
+            player = Player("Tester", random.randint(1, 60))
+            for _ in range(random.randint(0, 8)):
+                player.pick_up_item(Weapon(
+                    "sword", random.randint(0, 10), Rarity.Common,
+                    random.randint(0, 12), random.randint(0, 6)
+                ))
+            for _ in range(random.randint(0, 4)):
+                player.pick_up_item(Outfit(
+                    "vest", random.randint(0, 10), Rarity.Common,
+                    random.randint(0, 6)
+                ))
+            enemy = ogre(random.randint(1, 40), random.randint(0, 12))
+            loadout = best_loadout(player, enemy)
+            found = (
+                RANKS[loadout.outcome.result], -loadout.outcome.hp_lost,
+                -loadout.outcome.durability_used
+            )
+            best = max(
+                fight_score(player, enemy, weapon, outfit)
+                for weapon, outfit in itertools.product(
+                    [None, *player.weapons], [None, *player.outfits]
+                )
+            )
+            self.assertEqual(found, best)
+
+    def test_luck(self):
+        charm = Weapon("charm", 20, Rarity.Super, 1, 5)
+        cloak = Outfit("cloak", 15, Rarity.Super, 0)
+        self.player.pick_up_item(charm)
+        self.player.pick_up_item(cloak)
+        self.player.cur_outfit = Outfit("hat", 5, Rarity.Common, 0)
+        loadout = best_loadout(self.player)
+        self.assertEqual((loadout.weapon, loadout.luck), (charm, 25))
+        # The hat is lucky enough along with the charm
+        self.assertIs(loadout.outfit, self.player.cur_outfit)
+
+    def test_memoized(self):
+        self.player.pick_up_item(Weapon("mace", 0, Rarity.Common, 5, 10))
+        first = best_loadout(self.player, ogre())
+        self.assertIs(best_loadout(self.player, ogre()), first)
+        self.player.take_damage(1)
+        second = best_loadout(self.player, ogre())
+        self.assertIsNot(second, first)
+        self.assertIs(best_loadout(self.player, ogre()), second)
+        self.player.pick_up_item(Weapon("axe", 0, Rarity.Common, 9, 10))
+        self.assertEqual(
+            best_loadout(self.player, ogre()).weapon.name, "axe"
+        )
+
+
+class OptimizeTests(unittest.TestCase):
+    def setUp(self):
+        self.player = Player(
+            "Tester", 100, Weapon("stick", 0, Rarity.Crappy, 2, 50)
+        )
+        self.player.move_to(EmptyRoom("A dusty hall", []))
+        self.player.pick_up_item(Weapon("axe", 2, Rarity.Common, 9, 10))
+        self.player.pick_up_item(Outfit("cloak", 9, Rarity.Super, 1))
+
+    def optimize(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            utils.optimize(self.player, *args)
+        return output.getvalue()
+
+    def test_equips_for_enemy(self):
+        output = self.optimize("ogre")
+        self.assertIn("You equipped the axe", output)
+        self.assertIn("You would defeat the ogre and lose 14 hp", output)
+        self.assertEqual(self.player.cur_outfit.name, "cloak")
+        self.assertIn("already the best", self.optimize("towering ogre"))
+
+    def test_equips_for_luck(self):
+        output = self.optimize()
+        self.assertIn("You equipped the axe", output)
+        self.assertIn("Your luck is 11", output)
+
+    def test_unknown_enemy(self):
+        self.assertIn("no unicorn", self.optimize("unicorn"))
+        self.assertEqual(self.player.cur_weapon.name, "stick")
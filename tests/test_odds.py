@@ -0,0 +1,79 @@
+import contextlib
+import io
+import random
+import unittest
+from unittest.mock import create_autospec, patch
+
+from adventure_game import action, constants, item, odds
+from adventure_game.enemy import Enemy
+from adventure_game.player import Player
+from adventure_game.room import MonsterRoom
+from adventure_game.trap import Trap
+from adventure_game.weapon import Weapon
+
+
+def player_with_luck(luck):
+    return Player("Tester", 100, Weapon("charm", luck, item.Rarity.Super, 1, 1))
+
+
+class OddsTableTests(unittest.TestCase):
+    def test_sneak_table_matches_attempt_sneak(self):
+        monster = Enemy(
+            "monster", "monster", 20,
+            Weapon("sword", 1, item.Rarity.Crappy, 5, 5)
+        )
+        for luck in [0, 1, 10, constants.MAX_LUCK]:
+            with self.subTest(luck=luck):
+                player = player_with_luck(luck)
+                successes = 0
+                for threshold in range(odds.SNEAK_THRESHOLDS):
+                    attack_mock = create_autospec(action.attack)
+                    with patch('adventure_game.action.random.randint',
+                               lambda a, b: threshold), \
+                            patch('adventure_game.action.attack', attack_mock), \
+                            contextlib.redirect_stdout(io.StringIO()):
+                        action.attempt_sneak(player, monster)
+                    successes += not attack_mock.called
+                self.assertEqual(odds.SNEAK_SUCCESSES[luck], successes)
+
+    def test_trap_table_matches_trigger_trap(self):
+        for luck in [0, 1, 10, constants.MAX_LUCK]:
+            with self.subTest(luck=luck):
+                player = player_with_luck(luck)
+                escapes = 0
+                for threshold in range(odds.TRAP_THRESHOLDS):
+                    trap = Trap("pit", "you fell", 0)
+                    with patch('adventure_game.action.random.randint',
+                               lambda a, b: threshold), \
+                            patch('adventure_game.action.time.sleep',
+                                  lambda s: None), \
+                            contextlib.redirect_stdout(io.StringIO()):
+                        escapes += not action.trigger_trap(player, trap)
+                self.assertEqual(odds.TRAP_ESCAPES[luck], escapes)
+
+    def test_odds_are_probabilities(self):
+        self.assertEqual(odds.SNEAK_ODDS[0], 0)
+        self.assertEqual(odds.TRAP_ESCAPE_ODDS[constants.MAX_LUCK], 1)
+        for p in odds.SNEAK_ODDS + odds.TRAP_ESCAPE_ODDS:
+            self.assertTrue(0 <= p <= 1)
+
+
+class SamplerTests(unittest.TestCase):
+    def test_certain_outcomes(self):
+        self.assertFalse(any(odds.sample_sneaks(0, 1000)))
+        self.assertTrue(
+            all(odds.sample_trap_escapes(constants.MAX_LUCK, 1000))
+        )
+
+    def test_sample_rate(self):
+        rng = random.Random(3)
+        n = 20000
+        rate = sum(odds.sample_sneaks(13, n, rng)) / n
+        self.assertAlmostEqual(rate, odds.SNEAK_ODDS[13], delta=0.02)
+
+
+class OptionNotesTests(unittest.TestCase):
+    def test_sneak_note(self):
+        room = MonsterRoom.generate([])
+        notes = odds.option_notes(room.get_options(), player_with_luck(0))
+        self.assertEqual(notes, {'sneak': '(0% chance of success)'})
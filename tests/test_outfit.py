@@ -1,5 +1,8 @@
+import copy
+import pickle
 import unittest
 
+from adventure_game.item import Rarity
 from adventure_game.outfit import Outfit, generate_outfit
 
 
@@ -7,3 +10,19 @@ class OutfitGenerationTests(unittest.TestCase):
     def test_basic(self):
         outfit = generate_outfit()
         self.assertIsInstance(outfit, Outfit)
+
+    def test_types_shared(self):
+        outfit = generate_outfit()
+        same = Outfit(
+            outfit.name, outfit.luck_stat, outfit.rarity, outfit.defence
+        )
+        self.assertIs(same.type, outfit.type)
+        self.assertEqual(str(same), str(outfit))
+        self.assertIs(pickle.loads(pickle.dumps(same)).type, outfit.type)
+        self.assertIs(copy.deepcopy(same).type, outfit.type)
+
+    def test_description(self):
+        self.assertEqual(
+            str(Outfit("vest", 2, Rarity.Common, 3)),
+            "vest [defence: 3, luck: 2]"
+        )
@@ -23,6 +23,23 @@ class PlayerTests(unittest.TestCase):
         )
         self.assertIsInstance(player, Player)
 
+    def test_description_follows_state(self):
+        player = Player(
+            "Tester", 100, Weapon("sword", 0, Rarity.Crappy, 10, 10), None
+        )
+        before = str(player)
+        self.assertEqual(str(player), before)
+        player.take_damage(10)
+        self.assertNotEqual(str(player), before)
+        self.assertIn("90", str(player))
+        before = str(player)
+        player.cur_weapon.decrement_durability()
+        self.assertNotEqual(str(player), before)
+        player.cur_weapon.attack_strength = 7
+        self.assertIn("attack: 7", str(player))
+        player.cur_weapon = None
+        self.assertNotIn("sword", str(player))
+
     def test_pick_up_item(self):
         player = Player(
             "Tester",
@@ -0,0 +1,107 @@
+import contextlib
+import io
+import unittest
+
+from adventure_game import item, realtime
+from adventure_game.compass import Direction
+from adventure_game.enemy import Enemy
+from adventure_game.exceptions import PlayerKilledException
+from adventure_game.player import Player
+from adventure_game.room import EmptyRoom, MonsterRoom
+from adventure_game.timers import TimerWheel
+from adventure_game.trap import Trap
+from adventure_game.weapon import Weapon
+
+
+class RealTimeGameTests(unittest.TestCase):
+    def setUp(self):
+        self.wheel = TimerWheel(tick=1, clock=lambda: 0.)
+        self.player = Player("Tester", 100)
+        self.player.move_to(EmptyRoom("hall", [Direction.North]))
+        self.posted = []
+        self.game = realtime.RealTimeGame(
+            self.wheel, self.player, self.posted.append
+        )
+
+    def wait(self, seconds):
+        """
+        Waits at a prompt, applying the effects posted to the game as the
+        wheel turns.
+
+        """
+        with contextlib.redirect_stdout(io.StringIO()) as f:
+            for _ in range(int(seconds)):
+                self.wheel.advance(1)
+                while self.posted:
+                    self.posted.pop(0)()
+        self.game.on_prompt()
+        return f.getvalue()
+
+    def test_regeneration(self):
+        self.player.take_damage(10)
+        self.game.start()
+        self.wait(realtime.REGENERATION_INTERVAL * 3)
+        self.assertEqual(self.player.hp, 90 + 3 * realtime.REGENERATION_POINTS)
+        self.game.stop()
+        self.assertFalse(self.wheel)
+
+    def test_effects_posted_before_stopping(self):
+        self.player.take_damage(10)
+        self.game.start()
+        self.wheel.advance(realtime.REGENERATION_INTERVAL)
+        self.assertEqual(len(self.posted), 1)
+        self.game.stop()
+        # The effect still waiting in the game's queue does nothing, and
+        # schedules nothing more
+        self.wait(realtime.REGENERATION_INTERVAL * 3)
+        self.assertEqual(self.player.hp, 90)
+        self.assertFalse(self.wheel)
+
+    def test_monster_attacks_on_cooldown(self):
+        monster = Enemy(
+            "big troll", "troll", 10,
+            Weapon("club", 0, item.Rarity.Crappy, 10, 100)
+        )
+        self.player.move_to(MonsterRoom("cave", [], monster))
+        self.game.on_prompt()
+        output = self.wait(realtime.MONSTER_COOLDOWN * 2)
+        self.assertEqual(output.count("The troll attacks you!"), 2)
+        self.assertEqual(self.player.hp, 80)
+
+        # The monster stops attacking once the player has left
+        self.player.retreat()
+        self.game.on_prompt()
+        self.wait(realtime.MONSTER_COOLDOWN * 2)
+        self.assertEqual(self.player.hp, 80)
+
+    def test_monster_kills_player(self):
+        monster = Enemy(
+            "big troll", "troll", 10,
+            Weapon("club", 0, item.Rarity.Crappy, 100, 100)
+        )
+        self.player.move_to(MonsterRoom("cave", [], monster))
+        self.game.on_prompt()
+        with self.assertRaises(PlayerKilledException):
+            self.wait(realtime.MONSTER_COOLDOWN)
+
+    def test_trap_rearms(self):
+        trap = Trap("net", "A net falls on you", 5)
+        trapped = EmptyRoom("hall", [], trap=trap)
+        self.player.move_to(trapped)
+        trap.triggered = True
+        # Triggered traps move the player on
+        self.player.move_to(EmptyRoom("hall", []))
+        self.game.on_prompt()
+        self.wait(realtime.TRAP_REARM_DELAY - 1)
+        self.assertTrue(trap.triggered)
+        self.wait(1)
+        self.assertFalse(trap.triggered)
+
+    def test_food_spoils(self):
+        self.player.foods.append(item.FoodItem("apple", 5, "Crunch"))
+        self.game.on_prompt()
+        self.wait(realtime.FOOD_SHELF_LIFE - 1)
+        self.assertTrue(self.player.foods)
+        output = self.wait(1)
+        self.assertFalse(self.player.foods)
+        self.assertIn("Your apple has spoiled.", output)
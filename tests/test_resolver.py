@@ -0,0 +1,147 @@
+import contextlib
+import io
+import itertools
+import unittest
+from unittest.mock import patch
+
+from adventure_game import action, item
+from adventure_game.compass import Direction
+from adventure_game.enemy import Enemy
+from adventure_game.outfit import Outfit
+from adventure_game.player import Player
+from adventure_game.resolver import apply_outcome, resolve, resolve_fight
+from adventure_game.room import EmptyRoom, MonsterRoom
+from adventure_game.simulation import FightSpec, resolve_batch
+from adventure_game.weapon import Weapon
+
+
+class ResolveTests(unittest.TestCase):
+    def test_matches_round_by_round_resolution(self):
+        specs = [
+            FightSpec(player_hp, attack, durability, enemy_hp, enemy_damage)
+            for player_hp, attack, durability, enemy_hp, enemy_damage
+            in itertools.product(
+                [1, 7, 100], [0, 1, 3, 10], [None, 0, 1, 4, 20],
+                [1, 9, 30], [0, 1, 5, 25]
+            )
+        ]
+        for spec, expected in zip(specs, resolve_batch(specs)):
+            with self.subTest(spec=spec):
+                self.assertEqual(resolve(spec), expected)
+
+    def test_apply_outcome_matches_attack_loop(self):
+        def make_fight():
+            return (
+                Player(
+                    "Tester", 100,
+                    Weapon("sword", 0, item.Rarity.Crappy, 3, 4),
+                    Outfit("vest", 0, item.Rarity.Common, 1)
+                ),
+                Enemy(
+                    "beast", "beast", 20,
+                    Weapon("claws", 0, item.Rarity.Common, 6, 100)
+                )
+            )
+
+        player, enemy = make_fight()
+        apply_outcome(player, enemy, resolve_fight(player, enemy))
+
+        expected_player, expected_enemy = make_fight()
+        with patch('builtins.input', lambda *args: 'a'), \
+                contextlib.redirect_stdout(io.StringIO()):
+            action.attack(expected_player, expected_enemy)
+
+        self.assertEqual(player.hp, expected_player.hp)
+        self.assertEqual(enemy.hp, expected_enemy.hp)
+        self.assertEqual(
+            player.cur_weapon.durability,
+            expected_player.cur_weapon.durability
+        )
+
+    def test_memoized(self):
+        resolve.cache_clear()
+        spec = FightSpec(100, 5, 10, 30, 5)
+        resolve(spec)
+        resolve(FightSpec(100, 5, 10, 30, 5))
+        self.assertEqual(resolve.cache_info().hits, 1)
+
+
+class AutoAttackTests(unittest.TestCase):
+    def test_auto_room_option(self):
+        player = Player(
+            "Tester", 100, Weapon("sword", 0, item.Rarity.Crappy, 10, 5)
+        )
+        monster = Enemy(
+            "boss", "boss", 30, Weapon("gun", 0, item.Rarity.Crappy, 5, 5)
+        )
+        room = MonsterRoom("test classroom", [], monster)
+        player.move_to(room)
+
+        def mock_input(*args):
+            raise RuntimeError()
+
+        with patch('builtins.input', mock_input), \
+                contextlib.redirect_stdout(io.StringIO()):
+            room.get_options()['auto'].handler(player)
+
+        self.assertFalse(monster.is_alive())
+        self.assertEqual(player.hp, 90)
+        self.assertEqual(player.cur_weapon.durability, 2)
+
+    def test_auto_mid_fight(self):
+        player = Player("Tester", 100)
+        monster = Enemy(
+            "boss", "boss", 30, Weapon("gun", 0, item.Rarity.Crappy, 1, 5)
+        )
+        inputs = iter(["a", "auto"])
+
+        def mock_input(*args):
+            return next(inputs)
+
+        with patch('builtins.input', mock_input), \
+                contextlib.redirect_stdout(io.StringIO()):
+            action.attack(player, monster)
+
+        self.assertFalse(monster.is_alive())
+        self.assertEqual(player.hp, 71)
+
+    def test_stalemate_flees(self):
+        player = Player(
+            "Tester", 100,
+            Weapon("sword", 0, item.Rarity.Crappy, 1, 2),
+            Outfit("armor", 0, item.Rarity.Super, 50)
+        )
+        first_room = EmptyRoom.generate([Direction.North])
+        first_room.north = MonsterRoom.generate([Direction.South])
+        player.move_to(first_room)
+        player.go(Direction.North)
+        monster = player.current_room.monster
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            action.auto_attack(player, monster)
+
+        self.assertIs(player.current_room, first_room)
+        self.assertTrue(player.cur_weapon.is_broken())
+        self.assertIn("BROKEN", out.getvalue())
+        self.assertEqual(player.hp, 100)
+
+    def test_stalemate_without_attack(self):
+        player = Player(
+            "Tester", 100,
+            Weapon("sword", 0, item.Rarity.Crappy, 3, 5),
+            Outfit("armor", 0, item.Rarity.Super, 50)
+        )
+        player.add_effect('weakened', {'attack': -3})
+        player.move_to(EmptyRoom("hall", [Direction.North]))
+        monster = Enemy(
+            "slime", "slime", 10, Weapon("goo", 0, item.Rarity.Crappy, 1, 5)
+        )
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            action.auto_attack(player, monster)
+
+        self.assertFalse(player.cur_weapon.is_broken())
+        self.assertNotIn("BROKEN", out.getvalue())
+        self.assertIn("can't hurt the slime", out.getvalue())
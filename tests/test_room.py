@@ -3,6 +3,7 @@ from io import StringIO
 import unittest
 from unittest.mock import patch
 
+from adventure_game import enemy, hibernation, item
 from adventure_game.compass import Direction, DIRECTIONS
 from adventure_game.exceptions import NoSuchExitException
 from adventure_game.player import Player
@@ -90,3 +91,86 @@ class MonsterRoomTests(unittest.TestCase):
             options['run'].handler(player)
 
         self.assertIn(str(first_room), f.getvalue())
+
+
+class OptionsCacheTests(unittest.TestCase):
+    def test_options_are_reused_until_the_room_changes(self):
+        room = EmptyRoom("hall", [])
+        self.assertEqual(room.get_options(), {})
+        room.add_item(Weapon("sword", 0, item.Rarity.Crappy, 1, 5))
+        options = room.get_options()
+        self.assertEqual(list(options), ['look', 'ignore'])
+        self.assertIs(room.get_options(), options)
+
+        room.changed()
+        self.assertIsNot(room.get_options(), options)
+
+    def test_running_an_option_changes_the_room(self):
+        room = TreasureRoom("vault", [])
+        player = Player("Tester", 100)
+        player.move_to(room)
+        options = room.get_options()
+        self.assertIn('open', options)
+
+        with patch('builtins.input', lambda prompt: 'take all'), \
+                patch('adventure_game.chest.random.randint',
+                      lambda a, b: 0), \
+                contextlib.redirect_stdout(StringIO()):
+            options['open'].handler(player)
+        self.assertNotIn('open', room.get_options())
+
+    def test_monster_death(self):
+        monster = enemy.Enemy(
+            "rat", "rat", 1, Weapon("tooth", 0, item.Rarity.Crappy, 1, 100)
+        )
+        room = MonsterRoom("lair", [], monster)
+        player = Player("Tester", 100)
+        player.move_to(room)
+        self.assertIn('attack', room.get_options())
+
+        with patch('builtins.input', lambda prompt: 'a'), \
+                contextlib.redirect_stdout(StringIO()):
+            room.get_options()['attack'].handler(player)
+        self.assertFalse(monster.is_alive())
+        self.assertEqual(room.get_options(), {})
+
+    def test_cached_options_are_not_hibernated(self):
+        room = EmptyRoom("hall", [])
+        room.add_item(Weapon("sword", 0, item.Rarity.Crappy, 1, 5))
+        player = Player("Tester", 100)
+        player.move_to(room)
+        room.get_options()
+
+        restored, _ = hibernation.loads(hibernation.dumps(player))
+        self.assertEqual(
+            list(restored.current_room.get_options()), ['look', 'ignore']
+        )
+
+
+class DescriptionCacheTests(unittest.TestCase):
+    def test_description_follows_state(self):
+        room = EmptyRoom("A hall", [])
+        self.assertEqual(str(room), "A hall")
+        room.add_item(Weapon("sword", 0, item.Rarity.Crappy, 1, 5))
+        self.assertEqual(
+            str(room), "A hall. There is something lying on the floor"
+        )
+
+        monster = enemy.Enemy(
+            "ogre", "ogre", 1, Weapon("club", 0, item.Rarity.Crappy, 1, 1)
+        )
+        lair = MonsterRoom("A lair", [], monster)
+        self.assertEqual(str(lair), "A lair, with an ogre")
+        monster.take_damage(1)
+        lair.changed()
+        self.assertEqual(str(lair), "A lair, with the corpse of an ogre")
+
+        vault = TreasureRoom("A vault", [])
+        self.assertEqual(
+            str(vault), "A vault. An enticing chest sits in the centre"
+        )
+        vault.chest.is_open = True
+        vault.changed()
+        self.assertEqual(
+            str(vault), "A vault. An open, empty chest sits in the centre"
+        )
@@ -0,0 +1,156 @@
+import contextlib
+import unittest
+
+from adventure_game import console, messages, screen
+from adventure_game.player import Player
+from adventure_game.room import EmptyRoom
+from adventure_game.screen import ScreenConsole, diff
+
+
+class Window:
+    """A terminal window of fixed size, recording what is drawn."""
+    def __init__(self, lines, rows=20, cols=60):
+        self.lines = lines
+        self.size = (rows, cols)
+        self.cells = [[' '] * cols for _ in range(rows)]
+        self.region = (0, rows - 1)
+        self.cursor = (0, 0)
+        self.drawn = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, row, col, text):
+        self.cells[row][col:col + len(text)] = text
+        self.drawn += len(text)
+
+    def getstr(self, row, col, n):
+        return self.lines.pop(0).encode()
+
+    def erase(self):
+        self.cells = [[' '] * self.size[1] for _ in range(self.size[0])]
+
+    def setscrreg(self, top, bottom):
+        self.region = (top, bottom)
+
+    def scroll(self, n):
+        top, bottom = self.region
+        rows = self.cells[top:bottom + 1]
+        blank = [[' '] * self.size[1] for _ in range(n)]
+        self.cells[top:bottom + 1] = rows[n:] + blank
+
+    def row(self, i):
+        return ''.join(self.cells[i])
+
+    def move(self, row, col):
+        self.cursor = (row, col)
+
+    def clrtoeol(self):
+        row, col = self.cursor
+        self.cells[row][col:] = ' ' * (self.size[1] - col)
+
+    def refresh(self):
+        pass
+
+    def scrollok(self, flag):
+        pass
+
+
+class DiffTests(unittest.TestCase):
+    def test_runs(self):
+        self.assertEqual(list(diff(["abc"], ["abc"])), [])
+        self.assertEqual(
+            list(diff(["abcdefghijkl"], ["aXcdefghiYkl"])),
+            [(0, 1, "X"), (0, 9, "Y")]
+        )
+        # Changes close together are drawn as one run
+        self.assertEqual(
+            list(diff(["abcdefgh", "xy"], ["aXcYefgh", "xz"])),
+            [(0, 1, "XcY"), (1, 1, "z")]
+        )
+
+
+class ScreenConsoleTests(unittest.TestCase):
+    def setUp(self):
+        self.window = Window([])
+        self.screen = ScreenConsole(self.window)
+        self.player = Player("Tester", 100)
+        self.player.move_to(EmptyRoom("A dusty hall", []))
+        self.screen.player = self.player
+
+    def test_panes(self):
+        self.window.lines = ["go north"]
+        self.screen.write("Hello\n")
+        self.assertTrue(self.screen.show('exits', "There is a portal"))
+        self.assertFalse(self.screen.show('map', "There is no map"))
+        self.assertEqual(self.screen.read_line("Go where? "), "go north")
+        top, log_rows = ScreenConsole._layout(20)
+        self.assertTrue(self.window.row(0).startswith("Your weapons:"))
+        self.assertIn("| A dusty hall", self.window.row(0))
+        self.assertIn("| There is a portal", self.window.row(top - 1))
+        self.assertIn("Tester: hp 100", self.window.row(top))
+        self.assertEqual(self.window.row(top + log_rows).strip(), "Hello")
+        self.assertEqual(self.window.row(19).strip(), "Go where?")
+
+        # The panes are only shown with the prompt they were shown for
+        self.window.lines = ["go south"]
+        self.screen.read_line("Go where? ")
+        self.assertNotIn("portal", self.window.row(top - 1))
+
+    def test_room_not_logged(self):
+        with contextlib.ExitStack() as stack:
+            console.bind(self.screen)
+            stack.callback(console.bind, None)
+            messages.print_enter(self.player.current_room)
+        self.assertEqual(self.screen.tail(), [])
+
+    def test_only_changes_drawn(self):
+        self.window.lines = ["a", "b", "c"]
+        self.screen.read_line("> ")
+        first = self.window.drawn
+        self.screen.write("You picked up a sword!\n")
+        self.screen.read_line("> ")
+        # Only the line scrolled into the log is drawn
+        self.assertEqual(
+            self.window.drawn - first, len("You picked up a sword!")
+        )
+
+        # The status bar is drawn again, but none of the other panes
+        self.player.take_damage(10)
+        before = self.window.drawn
+        self.screen.read_line("> ")
+        self.assertLess(self.window.drawn - before, 60)
+        self.screen.draw()
+        self.assertEqual(
+            [self.window.row(i) for i in range(19)], self.screen.compose()
+        )
+
+    def test_scrolling_matches_frame(self):
+        self.window.lines = ["x"] * 10
+        for i in range(10):
+            self.screen.write(f"line {i}\n" * i)
+            self.screen.read_line("> ")
+            self.screen.draw()
+            self.assertEqual(
+                [self.window.row(j) for j in range(19)],
+                self.screen.compose()
+            )
+
+    def test_escapes_stripped(self):
+        self.screen.write("\033[4mtake\033[0m it\n")
+        self.assertEqual(self.screen.tail(), ["take it"])
+
+    def test_routes_output(self):
+        with contextlib.ExitStack() as stack:
+            console.route_stdout()
+            console.bind(self.screen)
+            stack.callback(console.bind, None)
+            print("You enter a room.")
+        self.assertEqual(self.screen.tail(), ["You enter a room."])
+
+
+class OpenScreenTests(unittest.TestCase):
+    def test_falls_back_without_terminal(self):
+        # The tests are not run in a terminal the screen could take over
+        with screen.open_screen() as screen_console:
+            self.assertIsNone(screen_console)
@@ -0,0 +1,207 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from adventure_game import item, realtime
+from adventure_game.compass import DIRECTIONS
+from adventure_game.enemy import Enemy
+from adventure_game.hibernation import HibernationStore
+from adventure_game.room import EmptyRoom, MonsterRoom
+from adventure_game.server import GameServer, Spectator
+from adventure_game.weapon import Weapon
+from adventure_game.world import SharedWorld
+
+
+class GameServerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Don't keep the tests waiting on the suspense of sprung traps
+        sleep_patch = patch('adventure_game.action.time.sleep', lambda s: None)
+        sleep_patch.start()
+        self.addCleanup(sleep_patch.stop)
+        # Start in rooms without traps, which could kill the players
+        room_patch = patch(
+            'adventure_game.player.generate_first_room',
+            lambda: EmptyRoom("hall", DIRECTIONS)
+        )
+        room_patch.start()
+        self.addCleanup(room_patch.stop)
+        self.server = GameServer(port=0, idle_timeout=5)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.shutdown()
+
+    async def connect(self, name):
+        reader, writer = await asyncio.open_connection(
+            '127.0.0.1', self.server.port
+        )
+        await self.read_until(reader, b"name: ")
+        writer.write(f"{name}\n".encode())
+        await self.read_until(reader, b"What would you like to do? ")
+        return reader, writer
+
+    async def read_until(self, reader, marker):
+        return await asyncio.wait_for(reader.readuntil(marker), 5)
+
+    async def test_sessions_are_independent(self):
+        clients = [await self.connect(name) for name in ["Ann", "Bob"]]
+        self.assertEqual(len(self.server.sessions), 2)
+        for (reader, writer), name in zip(clients, ["Ann", "Bob"]):
+            writer.write(b"me\r\n")
+            output = await self.read_until(reader, b"What would you like")
+            self.assertIn(f"{name}: hp".encode(), output)
+        players = {s.player for s in self.server.sessions}
+        self.assertEqual(len({p.current_room for p in players}), 2)
+        for _, writer in clients:
+            writer.close()
+
+    async def test_disconnect_ends_session(self):
+        _, writer = await self.connect("Ann")
+        writer.close()
+        for _ in range(50):
+            if not self.server.sessions:
+                break
+            await asyncio.sleep(0.05)
+        self.assertFalse(self.server.sessions)
+
+    async def test_idle_timeout(self):
+        self.server.idle_timeout = 0.5
+        reader, writer = await self.connect("Ann")
+        output = await asyncio.wait_for(reader.read(), 5)
+        self.assertIn(b"idle for too long", output)
+        writer.close()
+
+    async def test_shutdown_says_goodbye(self):
+        reader, writer = await self.connect("Ann")
+        await self.server.shutdown()
+        output = await asyncio.wait_for(reader.read(), 5)
+        self.assertIn(b"shutting down", output)
+        self.assertFalse(self.server.sessions)
+        writer.close()
+
+    async def test_shared_world(self):
+        # A start room without a trap, which could send a player elsewhere
+        self.server.world = SharedWorld(EmptyRoom("hall", DIRECTIONS))
+        clients = [await self.connect(name) for name in ["Ann", "Bob"]]
+        rooms = {s.player.current_room for s in self.server.sessions}
+        self.assertEqual(rooms, {self.server.world.start_room})
+        for _, writer in clients:
+            writer.close()
+
+    async def test_hibernation(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.server.store = HibernationStore(directory.name)
+        self.server.hibernate_after = 0.3
+        reader, writer = await self.connect("Ann")
+        writer.write(b"me\n")
+        before = await self.read_until(reader, b"What would you like")
+        before = before[before.index(b"Ann: hp"):].splitlines()[0]
+
+        session, = self.server.sessions
+        for _ in range(50):
+            if session.hibernated:
+                break
+            await asyncio.sleep(0.05)
+        self.assertTrue(session.hibernated)
+        self.assertIsNone(session.player)
+        self.assertIn("0 resident, 1 hibernated", self.server.status())
+
+        writer.write(b"me\n")
+        after = await self.read_until(reader, b"Ann: hp")
+        after += await self.read_until(reader, b"What would you like")
+        self.assertIn(before, after)
+        self.assertFalse(session.hibernated)
+        self.assertIn("1 resident, 0 hibernated", self.server.status())
+        self.assertIn("restore latency", self.server.status())
+        self.assertEqual(len(self.server.store), 0)
+        writer.close()
+
+    async def test_spectators(self):
+        reader, writer = await self.connect("Ann")
+        watchers = []
+        for _ in range(3):
+            w_reader, w_writer = await asyncio.open_connection(
+                '127.0.0.1', self.server.port
+            )
+            await self.read_until(w_reader, b"name: ")
+            w_writer.write(b"watch Ann\n")
+            await self.read_until(w_reader, b"now watching Ann")
+            watchers.append((w_reader, w_writer))
+        self.assertIn("3 spectators", self.server.status())
+
+        writer.write(b"me\n")
+        await self.read_until(reader, b"Ann: hp")
+        for w_reader, _ in watchers:
+            output = await self.read_until(w_reader, b"Ann: hp")
+            self.assertIn(b"me\r\n", output)
+
+        writer.close()
+        for w_reader, w_writer in watchers:
+            output = await asyncio.wait_for(w_reader.read(), 5)
+            self.assertIn(b"game of Ann has ended", output)
+            w_writer.close()
+
+    async def test_watch_unknown_player(self):
+        reader, writer = await asyncio.open_connection(
+            '127.0.0.1', self.server.port
+        )
+        await self.read_until(reader, b"name: ")
+        writer.write(b"watch Nobody\n")
+        output = await asyncio.wait_for(reader.read(), 5)
+        self.assertIn(b"nobody called Nobody", output)
+        writer.close()
+
+    async def test_realtime_monster_attacks(self):
+        await self.server.shutdown()
+        monster = Enemy(
+            "big troll", "troll", 10,
+            Weapon("club", 0, item.Rarity.Crappy, 60, 100)
+        )
+        room_patch = patch(
+            'adventure_game.player.generate_first_room',
+            lambda: MonsterRoom("cave", DIRECTIONS, monster)
+        )
+        cooldown_patch = patch.object(realtime, 'MONSTER_COOLDOWN', 0.2)
+        for p in (room_patch, cooldown_patch):
+            p.start()
+            self.addCleanup(p.stop)
+        self.server = GameServer(port=0, idle_timeout=5, realtime=True)
+        await self.server.start()
+        self.assertIn("timers pending", self.server.status())
+
+        # The player stands still, and the troll attacks until they die
+        reader, writer = await self.connect("Ann")
+        output = await asyncio.wait_for(reader.read(), 5)
+        self.assertEqual(output.count(b"The troll attacks you!"), 2)
+        self.assertIn(b"You have 40 hp left.", output)
+        self.assertIn(b"RIP", output)
+        writer.close()
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+class SpectatorTests(unittest.IsolatedAsyncioTestCase):
+    async def test_slow_spectator_skips_ahead(self):
+        writer = FakeWriter()
+        spectator = Spectator(writer, queue_size=2)
+        for i in range(5):
+            spectator.feed(f"message {i}\n".encode())
+        self.assertEqual(spectator.dropped, 3)
+
+        spectator.close()
+        await spectator.run()
+        self.assertEqual(
+            writer.data,
+            b"\r\n[... skipped 3 messages ...]\r\nmessage 3\nmessage 4\n"
+        )
@@ -0,0 +1,180 @@
+import asyncio
+import random
+import re
+import unittest
+from unittest.mock import patch
+
+from adventure_game import hibernation
+from adventure_game.compass import DIRECTIONS, get_opposite_dir
+from adventure_game import shards
+from adventure_game.exceptions import (
+    PlayerHandoffException, RoomUnavailableException
+)
+from adventure_game.player import Player
+from adventure_game.shards import (
+    RemoteRoom, ShardedServer, ShardedWorld, ShardSession, ShardWorker
+)
+
+
+class DirectLink:
+    """Links shards in the same process, for testing."""
+    def __init__(self):
+        self.worlds = []
+
+    def request_room(self, owner, coords, d, from_id):
+        return self.worlds[owner].generate_remote_exit_room(
+            coords, d, from_id
+        )
+
+
+def sharded_worlds(shards):
+    link = DirectLink()
+    link.worlds = [
+        ShardedWorld(shard, shards, link, region_size=1)
+        for shard in range(shards)
+    ]
+    return link.worlds
+
+
+def remote_exit(world):
+    """Finds an exit of the world's starting room leading to another shard."""
+    for d in DIRECTIONS:
+        if isinstance(getattr(world.start_room, d.name.lower()), RemoteRoom):
+            return d
+    return None
+
+
+class ShardedWorldTests(unittest.TestCase):
+    def test_room_ids_identify_owners(self):
+        worlds = sharded_worlds(3)
+        for shard, world in enumerate(worlds):
+            for d in DIRECTIONS:
+                room = getattr(world.start_room, d.name.lower())
+                self.assertEqual(room.id % 3, world.owner(
+                    worlds[room.id % 3].coords[room.id]
+                ))
+            self.assertEqual(world.start_room.id % 3, shard)
+
+    def test_rooms_are_generated_by_their_owner(self):
+        first, second = sharded_worlds(2)
+        d = remote_exit(first)
+        if d is None:
+            self.skipTest("Every exit stayed in the same shard")
+        stand_in = getattr(first.start_room, d.name.lower())
+        room = second.rooms[stand_in.id]
+        # The room leads back to a stand-in for the room it was reached from
+        back = getattr(room, get_opposite_dir(d).name.lower())
+        self.assertIsInstance(back, RemoteRoom)
+        self.assertEqual(back.id, first.start_room.id)
+
+    def test_player_handoff(self):
+        first, second = sharded_worlds(2)
+        d = remote_exit(first)
+        if d is None:
+            self.skipTest("Every exit stayed in the same shard")
+        player = Player("Tester", 100)
+        player.move_to(first.start_room)
+        with self.assertRaises(PlayerHandoffException) as cm:
+            player.go(d)
+        self.assertEqual(cm.exception.room_id % 2, 1)
+
+        restored, _ = hibernation.loads(hibernation.dumps(player), second)
+        room_id = cm.exception.room_id
+        self.assertIs(restored.current_room, second.rooms[room_id])
+        self.assertIsInstance(restored.previous_room, RemoteRoom)
+        # Going back hands the player back to the first shard
+        with self.assertRaises(PlayerHandoffException) as cm:
+            restored.retreat()
+        self.assertEqual(cm.exception.room_id, first.start_room.id)
+
+
+class SilentConnection:
+    """A connection to a coordinator which never replies."""
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+class ShardWorkerTests(unittest.TestCase):
+    def test_remote_rooms_are_never_generated(self):
+        self.assertFalse(hasattr(RemoteRoom, 'generate'))
+
+    def test_unanswered_room_request(self):
+        worker = ShardWorker(0, 2, SilentConnection())
+        with patch.object(shards, 'ROOM_REQUEST_TIMEOUT', 0.01):
+            with self.assertRaises(RoomUnavailableException):
+                worker.request_room(1, (0, 1), DIRECTIONS[0], 0)
+        # A late reply is dropped
+        request_id = worker.conn.sent[0][2]
+        worker._reply(request_id, 3)
+        self.assertEqual(worker._requests, {})
+
+    def test_player_returning_at_once_keeps_their_session(self):
+        worker = ShardWorker(0, 2, SilentConnection())
+        session = worker.sessions['key'] = ShardSession(worker, 'key')
+
+        def come_back(message):
+            # The player is handed straight back to this shard
+            worker.conn.sent.append(message)
+            worker.sessions['key'] = ShardSession(worker, 'key')
+
+        worker.conn.send = come_back
+        player = Player("Tester", 100)
+        player.move_to(worker.world.start_room)
+        with patch('adventure_game.run.play', side_effect=(
+                PlayerHandoffException(1)
+        )):
+            session.play(player, None)
+        self.assertEqual(worker.conn.sent[0][0], 'handoff')
+        self.assertIsNot(worker.sessions['key'], session)
+
+
+class ShardedServerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Patched before the workers are forked, so that traps don't kill
+        # the player in the middle of the test
+        trap_patch = patch(
+            'adventure_game.action.trigger_trap', lambda player, trap: False
+        )
+        trap_patch.start()
+        self.addCleanup(trap_patch.stop)
+        self.server = ShardedServer(2, port=0, region_size=1)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.shutdown()
+
+    async def read_until(self, reader, marker):
+        return await asyncio.wait_for(reader.readuntil(marker), 10)
+
+    async def test_walk_across_shards(self):
+        reader, writer = await asyncio.open_connection(
+            '127.0.0.1', self.server.port
+        )
+        await self.read_until(reader, b"name: ")
+        writer.write(b"Ann\n")
+        for _ in range(40):
+            output = (await self.read_until(reader, b"do? ")).decode()
+            exits = re.findall(r"portals to the ([\w, ]+)\.", output)
+            if exits and output.rfind("portals") > output.rfind("\x1b[4m"):
+                # Choosing an exit
+                directions = re.findall(r"North|South|East|West", exits[-1])
+                writer.write(f"go {random.choice(directions)}\n".encode())
+            else:
+                # Avoid everything the room has to offer
+                options = {
+                    o.lower()
+                    for o in re.findall(r"\x1b\[4m(\w+)\x1b\[0m", output)
+                }
+                avoid = {'run', 'leave', 'ignore'} & options
+                writer.write(f"{avoid.pop() if avoid else 'run'}\n".encode())
+            if self.server.handoffs >= 2:
+                break
+        await self.read_until(reader, b"do? ")
+        self.assertGreaterEqual(self.server.handoffs, 2)
+        self.assertIn("1 players over 2 shards", self.server.status())
+        writer.write(b"me\n")
+        self.assertIn(b"Ann: hp 100", await self.read_until(reader, b"do? "))
+        writer.close()
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import unittest
+from unittest.mock import patch
+
+from adventure_game import action, item
+from adventure_game.enemy import ENEMY_BANK, Enemy
+from adventure_game.outfit import Outfit
+from adventure_game.player import Player
+from adventure_game.simulation import (
+    FightSpec, LOADOUT_RARITIES, Result, fight_spec, resolve_batch, simulate
+)
+from adventure_game.weapon import Weapon
+
+
+def make_fight(weapon=None, outfit=None, enemy_hp=30, enemy_damage=5):
+    player = Player("Tester", 100, weapon, outfit)
+    enemy = Enemy(
+        "beast", "beast", enemy_hp,
+        Weapon("claws", 0, item.Rarity.Common, enemy_damage, 100)
+    )
+    return player, enemy
+
+
+class ResolveBatchTests(unittest.TestCase):
+    def test_matches_attack_loop(self):
+        fights = [
+            # Unarmed
+            make_fight(enemy_hp=10, enemy_damage=3),
+            # Armed, with an outfit
+            make_fight(
+                Weapon("sword", 0, item.Rarity.Common, 5, 10),
+                Outfit("vest", 0, item.Rarity.Common, 2)
+            ),
+            # The weapon breaks part way through the fight
+            make_fight(Weapon("sword", 0, item.Rarity.Crappy, 3, 2)),
+            # The player loses
+            make_fight(
+                Weapon("dagger", 0, item.Rarity.Crappy, 2, 30),
+                enemy_hp=100, enemy_damage=25
+            ),
+        ]
+        specs = [fight_spec(player, enemy) for player, enemy in fights]
+        outcomes = resolve_batch(specs)
+
+        for (player, enemy), outcome in zip(fights, outcomes):
+            with self.subTest(outcome=outcome):
+                weapon = player.cur_weapon
+                durability = None if weapon is None else weapon.durability
+                with patch('builtins.input', lambda *args: 'a'), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    action.attack(player, enemy)
+
+                self.assertEqual(
+                    outcome.result,
+                    Result.Won if player.is_alive() else Result.Lost
+                )
+                self.assertEqual(outcome.hp_lost, 100 - player.hp)
+                if weapon is not None:
+                    self.assertEqual(
+                        outcome.durability_used,
+                        durability - weapon.durability
+                    )
+
+    def test_rounds(self):
+        outcome, = resolve_batch([FightSpec(100, 5, 10, 30, 5)])
+        self.assertEqual(outcome.result, Result.Won)
+        self.assertEqual(outcome.rounds, 6)
+        # The enemy strikes back after every round but the last
+        self.assertEqual(outcome.hp_lost, 25)
+        self.assertEqual(outcome.durability_used, 6)
+
+    def test_stalemate(self):
+        outcome, = resolve_batch([FightSpec(100, 5, 2, 30, 0)])
+        self.assertEqual(outcome.result, Result.Stalemate)
+        self.assertEqual(outcome.rounds, 2)
+        self.assertEqual(outcome.hp_lost, 0)
+
+
+class SimulateTests(unittest.TestCase):
+    def test_every_cell_simulated(self):
+        results = simulate(fights_per_cell=20, seed=1)
+        self.assertEqual(
+            len(results), len(ENEMY_BANK) * len(LOADOUT_RARITIES) ** 2
+        )
+        for stats in results.values():
+            self.assertEqual(stats.fights, 20)
+            self.assertGreaterEqual(stats.win_rate, 0)
+            self.assertLessEqual(stats.win_rate, 1)
+
+    def test_seed_is_reproducible(self):
+        first = simulate(fights_per_cell=20, seed=7)
+        second = simulate(fights_per_cell=20, seed=7)
+        for cell in first:
+            self.assertEqual(first[cell].results, second[cell].results)
+            self.assertEqual(first[cell].rounds, second[cell].rounds)
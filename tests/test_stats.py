@@ -0,0 +1,87 @@
+import unittest
+
+from adventure_game import constants
+from adventure_game.enemy import Enemy
+from adventure_game.item import Rarity
+from adventure_game.outfit import Outfit
+from adventure_game.player import Player
+from adventure_game.resolver import apply_outcome, resolve_fight
+from adventure_game.room import EmptyRoom
+from adventure_game.stats import StatSheet
+from adventure_game.weapon import Weapon
+
+
+class StatSheetTests(unittest.TestCase):
+    def test_totals(self):
+        sheet = StatSheet()
+        sheet.apply('weapon', {'attack': 5, 'luck': 2})
+        sheet.apply('outfit', {'defence': 3, 'luck': 4})
+        self.assertEqual(
+            (sheet.attack, sheet.defence, sheet.luck), (5, 3, 6)
+        )
+        self.assertEqual(sheet.excluding('luck', ['weapon']), 4)
+
+        # Applying a source again replaces its modifiers
+        version = sheet.version
+        sheet.apply('weapon', {'attack': 1})
+        self.assertEqual((sheet.attack, sheet.luck), (1, 4))
+        self.assertNotEqual(sheet.version, version)
+
+        sheet.remove('outfit')
+        sheet.remove('outfit')
+        self.assertNotIn('outfit', sheet)
+        self.assertEqual((sheet.defence, sheet.luck), (0, 0))
+
+
+class PlayerStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.sword = Weapon("sword", 3, Rarity.Common, 6, 5)
+        self.vest = Outfit("vest", 4, Rarity.Common, 2)
+        self.player = Player("Tester", 100, self.sword, self.vest)
+        self.player.move_to(EmptyRoom("A dusty hall", []))
+
+    def stats(self):
+        return (
+            self.player.get_attack(), self.player.get_defence(),
+            self.player.get_luck()
+        )
+
+    def test_follow_equipment(self):
+        self.assertEqual(self.stats(), (6, 2, 7))
+        axe = Weapon("axe", 10, Rarity.Super, 9, 5)
+        self.player.pick_up_item(axe)
+        self.player.change_item('weapon', axe)
+        self.assertEqual(self.stats(), (9, 2, 14))
+        self.player.throw()
+        # Fists deal 1 damage
+        self.assertEqual(self.stats(), (1, 2, 4))
+        self.player.unequip('outfit')
+        self.assertEqual(self.stats(), (1, 0, 0))
+
+    def test_effects(self):
+        self.player.add_effect('blessed', {'luck': 30, 'attack': 2})
+        self.assertEqual(self.stats(), (8, 2, constants.MAX_LUCK))
+        self.player.add_effect('cursed', {'luck': -50, 'defence': -5})
+        self.assertEqual(self.stats(), (8, 0, 0))
+        self.player.remove_effect('blessed')
+        self.player.remove_effect('cursed')
+        self.assertEqual(self.stats(), (6, 2, 7))
+
+    def test_fights_use_stats(self):
+        self.player.add_effect('strength', {'attack': 4, 'defence': 1})
+        enemy = Enemy(
+            "towering ogre", "ogre", 25,
+            Weapon("club", 0, Rarity.Common, 8, 100)
+        )
+        outcome = resolve_fight(self.player, enemy)
+        # Three strikes of 10, with two of the ogre's of 8 - 3 between them
+        self.assertEqual((outcome.rounds, outcome.hp_lost), (3, 10))
+        apply_outcome(self.player, enemy, outcome)
+        self.assertFalse(enemy.is_alive())
+        self.assertEqual(self.player.hp, 90)
+
+        enemy.hp = 25
+        enemy.attack(self.player)
+        self.assertEqual(self.player.hp, 85)
+        self.player.attack(enemy)
+        self.assertEqual(enemy.hp, 15)
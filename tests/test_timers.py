@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+
+from adventure_game.timers import LEVEL_SLOTS, TimerWheel, drive
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+class TimerWheelTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.1, clock=self.clock)
+        self.fired = []
+
+    def schedule(self, delay, name):
+        return self.wheel.schedule(delay, self.fired.append, name)
+
+    def test_fires_after_delay(self):
+        self.schedule(0.5, 'a')
+        self.assertEqual(self.wheel.advance(4), 0)
+        self.assertEqual(self.wheel.advance(1), 1)
+        self.assertEqual(self.fired, ['a'])
+        self.assertFalse(self.wheel)
+
+    def test_delays_are_rounded_up_to_a_tick(self):
+        self.schedule(0, 'now')
+        self.schedule(0.11, 'later')
+        self.wheel.advance(1)
+        self.assertEqual(self.fired, ['now'])
+        self.wheel.advance(1)
+        self.assertEqual(self.fired, ['now', 'later'])
+
+    def test_fires_in_order_across_levels(self):
+        ticks = [1, 255, 256, 257, 300, 256 * 64, 256 * 64 + 1, 10 ** 6]
+        for t in reversed(ticks):
+            self.schedule(t * 0.1, t)
+        for t in ticks:
+            self.wheel.advance(t - self.wheel.now - 1)
+            self.assertNotIn(t, self.fired)
+            self.wheel.advance(1)
+            self.assertEqual(self.fired[-1], t)
+        self.assertEqual(self.fired, ticks)
+
+    def test_timers_beyond_the_wheel(self):
+        span = 1
+        for slots in LEVEL_SLOTS:
+            span *= slots
+        timer = self.schedule((2 * span + 5) * 0.1, 'far')
+        self.wheel.advance(2 * span + 4)
+        self.assertTrue(timer.pending)
+        self.wheel.advance(1)
+        self.assertEqual(self.fired, ['far'])
+
+    def test_cancel(self):
+        timer = self.schedule(1, 'a')
+        self.schedule(1, 'b')
+        timer.cancel()
+        timer.cancel()
+        self.assertFalse(timer.pending)
+        self.assertEqual(len(self.wheel), 1)
+        self.wheel.advance(10)
+        self.assertEqual(self.fired, ['b'])
+
+    def test_callbacks_may_reschedule(self):
+        def repeat():
+            self.fired.append(self.wheel.now)
+            if len(self.fired) < 3:
+                self.wheel.schedule(0.2, repeat)
+
+        self.wheel.schedule(0.2, repeat)
+        self.wheel.advance(100)
+        self.assertEqual(self.fired, [2, 4, 6])
+
+    def test_advance_to_follows_the_clock(self):
+        self.schedule(1, 'a')
+        self.clock.now = 0.95
+        self.assertEqual(self.wheel.advance_to(), 0)
+        self.clock.now = 1.05
+        self.assertEqual(self.wheel.advance_to(), 1)
+
+    def test_idle_wheel_skips_ahead(self):
+        self.wheel.advance(10 ** 9)
+        self.assertEqual(self.wheel.now, 10 ** 9)
+        self.schedule(0.1, 'a')
+        self.wheel.advance(1)
+        self.assertEqual(self.fired, ['a'])
+
+
+class DriveTests(unittest.IsolatedAsyncioTestCase):
+    async def test_drive_fires_timers_on_the_loop(self):
+        wheel = TimerWheel(tick=0.01)
+        fired = asyncio.Event()
+        wheel.schedule(0.05, fired.set)
+        driver = asyncio.ensure_future(drive(wheel))
+        try:
+            await asyncio.wait_for(fired.wait(), 5)
+        finally:
+            driver.cancel()
@@ -1,6 +1,9 @@
+import contextlib
+import io
 import unittest
+from unittest.mock import patch
 
-from adventure_game import item, room
+from adventure_game import item, room, utils
 from adventure_game.compass import Direction
 from adventure_game.outfit import Outfit
 from adventure_game.player import Player
@@ -28,6 +31,10 @@ class ParseMovementTests(unittest.TestCase):
                     d
                 )
 
+    def test_parse_abbreviations(self):
+        self.assertEqual(parse_movement_instr('go', 'n'), Direction.North)
+        self.assertEqual(parse_movement_instr('go', 'We'), Direction.West)
+
     def test_parse_no_go(self):
         with self.assertRaises(InvalidInstruction):
             parse_movement_instr('move', 'north')
@@ -111,3 +118,109 @@ class DropTests(unittest.TestCase):
     def test_drop_no_such_item_type(self):
         player = Player("Tester", 100)
         drop(player, "t1")
+
+
+class InventoryTests(unittest.TestCase):
+    def setUp(self):
+        self.player = Player("Tester", 100)
+        self.player.move_to(room.EmptyRoom.generate([]))
+        for i in range(8):
+            self.player.pick_up_item(
+                Weapon(f"sword {i}", i, item.Rarity.Common, 8 - i, 10)
+            )
+
+    def shown(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            utils.show_inventory(self.player, *args)
+        return output.getvalue()
+
+    def test_numbers_stay_with_items(self):
+        drop(self.player, "w2")
+        self.assertIn("3. sword 2", self.shown())
+        drop(self.player, "w3")
+        self.assertNotIn("sword 2", self.shown())
+        self.assertEqual(self.player.weapons.get(4).name, "sword 3")
+
+    def test_search(self):
+        self.assertEqual(
+            self.shown("w", "attack>5", "by:luck").splitlines()[1:],
+            ["3. sword 2 [attack: 6, durability: 10, luck: 2]",
+             "2. sword 1 [attack: 7, durability: 10, luck: 1]",
+             "1. sword 0 [attack: 8, durability: 10, luck: 0]"]
+        )
+        self.assertIn("None of your weapons match", self.shown("w", "luck>8"))
+        self.assertIn("not a valid search term", self.shown("w", "by:size"))
+        self.assertIn("one of w/o/f", self.shown("x"))
+
+
+class CommandLineTests(unittest.TestCase):
+    def setUp(self):
+        self.player = Player("Tester", 100)
+        self.lines = []
+        self.output = io.StringIO()
+        self.addCleanup(utils.interrupt)
+        stack = contextlib.ExitStack()
+        stack.enter_context(
+            patch('builtins.input', lambda prompt: self.lines.pop(0))
+        )
+        stack.enter_context(contextlib.redirect_stdout(self.output))
+        self.addCleanup(stack.close)
+
+    def instr(self, commands):
+        return utils.get_user_instr("What now?", self.player, commands)
+
+    def test_several_commands(self):
+        self.lines = ["go north; ignore ;go s", "go east"]
+        self.assertEqual(self.instr(['go']), ('go', ['north']))
+        self.assertEqual(self.instr(['ignore']), ('ignore', []))
+        self.assertEqual(self.instr(['go']), ('go', ['south']))
+        # The line is used up before another is read
+        self.assertEqual(self.instr(['go']), ('go', ['east']))
+        self.assertIn("What now? ignore", self.output.getvalue())
+
+    def test_invalid_command_stops_line(self):
+        self.lines = ["go north; take all; go south", "go east"]
+        self.assertEqual(self.instr(['go']), ('go', ['north']))
+        self.assertIsNone(self.instr(['go']))
+        self.assertIn("Skipped: go south", self.output.getvalue())
+        self.assertEqual(self.instr(['go']), ('go', ['east']))
+
+    def test_interrupt(self):
+        self.lines = ["go north; go south", "go east"]
+        self.assertEqual(self.instr(['go']), ('go', ['north']))
+        utils.interrupt()
+        self.assertEqual(self.instr(['go']), ('go', ['east']))
+
+    def test_macros(self):
+        self.lines = ["loot = open; take all", "loot; go west", "macros"]
+        self.assertIsNone(self.instr(['go']))
+        self.assertEqual(self.player.macros, {'loot': ['open', 'take all']})
+        self.assertEqual(self.instr(['open']), ('open', []))
+        self.assertEqual(self.instr(['take']), ('take', ['all']))
+        self.assertEqual(self.instr(['go']), ('go', ['west']))
+        self.assertIsNone(self.instr(['go']))
+        self.assertIn("loot = open; take all", self.output.getvalue())
+
+    def test_comparisons_are_not_macros(self):
+        self.player.pick_up_item(
+            Weapon("sword", 0, item.Rarity.Common, 3, 10)
+        )
+        self.lines = ["items w attack>=1", "items w luck<=0; items w luck=1"]
+        self.assertIsNone(utils.prompt_player("What now?", self.player))
+        self.assertIn("1. sword [attack: 3", self.output.getvalue())
+        self.assertIsNone(utils.prompt_player("What now?", self.player))
+        self.assertIsNone(utils.prompt_player("What now?", self.player))
+        self.assertEqual(self.output.getvalue().count("1. sword"), 2)
+        self.assertIn("None of your weapons match", self.output.getvalue())
+        self.assertNotIn("macro", self.output.getvalue())
+        self.assertEqual(self.player.macros, {})
+
+    def test_macro_definitions(self):
+        utils.define_macro(self.player, "go", "go north")
+        utils.define_macro(self.player, "two words", "go north")
+        self.assertEqual(self.player.macros, {})
+        utils.define_macro(self.player, "up", "go north")
+        self.assertEqual(self.player.macros, {'up': ['go north']})
+        utils.define_macro(self.player, "up", " ")
+        self.assertEqual(self.player.macros, {})
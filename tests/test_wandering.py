@@ -0,0 +1,137 @@
+import collections
+import random
+import unittest
+from unittest.mock import patch
+
+from adventure_game import item, wandering
+from adventure_game.compass import Direction
+from adventure_game.enemy import Enemy
+from adventure_game.player import Player
+from adventure_game.room import EmptyRoom
+from adventure_game.weapon import Weapon
+from adventure_game.world import SharedWorld
+
+
+def troll():
+    return Enemy(
+        "big troll", "troll", 10, Weapon("club", 0, item.Rarity.Crappy, 1, 5)
+    )
+
+
+class WanderingMonstersTests(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        exits = [Direction.North, Direction.South]
+        self.world = SharedWorld(EmptyRoom("room 0", exits))
+        self.monsters = wandering.WanderingMonsters(self.world, 0)
+        # A corridor of rooms leading north
+        self.rooms = [self.world.start_room]
+        for i in range(1, 30):
+            room = self.world.adopt(EmptyRoom(f"room {i}", exits))
+            self.rooms[-1].north = room
+            room.south = self.rooms[-1]
+            self.rooms.append(room)
+        self.heard = []
+
+    def join(self, room):
+        player = Player("Tester", 100)
+        player.move_to(room)
+        self.world.join(player, self.heard.append)
+        return player
+
+    def test_spawned_monsters_can_be_fought(self):
+        monster = troll()
+        self.monsters.spawn(monster, self.rooms[3])
+        self.assertEqual(self.rooms[3].wanderers, [monster])
+        self.assertIs(self.rooms[3].living_monster(), monster)
+        self.assertIn('attack', self.rooms[3].get_options())
+
+    def test_rooms_spawn_monsters_when_generated(self):
+        self.monsters.spawn_chance = 1
+        room = self.world.start_room
+        room.exits = [Direction.North, Direction.South, Direction.East]
+        self.assertEqual(len(room.east.wanderers), 1)
+        self.assertEqual(len(self.monsters), 1)
+
+    def test_only_monsters_near_players_are_simulated(self):
+        for room in self.rooms:
+            self.monsters.spawn(troll(), room)
+        self.join(self.rooms[0])
+        # Rooms 0 to 2 are near the player, and the monsters of rooms 0 to 5
+        # may roam into them
+        self.assertEqual(self.monsters.step(), 6)
+        far = self.monsters.wanderers[self.rooms[-1].wanderers[0]]
+        self.assertEqual(far.updated, 0)
+
+    def test_monsters_left_out_of_sight_are_caught_up(self):
+        wanderer = self.monsters.spawn(troll(), self.rooms[10])
+        self.monsters._move(wanderer, self.rooms[13], announce=False)
+        # Room 13 is out of sight of the player, but within the range
+        self.join(self.rooms[8])
+        self.monsters.step()
+        self.assertEqual(wanderer.updated, self.monsters.now)
+
+    def test_killed_monsters_are_cleared_away(self):
+        monster = troll()
+        self.monsters.spawn(monster, self.rooms[20])
+        player = self.join(self.rooms[20])
+        with patch('adventure_game.action.attack') as attack:
+            attack.side_effect = (
+                lambda player, monster, lock: monster.take_damage(monster.hp)
+            )
+            self.rooms[20].get_options()['attack'].handler(player)
+        # The player leaves before the next tick
+        player.move_to(self.rooms[0])
+        self.monsters.step()
+        self.assertFalse(self.rooms[20].wanderers)
+        self.assertFalse(self.monsters)
+
+    def test_monsters_stay_in_their_range(self):
+        wanderer = self.monsters.spawn(troll(), self.rooms[10])
+        self.join(self.rooms[10]).move_to(self.rooms[20])
+        self.join(self.rooms[10]).move_to(self.rooms[0])
+        for _ in range(200):
+            self.monsters.step()
+            self.assertLessEqual(
+                abs(self.rooms.index(wanderer.room) - 10),
+                wandering.HOME_RANGE
+            )
+        self.assertEqual(
+            [r for r in self.rooms if r.wanderers], [wanderer.room]
+        )
+
+    def test_monsters_stay_with_players(self):
+        wanderer = self.monsters.spawn(troll(), self.rooms[5])
+        self.join(self.rooms[5])
+        for _ in range(50):
+            self.monsters.step()
+        self.assertIs(wanderer.room, self.rooms[5])
+
+    def test_players_nearby_hear_monsters_wander(self):
+        wanderer = self.monsters.spawn(troll(), self.rooms[5])
+        self.join(self.rooms[4])
+        while wanderer.room is self.rooms[5]:
+            self.monsters.step()
+        self.assertIn("From the North: The troll wandered off.", self.heard)
+
+    def test_caught_up_monsters_follow_the_walk_odds(self):
+        # The range of a monster at the end of the corridor is rooms 0 to 3,
+        # in which rooms 1 and 2 have twice as many exits as rooms 0 and 3
+        counts = collections.Counter()
+        for _ in range(3000):
+            wanderer = self.monsters.spawn(troll(), self.world.start_room)
+            wanderer.updated = -1000
+            self.monsters._catch_up(wanderer)
+            counts[self.rooms.index(wanderer.room)] += 1
+            wanderer.room.wanderers.clear()
+        for i, share in enumerate([1 / 6, 2 / 6, 2 / 6, 1 / 6]):
+            self.assertAlmostEqual(counts[i] / 3000, share, delta=0.04)
+
+    def test_dead_monsters_are_cleared_away(self):
+        monster = troll()
+        self.monsters.spawn(monster, self.rooms[1])
+        self.join(self.rooms[0])
+        monster.take_damage(monster.hp)
+        self.monsters.step()
+        self.assertFalse(self.rooms[1].wanderers)
+        self.assertFalse(self.monsters)
@@ -1,3 +1,5 @@
+import pickle
+import random
 import unittest
 
 from adventure_game.item import Rarity
@@ -19,8 +21,63 @@ class WeaponTests(unittest.TestCase):
         self.assertEqual(weapon.durability, 0)
         self.assertEqual(weapon.is_broken(), True)
 
+    def test_description_follows_durability(self):
+        weapon = Weapon("sword", 5, Rarity.Crappy, 5, 2)
+        self.assertEqual(
+            str(weapon), "sword [attack: 5, durability: 2, luck: 5]"
+        )
+        weapon.decrement_durability()
+        self.assertEqual(
+            str(weapon), "sword [attack: 5, durability: 1, luck: 5]"
+        )
+
+    def test_description_follows_stats(self):
+        weapon = Weapon("sword", 5, Rarity.Crappy, 3, 2)
+        self.assertEqual(
+            str(weapon), "sword [attack: 3, durability: 2, luck: 5]"
+        )
+        weapon.attack_strength = 9
+        weapon.name = "blade"
+        self.assertEqual(
+            str(weapon), "blade [attack: 9, durability: 2, luck: 5]"
+        )
+
 
 class WeaponGenerationTests(unittest.TestCase):
     def test_basic(self):
         weapon = generate_weapon()
         self.assertIsInstance(weapon, Weapon)
+
+    def test_types_shared(self):
+        random.seed(0)
+        weapons = [generate_weapon() for _ in range(200)]
+        self.assertLessEqual(len({id(w.type) for w in weapons}), 30)
+        first = weapons[0]
+        same = Weapon(
+            first.name, first.luck_stat, first.rarity,
+            first.attack_strength, 1
+        )
+        self.assertIs(same.type, first.type)
+        self.assertFalse(hasattr(same, '__dict__'))
+
+        # Each weapon still has its own durability
+        same.decrement_durability()
+        self.assertEqual(same.durability, 0)
+        self.assertNotEqual(first.durability, 0)
+
+    def test_changing_stat_changes_type(self):
+        sword = Weapon("sword", 5, Rarity.Crappy, 5, 2)
+        other = Weapon("sword", 5, Rarity.Crappy, 5, 3)
+        sword.attack_strength = 7
+        self.assertEqual(
+            (sword.attack_strength, other.attack_strength), (7, 5)
+        )
+        self.assertIs(
+            sword.type, Weapon("sword", 5, Rarity.Crappy, 7, 2).type
+        )
+
+    def test_pickled_type_interned(self):
+        weapon = generate_weapon()
+        loaded = pickle.loads(pickle.dumps(weapon))
+        self.assertIs(loaded.type, weapon.type)
+        self.assertEqual(str(loaded), str(weapon))
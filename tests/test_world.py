@@ -0,0 +1,195 @@
+import contextlib
+import io
+import threading
+import unittest
+from unittest.mock import patch
+
+from adventure_game import enemy, item
+from adventure_game.compass import Direction
+from adventure_game.player import Player
+from adventure_game.room import EmptyRoom, MonsterRoom, TreasureRoom
+from adventure_game.weapon import Weapon
+from adventure_game.world import NO_LOCK, SharedWorld
+
+
+def run_threads(n, target):
+    """Runs target(i) on n threads, released at the same time."""
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def take_all(prompt):
+    """Answers the prompts of take_loop by taking everything, once."""
+    return "take all" if prompt.startswith("What would you like to") else "no"
+
+
+class SharedWorldTests(unittest.TestCase):
+    def test_adopt(self):
+        world = SharedWorld()
+        room = world.adopt(EmptyRoom("hall", [Direction.North]))
+        self.assertIs(room.world, world)
+        self.assertIsNot(room.lock, NO_LOCK)
+        self.assertEqual(room.id, 1)
+        self.assertIs(world.rooms[0], world.start_room)
+        self.assertEqual(len(world), 2)
+
+    def test_standalone_rooms_are_not_locked(self):
+        room = EmptyRoom("hall", [Direction.North])
+        self.assertIsNone(room.world)
+        self.assertIs(room.lock, NO_LOCK)
+        self.assertIsNone(room.north.world)
+
+    def test_exits_are_generated_once(self):
+        world = SharedWorld(EmptyRoom("hall", [Direction.North]))
+        found = []
+        run_threads(8, lambda _: found.append(world.start_room.north))
+        self.assertEqual(len({id(room) for room in found}), 1)
+        self.assertIs(found[0].world, world)
+        self.assertIs(found[0].south, world.start_room)
+        self.assertEqual(len(world), 2)
+
+    def test_new_room_after_trap_joins_world(self):
+        world = SharedWorld()
+        player = Player("Tester", 100)
+        player.move_to(world.start_room)
+        player.move_to_new_room()
+        self.assertIs(player.current_room.world, world)
+        self.assertIsNot(player.current_room, world.start_room)
+
+
+class SharedRoomTests(unittest.TestCase):
+    def test_items_are_taken_once(self):
+        world = SharedWorld(EmptyRoom("hall", []))
+        items = [
+            Weapon(f"sword {i}", 0, item.Rarity.Crappy, 1, 5)
+            for i in range(10)
+        ]
+        for weapon in items:
+            world.start_room.add_item(weapon)
+        players = [Player(f"Tester {i}", 100) for i in range(4)]
+        options = world.start_room.get_options()
+
+        with patch('builtins.input', take_all), \
+                contextlib.redirect_stdout(io.StringIO()):
+            run_threads(4, lambda i: options['look'].handler(players[i]))
+
+        taken = [w for player in players for w in player.weapons]
+        self.assertEqual(sorted(w.name for w in taken),
+                         sorted(w.name for w in items))
+        self.assertFalse(world.start_room.items)
+
+    def test_monster_is_killed_once(self):
+        world = SharedWorld()
+        monster = enemy.Enemy(
+            "boss", "boss", 5, Weapon("gun", 0, item.Rarity.Crappy, 1, 100)
+        )
+        room = world.adopt(MonsterRoom("lair", [], monster))
+        players = [Player(f"Tester {i}", 100) for i in range(8)]
+        options = room.get_options()
+
+        f = io.StringIO()
+        with patch('builtins.input', lambda prompt: "a"), \
+                contextlib.redirect_stdout(f):
+            run_threads(8, lambda i: options['attack'].handler(players[i]))
+
+        self.assertEqual(monster.hp, 0)
+        self.assertEqual(f.getvalue().count("You took down the boss!"), 1)
+        # Every strike landed on the living monster, one hp at a time
+        self.assertEqual(f.getvalue().count("You attacked the boss"), 5)
+
+    def test_chest_is_shared(self):
+        world = SharedWorld()
+        room = world.adopt(TreasureRoom("vault", []))
+        players = [Player(f"Tester {i}", 100) for i in range(4)]
+        options = room.get_options()
+
+        with patch('builtins.input', take_all), \
+                contextlib.redirect_stdout(io.StringIO()):
+            run_threads(4, lambda i: options['open'].handler(players[i]))
+
+        taken = [
+            i for player in players for i in player.weapons + player.outfits
+        ]
+        # The chest was only filled once, and each item was taken once
+        self.assertLessEqual(len(taken), 3)
+        self.assertEqual(len({id(i) for i in taken}), len(taken))
+        self.assertTrue(room.chest.is_open)
+        self.assertFalse(room.chest.contents)
+
+
+def corridor(world, n):
+    """Adds a corridor of n rooms leading north from the start room."""
+    exits = [Direction.North, Direction.South]
+    rooms = [world.start_room]
+    for i in range(n):
+        room = world.adopt(EmptyRoom(f"room {i}", exits))
+        rooms[-1]._exits[Direction.North] = room
+        room._exits[Direction.South] = rooms[-1]
+        rooms.append(room)
+    return rooms
+
+
+class InterestTests(unittest.TestCase):
+    def setUp(self):
+        self.world = SharedWorld(
+            EmptyRoom("hall", [Direction.North, Direction.South])
+        )
+        self.rooms = corridor(self.world, 3)
+        self.heard = {}
+
+    def join(self, name, room):
+        player = Player(name, 100)
+        player.move_to(room)
+        self.heard[name] = []
+        self.world.join(player, self.heard[name].append)
+        return player
+
+    def test_index_follows_players(self):
+        player = self.join("Tester", self.rooms[0])
+        self.assertEqual(self.world.players_in(self.rooms[0]), {player})
+        player.move_to(self.rooms[1])
+        self.assertFalse(self.world.players_in(self.rooms[0]))
+        self.assertEqual(self.world.players_in(self.rooms[1]), {player})
+        self.world.leave(player)
+        self.assertFalse(self.world.players_in(self.rooms[1]))
+
+    def test_broadcast_reaches_players_nearby(self):
+        actor = self.join("Actor", self.rooms[1])
+        self.join("Same", self.rooms[1])
+        self.join("South", self.rooms[0])
+        self.join("North", self.rooms[2])
+        self.join("Far", self.rooms[3])
+
+        self.world.broadcast(self.rooms[1], actor, "opened the chest")
+
+        self.assertEqual(self.heard["Same"], ["Actor opened the chest."])
+        self.assertEqual(self.heard["South"],
+                         ["From the North: Actor opened the chest."])
+        self.assertEqual(self.heard["North"],
+                         ["From the South: Actor opened the chest."])
+        self.assertFalse(self.heard["Actor"])
+        self.assertFalse(self.heard["Far"])
+
+    def test_drop_is_broadcast(self):
+        actor = self.join("Actor", self.rooms[0])
+        self.join("Watcher", self.rooms[0])
+        actor.weapons.append(Weapon("sword", 0, item.Rarity.Crappy, 1, 5))
+        with contextlib.redirect_stdout(io.StringIO()):
+            actor.drop('weapon', len(actor.weapons))
+        self.assertEqual(self.heard["Watcher"], ["Actor dropped the sword."])
+
+    def test_players_who_left_are_not_told(self):
+        actor = self.join("Actor", self.rooms[0])
+        watcher = self.join("Watcher", self.rooms[0])
+        self.world.leave(watcher)
+        self.world.broadcast(self.rooms[0], actor, "dropped the sword")
+        self.assertFalse(self.heard["Watcher"])